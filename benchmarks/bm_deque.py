@@ -0,0 +1,75 @@
+"""
+Moving average over an array, keeping the last k values in a list
+(evicting with list.pop(0)) and in a collections.deque (evicting with
+popleft()).  Run as a script to time both for various window sizes.
+"""
+from __future__ import print_function, division, absolute_import
+
+from collections import deque
+
+import numpy as np
+
+from numba import njit
+from numba.utils import benchmark
+
+
+N = 200000
+K = 1000
+
+rnd = np.random.RandomState(42)
+values = rnd.random_sample(N)
+
+
+def py_moving_average_list(values, k):
+    window = [values[0]]
+    window.pop()
+    res = np.empty(len(values) - k + 1)
+    total = 0.0
+    for i in range(len(values)):
+        if len(window) == k:
+            total -= window.pop(0)
+        window.append(values[i])
+        total += values[i]
+        if i >= k - 1:
+            res[i - k + 1] = total / k
+    return res
+
+
+def py_moving_average_deque(values, k):
+    window = deque()
+    res = np.empty(len(values) - k + 1)
+    total = 0.0
+    for i in range(len(values)):
+        if len(window) == k:
+            total -= window.popleft()
+        window.append(values[i])
+        total += values[i]
+        if i >= k - 1:
+            res[i - k + 1] = total / k
+    return res
+
+
+moving_average_list = njit(py_moving_average_list)
+moving_average_deque = njit(py_moving_average_deque)
+
+# compile ahead of the timings
+moving_average_list(values, K)
+moving_average_deque(values, K)
+
+
+def python_main():
+    py_moving_average_deque(values, K)
+
+
+def numba_main():
+    moving_average_deque(values, K)
+
+
+if __name__ == '__main__':
+    print("python, deque:", benchmark(python_main))
+    for k in (10, 1000, 50000):
+        print("k = %d" % k)
+        print("  jit, list:",
+              benchmark(lambda: moving_average_list(values, k)))
+        print("  jit, deque:",
+              benchmark(lambda: moving_average_deque(values, k)))
@@ -0,0 +1,96 @@
+"""
+Top-k selection of (score, index) pairs with heapq.nsmallest(), compared
+to sorting all pairs.  Run as a script to time both approaches for
+various values of k.
+"""
+from __future__ import print_function, division, absolute_import
+
+import heapq
+
+import numpy as np
+
+from numba import njit
+from numba.utils import benchmark
+
+
+N = 200000
+K = 10
+
+rnd = np.random.RandomState(42)
+scores = rnd.random_sample(N)
+
+
+def py_pairs(scores):
+    pairs = []
+    for i in range(len(scores)):
+        pairs.append((scores[i], i))
+    return pairs
+
+
+def py_topk_heap(pairs, k):
+    return heapq.nsmallest(k, pairs)
+
+
+def py_topk_sort(pairs, k):
+    pairs = list(pairs)
+    pairs.sort()
+    return pairs[:k]
+
+
+def py_topk_streaming(scores, k):
+    # Keep the k smallest in a bounded max-heap of negated scores
+    heap = [(-scores[0], 0)]
+    for i in range(1, len(scores)):
+        item = (-scores[i], i)
+        if len(heap) < k:
+            heapq.heappush(heap, item)
+        elif heap[0] < item:
+            heapq.heapreplace(heap, item)
+    return heap
+
+
+pairs_list = py_pairs(scores)
+
+make_pairs = njit(py_pairs)
+topk_heap = njit(py_topk_heap)
+topk_sort = njit(py_topk_sort)
+topk_streaming = njit(py_topk_streaming)
+
+pairs = make_pairs(scores)
+# compile ahead of the timings
+topk_heap(pairs, K)
+topk_sort(pairs, K)
+topk_streaming(scores, K)
+
+
+@njit
+def jit_topk_heap(scores, k):
+    return topk_heap(make_pairs(scores), k)
+
+
+@njit
+def jit_topk_sort(scores, k):
+    return topk_sort(make_pairs(scores), k)
+
+
+jit_topk_heap(scores, K)
+jit_topk_sort(scores, K)
+
+
+def python_main():
+    py_topk_heap(pairs_list, K)
+
+
+def numba_main():
+    jit_topk_heap(scores, K)
+
+
+if __name__ == '__main__':
+    print("python, nsmallest:", benchmark(python_main))
+    print("python, sort:", benchmark(lambda: py_topk_sort(pairs_list, K)))
+    for k in (10, 1000, 50000):
+        print("k = %d" % k)
+        print("  jit, nsmallest:", benchmark(lambda: jit_topk_heap(scores, k)))
+        print("  jit, sort:", benchmark(lambda: jit_topk_sort(scores, k)))
+        print("  jit, streaming heap:",
+              benchmark(lambda: topk_streaming(scores, k)))
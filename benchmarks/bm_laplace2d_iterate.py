@@ -0,0 +1,62 @@
+from __future__ import absolute_import, print_function, division
+
+import numpy as np
+from numba import njit, stencil, stencil_iterate
+from numba.utils import benchmark
+
+
+NN = 1024
+NM = 1024
+STEPS = 20
+
+
+@stencil
+def laplace_kernel(a):
+    return 0.25 * (a[0, 1] + a[1, 0] + a[0, -1] + a[-1, 0])
+
+
+def laplace_step(A):
+    Anew = np.zeros_like(A)
+    Anew[1:-1, 1:-1] = 0.25 * (A[1:-1, 2:] + A[2:, 1:-1]
+                               + A[1:-1, :-2] + A[:-2, 1:-1])
+    return Anew
+
+
+@njit(parallel=True)
+def laplace_sweeps(A, steps):
+    # one full sweep over memory per step
+    Anew = laplace_kernel(A)
+    for i in range(steps - 1):
+        Anew = laplace_kernel(Anew)
+    return Anew
+
+
+def initial_grid():
+    A = np.zeros((NN, NM), dtype=np.float64)
+    A[:, 0] = 1.0
+    return A
+
+
+# compile ahead of the timings
+laplace_sweeps(initial_grid(), 1)
+stencil_iterate(laplace_kernel, 1, initial_grid())
+
+
+def python_main():
+    A = initial_grid()
+    for i in range(STEPS):
+        A = laplace_step(A)
+
+
+def numba_sweeps_main():
+    laplace_sweeps(initial_grid(), STEPS)
+
+
+def numba_main():
+    stencil_iterate(laplace_kernel, STEPS, initial_grid())
+
+
+if __name__ == '__main__':
+    print(benchmark(python_main))
+    print(benchmark(numba_sweeps_main))
+    print(benchmark(numba_main))
@@ -0,0 +1,95 @@
+"""
+Kernels whose loops pass arrays around, to track the NRT reference count
+operations left in compiled code.  Run as a script to also print the number
+of NRT_incref/NRT_decref calls left in each kernel and the time taken to
+compile the kernels, which includes the pruning of these operations.
+"""
+from __future__ import print_function, division, absolute_import
+
+import numpy as np
+from numba import njit
+from numba.utils import benchmark
+
+
+N = 1000
+
+
+def py_sum_rows(arr):
+    s = 0.0
+    for i in range(arr.shape[0]):
+        row = arr[i]
+        s += row.sum()
+    return s
+
+
+def py_sum_list(a, lst):
+    s = 0.0
+    for i in range(len(lst)):
+        x = lst[i]
+        s += x.sum() + a[i]
+    return s
+
+
+def py_pairwise(a, b):
+    s = 0.0
+    for i in range(a.shape[0]):
+        x = a
+        y = b
+        s += x[i] * y[i]
+    return s
+
+
+sum_rows = njit(py_sum_rows)
+sum_list = njit(py_sum_list)
+pairwise = njit(py_pairwise)
+
+kernels = [(py_sum_rows, sum_rows), (py_sum_list, sum_list),
+           (py_pairwise, pairwise)]
+
+arr = np.arange(N * 10.).reshape(N, 10)
+vec = np.arange(float(N))
+lst = [np.arange(10.)] * N
+
+
+def run_all(sum_rows, sum_list, pairwise):
+    sum_rows(arr)
+    sum_list(vec, lst)
+    pairwise(vec, vec)
+
+
+def count_refct_ops(cfunc):
+    """
+    Count the NRT_incref and NRT_decref calls left in the compiled
+    function (not counting the wrapper and callees).
+    """
+    sig = cfunc.signatures[0]
+    llvm_ir = cfunc.inspect_llvm(sig)
+    fndesc = cfunc.overloads[sig].fndesc
+    start = llvm_ir.index('define i32 @"{}"'.format(fndesc.mangled_name))
+    body = llvm_ir[start:llvm_ir.index('\n}', start)]
+    return body.count('NRT_incref'), body.count('NRT_decref')
+
+
+# compile ahead of the timings
+run_all(sum_rows, sum_list, pairwise)
+
+
+def compile_main():
+    # fresh dispatchers, so that nothing is reused from the compiled kernels
+    run_all(njit(py_sum_rows), njit(py_sum_list), njit(py_pairwise))
+
+
+def python_main():
+    run_all(py_sum_rows, py_sum_list, py_pairwise)
+
+
+def numba_main():
+    run_all(sum_rows, sum_list, pairwise)
+
+
+if __name__ == '__main__':
+    for _, cfunc in kernels:
+        print(cfunc.__name__, "incref/decref calls:", count_refct_ops(cfunc))
+    print(benchmark(python_main))
+    print(benchmark(numba_main))
+    print(benchmark(compile_main))
@@ -0,0 +1,91 @@
+"""
+Scan and sort records of (price, volume, ident) stored as a typed list
+of tuples and as a numba.typed.RecordList (one array per field).
+Run as a script to time both layouts.
+"""
+from __future__ import print_function, division, absolute_import
+
+import numpy as np
+
+from numba import njit, types
+from numba.typed import List, RecordList
+from numba.utils import benchmark
+
+
+N = 1000000
+
+rnd = np.random.RandomState(42)
+prices = rnd.random_sample(N)
+volumes = rnd.randint(0, 1000, N)
+
+record_type = types.Tuple([types.float64, types.int64, types.int64])
+
+
+@njit
+def fill(records, prices, volumes):
+    for i in range(len(prices)):
+        records.append((prices[i], volumes[i], i))
+
+
+@njit
+def list_total_volume(records):
+    s = 0
+    for rec in records:
+        s += rec[1]
+    return s
+
+
+@njit
+def record_list_total_volume(records):
+    return records.columns()[1].sum()
+
+
+@njit
+def list_sort(records):
+    # Tuples compare on the price first
+    records.sort()
+
+
+@njit
+def record_list_sort(records):
+    records.sort_by(0)
+
+
+def make_list(n=N):
+    records = List.empty(record_type)
+    fill(records, prices[:n], volumes[:n])
+    return records
+
+
+def make_record_list(n=N):
+    records = RecordList.empty(record_type)
+    fill(records, prices[:n], volumes[:n])
+    return records
+
+
+tuples = make_list()
+records = make_record_list()
+
+# compile ahead of the timings
+list_total_volume(tuples)
+record_list_total_volume(records)
+list_sort(make_list(10))
+record_list_sort(make_record_list(10))
+
+
+def python_main():
+    list_total_volume(tuples)
+
+
+def numba_main():
+    record_list_total_volume(records)
+
+
+if __name__ == '__main__':
+    print("list of tuples, scan:", benchmark(python_main))
+    print("record list, scan:", benchmark(numba_main))
+    # (each run includes filling a new container)
+    print("list of tuples, fill and sort:",
+          benchmark(lambda: list_sort(make_list())))
+    print("record list, fill and sort:",
+          benchmark(lambda: record_list_sort(make_record_list())))
@@ -0,0 +1,79 @@
+"""
+Insert-heavy and lookup-heavy set workloads on integer keys with
+various distributions.  Run as a script to time all distributions;
+compare the timings with and without NUMBA_SET_HASH_MIXING=1 in the
+environment.
+"""
+from __future__ import print_function, division, absolute_import
+
+import numpy as np
+
+from numba import njit
+from numba.utils import benchmark
+
+
+N = 200000
+
+rnd = np.random.RandomState(42)
+
+KEYS = {
+    'sequential': np.arange(N),
+    'stride 1024': np.arange(N) * 1024,
+    'stride 2**32': np.arange(N) << 32,
+    'random': rnd.randint(0, 2**62, N),
+    }
+
+
+def py_insert(keys):
+    s = set()
+    for k in keys:
+        s.add(k)
+    return len(s)
+
+
+def py_lookup(keys, probes):
+    s = set(keys)
+    n = 0
+    for k in probes:
+        if k in s:
+            n += 1
+    return n
+
+
+def make_probes(keys):
+    # Half hits, half misses, in random order
+    probes = np.concatenate((keys, keys + 1))
+    rnd.shuffle(probes)
+    return probes
+
+
+insert = njit(py_insert)
+lookup = njit(py_lookup)
+
+strided = KEYS['stride 1024']
+strided_list = list(strided)
+strided_probes = make_probes(strided)
+strided_probes_list = list(strided_probes)
+
+# compile ahead of the timings
+insert(strided)
+lookup(strided, strided_probes)
+
+
+def python_main():
+    py_insert(strided_list)
+    py_lookup(strided_list, strided_probes_list)
+
+
+def numba_main():
+    insert(strided)
+    lookup(strided, strided_probes)
+
+
+if __name__ == '__main__':
+    for name, keys in sorted(KEYS.items()):
+        probes = make_probes(keys)
+        res = benchmark(lambda: insert(keys))
+        print("%-12s insert: %s" % (name, res))
+        res = benchmark(lambda: lookup(keys, probes))
+        print("%-12s lookup: %s" % (name, res))
@@ -0,0 +1,81 @@
+"""
+Sorting arrays with the quicksort, mergesort and timsort kinds, on random,
+sorted, reverse-sorted and nearly-sorted inputs.  Run as a script to time
+all of them, along with NumPy's own sort.
+"""
+from __future__ import print_function, division, absolute_import
+
+import numpy as np
+
+from numba import njit
+from numba.utils import benchmark
+
+
+N = 10 ** 6
+
+rnd = np.random.RandomState(42)
+
+
+def nearly_sorted(n, swaps):
+    arr = np.arange(n, dtype=np.float64)
+    i = rnd.randint(0, n, swaps)
+    j = rnd.randint(0, n, swaps)
+    arr[i], arr[j] = arr[j], arr[i].copy()
+    return arr
+
+inputs = [
+    ("random", rnd.random_sample(N)),
+    ("sorted", np.arange(N, dtype=np.float64)),
+    ("reverse-sorted", np.arange(N, dtype=np.float64)[::-1].copy()),
+    ("nearly sorted", nearly_sorted(N, N // 1000)),
+    ("sorted + random tail",
+     np.concatenate((np.arange(N - N // 100, dtype=np.float64),
+                     rnd.random_sample(N // 100) * N))),
+]
+
+
+@njit
+def sort_quicksort(arr):
+    return np.sort(arr)
+
+@njit
+def sort_mergesort(arr):
+    return np.sort(arr, kind='mergesort')
+
+@njit
+def sort_timsort(arr):
+    return np.sort(arr, kind='timsort')
+
+@njit
+def argsort_mergesort(arr):
+    return np.argsort(arr, kind='mergesort')
+
+@njit
+def argsort_timsort(arr):
+    return np.argsort(arr, kind='timsort')
+
+sorts = [
+    ("sort, quicksort", sort_quicksort),
+    ("sort, mergesort", sort_mergesort),
+    ("sort, timsort", sort_timsort),
+    ("argsort, mergesort", argsort_mergesort),
+    ("argsort, timsort", argsort_timsort),
+]
+
+# compile ahead of the timings
+for name, func in sorts:
+    func(inputs[0][1][:100])
+
+
+def numba_main():
+    for name, arr in inputs:
+        sort_timsort(arr)
+
+
+if __name__ == '__main__':
+    for input_name, arr in inputs:
+        print("%s:" % input_name)
+        print("  numpy, sort, quicksort:",
+              benchmark(lambda: np.sort(arr)))
+        for name, func in sorts:
+            print("  jit, %s:" % name, benchmark(lambda: func(arr)))
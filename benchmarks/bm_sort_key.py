@@ -0,0 +1,88 @@
+"""
+Sorting a list of records by a key, either by building a list of
+(key, index, record) tuples or with sort(key=...).  Run as a script to
+time both on 10**7 records.
+"""
+from __future__ import print_function, division, absolute_import
+
+import numpy as np
+
+from numba import njit
+from numba.utils import benchmark
+
+
+N = 10 ** 7
+
+rnd = np.random.RandomState(42)
+prices = rnd.random_sample(N)
+volumes = rnd.randint(0, 1000, N)
+
+
+# The records stay in jitted code: boxing 10**7 tuples would dominate
+# the timings.
+
+@njit
+def make_records(prices, volumes):
+    return [(prices[i], volumes[i], i) for i in range(len(prices))]
+
+
+@njit
+def volume_key(rec):
+    return rec[1]
+
+
+@njit
+def checksum(records):
+    # Depends on the order of the records
+    s = 0
+    for i in range(0, len(records), 1000):
+        s += records[i][2] * (i + 1)
+    return s
+
+
+@njit
+def make_only(prices, volumes):
+    return checksum(make_records(prices, volumes))
+
+
+@njit
+def sort_decorated(prices, volumes):
+    records = make_records(prices, volumes)
+    decorated = [(volume_key(rec), i, rec) for i, rec in enumerate(records)]
+    decorated.sort()
+    records = [t[2] for t in decorated]
+    return checksum(records)
+
+
+@njit
+def sort_with_key(prices, volumes):
+    records = make_records(prices, volumes)
+    records.sort(key=volume_key)
+    return checksum(records)
+
+
+@njit
+def sorted_with_key(prices, volumes):
+    records = make_records(prices, volumes)
+    return checksum(sorted(records, key=volume_key))
+
+
+# compile ahead of the timings, and check the results agree
+assert (sort_decorated(prices[:1000], volumes[:1000]) ==
+        sort_with_key(prices[:1000], volumes[:1000]) ==
+        sorted_with_key(prices[:1000], volumes[:1000]))
+make_only(prices[:10], volumes[:10])
+
+
+def numba_main():
+    sort_with_key(prices, volumes)
+
+
+if __name__ == '__main__':
+    print("jit, make records only:",
+          benchmark(lambda: make_only(prices, volumes)))
+    print("jit, list of tuples:",
+          benchmark(lambda: sort_decorated(prices, volumes)))
+    print("jit, list.sort(key=...):", benchmark(numba_main))
+    print("jit, sorted(key=...):",
+          benchmark(lambda: sorted_with_key(prices, volumes)))
@@ -0,0 +1,49 @@
+"""
+Pass a large list to a jitted function, as a Python list (unboxed and
+reflected at each call) and as a numba.typed.List (passed by reference).
+Run as a script to also time the jitted function on both.
+"""
+from __future__ import print_function, division, absolute_import
+
+from numba import njit, types
+from numba.typed import List
+from numba.utils import benchmark
+
+
+N = 100000
+
+
+def py_total(lst):
+    s = 0.0
+    for x in lst:
+        s += x
+    return s
+
+
+total = njit(py_total)
+
+pylist = [float(i) for i in range(N)]
+typed = List.empty(types.float64)
+typed.extend(pylist)
+
+# compile ahead of the timings
+total(pylist)
+total(typed)
+
+
+def reflected_main():
+    total(pylist)
+
+
+def python_main():
+    py_total(pylist)
+
+
+def numba_main():
+    total(typed)
+
+
+if __name__ == '__main__':
+    print("python:", benchmark(python_main))
+    print("jit, reflected list:", benchmark(reflected_main))
+    print("jit, typed list:", benchmark(numba_main))
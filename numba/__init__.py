@@ -24,6 +24,8 @@ from .smartarray import SmartArray
 # Re-export decorators
 from .decorators import autojit, cfunc, generated_jit, jit, njit, stencil
 
+from .stencil import stencil_iterate
+
 # Re-export vectorize decorators
 from .npyufunc import vectorize, guvectorize
 
@@ -49,6 +51,7 @@ __all__ = """
     typeof
     prange
     stencil
+    stencil_iterate
     vectorize
     """.split() + types.__all__ + errors.__all__
 
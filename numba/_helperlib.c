@@ -941,6 +941,29 @@ numba_unpickle(const char *data, int n)
     return obj;
 }
 
+/*
+ * Hash the compact representation of a unicode string (PEP 393), giving
+ * the same result as str.__hash__.
+ */
+NUMBA_EXPORT_FUNC(Py_ssize_t)
+numba_unicode_hash(const void *data, Py_ssize_t nbytes)
+{
+#if PY_VERSION_HEX >= 0x03040000
+    return _Py_HashBytes(data, nbytes);
+#else
+    /* FNV-1a */
+    const unsigned char *p = (const unsigned char *) data;
+    size_t h = (size_t) 2166136261U;
+    Py_ssize_t i;
+    for (i = 0; i < nbytes; i++) {
+        h = (h ^ p[i]) * 16777619U;
+    }
+    if ((Py_ssize_t) h == -1)
+        h = (size_t) -2;
+    return (Py_ssize_t) h;
+#endif
+}
+
 
 /*
  * Define bridge for all math functions
@@ -14,6 +14,7 @@ from numba.ir_utils import (
     dprint_func_ir,
     get_global_func_typ,
     guard,
+    GuardException,
     require,
     get_definition,
     find_callname,
@@ -64,7 +65,9 @@ def wrap_index(typingctx, idx, size):
     Note that we use the mod(%) operation here instead of
     (idx < 0 ? idx + size : idx) because we may have situations
     where idx > size due to the way indices are calculated
-    during slice/range analysis.
+    during slice/range analysis. An "idx" that reaches below -size
+    denotes an empty range (e.g. a[2:] when a has only one element),
+    and gives 0.
     """
     if idx != size:
         raise ValueError("Argument types for wrap_index must match")
@@ -73,14 +76,19 @@ def wrap_index(typingctx, idx, size):
         assert(len(args) == 2)
         idx = args[0]
         size = args[1]
-        rem = builder.srem(idx, size)
         zero = llvmlite.ir.Constant(idx.type, 0)
+        one = llvmlite.ir.Constant(idx.type, 1)
+        is_empty = builder.icmp_signed('<=', builder.add(idx, size), zero)
+        # avoid division by zero for empty dimensions
+        divisor = builder.select(builder.icmp_signed('>', size, zero),
+                                 size, one)
+        rem = builder.srem(idx, divisor)
         is_negative = builder.icmp_signed('<', rem, zero)
         wrapped_rem = builder.add(rem, size)
         is_oversize = builder.icmp_signed('>', wrapped_rem, size)
         mod = builder.select(is_negative, wrapped_rem,
                 builder.select(is_oversize, rem, wrapped_rem))
-        return mod
+        return builder.select(is_empty, zero, mod)
 
     return signature(idx, idx, size), codegen
 
@@ -592,7 +600,7 @@ class SymbolicEquivSet(ShapeEquivSet):
     """
 
     def __init__(self, typemap, def_by=None, ref_by=None, ext_shapes=None,
-                 defs=None, ind_to_var=None, obj_to_ind=None,
+                 wrap_rel=None, defs=None, ind_to_var=None, obj_to_ind=None,
                  ind_to_obj=None, next_id=0):
         """Create a new SymbolicEquivSet object, where typemap is a dictionary
         that maps variable names to their types, and it will not be modified.
@@ -611,6 +619,12 @@ class SymbolicEquivSet(ShapeEquivSet):
         # currently used to remember shapes for SetItem IR node, and wrapped
         # indices for Slice objects.
         self.ext_shapes = ext_shapes if ext_shapes else {}
+        # A "wrapped-by" table that maps A to a tuple of (B, i), which
+        # means A is the size of a range that ends i elements before the
+        # end of a dimension of size B, i.e. A = B + i, where i <= 0 and
+        # A >= 0. It is populated from wrap_index calls, and unlike def_by,
+        # it allows nested slices like a[1:][1:] and a[2:] to be related.
+        self.wrap_rel = wrap_rel if wrap_rel else {}
         super(SymbolicEquivSet, self).__init__(
             typemap, defs, ind_to_var, obj_to_ind, ind_to_obj, next_id)
 
@@ -621,8 +635,9 @@ class SymbolicEquivSet(ShapeEquivSet):
 
     def __repr__(self):
         return ("SymbolicEquivSet({}, ind_to_var={}, def_by={}, "
-                "ref_by={}, ext_shapes={})".format(self.ind_to_obj,
-                self.ind_to_var, self.def_by, self.ref_by, self.ext_shapes))
+                "ref_by={}, ext_shapes={}, wrap_rel={})".format(
+                self.ind_to_obj, self.ind_to_var, self.def_by, self.ref_by,
+                self.ext_shapes, self.wrap_rel))
 
     def clone(self):
         """Return a new copy.
@@ -632,6 +647,7 @@ class SymbolicEquivSet(ShapeEquivSet):
             def_by=copy.copy(self.def_by),
             ref_by=copy.copy(self.ref_by),
             ext_shapes=copy.copy(self.ext_shapes),
+            wrap_rel=copy.copy(self.wrap_rel),
             defs=copy.copy(self.defs),
             ind_to_var=copy.copy(self.ind_to_var),
             obj_to_ind=copy.deepcopy(self.obj_to_ind),
@@ -695,6 +711,11 @@ class SymbolicEquivSet(ShapeEquivSet):
                         if len(names) > 0:
                             self._insert(names)
                         self.ext_shapes[index] = names
+                        rel = guard(self._get_wrap_rel, expr.args[0],
+                                    expr.args[1], func_ir)
+                        if rel != None:
+                            self.wrap_rel[name] = rel
+                            self._insert_wrap_equiv(name)
                 elif expr.op == 'binop':
                     lhs = self._get_or_set_rel(expr.lhs, func_ir)
                     rhs = self._get_or_set_rel(expr.rhs, func_ir)
@@ -728,6 +749,119 @@ class SymbolicEquivSet(ShapeEquivSet):
                             super(SymbolicEquivSet, self)._insert(names)
             return value
 
+    def _get_wrap_rel(self, size, dsize, func_ir):
+        """Given the arguments of a wrap_index(size, dsize) call that computes
+        the size of a slice, return a pair (B, i) such that the result is
+        B + i, where i <= 0, or raise GuardException if it is not an offset
+        relative to the end of dsize. When dsize itself is the result of
+        another wrap_index or an offset of some variable, B refers to the
+        innermost base so that a[1:][1:] and a[2:] derive the same pair.
+        """
+        dsize = dsize.name if isinstance(dsize, ir.Var) else dsize
+        rel = self._get_or_set_rel(size, func_ir)
+        if isinstance(rel, int):
+            offset = rel
+        else:
+            (var, offset) = rel
+            require(var == dsize or
+                    self._get_ind(var) == self._get_ind(dsize) != -1)
+        require(offset <= 0)
+        ind = self._get_ind(dsize)
+        objs = self.ind_to_obj[ind] if ind >= 0 else [dsize]
+        for obj in objs:
+            if obj in self.wrap_rel:
+                (base, i) = self.wrap_rel[obj]
+                return (base, i + offset)
+        for obj in objs:
+            value = self.def_by.get(obj, None)
+            if isinstance(value, tuple) and value[0] != obj:
+                (base, i) = value
+                return (base, i + offset)
+        return (dsize, offset)
+
+    def _is_same_rel(self, rel, base, offset):
+        """Return true if the given (B, i) pair denotes base + offset.
+        """
+        return rel[1] == offset and (rel[0] == base or
+                self._get_ind(rel[0]) == self._get_ind(base) != -1)
+
+    def _is_non_negative(self, name):
+        """Return true if the given variable is known to be non-negative,
+        that is, it is equivalent to an array dimension, a slice size or
+        a non-negative constant.
+        """
+        ind = self._get_ind(name)
+        if ind == -1:
+            return False
+        for obj in self.ind_to_obj[ind]:
+            if isinstance(obj, int):
+                return obj >= 0
+            if obj in self.wrap_rel:
+                return True
+            if isinstance(obj, str) and '#' in obj:
+                typ = self.typemap.get(obj.rsplit('#', 1)[0], None)
+                if isinstance(typ, types.ArrayCompatible):
+                    return True
+        return False
+
+    def _get_wrap_equivs(self, base, offset):
+        """Return names of wrap_index results that are relative to the given
+        base and offset, as well as those variables defined as base + offset
+        that are known to be non-negative.
+        """
+        names = [obj for (obj, rel) in self.wrap_rel.items()
+                 if self._is_same_rel(rel, base, offset)]
+        for (obj, rel) in self.def_by.items():
+            if (isinstance(rel, tuple) and self.defs.get(obj, 0) == 1 and
+                self._is_same_rel(rel, base, offset) and
+                self._is_non_negative(obj)):
+                names.append(obj)
+        return names
+
+    def _insert_wrap_equiv(self, name):
+        """Insert equivalence between a wrap_index result and other objects
+        that are known to have the same size relation.
+        """
+        (base, offset) = self.wrap_rel[name]
+        names = self._get_wrap_equivs(base, offset)
+        if not (name in names):
+            names.append(name)
+        if len(names) > 1:
+            self._insert(names)
+
+    def _get_clamped_rel(self, obj):
+        """Return a (B, i) pair such that max(0, obj) = max(0, B + i), or
+        None if no such relation is known.
+        """
+        names = self._get_names(obj)
+        if len(names) != 1 or isinstance(names[0], int):
+            return None
+        name = names[0]
+        ind = self._get_ind(name)
+        objs = self.ind_to_obj[ind] if ind >= 0 else [name]
+        for x in objs:
+            if x in self.wrap_rel:
+                return self.wrap_rel[x]
+        for x in objs:
+            value = self.def_by.get(x, None)
+            if isinstance(value, tuple) and value[0] != x:
+                return value
+        return None
+
+    def is_clamped_equiv(self, x, y):
+        """Return true if max(0, x) and max(0, y) are known to be equal.
+        This is weaker than is_equiv, but it is sufficient to show that
+        two loops with the same non-negative start and step, stopping at
+        x and y respectively, iterate over the same range, since a range
+        whose stop is below its start is empty.
+        """
+        if self.is_equiv(x, y):
+            return True
+        x_rel = self._get_clamped_rel(x)
+        y_rel = self._get_clamped_rel(y)
+        return (x_rel != None and y_rel != None and
+                self._is_same_rel(x_rel, y_rel[0], y_rel[1]))
+
     def define(self, var, func_ir=None, typ=None):
         """Besides incrementing the definition count of the given variable
         name, it will also retrieve and simplify its definition from func_ir,
@@ -800,6 +934,41 @@ class SymbolicEquivSet(ShapeEquivSet):
         for names in offset_dict.values():
             self._insert(names)
 
+        # New equivalence guided by wrap_rel, which applies to variables
+        # defined by offsets only when they are known to be non-negative.
+        objs = self.ind_to_obj[self._get_ind(uniqs[0])]
+        if self.wrap_rel and self._is_non_negative(uniqs[0]):
+            rels = set()
+            for obj in objs:
+                if obj in self.wrap_rel:
+                    rels.add(self.wrap_rel[obj])
+                elif (isinstance(self.def_by.get(obj, None), tuple) and
+                      self.defs.get(obj, 0) == 1):
+                    rels.add(self.def_by[obj])
+            for (base, offset) in rels:
+                names = [x for x in self._get_wrap_equivs(base, offset)
+                         if not (x in objs)]
+                if names:
+                    self._insert(names + [uniqs[0]])
+
+    def intersect(self, equiv_set):
+        """Overload the intersect method to keep the symbolic relations that
+        hold in both sets.
+        """
+        newset = super(SymbolicEquivSet, self).intersect(equiv_set)
+        for (name, value) in self.def_by.items():
+            if equiv_set.def_by.get(name, None) == value:
+                newset.def_by[name] = value
+        for (name, refs) in self.ref_by.items():
+            other = equiv_set.ref_by.get(name, [])
+            common = [x for x in refs if x in other]
+            if common:
+                newset.ref_by[name] = common
+        for (name, value) in self.wrap_rel.items():
+            if equiv_set.wrap_rel.get(name, None) == value:
+                newset.wrap_rel[name] = value
+        return newset
+
     def set_shape(self, obj, shape):
         """Overload set_shape to remember shapes of SetItem IR nodes.
         """
@@ -874,6 +1043,14 @@ class ArrayAnalysis(object):
 
         cfg = compute_cfg_from_blocks(blocks)
         topo_order = find_topo_order(blocks, cfg=cfg)
+        # Variables (re)defined in each loop, indexed by loop header
+        loop_defs = {}
+        for loop in cfg.loops().values():
+            names = loop_defs.setdefault(loop.header, set())
+            for l in loop.body:
+                if l in blocks:
+                    names.update(stmt.target.name for stmt in blocks[l].body
+                                 if isinstance(stmt, ir.Assign))
         # Traverse blocks in topological order
         for label in topo_order:
             block = blocks[label]
@@ -909,6 +1086,12 @@ class ArrayAnalysis(object):
             # Start with a new equiv_set if none is computed
             if equiv_set == None:
                 equiv_set = init_equiv_set
+            # Back edges are not yet analyzed at a loop header, so variables
+            # defined before the loop and redefined in it (e.g. accumulators)
+            # must be treated as redefined already.
+            for name in loop_defs.get(label, ()):
+                if name in equiv_set.defs:
+                    equiv_set.define(name)
             self.equiv_sets[label] = equiv_set
             # Go through instructions in a block, and insert pre/post
             # instructions as we analyze them.
@@ -1183,6 +1366,10 @@ class ArrayAnalysis(object):
             if (isinstance(size_rel, int) or (isinstance(size_rel, tuple) and
                 equiv_set.is_equiv(size_rel[0], dsize.name))):
                 rel = size_rel if isinstance(size_rel, int) else size_rel[1]
+                # keep the original definition since size_var may have
+                # become equivalent to other sizes already
+                stmts.append(ir.Assign(value=size_val, target=size_var,
+                                       loc=loc))
                 size_val = ir.Const(rel, size_typ)
                 size_var = ir.Var(scope, mk_unique_var("slice_size"), loc)
                 self._define(equiv_set, size_var, size_typ, size_val)
@@ -1226,6 +1413,9 @@ class ArrayAnalysis(object):
         typ = self.typemap[var.name]
         if not isinstance(typ, types.BaseTuple):
             return self._index_to_shape(scope, equiv_set, expr.value, expr.index_var)
+        # the shape classes of a tuple of arrays are those of all the arrays
+        # together, e.g. the outputs of a stencil returning a tuple
+        require(not any(isinstance(t, types.ArrayCompatible) for t in typ))
         shape = equiv_set._get_shape(var)
         require(isinstance(expr.index, int) and expr.index < len(shape))
         return shape[expr.index], []
@@ -1263,8 +1453,13 @@ class ArrayAnalysis(object):
         if (isinstance(callee_def, (ir.Global, ir.FreeVar))
                 and isinstance(callee_def.value, StencilFunc)):
             args = expr.args
-            return self._analyze_stencil(scope, equiv_set, callee_def.value,
-                                         expr.loc, args, dict(expr.kws))
+            shape, asserts = self._analyze_stencil(scope, equiv_set,
+                                callee_def.value, expr.loc, args,
+                                dict(expr.kws))
+            # stencils with several outputs return a tuple of arrays
+            if isinstance(self.calltypes[expr].return_type, types.BaseTuple):
+                shape = None
+            return shape, asserts
 
         fname, mod_name = find_callname(
             self.func_ir, expr, typemap=self.typemap)
@@ -1722,7 +1917,7 @@ class ArrayAnalysis(object):
         max_dim = max(dims)
         require(max_dim > 0)
         try:
-            shapes = [equiv_set.get_shape(x) for x in arrs]
+            shapes = [equiv_set._get_shape(x) for x in arrs]
         except GuardException:
             return arrs[0], self._call_assert_equiv(scope, loc, equiv_set, arrs)
         return self._broadcast_assert_shapes(scope, equiv_set, loc, shapes, names)
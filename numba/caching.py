@@ -426,6 +426,18 @@ class CompileResultCacheImpl(_CacheImpl):
         return True
 
 
+class StencilCacheImpl(CompileResultCacheImpl):
+    """
+    Implements the logic to cache the CompileResult objects of the functions
+    generated to apply a stencil kernel.
+    """
+
+    def get_filename_base(self, fullname, abiflags):
+        parent = super(StencilCacheImpl, self)
+        res = parent.get_filename_base(fullname, abiflags)
+        return '-'.join(['stencil', res])
+
+
 class CodeLibraryCacheImpl(_CacheImpl):
     """
     Implements the logic to cache CodeLibrary objects.
@@ -691,9 +703,15 @@ class Cache(_Cache):
     def _index_key(self, sig, codegen):
         """
         Compute index key for the given signature and codegen.
-        It includes a description of the OS and target architecture.
+        It includes a description of the OS and target architecture,
+        and the config settings that change the generated code.
         """
-        return (sig, codegen.magic_tuple())
+        return (sig, codegen.magic_tuple(), self._config_key())
+
+    def _config_key(self):
+        # Code compiled with NUMBA_NRT_TRACE records allocation sites, and
+        # NUMBA_SET_HASH_MIXING changes the hashes of set and dict keys
+        return (bool(config.NRT_TRACE), bool(config.SET_HASH_MIXING))
 
 
 class FunctionCache(Cache):
@@ -703,8 +721,16 @@ class FunctionCache(Cache):
     _impl_class = CompileResultCacheImpl
 
 
+class StencilCache(Cache):
+    """
+    Implements Cache that saves and loads the CompileResult objects of the
+    functions generated for a stencil kernel.
+    """
+    _impl_class = StencilCacheImpl
+
+
 # Remember used cache filename prefixes.
-_lib_cache_prefixes = set([''])
+_lib_cache_prefixes = set(['', 'stencil'])
 
 
 def make_library_cache(prefix):
@@ -49,6 +49,12 @@ class Flags(utils.ConfigOptions):
         # detail.
         'auto_parallel': cpu.ParallelOptions(False),
         'nrt': False,
+        # Use non-atomic NRT reference count operations
+        'nrt_nonatomic': False,
+        # Record allocation sites for the NRT allocation tracer
+        'nrt_trace': False,
+        # Allocate the temporaries of each call from a NRT arena
+        'nrt_arena': False,
         'no_rewrites': False,
         'error_model': 'python',
         'fastmath': False,
@@ -73,7 +79,8 @@ CR_FIELDS = ["typing_context",
              "library",
              "call_helper",
              "environment",
-             "has_dynamic_globals"]
+             "has_dynamic_globals",
+             "parfor_diagnostics"]
 
 
 class CompileResult(namedtuple("_CompileResult", CR_FIELDS)):
@@ -112,6 +119,7 @@ class CompileResult(namedtuple("_CompileResult", CR_FIELDS)):
                  typing_error=None,
                  call_helper=None,
                  has_dynamic_globals=False,  # by definition
+                 parfor_diagnostics=None,
                  )
         return cr
 
@@ -291,6 +299,7 @@ class BasePipeline(object):
         self.typemap = None
         self.calltypes = None
         self.type_annotation = None
+        self.parfor_diagnostics = None
 
         self.status = _CompileStatus(
             can_fallback=self.flags.enable_pyobject,
@@ -519,6 +528,7 @@ class BasePipeline(object):
             self.type_annotation.calltypes, self.return_type, self.typingctx,
             self.flags.auto_parallel, self.flags)
         parfor_pass.run()
+        self.parfor_diagnostics = parfor_pass.diagnostics
 
         if config.WARNINGS:
             # check the parfor pass worked and warn if it didn't
@@ -642,6 +652,7 @@ class BasePipeline(object):
             fndesc=lowered.fndesc,
             environment=lowered.env,
             has_dynamic_globals=lowered.has_dynamic_globals,
+            parfor_diagnostics=self.parfor_diagnostics,
             )
 
     def stage_objectmode_backend(self):
@@ -834,6 +845,11 @@ def _make_subtarget(targetctx, flags):
         subtargetoptions['enable_boundcheck'] = True
     if flags.nrt:
         subtargetoptions['enable_nrt'] = True
+    if flags.nrt_nonatomic:
+        subtargetoptions['enable_nrt_atomic'] = False
+    # Not inherited by the internal functions compiled with this context
+    subtargetoptions['enable_nrt_trace'] = flags.nrt_trace
+    subtargetoptions['enable_nrt_arena'] = flags.nrt_arena
     if flags.auto_parallel:
         subtargetoptions['auto_parallel'] = flags.auto_parallel
     if flags.fastmath:
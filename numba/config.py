@@ -257,6 +257,21 @@ class _EnvReloader(object):
         # Disable jit for debugging
         DISABLE_JIT = _readenv("NUMBA_DISABLE_JIT", int, 0)
 
+        # Serve small and medium NRT allocations from a size-class pool
+        NRT_POOL_ALLOCATOR = _readenv("NUMBA_NRT_POOL_ALLOCATOR", int, 0)
+
+        # Record NRT allocations per allocation site and function
+        NRT_TRACE = _readenv("NUMBA_NRT_TRACE", int, 0)
+
+        # Scramble integer hashes in sets and dicts (helps strided keys,
+        # hurts the cache locality of consecutive keys)
+        SET_HASH_MIXING = _readenv("NUMBA_SET_HASH_MIXING", int, 0)
+
+        # Maximum number of bytes of non-escaping arrays placed on the stack
+        # per function (0 disables stack allocation)
+        STACK_ALLOC_MAX_BYTES = _readenv("NUMBA_STACK_ALLOC_MAX_BYTES", int,
+                                         4096)
+
         # CUDA Configs
 
         # Force CUDA compute capability to a specific version
@@ -740,6 +740,7 @@ class ListPayloadModel(StructModel):
 
 
 @register_default(types.List)
+@register_default(types.ListType)
 class ListModel(StructModel):
     def __init__(self, dmm, fe_type):
         payload_type = types.ListPayload(fe_type)
@@ -823,6 +824,168 @@ class SetIterModel(StructModel):
         super(SetIterModel, self).__init__(dmm, fe_type, members)
 
 
+@register_default(types.DequePayload)
+class DequePayloadModel(StructModel):
+    def __init__(self, dmm, fe_type):
+        members = [
+            ('size', types.intp),
+            # Allocated size - 1 (size being a power of 2)
+            ('mask', types.intp),
+            # Index of the first item in the ring buffer
+            ('head', types.intp),
+            # Maximum size, or -1 if unbounded
+            ('maxlen', types.intp),
+            # Actually an inlined var-sized array
+            ('data', fe_type.container.dtype),
+        ]
+        super(DequePayloadModel, self).__init__(dmm, fe_type, members)
+
+@register_default(types.Deque)
+class DequeModel(StructModel):
+    def __init__(self, dmm, fe_type):
+        payload_type = types.DequePayload(fe_type)
+        members = [
+            # The meminfo data points to a DequePayload
+            ('meminfo', types.MemInfoPointer(payload_type)),
+        ]
+        super(DequeModel, self).__init__(dmm, fe_type, members)
+
+@register_default(types.DequeIter)
+class DequeIterModel(StructModel):
+    def __init__(self, dmm, fe_type):
+        payload_type = types.DequePayload(fe_type.container)
+        members = [
+            # The meminfo data points to a DequePayload (shared with the
+            # original deque object)
+            ('meminfo', types.MemInfoPointer(payload_type)),
+            # The logical index of the next item
+            ('index', types.EphemeralPointer(types.intp)),
+            ]
+        super(DequeIterModel, self).__init__(dmm, fe_type, members)
+
+
+@register_default(types.RecordListPayload)
+class RecordListPayloadModel(StructModel):
+    def __init__(self, dmm, fe_type):
+        members = [
+            ('size', types.intp),
+            ('allocated', types.intp),
+            # One array per field, of length *allocated*
+            ('columns', fe_type.container.columns_type),
+        ]
+        super(RecordListPayloadModel, self).__init__(dmm, fe_type, members)
+
+@register_default(types.RecordListType)
+class RecordListModel(StructModel):
+    def __init__(self, dmm, fe_type):
+        payload_type = types.RecordListPayload(fe_type)
+        members = [
+            # The meminfo data points to a RecordListPayload
+            ('meminfo', types.MemInfoPointer(payload_type)),
+        ]
+        super(RecordListModel, self).__init__(dmm, fe_type, members)
+
+@register_default(types.RecordListIter)
+class RecordListIterModel(StructModel):
+    def __init__(self, dmm, fe_type):
+        payload_type = types.RecordListPayload(fe_type.container)
+        members = [
+            # The meminfo data points to a RecordListPayload (shared with
+            # the original record list)
+            ('meminfo', types.MemInfoPointer(payload_type)),
+            # The index of the next record
+            ('index', types.EphemeralPointer(types.intp)),
+            ]
+        super(RecordListIterModel, self).__init__(dmm, fe_type, members)
+
+
+@register_default(types.DictEntry)
+class DictEntryModel(StructModel):
+    def __init__(self, dmm, fe_type):
+        dict_type = fe_type.dict_type
+        members = [
+            # -1 = empty, -2 = deleted
+            ('hash', types.intp),
+            ('key', dict_type.key_type),
+            ('value', dict_type.value_type),
+        ]
+        super(DictEntryModel, self).__init__(dmm, fe_type, members)
+
+@register_default(types.DictPayload)
+class DictPayloadModel(StructModel):
+    def __init__(self, dmm, fe_type):
+        entry_type = types.DictEntry(fe_type.container)
+        members = [
+            # Number of active + deleted entries
+            ('fill', types.intp),
+            # Number of active entries
+            ('used', types.intp),
+            # Allocated size - 1 (size being a power of 2)
+            ('mask', types.intp),
+            # Search finger
+            ('finger', types.intp),
+            # Actually an inlined var-sized array
+            ('entries', entry_type),
+        ]
+        super(DictPayloadModel, self).__init__(dmm, fe_type, members)
+
+@register_default(types.DictType)
+class DictModel(StructModel):
+    def __init__(self, dmm, fe_type):
+        payload_type = types.DictPayload(fe_type)
+        members = [
+            # The meminfo data points to a DictPayload
+            ('meminfo', types.MemInfoPointer(payload_type)),
+            # Always NULL: typed dicts are not reflected
+            ('parent', types.pyobject),
+        ]
+        super(DictModel, self).__init__(dmm, fe_type, members)
+
+@register_default(types.DictIter)
+class DictIterModel(StructModel):
+    def __init__(self, dmm, fe_type):
+        payload_type = types.DictPayload(fe_type.container)
+        members = [
+            # The meminfo data points to a DictPayload (shared with the
+            # original dict object)
+            ('meminfo', types.MemInfoPointer(payload_type)),
+            # The index into the entries table
+            ('index', types.EphemeralPointer(types.intp)),
+            ]
+        super(DictIterModel, self).__init__(dmm, fe_type, members)
+
+
+@register_default(types.UnicodeType)
+class UnicodeModel(StructModel):
+    def __init__(self, dmm, fe_type):
+        members = [
+            # The code points, in the compact representation of CPython
+            ('data', types.voidptr),
+            # The number of code points
+            ('length', types.intp),
+            # The number of bytes per code point (1, 2 or 4)
+            ('kind', types.int32),
+            # The hash value, or -1 if not computed yet
+            ('hash', types.intp),
+            # The owner of the data: the NRT allocation or, for unboxed
+            # strings, a reference to the Python object (both are NULL
+            # for constant strings)
+            ('meminfo', types.MemInfoPointer(types.voidptr)),
+            ('parent', types.pyobject),
+            ]
+        super(UnicodeModel, self).__init__(dmm, fe_type, members)
+
+
+@register_default(types.UnicodeIteratorType)
+class UnicodeIteratorModel(StructModel):
+    def __init__(self, dmm, fe_type):
+        members = [
+            ('index', types.EphemeralPointer(types.intp)),
+            ('data', fe_type.string_type),
+            ]
+        super(UnicodeIteratorModel, self).__init__(dmm, fe_type, members)
+
+
 @register_default(types.Array)
 @register_default(types.Buffer)
 @register_default(types.ByteArray)
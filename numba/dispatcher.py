@@ -429,6 +429,21 @@ class _DispatcherBase(_dispatcher.Dispatcher):
         return dict((sig, self.inspect_cfg(sig, show_wrapper=show_wrapper))
                     for sig in self.signatures)
 
+    def parallel_diagnostics(self, signature=None):
+        """
+        Gets the report of the parallel transformations (parfor conversion,
+        fusion, hoisting and allocation sites) for the function specified by
+        signature, as a `numba.parfor.ParforDiagnostics` object. It is None
+        if the function was not compiled with `parallel=True` or was loaded
+        from the cache. If no signature is supplied a dictionary of signature
+        to diagnostics is returned.
+        """
+        if signature is not None:
+            return self.overloads[signature].parfor_diagnostics
+
+        return dict((sig, self.parallel_diagnostics(sig))
+                    for sig in self.signatures)
+
     def get_annotation_info(self, signature=None):
         """
         Gets the annotation information for the function specified by
@@ -0,0 +1,318 @@
+"""
+Escape analysis of array allocations in Numba IR.
+
+Arrays created by ``np.empty()`` or ``np.zeros()`` with a constant shape
+that never leave the function (they are not returned, stored into a
+container, captured by a view or passed to a callee that may keep them)
+can live in a stack slot of the function instead of a NRT-allocated
+buffer.  Such arrays have a NULL MemInfo and need no refcounting.
+
+In functions compiled with ``arena=True``, the assignments whose
+allocations can't outlive the call allocate from the NRT arena.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+from collections import defaultdict
+import functools
+import operator
+
+from numba import ir, types, config, utils, analysis
+from numba.ir_utils import (find_potential_aliases, find_callname, find_const,
+                            get_definition, guard, require)
+
+
+_known_stmts = (ir.Assign, ir.SetItem, ir.StaticSetItem, ir.SetAttr,
+                ir.Del, ir.Branch, ir.Jump, ir.Return, ir.Raise,
+                ir.StaticRaise, ir.Print)
+
+_alloc_funcs = {('empty', 'numpy'): False, ('zeros', 'numpy'): True}
+
+
+def find_stack_arrays(func_ir, typemap, context):
+    """
+    Find the array allocations of *func_ir* that can be placed on the stack.
+
+    Returns a tuple ``(stack_arrays, stack_vars)``.  *stack_arrays* maps the
+    name of each variable holding such an allocation to a ``(shape, zero)``
+    tuple, where *shape* is the constant shape and *zero* tells whether the
+    array must be zero-filled.  *stack_vars* is the set of variables that
+    only ever hold stack-allocated arrays and so need no refcounting.
+
+    At most :envvar:`NUMBA_STACK_ALLOC_MAX_BYTES` bytes are placed on the
+    stack per function.
+    """
+    max_bytes = config.STACK_ALLOC_MAX_BYTES
+    if max_bytes <= 0 or func_ir.generator_info is not None:
+        return {}, set()
+    blocks = func_ir.blocks
+    for block in blocks.values():
+        for stmt in block.body:
+            # Bail out on unknown statements (e.g. parfors) whose uses
+            # of arrays can't be checked
+            if type(stmt) not in _known_stmts:
+                return {}, set()
+
+    alias_map, _ = find_potential_aliases(blocks, func_ir.arg_names, typemap,
+                                          func_ir)
+    uses = _find_uses(blocks)
+    cfg = analysis.compute_cfg_from_blocks(blocks)
+    usedefs = analysis.compute_use_defs(blocks)
+    live_map = analysis.compute_live_map(cfg, blocks, usedefs.usemap,
+                                         usedefs.defmap)
+
+    stack_arrays = {}
+    total = 0
+    for label, block in sorted(blocks.items()):
+        for i, stmt in enumerate(block.body):
+            match = guard(_match_allocation, func_ir, stmt, typemap)
+            if match is None:
+                continue
+            shape, zero = match
+            name = stmt.target.name
+            arrtype = typemap[name]
+            itemsize = context.get_abi_sizeof(
+                context.get_data_type(arrtype.dtype))
+            nbytes = itemsize * functools.reduce(operator.mul, shape, 1)
+            if total + nbytes > max_bytes:
+                continue
+            holders = _find_holders(name, uses, typemap, context)
+            if holders is None:
+                continue
+            holders |= alias_map.get(name, set())
+            # The stack slot is reused each time the allocation runs (e.g.
+            # in a loop), so no earlier array from it may still be live.
+            live = _live_after(cfg, blocks, live_map, label, i)
+            if (holders - set([name])) & live:
+                continue
+            stack_arrays[name] = shape, zero
+            total += nbytes
+
+    return stack_arrays, _find_stack_vars(func_ir, stack_arrays)
+
+
+def find_arena_assignments(func_ir, typemap, context):
+    """
+    Find the assignments of *func_ir* whose allocations can come from the
+    NRT arena, because nothing allocated while computing the assigned
+    value can outlive the call.
+
+    Returns the set of the target names of those assignments.
+    """
+    blocks = func_ir.blocks
+    for block in blocks.values():
+        for stmt in block.body:
+            if type(stmt) not in _known_stmts:
+                return set()
+
+    dmm = context.data_model_manager
+    uses = _find_uses(blocks)
+    targets = set()
+    for block in blocks.values():
+        for stmt in block.body:
+            if not (isinstance(stmt, ir.Assign) and
+                    isinstance(stmt.value, ir.Expr)):
+                continue
+            # A container argument may capture new objects
+            if any(_may_capture(v, typemap, dmm)
+                   for v in stmt.value.list_vars()):
+                continue
+            name = stmt.target.name
+            ty = typemap[name]
+            if dmm[ty].contains_nrt_meminfo():
+                if not isinstance(ty, types.Array):
+                    continue
+                if _find_holders(name, uses, typemap, context) is None:
+                    continue
+            targets.add(name)
+    return targets
+
+
+def _match_allocation(func_ir, stmt, typemap):
+    """
+    Match ``x = np.empty(shape)`` or ``x = np.zeros(shape)`` with a constant
+    *shape* and a single definition of ``x``, and return ``(shape, zero)``.
+    """
+    require(isinstance(stmt, ir.Assign))
+    expr = stmt.value
+    require(isinstance(expr, ir.Expr) and expr.op == 'call')
+    fdef = find_callname(func_ir, expr, typemap)
+    require(fdef in _alloc_funcs)
+    name = stmt.target.name
+    require(len(func_ir._definitions[name]) == 1)
+    arrtype = typemap[name]
+    require(isinstance(arrtype, types.Array) and arrtype.layout in 'CF')
+    if expr.args:
+        shape_var = expr.args[0]
+    else:
+        shape_var = dict(expr.kws)['shape']
+    shape = _find_const_shape(func_ir, shape_var)
+    require(len(shape) == arrtype.ndim)
+    return shape, _alloc_funcs[fdef]
+
+
+def _find_const_shape(func_ir, var):
+    shape_def = get_definition(func_ir, var)
+    if isinstance(shape_def, ir.Expr) and shape_def.op == 'build_tuple':
+        shape = tuple(find_const(func_ir, v) for v in shape_def.items)
+    else:
+        require(isinstance(shape_def, (ir.Const, ir.Global, ir.FreeVar)))
+        shape = shape_def.value
+    if not isinstance(shape, tuple):
+        shape = (shape,)
+    for s in shape:
+        require(isinstance(s, utils.INT_TYPES) and not isinstance(s, bool))
+        require(s >= 0)
+    return shape
+
+
+def _find_uses(blocks):
+    """
+    Map each variable name to the statements using it.
+    """
+    uses = defaultdict(list)
+    for block in blocks.values():
+        for stmt in block.body:
+            if isinstance(stmt, ir.Assign):
+                used = _rhs_vars(stmt)
+            else:
+                used = stmt.list_vars()
+            for v in used:
+                uses[v.name].append(stmt)
+    return uses
+
+
+def _rhs_vars(stmt):
+    value = stmt.value
+    if isinstance(value, ir.Var):
+        return [value]
+    if isinstance(value, ir.Inst):
+        return value.list_vars()
+    return []
+
+
+def _find_holders(name, uses, typemap, context):
+    """
+    Return the set of variables that may hold the array allocated into
+    variable *name*, or None if the array may escape the function.
+    """
+    dmm = context.data_model_manager
+
+    def has_meminfo(var):
+        return dmm[typemap[var.name]].contains_nrt_meminfo()
+
+    def may_capture(var):
+        return _may_capture(var, typemap, dmm)
+
+    holders = set([name])
+    worklist = [name]
+    while worklist:
+        varname = worklist.pop()
+        for stmt in uses[varname]:
+            if isinstance(stmt, ir.Del):
+                continue
+            if isinstance(stmt, (ir.SetItem, ir.StaticSetItem)):
+                # Storing into an array copies the data
+                if (stmt.value.name == varname and
+                        not isinstance(typemap[stmt.target.name], types.Array)):
+                    return None
+                continue
+            if not isinstance(stmt, ir.Assign):
+                return None
+            target = stmt.target
+            expr = stmt.value
+            held = False
+            if isinstance(expr, ir.Var):
+                held = True
+            elif not isinstance(expr, ir.Expr):
+                return None
+            elif expr.op == 'cast':
+                held = True
+            elif expr.op == 'getattr':
+                if expr.attr == 'ctypes':
+                    return None
+                if isinstance(typemap[target.name], types.BoundFunction):
+                    held = True
+                elif has_meminfo(target):
+                    return None
+            elif expr.op in ('getitem', 'static_getitem'):
+                # Views share the array's data
+                if expr.value.name == varname and has_meminfo(target):
+                    return None
+            elif expr.op in ('binop', 'unary', 'arrayexpr'):
+                if any(may_capture(v) for v in expr.list_vars()):
+                    return None
+            elif expr.op == 'inplace_binop':
+                if any(may_capture(v) for v in expr.list_vars()):
+                    return None
+                # In-place operators return their left operand
+                held = expr.lhs.name == varname
+            elif expr.op == 'call':
+                if not isinstance(expr.func, ir.Var):
+                    return None
+                fnty = typemap[expr.func.name]
+                if (isinstance(fnty, types.ExternalFunctionPointer) and
+                        fnty.requires_gil):
+                    return None
+                if has_meminfo(target):
+                    return None
+                args = list(expr.args) + [v for _, v in expr.kws]
+                if expr.vararg is not None:
+                    args.append(expr.vararg)
+                if any(may_capture(v) for v in args):
+                    return None
+                if (isinstance(fnty, types.BoundFunction) and
+                        expr.func.name not in holders and
+                        not isinstance(fnty.this, types.Array) and
+                        dmm[fnty.this].contains_nrt_meminfo()):
+                    return None
+            else:
+                return None
+            if held and target.name not in holders:
+                holders.add(target.name)
+                worklist.append(target.name)
+    return holders
+
+
+def _may_capture(var, typemap, dmm):
+    # Arrays can't hold references to other arrays, but containers
+    # and other refcounted objects can.
+    ty = typemap[var.name]
+    return (not isinstance(ty, types.Array) and
+            dmm[ty].contains_nrt_meminfo())
+
+
+def _live_after(cfg, blocks, live_map, label, index):
+    """
+    Return the set of variables live right after statement *index* of
+    block *label*.
+    """
+    live = set()
+    for succ, _ in cfg.successors(label):
+        live |= live_map[succ]
+    for stmt in reversed(blocks[label].body[index + 1:]):
+        if isinstance(stmt, ir.Assign):
+            live.discard(stmt.target.name)
+            live |= set(v.name for v in _rhs_vars(stmt))
+        else:
+            live |= set(v.name for v in stmt.list_vars())
+    return live
+
+
+def _find_stack_vars(func_ir, stack_arrays):
+    """
+    Find the variables whose every definition is a stack allocation or
+    a copy of such a variable.
+    """
+    stack_vars = set(stack_arrays)
+    changed = True
+    while changed:
+        changed = False
+        for name, defs in func_ir._definitions.items():
+            if name in stack_vars or not defs:
+                continue
+            if all(isinstance(d, ir.Var) and d.name in stack_vars
+                   for d in defs):
+                stack_vars.add(name)
+                changed = True
+    return stack_vars
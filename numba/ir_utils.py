@@ -730,7 +730,7 @@ def is_immutable_type(var, typemap):
                         types.containers.BaseTuple,
                         types.iterators.RangeType)):
         return True
-    if typ==types.string:
+    if typ in (types.string, types.unicode_type):
         return True
     # consevatively, assume mutable
     return False
@@ -851,7 +851,7 @@ def get_block_copies(blocks, typemap):
                     in1_typ = typemap[in1_var]
                     # inplace_binop assigns first operand if mutable
                     if not (isinstance(in1_typ, types.Number)
-                            or in1_typ == types.string):
+                            or in1_typ in (types.string, types.unicode_type)):
                         extra_kill[label].add(in1_var)
                         # if a=b is in dict and b is killed, a is also killed
                         new_assign_dict = {}
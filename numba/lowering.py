@@ -9,7 +9,7 @@ from llvmlite.llvmpy.core import Constant, Type, Builder
 from llvmlite import ir as llvmir
 
 from . import (_dynfunc, cgutils, config, funcdesc, generators, ir, types,
-               typing, utils)
+               typing, utils, escape_analysis)
 from .errors import LoweringError, new_error_context
 from .targets import removerefctpass
 from .funcdesc import default_mangler
@@ -294,13 +294,82 @@ lower_extensions = {}
 class Lower(BaseLower):
     GeneratorLower = generators.GeneratorLower
 
+    def init(self):
+        # Non-escaping arrays of constant shape are allocated on the stack
+        if self.context.enable_nrt:
+            res = escape_analysis.find_stack_arrays(self.func_ir,
+                                                    self.fndesc.typemap,
+                                                    self.context)
+            self.stack_arrays, self.stack_vars = res
+        else:
+            self.stack_arrays, self.stack_vars = {}, set()
+        # With arena=True, the assignments whose allocations can't outlive
+        # the call allocate from the NRT arena
+        if (self.context.enable_nrt and self.context.enable_nrt_arena and
+                self.generator_info is None):
+            self.arena_targets = escape_analysis.find_arena_assignments(
+                self.func_ir, self.fndesc.typemap, self.context)
+        else:
+            self.arena_targets = None
+        self.trace_sites = (self.context.enable_nrt and
+                            self.context.enable_nrt_trace)
+
+    def pre_lower(self):
+        super(Lower, self).pre_lower()
+        if self.arena_targets is not None:
+            self.arena_state = self.context.nrt.arena_enter(self.builder)
+        if self.trace_sites:
+            self.trace_state = self.context.nrt.trace_get_site(self.builder)
+
+    def pre_block(self, block):
+        super(Lower, self).pre_block(block)
+        # The arena state is unknown at the start of a block
+        self.arena_use = None
+
+    def post_lower(self):
+        super(Lower, self).post_lower()
+        if self.arena_targets is None and not self.trace_sites:
+            return
+        # Leave the arena and restore the caller's allocation site on
+        # every return path
+        for block in self.function.blocks:
+            # (a generator's prologue is still empty here)
+            if not block.instructions:
+                continue
+            term = block.instructions[-1]
+            if isinstance(term, llvmir.Ret):
+                self.builder.position_before(term)
+                if self.arena_targets is not None:
+                    self.context.nrt.arena_exit(self.builder,
+                                                self.arena_state)
+                if self.trace_sites:
+                    self.context.nrt.trace_restore_site(self.builder,
+                                                        self.trace_state)
+
     def lower_inst(self, inst):
         # Set debug location for all subsequent LL instructions
         self.debuginfo.mark_location(self.builder, self.loc)
         self.debug_print(str(inst))
+        if (self.trace_sites and
+                not isinstance(inst, (ir.Del, ir.Jump, ir.Branch))):
+            # Each statement has its own site
+            site = "{}\t{}\t{}".format(self.fndesc.qualname,
+                                       self.loc.filename, self.loc.line)
+            self.context.nrt.trace_set_site(self.builder, site)
+        if (self.arena_targets is not None and isinstance(inst, ir.Assign)
+                and isinstance(inst.value, ir.Expr)):
+            use = inst.target.name in self.arena_targets
+            # Callees restore the arena state when they return
+            if use != self.arena_use:
+                self.context.nrt.arena_use(self.builder, use)
+                self.arena_use = use
         if isinstance(inst, ir.Assign):
             ty = self.typeof(inst.target.name)
-            val = self.lower_assign(ty, inst)
+            if inst.target.name in self.stack_arrays:
+                shape, zero = self.stack_arrays[inst.target.name]
+                val = self.lower_stack_array(ty, shape, zero)
+            else:
+                val = self.lower_assign(ty, inst)
             self.storevar(val, inst.target.name)
 
         elif isinstance(inst, ir.Branch):
@@ -452,7 +521,8 @@ class Lower(BaseLower):
             val = self.loadvar(value.name)
             oty = self.typeof(value.name)
             res = self.context.cast(self.builder, val, oty, ty)
-            self.incref(ty, res)
+            if inst.target.name not in self.stack_vars:
+                self.incref(ty, res)
             return res
 
         elif isinstance(value, ir.Arg):
@@ -480,6 +550,17 @@ class Lower(BaseLower):
 
         raise NotImplementedError(type(value), value)
 
+    def lower_stack_array(self, ty, shape, zero):
+        """
+        Allocate a non-escaping array of constant *shape* on the stack.
+        """
+        from .targets import arrayobj
+
+        ary = arrayobj._stack_nd_impl(self.context, self.builder, ty, shape)
+        if zero:
+            arrayobj._zero_fill_array(self.context, self.builder, ary)
+        return ary._getvalue()
+
     def lower_yield(self, retty, inst):
         yp = self.generator_info.yield_points[inst.index]
         assert yp.inst is inst
@@ -976,8 +1057,9 @@ class Lower(BaseLower):
         self._alloca_var(name, fetype)
 
         # Clean up existing value stored in the variable
-        old = self.loadvar(name)
-        self.decref(fetype, old)
+        if name not in self.stack_vars:
+            old = self.loadvar(name)
+            self.decref(fetype, old)
 
         # Store variable
         ptr = self.getvar(name)
@@ -1000,7 +1082,8 @@ class Lower(BaseLower):
         self._alloca_var(name, fetype)
 
         ptr = self.getvar(name)
-        self.decref(fetype, self.builder.load(ptr))
+        if name not in self.stack_vars:
+            self.decref(fetype, self.builder.load(ptr))
         # Zero-fill variable to avoid double frees on subsequent dels
         self.builder.store(Constant.null(ptr.type.pointee), ptr)
 
@@ -26,6 +26,7 @@ from numba.numpy_support import as_dtype
 from numba.typing.templates import infer_global, AbstractTemplate
 from numba import stencilparfor
 from numba.stencilparfor import StencilPass
+from numba.targets import linalg
 
 
 from numba.ir_utils import (
@@ -203,8 +204,24 @@ def dotmv_parallel_impl(a, b):
         c[i] = s
     return c
 
+def dotmm_parallel_impl(a, b):
+    numba.parfor.init_prange()
+    m, k = a.shape
+    _k, n = b.shape
+    if k != _k:
+        raise ValueError("incompatible array sizes for np.dot(a, b) "
+                         "(matrix * matrix)")
+    c = np.zeros((m, n), a.dtype)
+    for i in numba.parfor.internal_prange(m):
+        for l in range(k):
+            ail = a[i, l]
+            for j in range(n):
+                c[i, j] += ail * b[l, j]
+    return c
+
 def dot_parallel_impl(return_type, atyp, btyp):
-    # Note that matrix matrix multiply is not translated.
+    # Note that matrix matrix multiply is only translated for dtypes that
+    # BLAS doesn't support.
     if (isinstance(atyp, types.npytypes.Array) and
         isinstance(btyp, types.npytypes.Array)):
         if atyp.ndim == btyp.ndim == 1:
@@ -214,6 +231,62 @@ def dot_parallel_impl(return_type, atyp, btyp):
         #    return dotvm_parallel_impl
         elif atyp.ndim == 2 and btyp.ndim == 1:
             return dotmv_parallel_impl
+        elif (atyp.ndim == btyp.ndim == 2 and
+              isinstance(atyp.dtype, types.Integer)):
+            return dotmm_parallel_impl
+
+def matmul_parallel_impl(return_type, atyp, btyp):
+    if not (isinstance(atyp, types.npytypes.Array) and
+            isinstance(btyp, types.npytypes.Array)):
+        return None
+    if 3 not in (atyp.ndim, btyp.ndim):
+        # same semantics as np.dot() for 1-D and 2-D arrays
+        return dot_parallel_impl(return_type, atyp, btyp)
+
+    # stacks of matrices, parallel across the stack
+    zero = return_type.dtype(0)
+    a_stacked = atyp.ndim == 3
+    b_stacked = btyp.ndim == 3
+    get_a = linalg._stack_item if a_stacked else linalg._stack_self
+    get_b = linalg._stack_item if b_stacked else linalg._stack_self
+    use_blas = return_type.dtype in linalg._blas_kinds and all(
+        ty.layout == 'C' or (ty.ndim == 2 and ty.layout == 'F')
+        for ty in (atyp, btyp))
+    large_mm = linalg._dot_mm_blas if use_blas else linalg._dot_mm_native
+    small_size = linalg._small_matmul_size
+
+    def matmul_stacked(a, b):
+        numba.parfor.init_prange()
+        m, k = a.shape[-2], a.shape[-1]
+        _k, n = b.shape[-2], b.shape[-1]
+        if k != _k:
+            raise ValueError("incompatible array sizes for '@' "
+                             "(matrix * matrix)")
+        na = a.shape[0] if a_stacked else 1
+        nb = b.shape[0] if b_stacked else 1
+        if na != nb and na != 1 and nb != 1:
+            raise ValueError("incompatible array sizes for '@' "
+                             "(stacks of matrices)")
+        out = np.empty((max(na, nb), m, n), a.dtype)
+        small = m * n * k <= small_size
+        # stacks of size 1 are broadcast, p % na selects their only item;
+        # unsigned like the parfor index to avoid mixed sign arithmetic
+        ua = np.uintp(na)
+        ub = np.uintp(nb)
+        for p in numba.parfor.internal_prange(max(na, nb)):
+            ap = get_a(a, p % ua)
+            bp = get_b(b, p % ub)
+            if small:
+                for i in range(m):
+                    for j in range(n):
+                        s = zero
+                        for l in range(k):
+                            s += ap[i, l] * bp[l, j]
+                        out[p, i, j] = s
+            else:
+                large_mm(ap, bp, out[p])
+        return out
+    return matmul_stacked
 
 def sum_parallel_impl(return_type, arg):
     zero = return_type(0)
@@ -371,6 +444,97 @@ def linspace_parallel_impl(return_type, *args):
     else:
         raise ValueError("parallel linspace with types {}".format(args))
 
+# Compaction (e.g. A[A > 0] and np.nonzero) is done in parallel in two passes
+# over chunks of the input: count the selected elements of each chunk, compute
+# the starting position of each chunk in the output with a (short) sequential
+# prefix sum, and then let each chunk write its own part of the output.
+# A few chunks per thread balance the load when selections are uneven.
+_compaction_chunks_per_thread = 4
+
+def nonzero_parallel_impl(return_type, *args):
+    max_chunks = config.NUMBA_NUM_THREADS * _compaction_chunks_per_thread
+
+    # also used for np.where with a single argument
+    if (len(args) == 1 and isinstance(args[0], types.npytypes.Array) and
+            args[0].ndim == 1):
+        def nonzero_1(in_arr):
+            numba.parfor.init_prange()
+            n = len(in_arr)
+            nchunks = max(min(n, max_chunks), 1)
+            chunk = (n + nchunks - 1) // nchunks
+            counts = np.empty(nchunks, np.intp)
+            for c in numba.parfor.internal_prange(nchunks):
+                count = 0
+                for i in range(c * chunk, min((c + 1) * chunk, n)):
+                    if in_arr[i]:
+                        count += 1
+                counts[c] = count
+            total = 0
+            for c in range(nchunks):
+                count = counts[c]
+                counts[c] = total
+                total += count
+            out = np.empty(total, np.intp)
+            for c in numba.parfor.internal_prange(nchunks):
+                pos = counts[c]
+                for i in range(c * chunk, min((c + 1) * chunk, n)):
+                    if in_arr[i]:
+                        out[pos] = i
+                        pos += 1
+            return (out,)
+        return nonzero_1
+
+def getitem_mask_parallel_impl(return_type, arr, mask):
+    max_chunks = config.NUMBA_NUM_THREADS * _compaction_chunks_per_thread
+
+    if arr.ndim == mask.ndim == 1:
+        def getitem_mask_1(in_arr, in_mask):
+            numba.parfor.init_prange()
+            n = len(in_arr)
+            nchunks = max(min(n, max_chunks), 1)
+            chunk = (n + nchunks - 1) // nchunks
+            counts = np.empty(nchunks, np.intp)
+            for c in numba.parfor.internal_prange(nchunks):
+                count = 0
+                for i in range(c * chunk, min((c + 1) * chunk, n)):
+                    if in_mask[i]:
+                        count += 1
+                counts[c] = count
+            total = 0
+            for c in range(nchunks):
+                count = counts[c]
+                counts[c] = total
+                total += count
+            out = np.empty(total, in_arr.dtype)
+            for c in numba.parfor.internal_prange(nchunks):
+                pos = counts[c]
+                for i in range(c * chunk, min((c + 1) * chunk, n)):
+                    if in_mask[i]:
+                        out[pos] = in_arr[i]
+                        pos += 1
+            return out
+        return getitem_mask_1
+
+def getitem_gather_parallel_impl(return_type, arr, ind):
+    if arr.ndim == ind.ndim == 1:
+        def gather_1(in_arr, in_ind):
+            numba.parfor.init_prange()
+            n = len(in_ind)
+            out = np.empty(n, in_arr.dtype)
+            for i in numba.parfor.internal_prange(n):
+                out[i] = in_arr[in_ind[i]]
+            return out
+        return gather_1
+
+def setitem_scatter_parallel_impl(return_type, arr, ind, val):
+    # only scalar values are scattered in parallel since repeated indices
+    # with array values require the last write to win
+    if arr.ndim == ind.ndim == 1 and isinstance(val, types.Number):
+        def scatter_1(in_arr, in_ind, in_val):
+            for i in numba.parfor.internal_prange(len(in_ind)):
+                in_arr[in_ind[i]] = in_val
+        return scatter_1
+
 replace_functions_map = {
     ('argmin', 'numpy'): lambda r,a: argmin_parallel_impl,
     ('argmax', 'numpy'): lambda r,a: argmax_parallel_impl,
@@ -382,8 +546,11 @@ replace_functions_map = {
     ('var', 'numpy'): var_parallel_impl,
     ('std', 'numpy'): std_parallel_impl,
     ('dot', 'numpy'): dot_parallel_impl,
+    ('matmul', 'numpy'): matmul_parallel_impl,
     ('arange', 'numpy'): arange_parallel_impl,
     ('linspace', 'numpy'): linspace_parallel_impl,
+    ('nonzero', 'numpy'): nonzero_parallel_impl,
+    ('where', 'numpy'): nonzero_parallel_impl,
 }
 
 class LoopNest(object):
@@ -453,6 +620,10 @@ class Parfor(ir.Expr, ir.Stmt):
         # if True, this parfor shouldn't be lowered sequentially even with the
         # sequential lowering option
         self.no_sequential_lowering = no_sequential_lowering
+        # the lists of ParforDiagnostics.hoisted and .not_hoisted that
+        # parallel lowering records this parfor's hoisting in, set by
+        # ParforPass
+        self.hoisting = None
         if config.DEBUG_ARRAY_OPT_STATS:
             fmt = 'Parallel for-loop #{} is produced from pattern \'{}\' at {}'
             print(fmt.format(
@@ -495,6 +666,85 @@ class Parfor(ir.Expr, ir.Stmt):
             block.dump(file)
         print(("end parfor {}".format(self.id)).center(20, '-'), file=file)
 
+
+class ParforDiagnostics(object):
+    """Record of the decisions made by the parfor passes while compiling one
+    function: which loops and array expressions became parfors, the outcome
+    of every fusion attempt, statements hoisted out of parfor bodies during
+    parallel lowering and the array allocation sites that remain.
+    """
+
+    def __init__(self):
+        self.func_name = None
+        # dicts with 'loc', 'kind', 'parfor' (id or None) and 'reason'
+        self.loops = []
+        # dicts with 'parfor1', 'parfor2', 'fused' and 'reason'
+        self.fusion = []
+        # parfor id -> list of hoisted statements (as strings)
+        self.hoisted = {}
+        # parfor id -> list of (statement, reason) pairs
+        self.not_hoisted = {}
+        # dicts with 'var', 'func', 'loc' and 'parfor' (enclosing id or None)
+        self.allocations = []
+        # ids of the parfors left after fusion
+        self.parfor_ids = []
+
+    def add_loop(self, loc, kind, parfor_id=None, reason=None):
+        self.loops.append({'loc': loc, 'kind': kind, 'parfor': parfor_id,
+                           'reason': reason})
+
+    def add_fusion(self, parfor1, parfor2, fused, reason):
+        # fusion is attempted again after statement reordering, only the
+        # last decision for a pair of parfors is kept
+        self.fusion = [rec for rec in self.fusion
+                       if (rec['parfor1'], rec['parfor2']) != (parfor1, parfor2)]
+        self.fusion.append({'parfor1': parfor1, 'parfor2': parfor2,
+                            'fused': fused, 'reason': reason})
+
+    def get_hoisting(self, parfor_id):
+        # filled by parallel lowering, which only has the parfor at hand
+        return (self.hoisted.setdefault(parfor_id, []),
+                self.not_hoisted.setdefault(parfor_id, []))
+
+    def add_allocation(self, var, func, loc, parfor_id=None):
+        self.allocations.append({'var': var, 'func': func, 'loc': loc,
+                                 'parfor': parfor_id})
+
+    def dump(self, file=None):
+        file = file or sys.stdout
+        print((" Parallel diagnostics for {} ".format(self.func_name)).center(
+              80, '='), file=file)
+        print("Loops and array expressions:", file=file)
+        for rec in self.loops:
+            if rec['parfor'] is not None:
+                status = "parfor #{}".format(rec['parfor'])
+            else:
+                status = "not parallelized ({})".format(rec['reason'])
+            print("  {} at {}: {}".format(rec['kind'], rec['loc'], status),
+                  file=file)
+        print("Fusion:", file=file)
+        for rec in self.fusion:
+            print("  #{} and #{}: {}".format(
+                  rec['parfor1'], rec['parfor2'],
+                  "fused" if rec['fused'] else "not fused, " + rec['reason']),
+                  file=file)
+        print("Parfors after fusion: {}".format(self.parfor_ids), file=file)
+        print("Hoisting:", file=file)
+        for parfor_id in sorted(self.hoisted):
+            for inst in self.hoisted[parfor_id]:
+                print("  #{} hoisted: {}".format(parfor_id, inst), file=file)
+            for inst, reason in self.not_hoisted[parfor_id]:
+                print("  #{} not hoisted: {} ({})".format(
+                      parfor_id, inst, reason), file=file)
+        print("Allocations:", file=file)
+        for rec in self.allocations:
+            where = ("inside parfor #{}".format(rec['parfor'])
+                     if rec['parfor'] is not None else "outside parfors")
+            print("  {} = {}(...) at {}, {}".format(
+                  rec['var'], rec['func'], rec['loc'], where), file=file)
+        print("=" * 80, file=file)
+
+
 def _analyze_parfor(parfor, equiv_set, typemap, array_analysis):
     """Recursive array analysis for parfor nodes.
     """
@@ -541,7 +791,6 @@ class PreParforPass(object):
         replace_functions_map if available.
         The implementation code is inlined to enable more optimization.
         """
-        from numba.inline_closurecall import inline_closure_call
         work_list = list(blocks.items())
         while work_list:
             label, block = work_list.pop()
@@ -563,17 +812,55 @@ class PreParforPass(object):
                             except:
                                 new_func = None
                             require(new_func != None)
-                            g = copy.copy(self.func_ir.func_id.func.__globals__)
-                            g['numba'] = numba
-                            g['np'] = numpy
-                            g['math'] = math
-                            # inline the parallel implementation
-                            inline_closure_call(self.func_ir, g,
-                                            block, i, new_func, self.typingctx, typs,
-                                            self.typemap, self.calltypes, work_list)
+                            self._inline_parallel_impl(block, i, new_func, typs,
+                                                       work_list)
                             return True
                         if guard(replace_func):
                             break
+                    elif isinstance(expr, ir.Expr) and expr.op == 'getitem':
+                        # Try inline parallel implementations of boolean mask
+                        # selection like A[A > 0] and integer array gather
+                        def replace_getitem():
+                            arr_typ = self.typemap[expr.value.name]
+                            ind_typ = self.typemap[expr.index.name]
+                            require(isinstance(arr_typ, types.npytypes.Array)
+                                and isinstance(ind_typ, types.npytypes.Array))
+                            # A[C] = B[C] is converted to a single parfor
+                            # by ParforPass
+                            require(not any(isinstance(stmt, ir.SetItem) and
+                                        stmt.value.name == lhs.name and
+                                        stmt.index.name == expr.index.name
+                                        for stmt in block.body))
+                            if isinstance(ind_typ.dtype, types.Boolean):
+                                repl_func = getitem_mask_parallel_impl
+                            else:
+                                require(isinstance(ind_typ.dtype, types.Integer))
+                                repl_func = getitem_gather_parallel_impl
+                            new_func = repl_func(lhs_typ, arr_typ, ind_typ)
+                            require(new_func != None)
+                            instr.value = self._mk_impl_call(block.scope,
+                                            [expr.value, expr.index], expr.loc)
+                            self._inline_parallel_impl(block, i, new_func,
+                                            (arr_typ, ind_typ), work_list)
+                            return True
+                        if guard(replace_getitem):
+                            break
+                    elif (isinstance(expr, ir.Expr) and expr.op == 'binop' and
+                          expr.fn == '@'):
+                        # Try inline parallel implementations of matrix
+                        # products like A @ B
+                        def replace_matmul():
+                            typs = (self.typemap[expr.lhs.name],
+                                    self.typemap[expr.rhs.name])
+                            new_func = matmul_parallel_impl(lhs_typ, *typs)
+                            require(new_func != None)
+                            instr.value = self._mk_impl_call(block.scope,
+                                            [expr.lhs, expr.rhs], expr.loc)
+                            self._inline_parallel_impl(block, i, new_func,
+                                                       typs, work_list)
+                            return True
+                        if guard(replace_matmul):
+                            break
                     elif (isinstance(expr, ir.Expr) and expr.op == 'getattr' and
                           expr.attr == 'dtype'):
                         # Replace getattr call "A.dtype" with the actual type itself.
@@ -598,6 +885,53 @@ class PreParforPass(object):
                             block.body.insert(0, typ_var_assign)
                             block.body.insert(0, g_np_assign)
                             break
+                elif isinstance(instr, ir.SetItem):
+                    # Try inline parallel implementation of integer array
+                    # scatter like A[I] = c. Boolean mask setitem is converted
+                    # to parfor later on in ParforPass.
+                    def replace_setitem():
+                        typs = tuple(self.typemap[x.name] for x in
+                                     (instr.target, instr.index, instr.value))
+                        (arr_typ, ind_typ, val_typ) = typs
+                        require(isinstance(arr_typ, types.npytypes.Array) and
+                                isinstance(ind_typ, types.npytypes.Array) and
+                                isinstance(ind_typ.dtype, types.Integer))
+                        new_func = setitem_scatter_parallel_impl(types.none,
+                                                                 *typs)
+                        require(new_func != None)
+                        loc = instr.loc
+                        out = ir.Var(block.scope, mk_unique_var("$setitem_out"),
+                                     loc)
+                        self.typemap[out.name] = types.none
+                        call = self._mk_impl_call(block.scope,
+                                [instr.target, instr.index, instr.value], loc)
+                        block.body[i] = ir.Assign(call, out, loc)
+                        self._inline_parallel_impl(block, i, new_func, typs,
+                                                   work_list)
+                        return True
+                    if guard(replace_setitem):
+                        break
+
+    def _mk_impl_call(self, scope, args, loc):
+        """Create a call expression with the given arguments to stand for an
+        indexing or operator expression, so that a parallel implementation can be inlined
+        in its place.
+        """
+        func_var = ir.Var(scope, mk_unique_var("$parallel_impl"), loc)
+        return ir.Expr.call(func_var, args, (), loc)
+
+    def _inline_parallel_impl(self, block, i, new_func, typs, work_list):
+        """Inline the given parallel implementation at the call in the i-th
+        statement of the block.
+        """
+        from numba.inline_closurecall import inline_closure_call
+        g = copy.copy(self.func_ir.func_id.func.__globals__)
+        g['numba'] = numba
+        g['np'] = numpy
+        g['math'] = math
+        inline_closure_call(self.func_ir, g, block, i, new_func,
+                            self.typingctx, typs, self.typemap,
+                            self.calltypes, work_list)
 
 
 class ParforPass(object):
@@ -619,6 +953,12 @@ class ParforPass(object):
                                                            calltypes)
         ir_utils._max_label = max(func_ir.blocks.keys())
         self.flags = flags
+        self.diagnostics = ParforDiagnostics()
+        self.diagnostics.func_name = func_ir.func_id.func_qualname
+        # why conversion was rejected, for arrayexpr assignments (by
+        # target variable name) and loops (by header label) left unconverted
+        self.rejected_arrayexprs = {}
+        self.rejected_loops = {}
 
     def run(self):
         """run parfor conversion pass: replace Numpy calls
@@ -639,6 +979,7 @@ class ParforPass(object):
             self._convert_reduce(self.func_ir.blocks)
         if self.options.prange:
            self._convert_loop(self.func_ir.blocks)
+        self._record_conversions(self.func_ir.blocks)
         dprint_func_ir(self.func_ir, "after parfor pass")
 
         # simplify CFG of parfor body loops since nested parfors with extra
@@ -666,6 +1007,10 @@ class ParforPass(object):
             dprint_func_ir(self.func_ir, "after maximize fusion up")
             # try fuse again after maximize
             self.fuse_parfors(self.array_analysis, self.func_ir.blocks)
+            # statements depending on one parfor (e.g. extracting the index
+            # of argmin) can block reordering in both directions, try to
+            # bring such sibling parfors together directly
+            self.fuse_sibling_parfors(self.array_analysis, self.func_ir.blocks)
             dprint_func_ir(self.func_ir, "after fusion")
         # simplify again
         simplify(self.func_ir, self.typemap, self.calltypes)
@@ -684,6 +1029,7 @@ class ParforPass(object):
         if self.func_ir.is_generator:
             fix_generator_types(self.func_ir.generator_info, self.return_type,
                                 self.typemap)
+        self._record_results(self.func_ir.blocks)
         if sequential_parfor_lowering:
             lower_parfor_sequential(
                 self.typingctx, self.func_ir, self.typemap, self.calltypes)
@@ -705,6 +1051,70 @@ class ParforPass(object):
                     print('Function {} has no Parfor.'.format(name))
         return
 
+    def _record_conversions(self, blocks, parfor_id=None):
+        """Record in the diagnostics which loops and array expressions were
+        converted to parfors, and why the remaining ones were not.
+        """
+        for label, block in sorted(blocks.items()):
+            for stmt in block.body:
+                if isinstance(stmt, Parfor):
+                    self.diagnostics.add_loop(stmt.loc,
+                        _describe_pattern(stmt.patterns[0]), stmt.id)
+                    self._record_conversions(stmt.loop_body, stmt.id)
+                elif (parfor_id is None and isinstance(stmt, ir.Assign) and
+                        isinstance(stmt.value, ir.Expr) and
+                        stmt.value.op == 'arrayexpr'):
+                    if self.options.numpy:
+                        reason = self.rejected_arrayexprs.get(
+                            stmt.target.name, "unknown reason")
+                    else:
+                        reason = "numpy conversion is disabled"
+                    self.diagnostics.add_loop(stmt.loc, 'arrayexpr {}'.format(
+                        repr_arrayexpr(stmt.value.expr)), reason=reason)
+        if parfor_id is not None:
+            return
+        call_table, _ = get_call_table(blocks)
+        cfg = compute_cfg_from_blocks(blocks)
+        for header, loop in sorted(cfg.loops().items()):
+            loc = blocks[header].loc
+            is_parallel = any(isinstance(inst, ir.Assign) and
+                              isinstance(inst.value, ir.Expr) and
+                              inst.value.op == 'call' and
+                              self._is_parallel_loop(inst.value.func.name,
+                                                     call_table)
+                              for entry in loop.entries
+                              for inst in blocks[entry].body)
+            if not is_parallel:
+                self.diagnostics.add_loop(loc, 'loop',
+                                          reason="not a prange loop")
+            elif not self.options.prange:
+                self.diagnostics.add_loop(loc, 'prange loop',
+                                          reason="prange conversion is disabled")
+            else:
+                self.diagnostics.add_loop(loc, 'prange loop',
+                    reason=self.rejected_loops.get(header, "unknown reason"))
+
+    def _record_results(self, blocks, parfor_id=None):
+        """Record the parfors left after fusion and the array allocation
+        sites in the diagnostics, and give the parfors the records of their
+        hoisting.
+        """
+        for block in blocks.values():
+            for stmt in block.body:
+                if isinstance(stmt, Parfor):
+                    self.diagnostics.parfor_ids.append(stmt.id)
+                    stmt.hoisting = self.diagnostics.get_hoisting(stmt.id)
+                    self._record_results({-1: stmt.init_block}, parfor_id)
+                    self._record_results(stmt.loop_body, stmt.id)
+                elif (isinstance(stmt, ir.Assign) and
+                        isinstance(stmt.value, ir.Expr) and
+                        stmt.value.op == 'call'):
+                    callname = guard(find_callname, self.func_ir, stmt.value,
+                                     self.typemap)
+                    if callname in _alloc_calls:
+                        self.diagnostics.add_allocation(stmt.target.name,
+                            'np.' + callname[0], stmt.loc, parfor_id)
+
     def _convert_numpy(self, blocks):
         """
         Convert supported Numpy functions, as well as arrayexpr nodes, to
@@ -732,6 +1142,10 @@ class ParforPass(object):
                         elif isinstance(expr, ir.Expr) and expr.op == 'arrayexpr':
                             instr = self._arrayexpr_to_parfor(
                                 equiv_set, lhs, expr, avail_vars)
+                    elif isinstance(expr, ir.Expr) and expr.op == 'arrayexpr':
+                        self.rejected_arrayexprs[lhs.name] = (
+                            "output array layout is '{}', not 'C'".format(
+                                self.typemap[lhs.name].layout))
                     avail_vars.append(lhs.name)
                 new_body.append(instr)
             block.body = new_body
@@ -817,6 +1231,8 @@ class ParforPass(object):
         # We go over all loops, smaller loops first (inner first)
         for loop, s in sorted(sized_loops, key=lambda tup: tup[1]):
             if len(loop.entries) != 1 or len(loop.exits) != 1:
+                self.rejected_loops[loop.header] = (
+                    "loop has multiple entries or exits")
                 continue
             entry = list(loop.entries)[0]
             for inst in blocks[entry].body:
@@ -1585,7 +2001,8 @@ class ParforPass(object):
                         equiv_set = array_analysis.get_equiv_set(label)
                         stmt.equiv_set = equiv_set
                         next_stmt.equiv_set = equiv_set
-                        fused_node = try_fuse(equiv_set, stmt, next_stmt)
+                        fused_node = try_fuse(equiv_set, stmt, next_stmt,
+                                              self.diagnostics)
                         if fused_node is not None:
                             fusion_happened = True
                             new_body.append(fused_node)
@@ -1600,6 +2017,46 @@ class ParforPass(object):
                 block.body = new_body
         return
 
+    def fuse_sibling_parfors(self, array_analysis, blocks):
+        """Fuse parfors of a block that are separated by other statements,
+        typically multiple reductions over the same array where the
+        statements consuming the first result sit in between. The statements
+        in between are moved above the first parfor or below the second one
+        if dependencies allow it, and the new order is kept only if the two
+        parfors are fused.
+        """
+        call_table, _ = get_call_table(blocks)
+        for label, block in blocks.items():
+            fusion_happened = True
+            while fusion_happened:
+                fusion_happened = False
+                parfor_inds = [i for i, stmt in enumerate(block.body)
+                               if isinstance(stmt, Parfor)]
+                for i, j in zip(parfor_inds, parfor_inds[1:]):
+                    if j == i + 1:
+                        continue
+                    parfor1 = block.body[i]
+                    parfor2 = block.body[j]
+                    order = _sibling_parfor_order(parfor1, parfor2,
+                                    block.body[i + 1:j], self.func_ir,
+                                    call_table)
+                    if order is None:
+                        continue
+                    before, after = order
+                    equiv_set = array_analysis.get_equiv_set(label)
+                    parfor1.equiv_set = equiv_set
+                    parfor2.equiv_set = equiv_set
+                    fused_node = try_fuse(equiv_set, parfor1, parfor2,
+                                          self.diagnostics)
+                    if fused_node is None:
+                        continue
+                    self.fuse_recursive_parfor(fused_node, equiv_set)
+                    block.body = (block.body[:i] + before + [fused_node]
+                                  + after + block.body[j + 1:])
+                    fusion_happened = True
+                    break
+        return
+
     def fuse_recursive_parfor(self, parfor, equiv_set):
         blocks = wrap_parfor_blocks(parfor)
         # print("in fuse_recursive parfor for ", parfor.id)
@@ -1610,6 +2067,21 @@ class ParforPass(object):
         self.fuse_parfors(arr_analysis, blocks)
         unwrap_parfor_blocks(parfor)
 
+# numpy calls that allocate a new array, reported as allocation sites
+_alloc_calls = [(name, 'numpy') for name in ('empty', 'zeros', 'ones',
+    'full', 'empty_like', 'zeros_like', 'ones_like', 'full_like', 'array',
+    'copy', 'arange', 'linspace', 'eye', 'identity')]
+
+
+def _describe_pattern(pattern):
+    """Return a short description of a parfor pattern for diagnostics."""
+    if isinstance(pattern, tuple):
+        if pattern[0] == 'prange':
+            return '{} loop'.format(pattern[1])
+        return str(pattern[0])
+    return str(pattern)
+
+
 def _remove_size_arg(call_name, expr):
     "remove size argument from args or kws"
     # remove size kwarg
@@ -2382,6 +2854,47 @@ def _can_reorder_stmts(stmt, next_stmt, func_ir, call_table):
             return True
     return False
 
+def _sibling_parfor_order(parfor1, parfor2, stmts, func_ir, call_table):
+    """
+    Split the statements between two parfors of a block into the ones that
+    have to move above parfor1 (parfor2 depends on them) and the ones that
+    can stay below parfor2, so that the parfors become adjacent. Return None
+    if there is no such split.
+    """
+    def writes(stmt):
+        if isinstance(stmt, Parfor):
+            return get_parfor_writes(stmt)
+        if isinstance(stmt, ir.Del):
+            return {stmt.value}
+        return get_stmt_writes(stmt)
+
+    def accesses(stmt):
+        if isinstance(stmt, ir.Del):
+            return {stmt.value}
+        return {v.name for v in stmt.list_vars()}
+
+    def conflict(stmt1, stmt2):
+        return len((writes(stmt1) & accesses(stmt2))
+                   | (writes(stmt2) & accesses(stmt1))) != 0
+
+    before = []
+    after = []
+    # walk backwards since a statement has to move above parfor1 if parfor2
+    # or any statement already moved above parfor1 depends on it
+    for stmt in reversed(stmts):
+        if (isinstance(stmt, (Parfor, ir.Print))
+                or (isinstance(stmt, ir.Assign)
+                    and not has_no_side_effect(stmt.value, set(), call_table)
+                    and not guard(is_assert_equiv, func_ir, stmt.value))):
+            return None
+        if conflict(stmt, parfor2) or any(conflict(stmt, s) for s in before):
+            if conflict(stmt, parfor1):
+                return None
+            before.insert(0, stmt)
+        else:
+            after.insert(0, stmt)
+    return before, after
+
 def is_assert_equiv(func_ir, expr):
     func_name, mod_name = find_callname(func_ir, expr)
     return func_name == 'assert_equiv'
@@ -2399,15 +2912,21 @@ def get_parfor_writes(parfor):
                 writes.update(get_parfor_writes(stmt))
     return writes
 
-def try_fuse(equiv_set, parfor1, parfor2):
-    """try to fuse parfors and return a fused parfor, otherwise return None
+def try_fuse(equiv_set, parfor1, parfor2, diagnostics=None):
+    """try to fuse parfors and return a fused parfor, otherwise return None.
+    The outcome is recorded in *diagnostics* if given.
     """
     dprint("try_fuse trying to fuse \n", parfor1, "\n", parfor2)
 
+    def report(reason):
+        dprint("try_fuse", reason)
+        if diagnostics is not None:
+            diagnostics.add_fusion(parfor1.id, parfor2.id, False, reason)
+        return None
+
     # fusion of parfors with different dimensions not supported yet
     if len(parfor1.loop_nests) != len(parfor2.loop_nests):
-        dprint("try_fuse parfors number of dimensions mismatch")
-        return None
+        return report("parfors number of dimensions mismatch")
 
     ndims = len(parfor1.loop_nests)
     # all loops should be equal length
@@ -2415,20 +2934,31 @@ def try_fuse(equiv_set, parfor1, parfor2):
     def is_equiv(x, y):
         return x == y or equiv_set.is_equiv(x, y)
 
+    def is_equiv_stop(nest1, nest2):
+        # loops with the same non-negative start iterate over the same range
+        # as long as their stops are equal when clamped at zero, e.g.
+        # prange(n-1) and a[1:] + 1
+        if is_equiv(nest1.stop, nest2.stop):
+            return True
+        start = (nest1.start if isinstance(nest1.start, int)
+                 else equiv_set.get_equiv_const(nest1.start))
+        return (start is not None and start >= 0 and
+                isinstance(equiv_set, array_analysis.SymbolicEquivSet) and
+                equiv_set.is_clamped_equiv(nest1.stop, nest2.stop))
+
     for i in range(ndims):
         nest1 = parfor1.loop_nests[i]
         nest2 = parfor2.loop_nests[i]
         if not (is_equiv(nest1.start, nest2.start) and
-                is_equiv(nest1.stop, nest2.stop) and
+                is_equiv_stop(nest1, nest2) and
                 is_equiv(nest1.step, nest2.step)):
-            dprint("try_fuse parfor dimension correlation mismatch", i)
-            return None
+            return report("parfor dimension correlation mismatch "
+                          "(dimension {})".format(i))
 
     # TODO: make sure parfor1's reduction output is not used in parfor2
     # only data parallel loops
     if has_cross_iter_dep(parfor1) or has_cross_iter_dep(parfor2):
-        dprint("try_fuse parfor cross iteration dependency found")
-        return None
+        return report("parfor cross iteration dependency found")
 
     # find parfor1's defs, only body is considered since init_block will run
     # first after fusion as well
@@ -2443,9 +2973,10 @@ def try_fuse(equiv_set, parfor1, parfor2):
         p2_uses |= uses
 
     if not p1_body_defs.isdisjoint(p2_uses):
-        dprint("try_fuse parfor2 depends on parfor1 body")
-        return None
+        return report("parfor2 depends on parfor1 body")
 
+    if diagnostics is not None:
+        diagnostics.add_fusion(parfor1.id, parfor2.id, True, None)
     return fuse_parfors_inner(parfor1, parfor2)
 
 
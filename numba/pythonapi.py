@@ -1125,6 +1125,16 @@ class PythonAPI(object):
         fn = self._get_function(fnty, name=fname)
         return self.builder.call(fn, [string, size])
 
+    def string_from_kind_and_data(self, kind, string, size):
+        """
+        Create a str object from the given compact unicode representation
+        (Python 3 only).
+        """
+        fnty = Type.function(self.pyobj, [Type.int(), self.cstring,
+                                          self.py_ssize_t])
+        fn = self._get_function(fnty, name="PyUnicode_FromKindAndData")
+        return self.builder.call(fn, [kind, string, size])
+
     def string_from_string(self, string):
         fnty = Type.function(self.pyobj, [self.cstring])
         if PYVERSION >= (3, 0):
@@ -1198,6 +1208,24 @@ class PythonAPI(object):
         fn.args[1].add_attribute(lc.ATTR_NO_CAPTURE)
         return self.builder.call(fn, (ary, ptr))
 
+    def nrt_adapt_unicode_from_python(self, obj, p_data, p_length, p_kind,
+                                      p_hash, p_meminfo):
+        """
+        Fill the given pointers with the fields of a native unicode string
+        sharing the data of str object *obj*.  Return an i1 value set if ok.
+        """
+        assert self.context.enable_nrt
+        fnty = Type.function(Type.int(), [self.pyobj,
+                                          self.voidptr.as_pointer(),
+                                          self.py_ssize_t.as_pointer(),
+                                          Type.int().as_pointer(),
+                                          self.py_ssize_t.as_pointer(),
+                                          self.voidptr.as_pointer()])
+        fn = self._get_function(fnty, name="NRT_adapt_unicode_from_python")
+        status = self.builder.call(fn, (obj, p_data, p_length, p_kind,
+                                        p_hash, p_meminfo))
+        return cgutils.is_null(self.builder, status)
+
     def nrt_adapt_buffer_from_python(self, buf, ptr):
         assert self.context.enable_nrt
         fnty = Type.function(Type.void(), [Type.pointer(self.py_buffer_t),
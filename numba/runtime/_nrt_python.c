@@ -403,6 +403,40 @@ NRT_adapt_buffer_from_python(Py_buffer *buf, arystruct_t *arystruct)
     }
 }
 
+/*
+ * Fill the fields of a native unicode string from a str object.  The
+ * object's data is shared: the returned MemInfo keeps a reference to it.
+ * Return -1 with an exception set on failure.
+ */
+NUMBA_EXPORT_FUNC(int)
+NRT_adapt_unicode_from_python(PyObject *obj, void **data, Py_ssize_t *length,
+                              int *kind, Py_ssize_t *hash,
+                              NRT_MemInfo **meminfo)
+{
+#if PY_MAJOR_VERSION >= 3
+    if (!PyUnicode_Check(obj)) {
+        PyErr_SetString(PyExc_TypeError, "expected a str object");
+        return -1;
+    }
+    if (PyUnicode_READY(obj))
+        return -1;
+    *data = PyUnicode_DATA(obj);
+    *length = PyUnicode_GET_LENGTH(obj);
+    *kind = PyUnicode_KIND(obj);
+    *hash = ((PyASCIIObject *) obj)->hash;
+    *meminfo = meminfo_new_from_pyobject(*data, obj);
+    if (*meminfo == NULL) {
+        PyErr_NoMemory();
+        return -1;
+    }
+    return 0;
+#else
+    PyErr_SetString(PyExc_TypeError,
+                    "native unicode strings require Python 3");
+    return -1;
+#endif
+}
+
 
 /* Initialization subroutines for modules including this source file */
 
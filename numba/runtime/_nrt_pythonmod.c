@@ -17,6 +17,73 @@ memsys_use_cpython_allocator(PyObject *self, PyObject *args) {
     Py_RETURN_NONE;
 }
 
+static PyObject *
+memsys_use_pool_allocator(PyObject *self, PyObject *args) {
+    NRT_MemSys_use_pool_allocator(PyMem_RawMalloc,
+                                  PyMem_RawRealloc,
+                                  PyMem_RawFree);
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+memsys_use_trace_allocator(PyObject *self, PyObject *args) {
+    NRT_MemSys_use_trace_allocator();
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+memsys_trace_enabled(PyObject *self, PyObject *args) {
+    return PyBool_FromLong(NRT_MemSys_trace_enabled());
+}
+
+/*
+ * Return a (entries, peak_live_bytes) tuple, where entries is a list of
+ * (name, is_function, alloc, free, bytes, live_bytes, peak_live_bytes,
+ *  lifetime) tuples.
+ */
+static PyObject *
+memsys_get_trace_stats(PyObject *self, PyObject *args) {
+    NRT_TraceStats *stats = NULL;
+    PyObject *entries = NULL;
+    size_t n = 0, count, peak, i;
+
+    /* Entries may be added while we are copying them */
+    while (1) {
+        count = NRT_MemSys_trace_get_stats(stats, n, &peak);
+        if (count <= n)
+            break;
+        PyMem_Free(stats);
+        n = count + 16;
+        stats = PyMem_New(NRT_TraceStats, n);
+        if (stats == NULL)
+            return PyErr_NoMemory();
+    }
+    entries = PyList_New(count);
+    if (entries == NULL)
+        goto error;
+    for (i = 0; i < count; i++) {
+        NRT_TraceStats *st = &stats[i];
+        PyObject *item = Py_BuildValue("(siKKKKKd)", st->name,
+                                       st->is_function,
+                                       (unsigned long long) st->alloc,
+                                       (unsigned long long) st->free,
+                                       (unsigned long long) st->bytes,
+                                       (unsigned long long) st->live_bytes,
+                                       (unsigned long long) st->peak_live_bytes,
+                                       st->lifetime);
+        if (item == NULL)
+            goto error;
+        PyList_SET_ITEM(entries, i, item);
+    }
+    PyMem_Free(stats);
+    return Py_BuildValue("(NK)", entries, (unsigned long long) peak);
+
+error:
+    Py_XDECREF(entries);
+    PyMem_Free(stats);
+    return NULL;
+}
+
 static PyObject *
 memsys_set_atomic_inc_dec(PyObject *self, PyObject *args) {
     PyObject *addr_inc_obj, *addr_dec_obj;
@@ -65,6 +132,16 @@ memsys_get_stats_mi_free(PyObject *self, PyObject *args) {
     return PyLong_FromSize_t(NRT_MemSys_get_stats_mi_free());
 }
 
+static PyObject *
+memsys_get_stats_pool_hit(PyObject *self, PyObject *args) {
+    return PyLong_FromSize_t(NRT_MemSys_get_stats_pool_hit());
+}
+
+static PyObject *
+memsys_get_stats_pool_miss(PyObject *self, PyObject *args) {
+    return PyLong_FromSize_t(NRT_MemSys_get_stats_pool_miss());
+}
+
 
 /*
  * Create a new MemInfo with a owner PyObject
@@ -118,6 +195,10 @@ static PyMethodDef ext_methods[] = {
 #define declmethod(func) { #func , ( PyCFunction )func , METH_VARARGS , NULL }
 #define declmethod_noargs(func) { #func , ( PyCFunction )func , METH_NOARGS, NULL }
     declmethod_noargs(memsys_use_cpython_allocator),
+    declmethod_noargs(memsys_use_pool_allocator),
+    declmethod_noargs(memsys_use_trace_allocator),
+    declmethod_noargs(memsys_trace_enabled),
+    declmethod_noargs(memsys_get_trace_stats),
     declmethod_noargs(memsys_shutdown),
     declmethod(memsys_set_atomic_inc_dec),
     declmethod(memsys_set_atomic_cas),
@@ -125,6 +206,8 @@ static PyMethodDef ext_methods[] = {
     declmethod_noargs(memsys_get_stats_free),
     declmethod_noargs(memsys_get_stats_mi_alloc),
     declmethod_noargs(memsys_get_stats_mi_free),
+    declmethod_noargs(memsys_get_stats_pool_hit),
+    declmethod_noargs(memsys_get_stats_pool_miss),
     declmethod(meminfo_new),
     declmethod(meminfo_alloc),
     declmethod(meminfo_alloc_safe),
@@ -156,6 +239,12 @@ build_c_helpers_dict(void)
 declmethod(adapt_ndarray_from_python);
 declmethod(adapt_ndarray_to_python);
 declmethod(adapt_buffer_from_python);
+declmethod(adapt_unicode_from_python);
+declmethod(MemSys_trace_set_site);
+declmethod(MemSys_trace_get_site);
+declmethod(Arena_enter);
+declmethod(Arena_use);
+declmethod(Arena_exit);
 declmethod(MemInfo_alloc);
 declmethod(MemInfo_alloc_safe);
 declmethod(MemInfo_alloc_aligned);
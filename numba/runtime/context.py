@@ -209,14 +209,91 @@ class NRTContext(object):
             fn.args[0].add_attribute("nocapture")
             builder.call(fn, [meminfo])
 
+    def trace_set_site(self, builder, site):
+        """
+        Tell the NRT allocation tracer that the following allocations
+        happen at *site*, a "function\\tfilename\\tline" string.
+        """
+        self._require_nrt()
+
+        mod = builder.module
+        fnty = ir.FunctionType(ir.VoidType(), [cgutils.voidptr_t])
+        fn = mod.get_or_insert_function(fnty, name="NRT_MemSys_trace_set_site")
+        site = self._context.insert_const_string(mod, site)
+        builder.call(fn, [site])
+
+    def trace_get_site(self, builder):
+        """
+        Return the current allocation site of the NRT allocation tracer,
+        to give to trace_restore_site().
+        """
+        self._require_nrt()
+
+        mod = builder.module
+        fnty = ir.FunctionType(cgutils.voidptr_t, [])
+        fn = mod.get_or_insert_function(fnty, name="NRT_MemSys_trace_get_site")
+        return builder.call(fn, [])
+
+    def trace_restore_site(self, builder, site):
+        """
+        Restore an allocation site returned by trace_get_site().
+        """
+        self._require_nrt()
+
+        mod = builder.module
+        fnty = ir.FunctionType(ir.VoidType(), [cgutils.voidptr_t])
+        fn = mod.get_or_insert_function(fnty, name="NRT_MemSys_trace_set_site")
+        builder.call(fn, [site])
+
+    def arena_enter(self, builder):
+        """
+        Enter a call using the NRT arena.  Returns the state to give to
+        arena_exit().
+        """
+        self._require_nrt()
+
+        mod = builder.module
+        fnty = ir.FunctionType(ir.IntType(32), [])
+        fn = mod.get_or_insert_function(fnty, name="NRT_Arena_enter")
+        return builder.call(fn, [])
+
+    def arena_use(self, builder, use):
+        """
+        Tell whether the following allocations may come from the arena.
+        """
+        self._require_nrt()
+
+        mod = builder.module
+        fnty = ir.FunctionType(ir.VoidType(), [ir.IntType(32)])
+        fn = mod.get_or_insert_function(fnty, name="NRT_Arena_use")
+        builder.call(fn, [ir.Constant(ir.IntType(32), int(use))])
+
+    def arena_exit(self, builder, state):
+        """
+        Leave a call entered with arena_enter().
+        """
+        self._require_nrt()
+
+        mod = builder.module
+        fnty = ir.FunctionType(ir.VoidType(), [ir.IntType(32)])
+        fn = mod.get_or_insert_function(fnty, name="NRT_Arena_exit")
+        builder.call(fn, [state])
+
+    def _refct_funcname(self, funcname):
+        if not self._context.enable_nrt_atomic:
+            funcname += "_nonatomic"
+        return funcname
+
     def incref(self, builder, typ, value):
         """
         Recursively incref the given *value* and its members.
         """
-        self._call_incref_decref(builder, typ, typ, value, "NRT_incref")
+        self._call_incref_decref(builder, typ, typ, value,
+                                 self._refct_funcname("NRT_incref"))
 
     def decref(self, builder, typ, value):
         """
         Recursively decref the given *value* and its members.
         """
-        self._call_incref_decref(builder, typ, typ, value, "NRT_decref")
+        self._call_incref_decref(builder, typ, typ, value,
+                                 self._refct_funcname("NRT_decref"))
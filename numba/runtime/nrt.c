@@ -56,6 +56,12 @@ struct MemSys {
         NRT_realloc_func realloc;
         NRT_free_func free;
     } allocator;
+    /* Allocation functions backing the size-class pool */
+    struct {
+        NRT_malloc_func malloc;
+        NRT_realloc_func realloc;
+        NRT_free_func free;
+    } pool_backend;
 };
 
 /* The Memory System object */
@@ -70,8 +76,12 @@ void NRT_MemSys_init(void) {
     TheMSys.allocator.free = free;
 }
 
+static void nrt_thread_exit(void);
+
 void NRT_MemSys_shutdown(void) {
     TheMSys.shutting = 1;
+    /* Thread-exit hooks don't run for the main thread */
+    nrt_thread_exit();
     /* Revert to use our non-atomic stub for all atomic operations
        because the JIT-ed version will be removed.
        Since we are at interpreter shutdown,
@@ -123,6 +133,782 @@ size_t NRT_MemSys_get_stats_mi_free() {
     return TheMSys.stats_mi_free;
 }
 
+/*
+ * Per-thread state.
+ *
+ * The pool allocator and the arena keep memory in thread-local storage.
+ * A thread registers a thread-exit hook the first time it keeps memory
+ * there; the hook calls nrt_thread_exit(), which gives the memory back.
+ */
+
+#if defined(_MSC_VER)
+#define NRT_THREAD_LOCAL __declspec(thread)
+#else
+#define NRT_THREAD_LOCAL __thread
+#endif
+
+#if defined(_WIN32)
+#include <windows.h>
+
+typedef SRWLOCK nrt_lock_t;
+#define NRT_LOCK_INIT SRWLOCK_INIT
+#define nrt_lock(L) AcquireSRWLockExclusive(L)
+#define nrt_unlock(L) ReleaseSRWLockExclusive(L)
+#else
+#include <pthread.h>
+
+typedef pthread_mutex_t nrt_lock_t;
+#define NRT_LOCK_INIT PTHREAD_MUTEX_INITIALIZER
+#define nrt_lock(L) pthread_mutex_lock(L)
+#define nrt_unlock(L) pthread_mutex_unlock(L)
+#endif
+
+static NRT_THREAD_LOCAL int nrt_thread_registered;
+
+#if defined(_WIN32)
+/* Fiber-local storage callbacks also run when a thread exits */
+static INIT_ONCE nrt_thread_once = INIT_ONCE_STATIC_INIT;
+static DWORD nrt_thread_key = FLS_OUT_OF_INDEXES;
+
+static void WINAPI nrt_thread_exit_callback(void *value) {
+    if (value != NULL)
+        nrt_thread_exit();
+}
+
+static BOOL CALLBACK nrt_thread_key_init(PINIT_ONCE once, void *param,
+                                         void **context) {
+    nrt_thread_key = FlsAlloc(nrt_thread_exit_callback);
+    return TRUE;
+}
+
+static void nrt_thread_register(void) {
+    if (nrt_thread_registered)
+        return;
+    InitOnceExecuteOnce(&nrt_thread_once, nrt_thread_key_init, NULL, NULL);
+    if (nrt_thread_key != FLS_OUT_OF_INDEXES)
+        FlsSetValue(nrt_thread_key, (void *) 1);
+    nrt_thread_registered = 1;
+}
+#else
+static pthread_once_t nrt_thread_once = PTHREAD_ONCE_INIT;
+static pthread_key_t nrt_thread_key;
+static int nrt_thread_key_created;
+
+static void nrt_thread_exit_callback(void *value) {
+    nrt_thread_exit();
+}
+
+static void nrt_thread_key_init(void) {
+    nrt_thread_key_created =
+        pthread_key_create(&nrt_thread_key, nrt_thread_exit_callback) == 0;
+}
+
+static void nrt_thread_register(void) {
+    if (nrt_thread_registered)
+        return;
+    pthread_once(&nrt_thread_once, nrt_thread_key_init);
+    if (nrt_thread_key_created)
+        pthread_setspecific(nrt_thread_key, (void *) 1);
+    nrt_thread_registered = 1;
+}
+#endif
+
+/*
+ * Size-class pool allocator.
+ *
+ * Requests up to the largest size class are rounded up to a class size.
+ * Freed blocks are pushed on a per-thread free list for their class and
+ * handed out again by later requests of the same class on that thread,
+ * without going to the system allocator.  Each thread keeps at most
+ * NRT_POOL_CACHE_BYTES per class; blocks beyond that, and requests larger
+ * than the largest class, are returned to and served by the backend
+ * allocation functions given to NRT_MemSys_use_pool_allocator().  The
+ * free lists of a thread are returned to the backend when it exits.
+ *
+ * Every block starts with a header recording its size class so that
+ * free() and realloc() don't need to be told the block size.
+ */
+
+#define NRT_POOL_NCLASSES 24
+#define NRT_POOL_LARGE ((size_t) -1)
+#define NRT_POOL_CACHE_BYTES (256 * 1024)
+
+static const size_t nrt_pool_class_sizes[NRT_POOL_NCLASSES] = {
+    16, 32, 48, 64, 96, 128, 192, 256, 384, 512, 768, 1024,
+    1536, 2048, 3072, 4096, 6144, 8192, 12288, 16384, 24576, 32768,
+    49152, 65536
+};
+
+/* The header is padded so that the payload keeps malloc()'s alignment */
+typedef union {
+    size_t cls;
+    double _align[2];
+} nrt_pool_header;
+
+struct nrt_pool_cache {
+    void   *head[NRT_POOL_NCLASSES];
+    size_t count[NRT_POOL_NCLASSES];
+    /* Stats, summed over all threads when read */
+    size_t hit, miss;
+    /* Links in the list of threads using the pool */
+    int registered;
+    struct nrt_pool_cache *prev, *next;
+};
+
+static NRT_THREAD_LOCAL struct nrt_pool_cache nrt_pool_tcache;
+
+static struct {
+    nrt_lock_t lock;
+    struct nrt_pool_cache *threads;
+    /* Stats of the threads that exited */
+    size_t hit, miss;
+} nrt_pool = { NRT_LOCK_INIT };
+
+static void nrt_pool_register(struct nrt_pool_cache *cache) {
+    nrt_thread_register();
+    nrt_lock(&nrt_pool.lock);
+    cache->prev = NULL;
+    cache->next = nrt_pool.threads;
+    if (cache->next != NULL)
+        cache->next->prev = cache;
+    nrt_pool.threads = cache;
+    cache->registered = 1;
+    nrt_unlock(&nrt_pool.lock);
+}
+
+/* Return the free lists of the calling thread to the backend */
+static void nrt_pool_flush(void) {
+    struct nrt_pool_cache *cache = &nrt_pool_tcache;
+    size_t cls;
+    if (!cache->registered)
+        return;
+    for (cls = 0; cls < NRT_POOL_NCLASSES; cls++) {
+        void **head = cache->head[cls];
+        while (head != NULL) {
+            void **next = *head;
+            TheMSys.pool_backend.free((nrt_pool_header *) head - 1);
+            head = next;
+        }
+        cache->head[cls] = NULL;
+        cache->count[cls] = 0;
+    }
+    nrt_lock(&nrt_pool.lock);
+    if (cache->prev != NULL)
+        cache->prev->next = cache->next;
+    else
+        nrt_pool.threads = cache->next;
+    if (cache->next != NULL)
+        cache->next->prev = cache->prev;
+    nrt_pool.hit += cache->hit;
+    nrt_pool.miss += cache->miss;
+    cache->hit = cache->miss = 0;
+    cache->registered = 0;
+    nrt_unlock(&nrt_pool.lock);
+}
+
+size_t NRT_MemSys_get_stats_pool_hit() {
+    struct nrt_pool_cache *cache;
+    size_t hit;
+    nrt_lock(&nrt_pool.lock);
+    hit = nrt_pool.hit;
+    for (cache = nrt_pool.threads; cache != NULL; cache = cache->next)
+        hit += cache->hit;
+    nrt_unlock(&nrt_pool.lock);
+    return hit;
+}
+
+size_t NRT_MemSys_get_stats_pool_miss() {
+    struct nrt_pool_cache *cache;
+    size_t miss;
+    nrt_lock(&nrt_pool.lock);
+    miss = nrt_pool.miss;
+    for (cache = nrt_pool.threads; cache != NULL; cache = cache->next)
+        miss += cache->miss;
+    nrt_unlock(&nrt_pool.lock);
+    return miss;
+}
+
+static size_t nrt_pool_size_class(size_t size) {
+    size_t lo = 0, hi = NRT_POOL_NCLASSES - 1;
+    if (size > nrt_pool_class_sizes[hi])
+        return NRT_POOL_LARGE;
+    /* Find the smallest class that fits */
+    while (lo < hi) {
+        size_t mid = (lo + hi) / 2;
+        if (nrt_pool_class_sizes[mid] < size)
+            lo = mid + 1;
+        else
+            hi = mid;
+    }
+    return lo;
+}
+
+static void *nrt_pool_malloc(size_t size) {
+    nrt_pool_header *hdr;
+    size_t cls = nrt_pool_size_class(size);
+    if (cls != NRT_POOL_LARGE) {
+        struct nrt_pool_cache *cache = &nrt_pool_tcache;
+        void **head = cache->head[cls];
+        if (head != NULL) {
+            cache->head[cls] = *head;
+            cache->count[cls]--;
+            cache->hit++;
+            return head;
+        }
+        if (!cache->registered)
+            nrt_pool_register(cache);
+        cache->miss++;
+        size = nrt_pool_class_sizes[cls];
+    } else if (size > NRT_POOL_LARGE - sizeof(nrt_pool_header)) {
+        return NULL;
+    }
+    hdr = TheMSys.pool_backend.malloc(sizeof(nrt_pool_header) + size);
+    if (hdr == NULL)
+        return NULL;
+    hdr->cls = cls;
+    return hdr + 1;
+}
+
+static void nrt_pool_free(void *ptr) {
+    nrt_pool_header *hdr;
+    size_t cls;
+    if (ptr == NULL)
+        return;
+    hdr = (nrt_pool_header *) ptr - 1;
+    cls = hdr->cls;
+    /* Nothing would return the free lists after shutdown */
+    if (cls != NRT_POOL_LARGE && !TheMSys.shutting) {
+        struct nrt_pool_cache *cache = &nrt_pool_tcache;
+        if (!cache->registered)
+            nrt_pool_register(cache);
+        if ((cache->count[cls] + 1) * nrt_pool_class_sizes[cls]
+                <= NRT_POOL_CACHE_BYTES) {
+            *(void **) ptr = cache->head[cls];
+            cache->head[cls] = ptr;
+            cache->count[cls]++;
+            return;
+        }
+    }
+    TheMSys.pool_backend.free(hdr);
+}
+
+static void *nrt_pool_realloc(void *ptr, size_t size) {
+    nrt_pool_header *hdr;
+    size_t cls, new_cls, ncopy;
+    void *new_ptr;
+    if (ptr == NULL)
+        return nrt_pool_malloc(size);
+    hdr = (nrt_pool_header *) ptr - 1;
+    cls = hdr->cls;
+    new_cls = nrt_pool_size_class(size);
+    if (cls == NRT_POOL_LARGE && new_cls == NRT_POOL_LARGE) {
+        /* Let the system allocator resize in place if it can */
+        if (size > NRT_POOL_LARGE - sizeof(nrt_pool_header))
+            return NULL;
+        hdr = TheMSys.pool_backend.realloc(hdr,
+                                           sizeof(nrt_pool_header) + size);
+        if (hdr == NULL)
+            return NULL;
+        return hdr + 1;
+    }
+    if (cls != NRT_POOL_LARGE && (new_cls == cls || new_cls + 1 == cls)) {
+        /* Fits in the current block without wasting too much of it;
+           a larger shrink moves to a block of the smaller class */
+        return ptr;
+    }
+    new_ptr = nrt_pool_malloc(size);
+    if (new_ptr == NULL)
+        return NULL;
+    /* A large block only moves into a class when it shrinks */
+    ncopy = size;
+    if (cls != NRT_POOL_LARGE && nrt_pool_class_sizes[cls] < size)
+        ncopy = nrt_pool_class_sizes[cls];
+    memcpy(new_ptr, ptr, ncopy);
+    nrt_pool_free(ptr);
+    return new_ptr;
+}
+
+void NRT_MemSys_use_pool_allocator(NRT_malloc_func malloc_func,
+                                   NRT_realloc_func realloc_func,
+                                   NRT_free_func free_func)
+{
+    NRT_MemSys_set_allocator(nrt_pool_malloc,
+                             nrt_pool_realloc,
+                             nrt_pool_free);
+    TheMSys.pool_backend.malloc = malloc_func;
+    TheMSys.pool_backend.realloc = realloc_func;
+    TheMSys.pool_backend.free = free_func;
+}
+
+/*
+ * Allocation tracer.
+ *
+ * Each traced block starts with a header recording its size, the
+ * entries of its allocation site and function, and its allocation time.
+ * The entries live in a hash table keyed by name, so that several
+ * specializations of a function share their statistics.
+ */
+
+#if defined(_WIN32)
+static double nrt_trace_clock(void) {
+    LARGE_INTEGER freq, count;
+    QueryPerformanceFrequency(&freq);
+    QueryPerformanceCounter(&count);
+    return (double) count.QuadPart / (double) freq.QuadPart;
+}
+#else
+#include <time.h>
+
+static double nrt_trace_clock(void) {
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec + ts.tv_nsec * 1e-9;
+}
+#endif
+
+typedef union {
+    struct {
+        size_t size;
+        size_t site, func;
+        double start;
+    } info;
+    double _align[4];
+} nrt_trace_header;
+
+struct nrt_trace_entry {
+    char *name;
+    size_t len;
+    int is_function;
+    size_t alloc, free;
+    size_t bytes, live_bytes, peak_live_bytes;
+    double lifetime;
+};
+
+static struct {
+    nrt_lock_t lock;
+    int enabled;
+    struct nrt_trace_entry *entries;
+    size_t nentries, capacity;
+    /* Open-addressing index of entries (stored as index + 1) */
+    size_t *slots;
+    size_t nslots;
+    size_t live_bytes, peak_live_bytes;
+    /* The allocation functions wrapped by the tracer */
+    NRT_malloc_func malloc;
+    NRT_realloc_func realloc;
+    NRT_free_func free;
+} nrt_trace = { NRT_LOCK_INIT };
+
+static const char nrt_trace_unknown_site[] = "<unknown>\t\t0";
+
+static NRT_THREAD_LOCAL const char *nrt_trace_site;
+
+void NRT_MemSys_trace_set_site(const char *site) {
+    nrt_trace_site = site;
+}
+
+const char *NRT_MemSys_trace_get_site(void) {
+    return nrt_trace_site;
+}
+
+static size_t nrt_trace_hash(const char *name, size_t len, int is_function) {
+    /* FNV-1a */
+    size_t h = 2166136261u;
+    size_t i;
+    for (i = 0; i < len; i++) {
+        h ^= (unsigned char) name[i];
+        h *= 16777619u;
+    }
+    return h ^ (size_t) is_function;
+}
+
+static void nrt_trace_grow_slots(void) {
+    size_t nslots = nrt_trace.nslots ? nrt_trace.nslots * 2 : 64;
+    size_t *slots = calloc(nslots, sizeof(size_t));
+    size_t i;
+    if (slots == NULL)
+        nrt_fatal_error("out of memory in allocation tracer");
+    for (i = 0; i < nrt_trace.nentries; i++) {
+        struct nrt_trace_entry *e = &nrt_trace.entries[i];
+        size_t j = nrt_trace_hash(e->name, e->len, e->is_function);
+        j &= nslots - 1;
+        while (slots[j])
+            j = (j + 1) & (nslots - 1);
+        slots[j] = i + 1;
+    }
+    free(nrt_trace.slots);
+    nrt_trace.slots = slots;
+    nrt_trace.nslots = nslots;
+}
+
+/* Find or create the entry for `name`.  Must be called with the lock held. */
+static size_t nrt_trace_lookup(const char *name, size_t len, int is_function) {
+    struct nrt_trace_entry *e;
+    size_t mask, i;
+    if ((nrt_trace.nentries + 1) * 2 > nrt_trace.nslots)
+        nrt_trace_grow_slots();
+    mask = nrt_trace.nslots - 1;
+    i = nrt_trace_hash(name, len, is_function) & mask;
+    while (nrt_trace.slots[i]) {
+        e = &nrt_trace.entries[nrt_trace.slots[i] - 1];
+        if (e->is_function == is_function && e->len == len &&
+                memcmp(e->name, name, len) == 0)
+            return nrt_trace.slots[i] - 1;
+        i = (i + 1) & mask;
+    }
+    if (nrt_trace.nentries == nrt_trace.capacity) {
+        size_t capacity = nrt_trace.capacity ? nrt_trace.capacity * 2 : 32;
+        e = realloc(nrt_trace.entries,
+                    capacity * sizeof(struct nrt_trace_entry));
+        if (e == NULL)
+            nrt_fatal_error("out of memory in allocation tracer");
+        nrt_trace.entries = e;
+        nrt_trace.capacity = capacity;
+    }
+    e = &nrt_trace.entries[nrt_trace.nentries];
+    memset(e, 0, sizeof(*e));
+    e->name = malloc(len + 1);
+    if (e->name == NULL)
+        nrt_fatal_error("out of memory in allocation tracer");
+    memcpy(e->name, name, len);
+    e->name[len] = '\0';
+    e->len = len;
+    e->is_function = is_function;
+    nrt_trace.slots[i] = ++nrt_trace.nentries;
+    return nrt_trace.nentries - 1;
+}
+
+static void nrt_trace_add_live(struct nrt_trace_entry *e, size_t size) {
+    e->live_bytes += size;
+    if (e->live_bytes > e->peak_live_bytes)
+        e->peak_live_bytes = e->live_bytes;
+}
+
+/* Record a new block.  Must be called with the lock held. */
+static void nrt_trace_record_alloc(nrt_trace_header *hdr, size_t size) {
+    const char *site = nrt_trace_site;
+    size_t site_len, func_len;
+    struct nrt_trace_entry *e;
+    if (site == NULL)
+        site = nrt_trace_unknown_site;
+    site_len = strlen(site);
+    func_len = strcspn(site, "\t");
+    hdr->info.size = size;
+    hdr->info.site = nrt_trace_lookup(site, site_len, 0);
+    hdr->info.func = nrt_trace_lookup(site, func_len, 1);
+    hdr->info.start = nrt_trace_clock();
+
+    e = &nrt_trace.entries[hdr->info.site];
+    e->alloc++;
+    e->bytes += size;
+    nrt_trace_add_live(e, size);
+    e = &nrt_trace.entries[hdr->info.func];
+    e->alloc++;
+    e->bytes += size;
+    nrt_trace_add_live(e, size);
+    nrt_trace.live_bytes += size;
+    if (nrt_trace.live_bytes > nrt_trace.peak_live_bytes)
+        nrt_trace.peak_live_bytes = nrt_trace.live_bytes;
+}
+
+/* Record the release of a block.  Must be called with the lock held. */
+static void nrt_trace_record_free(nrt_trace_header *hdr) {
+    double lifetime = nrt_trace_clock() - hdr->info.start;
+    size_t size = hdr->info.size;
+    struct nrt_trace_entry *e;
+
+    e = &nrt_trace.entries[hdr->info.site];
+    e->free++;
+    e->live_bytes -= size;
+    e->lifetime += lifetime;
+    e = &nrt_trace.entries[hdr->info.func];
+    e->free++;
+    e->live_bytes -= size;
+    e->lifetime += lifetime;
+    nrt_trace.live_bytes -= size;
+}
+
+static void *nrt_trace_malloc(size_t size) {
+    nrt_trace_header *hdr;
+    if (size > (size_t) -1 - sizeof(nrt_trace_header))
+        return NULL;
+    hdr = nrt_trace.malloc(sizeof(nrt_trace_header) + size);
+    if (hdr == NULL)
+        return NULL;
+    nrt_lock(&nrt_trace.lock);
+    nrt_trace_record_alloc(hdr, size);
+    nrt_unlock(&nrt_trace.lock);
+    return hdr + 1;
+}
+
+static void nrt_trace_free(void *ptr) {
+    nrt_trace_header *hdr;
+    if (ptr == NULL)
+        return;
+    hdr = (nrt_trace_header *) ptr - 1;
+    nrt_lock(&nrt_trace.lock);
+    nrt_trace_record_free(hdr);
+    nrt_unlock(&nrt_trace.lock);
+    nrt_trace.free(hdr);
+}
+
+static void *nrt_trace_realloc(void *ptr, size_t size) {
+    nrt_trace_header *hdr, *new_hdr;
+    size_t old_size;
+    if (ptr == NULL)
+        return nrt_trace_malloc(size);
+    if (size > (size_t) -1 - sizeof(nrt_trace_header))
+        return NULL;
+    hdr = (nrt_trace_header *) ptr - 1;
+    new_hdr = nrt_trace.realloc(hdr, sizeof(nrt_trace_header) + size);
+    if (new_hdr == NULL)
+        return NULL;
+    /* A resized block stays accounted to its original site */
+    nrt_lock(&nrt_trace.lock);
+    old_size = new_hdr->info.size;
+    new_hdr->info.size = size;
+    if (size > old_size) {
+        size_t delta = size - old_size;
+        struct nrt_trace_entry *e = &nrt_trace.entries[new_hdr->info.site];
+        e->bytes += delta;
+        nrt_trace_add_live(e, delta);
+        e = &nrt_trace.entries[new_hdr->info.func];
+        e->bytes += delta;
+        nrt_trace_add_live(e, delta);
+        nrt_trace.live_bytes += delta;
+        if (nrt_trace.live_bytes > nrt_trace.peak_live_bytes)
+            nrt_trace.peak_live_bytes = nrt_trace.live_bytes;
+    } else {
+        size_t delta = old_size - size;
+        nrt_trace.entries[new_hdr->info.site].live_bytes -= delta;
+        nrt_trace.entries[new_hdr->info.func].live_bytes -= delta;
+        nrt_trace.live_bytes -= delta;
+    }
+    nrt_unlock(&nrt_trace.lock);
+    return new_hdr + 1;
+}
+
+void NRT_MemSys_use_trace_allocator(void) {
+    NRT_malloc_func malloc_func = TheMSys.allocator.malloc;
+    NRT_realloc_func realloc_func = TheMSys.allocator.realloc;
+    NRT_free_func free_func = TheMSys.allocator.free;
+    if (nrt_trace.enabled)
+        return;
+    NRT_MemSys_set_allocator(nrt_trace_malloc,
+                             nrt_trace_realloc,
+                             nrt_trace_free);
+    nrt_trace.malloc = malloc_func;
+    nrt_trace.realloc = realloc_func;
+    nrt_trace.free = free_func;
+    nrt_trace.enabled = 1;
+}
+
+int NRT_MemSys_trace_enabled(void) {
+    return nrt_trace.enabled;
+}
+
+size_t NRT_MemSys_trace_get_stats(NRT_TraceStats *out, size_t n,
+                                  size_t *peak)
+{
+    size_t i, count;
+    nrt_lock(&nrt_trace.lock);
+    count = nrt_trace.nentries;
+    for (i = 0; i < count && i < n; i++) {
+        struct nrt_trace_entry *e = &nrt_trace.entries[i];
+        out[i].name = e->name;
+        out[i].is_function = e->is_function;
+        out[i].alloc = e->alloc;
+        out[i].free = e->free;
+        out[i].bytes = e->bytes;
+        out[i].live_bytes = e->live_bytes;
+        out[i].peak_live_bytes = e->peak_live_bytes;
+        out[i].lifetime = e->lifetime;
+    }
+    if (peak != NULL)
+        *peak = nrt_trace.peak_live_bytes;
+    nrt_unlock(&nrt_trace.lock);
+    return count;
+}
+
+/*
+ * Arena allocator.
+ *
+ * While a function compiled with arena=True runs, the MemInfos it
+ * allocates are bump-allocated from per-thread chunks instead of the
+ * system allocator.  Each chunk counts its live blocks, plus one
+ * reference held by the arena.  Freeing a block only decrements its
+ * chunk's count; a chunk is reused as soon as all its blocks are freed,
+ * and when the outermost arena call returns, all the chunks are released
+ * at once, except for one spare chunk kept for the next call until the
+ * thread exits.  A chunk still holding live blocks (e.g. an escaped array)
+ * is freed when its last block is.
+ *
+ * An arena block is a nrt_arena_header followed by the MemInfo and its
+ * data.  The MemInfo's destructor is replaced with nrt_arena_dtor, which
+ * calls the original destructor saved in the header.
+ */
+
+#define NRT_ARENA_CHUNK_SIZE (256 * 1024)
+/* Larger blocks are allocated with the system allocator */
+#define NRT_ARENA_MAX_BLOCK (NRT_ARENA_CHUNK_SIZE / 4)
+
+typedef union nrt_arena_chunk {
+    struct {
+        size_t refct;
+        size_t used;
+        union nrt_arena_chunk *next;
+    } info;
+    double _align[4];
+} nrt_arena_chunk;
+
+typedef union {
+    struct {
+        nrt_arena_chunk *chunk;
+        NRT_dtor_function dtor;
+        void *dtor_info;
+    } info;
+    double _align[4];
+} nrt_arena_header;
+
+struct nrt_arena {
+    /* Number of active arena calls */
+    size_t depth;
+    /* Whether the current allocations may come from the arena */
+    int use;
+    nrt_arena_chunk *current;
+    /* Chunks filled during the current call */
+    nrt_arena_chunk *full;
+    /* A chunk kept between calls */
+    nrt_arena_chunk *spare;
+};
+
+static NRT_THREAD_LOCAL struct nrt_arena nrt_tarena;
+
+static void nrt_arena_release_chunk(nrt_arena_chunk *chunk) {
+    if (TheMSys.atomic_dec(&chunk->info.refct) == 0)
+        TheMSys.allocator.free(chunk);
+}
+
+static nrt_arena_chunk *nrt_arena_new_chunk(struct nrt_arena *arena) {
+    nrt_arena_chunk *chunk, **prev;
+    if (arena->current != NULL) {
+        arena->current->info.next = arena->full;
+        arena->full = arena->current;
+        arena->current = NULL;
+    }
+    /* Reuse a filled chunk whose blocks were all freed */
+    for (prev = &arena->full; *prev != NULL; prev = &(*prev)->info.next) {
+        chunk = *prev;
+        if (chunk->info.refct == 1) {
+            *prev = chunk->info.next;
+            goto found;
+        }
+    }
+    if (arena->spare != NULL) {
+        chunk = arena->spare;
+        arena->spare = NULL;
+        goto found;
+    }
+    chunk = TheMSys.allocator.malloc(NRT_ARENA_CHUNK_SIZE);
+    if (chunk == NULL)
+        return NULL;
+    chunk->info.refct = 1;
+found:
+    chunk->info.used = sizeof(nrt_arena_chunk);
+    chunk->info.next = NULL;
+    arena->current = chunk;
+    return chunk;
+}
+
+/* Allocate *size* bytes after a nrt_arena_header, or return NULL if the
+   block should come from the system allocator. */
+static nrt_arena_header *nrt_arena_alloc(size_t size) {
+    struct nrt_arena *arena = &nrt_tarena;
+    nrt_arena_chunk *chunk = arena->current;
+    nrt_arena_header *hdr;
+    if (!arena->use || size > NRT_ARENA_MAX_BLOCK)
+        return NULL;
+    size = (sizeof(nrt_arena_header) + size + 15) & ~(size_t) 15;
+    if (chunk != NULL && chunk->info.refct == 1) {
+        /* All blocks of the current chunk were freed */
+        chunk->info.used = sizeof(nrt_arena_chunk);
+    }
+    if (chunk == NULL || NRT_ARENA_CHUNK_SIZE - chunk->info.used < size) {
+        chunk = nrt_arena_new_chunk(arena);
+        if (chunk == NULL)
+            return NULL;
+    }
+    hdr = (nrt_arena_header *) ((char *) chunk + chunk->info.used);
+    chunk->info.used += size;
+    TheMSys.atomic_inc(&chunk->info.refct);
+    TheMSys.atomic_inc(&TheMSys.stats_alloc);
+    hdr->info.chunk = chunk;
+    return hdr;
+}
+
+static void nrt_arena_dtor(void *ptr, size_t size, void *info) {
+    nrt_arena_header *hdr = info;
+    if (hdr->info.dtor != NULL)
+        hdr->info.dtor(ptr, size, hdr->info.dtor_info);
+}
+
+static void nrt_arena_free(nrt_arena_header *hdr) {
+    nrt_arena_release_chunk(hdr->info.chunk);
+    TheMSys.atomic_inc(&TheMSys.stats_free);
+}
+
+int NRT_Arena_enter(void) {
+    struct nrt_arena *arena = &nrt_tarena;
+    int prev = arena->use;
+    arena->depth++;
+    return prev;
+}
+
+void NRT_Arena_use(int use) {
+    nrt_tarena.use = use;
+}
+
+void NRT_Arena_exit(int prev) {
+    struct nrt_arena *arena = &nrt_tarena;
+    nrt_arena_chunk *chunk, *next;
+    arena->use = prev;
+    if (--arena->depth > 0)
+        return;
+    if (arena->current != NULL) {
+        arena->current->info.next = arena->full;
+        arena->full = arena->current;
+        arena->current = NULL;
+    }
+    for (chunk = arena->full; chunk != NULL; chunk = next) {
+        next = chunk->info.next;
+        if (arena->spare == NULL && chunk->info.refct == 1) {
+            /* The spare chunk is released when the thread exits */
+            nrt_thread_register();
+            arena->spare = chunk;
+        } else {
+            nrt_arena_release_chunk(chunk);
+        }
+    }
+    arena->full = NULL;
+}
+
+static void nrt_arena_release_spare(void) {
+    struct nrt_arena *arena = &nrt_tarena;
+    if (arena->spare != NULL) {
+        nrt_arena_release_chunk(arena->spare);
+        arena->spare = NULL;
+    }
+}
+
+/* Called by the thread-exit hook, and for the main thread at shutdown */
+static void nrt_thread_exit(void) {
+    /* The arena's chunks may come from the pool */
+    nrt_arena_release_spare();
+    nrt_pool_flush();
+    /* Run the hook again if the thread keeps memory after this */
+    nrt_thread_registered = 0;
+}
+
 static
 size_t nrt_testing_atomic_inc(size_t *ptr){
     /* non atomic */
@@ -208,12 +994,37 @@ void nrt_internal_dtor_safe(void *ptr, size_t size, void *info) {
 static
 void *nrt_allocate_meminfo_and_data(size_t size, NRT_MemInfo **mi_out) {
     NRT_MemInfo *mi;
-    char *base = NRT_Allocate(sizeof(NRT_MemInfo) + size);
+    char *base;
+    nrt_arena_header *hdr = NULL;
+    if (nrt_tarena.use)
+        hdr = nrt_arena_alloc(sizeof(NRT_MemInfo) + size);
+    if (hdr != NULL)
+        base = (char *) (hdr + 1);
+    else
+        base = NRT_Allocate(sizeof(NRT_MemInfo) + size);
     mi = (NRT_MemInfo *) base;
+    /* Tell nrt_meminfo_init_allocated() whether it comes from the arena */
+    mi->dtor = hdr != NULL ? nrt_arena_dtor : NULL;
+    mi->dtor_info = hdr;
     *mi_out = mi;
     return base + sizeof(NRT_MemInfo);
 }
 
+/* Initialize a MemInfo allocated by nrt_allocate_meminfo_and_data() */
+static
+void nrt_meminfo_init_allocated(NRT_MemInfo *mi, void *data, size_t size,
+                                NRT_dtor_function dtor, void *dtor_info)
+{
+    nrt_arena_header *hdr = mi->dtor_info;
+    if (mi->dtor == nrt_arena_dtor) {
+        hdr->info.dtor = dtor;
+        hdr->info.dtor_info = dtor_info;
+        dtor = nrt_arena_dtor;
+        dtor_info = hdr;
+    }
+    NRT_MemInfo_init(mi, data, size, dtor, dtor_info);
+}
+
 
 static
 void nrt_internal_custom_dtor_safe(void *ptr, size_t size, void *info) {
@@ -232,7 +1043,7 @@ NRT_MemInfo *NRT_MemInfo_alloc(size_t size) {
     NRT_MemInfo *mi;
     void *data = nrt_allocate_meminfo_and_data(size, &mi);
     NRT_Debug(nrt_debug_print("NRT_MemInfo_alloc %p\n", data));
-    NRT_MemInfo_init(mi, data, size, NULL, NULL);
+    nrt_meminfo_init_allocated(mi, data, size, NULL, NULL);
     return mi;
 }
 
@@ -247,7 +1058,8 @@ NRT_MemInfo* NRT_MemInfo_alloc_dtor_safe(size_t size, NRT_dtor_function dtor) {
        overhead. */
     memset(data, 0xCB, MIN(size, 256));
     NRT_Debug(nrt_debug_print("NRT_MemInfo_alloc_dtor_safe %p %zu\n", data, size));
-    NRT_MemInfo_init(mi, data, size, nrt_internal_custom_dtor_safe, dtor);
+    nrt_meminfo_init_allocated(mi, data, size, nrt_internal_custom_dtor_safe,
+                               dtor);
     return mi;
 }
 
@@ -273,7 +1085,7 @@ NRT_MemInfo *NRT_MemInfo_alloc_aligned(size_t size, unsigned align) {
     NRT_MemInfo *mi;
     void *data = nrt_allocate_meminfo_and_data_align(size, align, &mi);
     NRT_Debug(nrt_debug_print("NRT_MemInfo_alloc_aligned %p\n", data));
-    NRT_MemInfo_init(mi, data, size, NULL, NULL);
+    nrt_meminfo_init_allocated(mi, data, size, NULL, NULL);
     return mi;
 }
 
@@ -285,12 +1097,16 @@ NRT_MemInfo *NRT_MemInfo_alloc_safe_aligned(size_t size, unsigned align) {
     memset(data, 0xCB, MIN(size, 256));
     NRT_Debug(nrt_debug_print("NRT_MemInfo_alloc_safe_aligned %p %zu\n",
                               data, size));
-    NRT_MemInfo_init(mi, data, size, nrt_internal_dtor_safe, (void*)size);
+    nrt_meminfo_init_allocated(mi, data, size, nrt_internal_dtor_safe,
+                               (void*)size);
     return mi;
 }
 
 void NRT_MemInfo_destroy(NRT_MemInfo *mi) {
-    NRT_Free(mi);
+    if (mi->dtor == nrt_arena_dtor)
+        nrt_arena_free(mi->dtor_info);
+    else
+        NRT_Free(mi);
     TheMSys.atomic_inc(&TheMSys.stats_mi_free);
 }
 
@@ -48,6 +48,85 @@ void NRT_MemSys_shutdown(void);
 VISIBILITY_HIDDEN
 void NRT_MemSys_set_allocator(NRT_malloc_func, NRT_realloc_func, NRT_free_func);
 
+/*
+ * Register the size-class pool allocator as the system allocation functions.
+ * Small and medium blocks are cached per thread and reused; the given
+ * functions allocate the blocks that are not served from a cache.
+ */
+VISIBILITY_HIDDEN
+void NRT_MemSys_use_pool_allocator(NRT_malloc_func, NRT_realloc_func,
+                                   NRT_free_func);
+
+/*
+ * Register the allocation tracer as the system allocation functions.
+ * It wraps the allocation functions registered before it and records
+ * statistics per allocation site and per function (see NRT_TraceStats).
+ */
+VISIBILITY_HIDDEN
+void NRT_MemSys_use_trace_allocator(void);
+
+/*
+ * Set the allocation site of the calling thread.  `site` is a
+ * "function\tfilename\tline" string that must stay alive while it is set
+ * (traced functions restore the caller's site when they return).
+ */
+VISIBILITY_HIDDEN
+void NRT_MemSys_trace_set_site(const char *site);
+
+/*
+ * Return the allocation site of the calling thread, or NULL.
+ */
+VISIBILITY_HIDDEN
+const char *NRT_MemSys_trace_get_site(void);
+
+/*
+ * Allocation statistics of a site or of a function, as recorded by the
+ * allocation tracer.  Lifetimes are in seconds.
+ */
+typedef struct {
+    const char *name;
+    int is_function;
+    size_t alloc, free;
+    size_t bytes, live_bytes, peak_live_bytes;
+    double lifetime;
+} NRT_TraceStats;
+
+/*
+ * Return whether the allocation tracer is in use.
+ */
+VISIBILITY_HIDDEN
+int NRT_MemSys_trace_enabled(void);
+
+/*
+ * Copy the statistics of all sites and functions into `out`, which has
+ * room for `n` entries, and return the total number of entries.
+ * The peak number of live bytes over all sites is stored in `peak`.
+ */
+VISIBILITY_HIDDEN
+size_t NRT_MemSys_trace_get_stats(NRT_TraceStats *out, size_t n,
+                                  size_t *peak);
+
+/*
+ * Enter a call of a function compiled with arena=True.  Returns the state
+ * to pass to NRT_Arena_exit() when the call returns.
+ */
+VISIBILITY_HIDDEN
+int NRT_Arena_enter(void);
+
+/*
+ * Tell whether the following MemInfo allocations of the calling thread
+ * may come from the arena, i.e. whether they can't outlive the call.
+ */
+VISIBILITY_HIDDEN
+void NRT_Arena_use(int use);
+
+/*
+ * Leave a call entered with NRT_Arena_enter().  When the outermost call
+ * returns, the memory of the arena is released.
+ */
+VISIBILITY_HIDDEN
+void NRT_Arena_exit(int state);
+
 /*
  * Register the atomic increment and decrement functions
  */
@@ -85,6 +164,10 @@ VISIBILITY_HIDDEN
 size_t NRT_MemSys_get_stats_mi_alloc(void);
 VISIBILITY_HIDDEN
 size_t NRT_MemSys_get_stats_mi_free(void);
+VISIBILITY_HIDDEN
+size_t NRT_MemSys_get_stats_pool_hit(void);
+VISIBILITY_HIDDEN
+size_t NRT_MemSys_get_stats_pool_miss(void);
 
 /* Memory Info API */
 
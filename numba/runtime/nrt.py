@@ -5,10 +5,22 @@ from collections import namedtuple
 from . import nrtdynmod
 from llvmlite import binding as ll
 
+from numba import config
 from numba.utils import finalize as _finalize
 from . import _nrt_python as _nrt
 
-_nrt_mstats = namedtuple("nrt_mstats", ["alloc", "free", "mi_alloc", "mi_free"])
+_nrt_mstats = namedtuple("nrt_mstats", ["alloc", "free", "mi_alloc", "mi_free",
+                                        "pool_hit", "pool_miss"])
+
+_nrt_trace_fields = ["alloc", "free", "bytes", "live_bytes", "peak_live_bytes",
+                     "lifetime"]
+_nrt_alloc_site = namedtuple("nrt_alloc_site",
+                             ["function", "filename", "line"]
+                             + _nrt_trace_fields)
+_nrt_alloc_function = namedtuple("nrt_alloc_function",
+                                 ["function"] + _nrt_trace_fields)
+_nrt_alloc_trace = namedtuple("nrt_alloc_trace",
+                              ["sites", "functions", "peak_live_bytes"])
 
 
 class _Runtime(object):
@@ -98,20 +110,91 @@ class _Runtime(object):
     def get_allocation_stats(self):
         """
         Returns a namedtuple of (alloc, free, mi_alloc, mi_free) for count of
-        each memory operations.
+        each memory operations, followed by (pool_hit, pool_miss): the number
+        of allocations served from the size-class pool and from the system
+        allocator when the pool allocator is in use.
         """
         # No init guard needed to access stats members
         return _nrt_mstats(alloc=_nrt.memsys_get_stats_alloc(),
                            free=_nrt.memsys_get_stats_free(),
                            mi_alloc=_nrt.memsys_get_stats_mi_alloc(),
-                           mi_free=_nrt.memsys_get_stats_mi_free())
+                           mi_free=_nrt.memsys_get_stats_mi_free(),
+                           pool_hit=_nrt.memsys_get_stats_pool_hit(),
+                           pool_miss=_nrt.memsys_get_stats_pool_miss())
+
+    def get_allocation_trace(self):
+        """
+        Returns the statistics recorded by the allocation tracer, which is
+        enabled by the NUMBA_NRT_TRACE environment variable, as a namedtuple
+        of (sites, functions, peak_live_bytes).
+
+        *sites* and *functions* are lists of namedtuples giving, for each
+        allocation site (function, filename, line) and for each function,
+        the number of allocations and frees, the number of bytes allocated,
+        the number of bytes still live and their peak, and the total
+        lifetime in seconds of the freed blocks.  They are sorted by
+        decreasing number of bytes allocated.  *peak_live_bytes* is the
+        peak number of bytes live in all sites at once.
+        """
+        if not _nrt.memsys_trace_enabled():
+            raise RuntimeError("NRT allocation tracing is not enabled, "
+                               "set NUMBA_NRT_TRACE=1 before importing Numba")
+        entries, peak = _nrt.memsys_get_trace_stats()
+        sites = []
+        functions = []
+        for entry in entries:
+            name, is_function, stats = entry[0], entry[1], entry[2:]
+            if is_function:
+                functions.append(_nrt_alloc_function(name, *stats))
+            else:
+                function, filename, line = name.split('\t')
+                sites.append(_nrt_alloc_site(function, filename, int(line),
+                                             *stats))
+        key = lambda st: st.bytes
+        return _nrt_alloc_trace(sorted(sites, key=key, reverse=True),
+                                sorted(functions, key=key, reverse=True),
+                                peak)
+
+    def dump_allocation_trace(self, file=None):
+        """
+        Print a report of the statistics returned by get_allocation_trace()
+        to *file* (default: sys.stdout).
+        """
+        trace = self.get_allocation_trace()
+        header = "{:>14} {:>10} {:>10} {:>14} {:>14} {:>12}  {}"
+        row = "{:14d} {:10d} {:10d} {:14d} {:14d} {:12.6f}  {}"
+
+        def mean_lifetime(st):
+            return st.lifetime / st.free if st.free else 0.0
+
+        print("NRT allocation trace, peak live bytes: %d"
+              % trace.peak_live_bytes, file=file)
+        for title, stats in [("function", trace.functions),
+                             ("site", trace.sites)]:
+            print(file=file)
+            print(header.format("bytes", "allocs", "frees", "live bytes",
+                                "peak live", "lifetime (s)", title),
+                  file=file)
+            for st in stats:
+                if title == "site":
+                    where = "%s (%s:%d)" % (st.function, st.filename, st.line)
+                else:
+                    where = st.function
+                print(row.format(st.bytes, st.alloc, st.free, st.live_bytes,
+                                 st.peak_live_bytes, mean_lifetime(st), where),
+                      file=file)
 
 
 # Alias to _nrt_python._MemInfo
 MemInfo = _nrt._MemInfo
 
 # Create runtime
-_nrt.memsys_use_cpython_allocator()
+if config.NRT_POOL_ALLOCATOR:
+    _nrt.memsys_use_pool_allocator()
+else:
+    _nrt.memsys_use_cpython_allocator()
+if config.NRT_TRACE:
+    _nrt.memsys_use_trace_allocator()
 rtsys = _Runtime()
 
 # Install finalizer
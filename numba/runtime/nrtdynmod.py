@@ -41,14 +41,15 @@ def _define_nrt_meminfo_data(module):
     builder.ret(data_ptr)
 
 
-def _define_nrt_incref(module, atomic_incr):
+def _define_nrt_incref(module, atomic_incr, name="NRT_incref"):
     """
     Implement NRT_incref in the module
     """
     fn_incref = module.get_or_insert_function(incref_decref_ty,
-                                              name="NRT_incref")
-    # Cannot inline this for refcount pruning to work
-    fn_incref.attributes.add('noinline')
+                                              name=name)
+    if name == "NRT_incref":
+        # Cannot inline this for refcount pruning to work
+        fn_incref.attributes.add('noinline')
     builder = ir.IRBuilder(fn_incref.append_basic_block())
     [ptr] = fn_incref.args
     is_null = builder.icmp_unsigned("==", ptr, cgutils.get_null_value(ptr.type))
@@ -62,16 +63,19 @@ def _define_nrt_incref(module, atomic_incr):
     builder.ret_void()
 
 
-def _define_nrt_decref(module, atomic_decr):
+def _define_nrt_decref(module, atomic_decr, name="NRT_decref"):
     """
     Implement NRT_decref in the module
     """
     fn_decref = module.get_or_insert_function(incref_decref_ty,
-                                              name="NRT_decref")
-    # Cannot inline this for refcount pruning to work
-    fn_decref.attributes.add('noinline')
-    calldtor = module.add_function(ir.FunctionType(ir.VoidType(), [_pointer_type]),
-                                   name="NRT_MemInfo_call_dtor")
+                                              name=name)
+    atomic = name == "NRT_decref"
+    if atomic:
+        # Cannot inline this for refcount pruning to work
+        fn_decref.attributes.add('noinline')
+    calldtor = module.get_or_insert_function(
+        ir.FunctionType(ir.VoidType(), [_pointer_type]),
+        name="NRT_MemInfo_call_dtor")
 
     builder = ir.IRBuilder(fn_decref.append_basic_block())
     [ptr] = fn_decref.args
@@ -87,7 +91,8 @@ def _define_nrt_decref(module, atomic_decr):
 
     # A release fence is used before the relevant write operation.
     # No-op on x86.  On POWER, it lowers to lwsync.
-    builder.fence("release")
+    if atomic:
+        builder.fence("release")
     newrefct = builder.call(atomic_decr,
                             [builder.bitcast(ptr, atomic_decr.args[0].type)])
 
@@ -96,7 +101,8 @@ def _define_nrt_decref(module, atomic_decr):
     with cgutils.if_unlikely(builder, refct_eq_0):
         # An acquire fence is used after the relevant read operation.
         # No-op on x86.  On POWER, it lowers to lwsync.
-        builder.fence("acquire")
+        if atomic:
+            builder.fence("acquire")
         builder.call(calldtor, [ptr])
     builder.ret_void()
 
@@ -133,6 +139,26 @@ def _define_atomic_inc_dec(module, op, ordering):
     return fn_atomic
 
 
+def _define_nonatomic_inc_dec(module, op):
+    """Define a llvm function for non-atomic increment/decrement to the given
+    module.  Argument ``op`` is the operation "add"/"sub".  The generated
+    function returns the new value.
+    """
+    ftype = ir.FunctionType(_word_type, [_word_type.as_pointer()])
+    fn = ir.Function(module, ftype, name="nrt_nonatomic_{0}".format(op))
+
+    [ptr] = fn.args
+    bb = fn.append_basic_block()
+    builder = ir.IRBuilder(bb)
+    ONE = ir.Constant(_word_type, 1)
+    oldval = builder.load(ptr)
+    newval = getattr(builder, op)(oldval, ONE)
+    builder.store(newval, ptr)
+    builder.ret(newval)
+
+    return fn
+
+
 def _define_atomic_cas(module, ordering):
     """Define a llvm function for atomic compare-and-swap.
     The generated function is a direct wrapper of the LLVM cmpxchg with the
@@ -195,6 +221,13 @@ def create_nrt_module(ctx):
     _define_nrt_incref(ir_mod, atomic_inc)
     _define_nrt_decref(ir_mod, atomic_dec)
 
+    # Plain variants for code compiled with nrt_atomic=False.  Unlike the
+    # atomic ones, they can be inlined once refcount pruning is done.
+    nonatomic_inc = _define_nonatomic_inc_dec(ir_mod, "add")
+    nonatomic_dec = _define_nonatomic_inc_dec(ir_mod, "sub")
+    _define_nrt_incref(ir_mod, nonatomic_inc, name="NRT_incref_nonatomic")
+    _define_nrt_decref(ir_mod, nonatomic_dec, name="NRT_decref_nonatomic")
+
     _define_nrt_unresolved_abort(ctx, ir_mod)
 
     return ir_mod, library
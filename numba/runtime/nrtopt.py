@@ -6,9 +6,11 @@ from collections import defaultdict, deque
 from llvmlite import binding as ll
 from numba import cgutils
 
-_regex_incref = re.compile(r'\s*(?:tail)?\s*call void @NRT_incref\((.*)\)')
-_regex_decref = re.compile(r'\s*(?:tail)?\s*call void @NRT_decref\((.*)\)')
-_regex_bb = re.compile(r'([\'"]?[-a-zA-Z$._][-a-zA-Z$._0-9]*[\'"]?:)|^define')
+_regex_incref = re.compile(r'\s*(?:tail)?\s*call void @NRT_incref(?:_nonatomic)?\((.*)\)')
+_regex_decref = re.compile(r'\s*(?:tail)?\s*call void @NRT_decref(?:_nonatomic)?\((.*)\)')
+_regex_bb = re.compile(r'([\'"]?[-a-zA-Z$._][-a-zA-Z$._0-9]*[\'"]?:)|^define|; <label>:')
+_regex_label = re.compile(r'(?:([-a-zA-Z$._0-9]+|"[^"]+"):|; <label>:(\d+):)')
+_regex_label_ref = re.compile(r'label %([-a-zA-Z$._0-9]+|"[^"]+")')
 
 
 def _remove_redundant_nrt_refct(llvmir):
@@ -39,7 +41,7 @@ def _remove_redundant_nrt_refct(llvmir):
             if is_bb and bb_lines:
                 bb_lines = _process_basic_block(bb_lines)
             out += bb_lines
-        return out
+        return _prune_refct_across_blocks(out)
 
     def _extract_basic_blocks(func_lines):
         assert func_lines[0].startswith('define')
@@ -145,6 +147,271 @@ def _remove_redundant_nrt_refct(llvmir):
     return '\n'.join(processed)
 
 
+def _split_basic_blocks(func_lines):
+    """
+    Split the body of a function into a list of (label, label_line, lines)
+    tuples.  The first block's label and label line are None if it is
+    unnamed.
+    """
+    blocks = []
+    label, label_line, cur = None, None, []
+    for ln in func_lines[1:-1]:
+        m = _regex_label.match(ln)
+        if m is not None:
+            if cur or label is not None:
+                blocks.append((label, label_line, cur))
+            label, label_line, cur = m.group(1) or m.group(2), ln, []
+        elif ln:
+            cur.append(ln)
+    blocks.append((label, label_line, cur))
+    return blocks
+
+
+def _find_dominators(nodes, entries, preds):
+    """
+    Compute the dominator sets of *nodes* given the *entries* and the
+    predecessor map *preds*.  Nodes not reachable from an entry are
+    dominated by all nodes.  This converges faster if *nodes* lists
+    predecessors first.
+    """
+    doms = {}
+    for node in nodes:
+        doms[node] = set([node]) if node in entries else set(nodes)
+    changed = True
+    while changed:
+        changed = False
+        for node in nodes:
+            if node in entries:
+                continue
+            new = set(nodes)
+            for p in preds[node]:
+                new &= doms[p]
+            new.add(node)
+            if new != doms[node]:
+                doms[node] = new
+                changed = True
+    return doms
+
+
+def _find_loops(nodes, entry, succs, preds, doms):
+    """
+    Return a dict mapping each of *nodes* to the frozenset of headers of the
+    natural loops containing it, or None if the control flow graph is
+    irreducible (it has a cycle without a dominating header).
+    """
+    # Depth-first search for the edges going back to a node on the stack
+    back_edges = []
+    on_stack = set([entry])
+    seen = set([entry])
+    stack = [(entry, iter(succs[entry]))]
+    while stack:
+        node, it = stack[-1]
+        for succ in it:
+            if succ in on_stack:
+                if succ not in doms[node]:
+                    return None
+                back_edges.append((node, succ))
+            elif succ not in seen:
+                seen.add(succ)
+                on_stack.add(succ)
+                stack.append((succ, iter(succs[succ])))
+                break
+        else:
+            stack.pop()
+            on_stack.discard(node)
+
+    loops = dict((node, set()) for node in nodes)
+    for tail, header in back_edges:
+        # The loop body: the header and the nodes reaching the tail
+        # without going through the header
+        body = set([header])
+        todo = [tail]
+        while todo:
+            node = todo.pop()
+            if node in body:
+                continue
+            body.add(node)
+            todo.extend(preds[node])
+        for node in body:
+            loops[node].add(header)
+    return dict((node, frozenset(headers)) for node, headers in loops.items())
+
+
+def _examine_refct_ops(lines):
+    for num, ln in enumerate(lines):
+        m = _regex_incref.match(ln)
+        if m is not None:
+            yield num, m.group(1), None
+            continue
+        m = _regex_decref.match(ln)
+        if m is not None:
+            yield num, None, m.group(1)
+
+
+def _prune_refct_across_blocks(func_lines):
+    """
+    Remove NRT_incref/NRT_decref pairs on the same pointer that sit in
+    different basic blocks of a function.  An incref in block A and a
+    decref in block B are removed together if:
+
+    - A dominates B, B post-dominates A, and A and B are in the same loops,
+      so each execution of the incref is balanced by one of the decref
+      (otherwise e.g. an incref before a loop could be paired with a decref
+      in the loop body);
+    - no other decref can run in between (after the incref in A, before the
+      decref in B or anywhere in the blocks reachable from A without going
+      through B), so the object can't be released while the pair is gone.
+
+    Error return paths (non-zero status in Numba's calling convention) are
+    ignored for post-dominance: references aren't released on them anyway.
+    Functions with an irreducible control flow graph are left alone.
+    Like the per-block pruning, calls are assumed not to release references
+    owned by the caller.
+    """
+    if not any(_regex_incref.match(ln) for ln in func_lines):
+        return func_lines
+    blocks = _split_basic_blocks(func_lines)
+    if len(blocks) < 2:
+        return func_lines
+    is_callconv = '%excinfo' in func_lines[0]
+    labels = [label for label, _, _ in blocks]
+    body = dict((label, lines) for label, _, lines in blocks)
+    succs = dict((label, set()) for label in labels)
+    preds = dict((label, set()) for label in labels)
+    normal_exits = set()
+    for label, _, lines in blocks:
+        for ln in lines:
+            for target in _regex_label_ref.findall(ln):
+                if target in succs:
+                    succs[label].add(target)
+                    preds[target].add(label)
+            stripped = ln.strip()
+            if stripped.startswith('ret '):
+                if not is_callconv or stripped.startswith('ret i32 0'):
+                    normal_exits.add(label)
+
+    doms = _find_dominators(labels, set(labels[:1]), preds)
+    postdoms = _find_dominators(labels[::-1], normal_exits, succs)
+    loops = _find_loops(labels, labels[0], succs, preds, doms)
+    if loops is None:
+        return func_lines
+
+    regions = {}
+
+    def region(start, stop):
+        # Blocks reachable from *start* without going through *stop*
+        key = start, stop
+        if key not in regions:
+            seen = set()
+            todo = list(succs[start])
+            while todo:
+                label = todo.pop()
+                if label in seen or label == stop:
+                    continue
+                seen.add(label)
+                todo.extend(succs[label])
+            regions[key] = seen
+        return regions[key]
+
+    # The refct ops left in each block, as (line number, incref, decref)
+    ops = dict((label, list(_examine_refct_ops(body[label])))
+               for label in labels)
+    removed = set()
+
+    def first_decref(label):
+        for num, _, var in ops[label]:
+            if var:
+                return num, var
+        return None
+
+    def last_increfs(label):
+        # The increfs after the last decref of the block, last one first
+        for num, var, decref in reversed(ops[label]):
+            if decref:
+                break
+            if var and var != 'i8* null':
+                yield num, var
+
+    # Only the first decref of a block can be paired with an incref from
+    # another block, and only increfs after the last decref of their block.
+    first_decrefs = {}
+    by_var = defaultdict(list)
+    for label in labels:
+        first = first_decref(label)
+        if first is not None:
+            first_decrefs[label] = first
+            by_var[first[1]].append(label)
+
+    # The blocks with an incref whose pair was only rejected because of the
+    # decrefs of a given block
+    blocked = defaultdict(list)
+
+    def find_pair(a):
+        for num, var in last_increfs(a):
+            for b in by_var.get(var, ()):
+                if b == a or a not in doms[b] or b not in postdoms[a]:
+                    continue
+                if loops[a] != loops[b]:
+                    continue
+                blockers = region(a, b).intersection(first_decrefs)
+                if blockers:
+                    blocked[min(blockers, key=labels.index)].append(a)
+                    continue
+                return num, b
+        return None
+
+    # Blocks whose increfs may have a pair, examined again when removing a
+    # pair can give them a new one
+    todo = list(reversed(labels))
+    queued = set(labels)
+
+    def push(label):
+        if label not in queued:
+            queued.add(label)
+            todo.append(label)
+
+    while todo:
+        a = todo.pop()
+        queued.discard(a)
+        pair = find_pair(a)
+        if pair is None:
+            continue
+        num, b = pair
+        b_num, var = first_decrefs.pop(b)
+        by_var[var].remove(b)
+        ops[a] = [op for op in ops[a] if op[0] != num]
+        ops[b] = [op for op in ops[b] if op[0] != b_num]
+        removed.add((a, num))
+        removed.add((b, b_num))
+        push(a)
+        first = first_decref(b)
+        if first is not None:
+            # Only the blocks dominating b can pair with its new first decref
+            first_decrefs[b] = first
+            by_var[first[1]].append(b)
+            for label in labels:
+                if label in doms[b]:
+                    push(label)
+        else:
+            # b no longer blocks the pairs around it, and its increfs are
+            # all after its last decref
+            for label in blocked.pop(b, ()):
+                push(label)
+            push(b)
+
+    if not removed:
+        return func_lines
+
+    out = [func_lines[0]]
+    for label, label_line, _ in blocks:
+        if label_line is not None:
+            out.append(label_line)
+        out += [ln for num, ln in enumerate(body[label])
+                if (label, num) not in removed]
+    out.append(func_lines[-1])
+    return out
+
+
 def remove_redundant_nrt_refct(ll_module):
     """
     Remove redundant reference count operations from the
@@ -152,14 +419,19 @@ def remove_redundant_nrt_refct(ll_module):
     line by line to remove the unnecessary nrt refct pairs within each block.
     Decref calls are moved after the last incref call in the block to avoid
     temporarily decref'ing to zero (which can happen due to hidden decref from
-    alias).
+    alias).  Pairs spanning several blocks are then removed using the
+    function's control flow graph (see `_prune_refct_across_blocks()`).
 
     Note: non-threadsafe due to usage of global LLVMcontext
     """
     # Early escape if NRT_incref is not used
-    try:
-        ll_module.get_function('NRT_incref')
-    except NameError:
+    for fname in ('NRT_incref', 'NRT_incref_nonatomic'):
+        try:
+            ll_module.get_function(fname)
+        except NameError:
+            continue
+        break
+    else:
         return ll_module
 
     # the optimisation pass loses the name of module as it operates on
@@ -15,6 +15,7 @@ from numba.typing.templates import (CallableTemplate, signature, infer_global,
 from numba.targets import registry
 from numba.targets.imputils import lower_builtin
 from numba.extending import register_jitable
+from numba.caching import NullCache, StencilCache
 from numba.six import exec_
 
 
@@ -23,10 +24,14 @@ class StencilFuncLowerer(object):
     '''
     def __init__(self, sf):
         self.stencilFunc = sf
+        self.libs = []
 
     def __call__(self, context, builder, sig, args):
         cres = self.stencilFunc.compile_for_argtys(sig.args, {},
                     sig.return_type, None)
+        # link the stencil function into the caller, e.g. so that it is
+        # part of the cached caller
+        self.libs = [cres.library]
         return context.call_internal(builder, cres.fndesc, sig, args)
 
 @register_jitable
@@ -43,6 +48,84 @@ def raise_if_incompatible_array_sizes(a, *args):
                                  "smaller the same dimension in the first "
                                  "stencil input.")
 
+@register_jitable
+def _array_extent(a):
+    # the range of addresses [lo, hi) spanned by the elements of a
+    lo = np.intp(a.ctypes.data)
+    hi = lo
+    for i in range(a.ndim):
+        step = (a.shape[i] - 1) * a.strides[i]
+        if step < 0:
+            lo += step
+        else:
+            hi += step
+    return lo, hi + a.itemsize
+
+@register_jitable
+def _arrays_overlap(a, b):
+    # conservative check whether writing to a may change elements of b
+    if a.size == 0 or b.size == 0:
+        return False
+    a_lo, a_hi = _array_extent(a)
+    b_lo, b_hi = _array_extent(b)
+    return a_lo < b_hi and b_lo < a_hi
+
+@register_jitable
+def _stencil_write_buffer(out, overlap, copy):
+    # the array a parallel stencil writes into: a temporary if out overlaps
+    # one of the inputs, starting out as a copy of out if copy is true
+    if overlap:
+        if copy:
+            return out.copy()
+        return np.empty_like(out)
+    return out
+
+@register_jitable
+def _stencil_copy_back(out, buf, overlap):
+    if overlap:
+        out[:] = buf
+
+# Functions mapping an index that may fall outside of an array dimension of
+# size n back into [0, n) for the border modes other than 'constant'.  The
+# names follow scipy.ndimage.
+
+@register_jitable
+def _reflect_index(i, n):
+    # d c b a | a b c d | d c b a
+    period = 2 * n
+    i = i % period
+    if i >= n:
+        i = period - i - 1
+    return i
+
+@register_jitable
+def _mirror_index(i, n):
+    # d c b | a b c d | c b a
+    if n == 1:
+        return 0
+    period = 2 * n - 2
+    i = i % period
+    if i >= n:
+        i = period - i
+    return i
+
+@register_jitable
+def _nearest_index(i, n):
+    # a a a | a b c d | d d d
+    return min(max(i, 0), n - 1)
+
+@register_jitable
+def _wrap_index(i, n):
+    # a b c d | a b c d | a b c d
+    return i % n
+
+border_index_funcs = {
+    'reflect': _reflect_index,
+    'mirror': _mirror_index,
+    'nearest': _nearest_index,
+    'wrap': _wrap_index,
+}
+
 class StencilFunc(object):
     """
     A special type to hold stencil information for the IR.
@@ -66,12 +149,21 @@ class StencilFunc(object):
         self._install_type(self._typingctx)
         self.neighborhood = self.options.get("neighborhood")
         self._type_cache = {}
+        # compiled stencil functions by argument types
+        self._compile_cache = {}
+        if self.options.get("cache"):
+            self._cache = StencilCache(kernel_ir.func_id.func)
+        else:
+            self._cache = NullCache()
         self._lower_me = StencilFuncLowerer(self)
+        self._iterate_driver = None
 
     def replace_return_with_setitem(self, blocks, index_vars, out_name):
         """
         Find return statements in the IR and replace them with a SetItem
         call of the value "returned" by the kernel into the result array.
+        If out_name is a list of names, the kernel returns a tuple and each
+        of its elements is written into the corresponding result array.
         Returns the block labels that contained return statements.
         """
         ret_blocks = []
@@ -85,9 +177,7 @@ class StencilFunc(object):
                     ret_blocks.append(label)
                     # If 1D array then avoid the tuple construction.
                     if len(index_vars) == 1:
-                        rvar = ir.Var(scope, out_name, loc)
                         ivar = ir.Var(scope, index_vars[0], loc)
-                        new_body.append(ir.SetItem(rvar, ivar, stmt.value, loc))
                     else:
                         # Convert the string names of the index variables into
                         # ir.Var's.
@@ -97,26 +187,62 @@ class StencilFunc(object):
                             var_index_vars += [index_var]
 
                         s_index_name = ir_utils.mk_unique_var("stencil_index")
-                        s_index_var  = ir.Var(scope, s_index_name, loc)
+                        ivar = ir.Var(scope, s_index_name, loc)
                         # Build a tuple from the index ir.Var's.
                         tuple_call = ir.Expr.build_tuple(var_index_vars, loc)
-                        new_body.append(ir.Assign(tuple_call, s_index_var, loc))
-                        rvar = ir.Var(scope, out_name, loc)
+                        new_body.append(ir.Assign(tuple_call, ivar, loc))
+                    if isinstance(out_name, str):
                         # Write the return statements original value into
-                        # the array using the tuple index.
-                        si = ir.SetItem(rvar, s_index_var, stmt.value, loc)
-                        new_body.append(si)
+                        # the array using the index.
+                        rvar = ir.Var(scope, out_name, loc)
+                        new_body.append(ir.SetItem(rvar, ivar, stmt.value,
+                                                   loc))
+                        continue
+                    for i, one_out_name in enumerate(out_name):
+                        # Write each element of the returned tuple into its
+                        # own array.
+                        elem_name = ir_utils.mk_unique_var("stencil_elem")
+                        elem_var = ir.Var(scope, elem_name, loc)
+                        new_body.append(ir.Assign(ir.Expr.static_getitem(
+                            stmt.value, i, None, loc), elem_var, loc))
+                        rvar = ir.Var(scope, one_out_name, loc)
+                        new_body.append(ir.SetItem(rvar, ivar, elem_var, loc))
                 else:
                     new_body.append(stmt)
             block.body = new_body
         return ret_blocks
 
+    def _map_border_index(self, index_var, dim, shape_name, new_body, scope,
+                          loc):
+        """
+        Generate IR mapping index_var into the bounds of dimension dim of the
+        array whose shape is in shape_name according to the border mode.
+        Returns the variable holding the mapped index.
+        """
+        shape_var = ir.Var(scope, shape_name, loc)
+        size_var = ir.Var(scope, ir_utils.mk_unique_var("border_size"), loc)
+        new_body.append(ir.Assign(
+            ir.Expr.static_getitem(shape_var, dim, None, loc), size_var, loc))
+        index_func = border_index_funcs[self.mode]
+        func_var = ir.Var(scope, ir_utils.mk_unique_var("border_index_func"),
+                          loc)
+        new_body.append(ir.Assign(
+            ir.Global(index_func.__name__, index_func, loc), func_var, loc))
+        mapped_var = ir.Var(scope, ir_utils.mk_unique_var("border_index"), loc)
+        index_call = ir.Expr.call(func_var, [index_var, size_var], (), loc)
+        new_body.append(ir.Assign(index_call, mapped_var, loc))
+        return mapped_var
+
     def add_indices_to_kernel(self, kernel, index_names, ndim,
-                              neighborhood, standard_indexed):
+                              neighborhood, standard_indexed,
+                              border_shape_name=None):
         """
         Transforms the stencil kernel as specified by the user into one
         that includes each dimension's index variable as part of the getitem
         calls.  So, in effect array[-1] becomes array[index0-1].
+        If border_shape_name is given, the resulting indices are also mapped
+        into the bounds of the array with that shape according to the border
+        mode, e.g. array[reflect(index0-1)].
         """
         const_dict = {}
         kernel_consts = []
@@ -196,6 +322,9 @@ class StencilFunc(object):
                         acc_call = ir.Expr.binop('+', stmt_index_var,
                                                  index_var, loc)
                         new_body.append(ir.Assign(acc_call, tmpvar, loc))
+                        if border_shape_name is not None:
+                            tmpvar = self._map_border_index(tmpvar, 0,
+                                        border_shape_name, new_body, scope, loc)
                         new_body.append(ir.Assign(
                                        ir.Expr.getitem(stmt.value.value,tmpvar,loc),
                                        stmt.target,loc))
@@ -223,7 +352,6 @@ class StencilFunc(object):
 
                             tmpname = ir_utils.mk_unique_var("ind_stencil_index")
                             tmpvar  = ir.Var(scope, tmpname, loc)
-                            ind_stencils += [tmpvar]
                             getitemname = ir_utils.mk_unique_var("getitem")
                             getitemvar  = ir.Var(scope, getitemname, loc)
                             getitemcall = ir.Expr.getitem(stmt_index_var,
@@ -232,6 +360,10 @@ class StencilFunc(object):
                             acc_call = ir.Expr.binop('+', getitemvar,
                                                      index_vars[dim], loc)
                             new_body.append(ir.Assign(acc_call, tmpvar, loc))
+                            if border_shape_name is not None:
+                                tmpvar = self._map_border_index(tmpvar, dim,
+                                        border_shape_name, new_body, scope, loc)
+                            ind_stencils += [tmpvar]
 
                         tuple_call = ir.Expr.build_tuple(ind_stencils, loc)
                         new_body.append(ir.Assign(tuple_call, s_index_var, loc))
@@ -292,14 +424,53 @@ class StencilFunc(object):
                 argtys,
                 None,
                 {})
-        if isinstance(return_type, types.npytypes.Array):
-            raise ValueError(
-                "Stencil kernel must return a scalar and not a numpy array.")
-
-        real_ret = types.npytypes.Array(return_type, argtys[0].ndim,
-                                                     argtys[0].layout)
+        # A kernel returning a tuple of scalars computes one output array
+        # per tuple element in the same sweep.
+        if isinstance(return_type, types.BaseTuple):
+            elem_types = list(return_type)
+        else:
+            elem_types = [return_type]
+        for elem_type in elem_types:
+            if isinstance(elem_type, (types.npytypes.Array, types.BaseTuple)):
+                raise ValueError(
+                    "Stencil kernel must return a scalar or a tuple of "
+                    "scalars and not a numpy array.")
+
+        real_rets = [types.npytypes.Array(elem_type, argtys[0].ndim,
+                                          argtys[0].layout)
+                     for elem_type in elem_types]
+        if isinstance(return_type, types.BaseTuple):
+            real_ret = types.Tuple(real_rets)
+        else:
+            real_ret = real_rets[0]
         return (real_ret, typemap, calltypes)
 
+    def get_neighborhood(self, argtys):
+        """
+        Return the neighborhood of the kernel for the given argument types,
+        computing it from the kernel accesses if it was not specified.
+        """
+        if self.neighborhood is None:
+            _, typemap, calltypes = self.get_return_type(argtys)
+            (kernel_copy, copy_calltypes) = self.copy_ir_with_calltypes(
+                                                self.kernel_ir, calltypes)
+            in_cps, out_cps = ir_utils.copy_propagate(kernel_copy.blocks,
+                                                      typemap)
+            name_var_table = ir_utils.get_name_var_table(kernel_copy.blocks)
+            ir_utils.apply_copy_propagate(
+                kernel_copy.blocks,
+                in_cps,
+                name_var_table,
+                typemap,
+                copy_calltypes)
+            index_vars = [ir_utils.get_unused_var_name("index" + str(i),
+                                                       name_var_table)
+                          for i in range(argtys[0].ndim)]
+            self.neighborhood, _ = self.add_indices_to_kernel(
+                kernel_copy, index_vars, argtys[0].ndim, None,
+                self.options.get("standard_indexing", []))
+        return self.neighborhood
+
     def _install_type(self, typingctx):
         """Constructs and installs a typing class for a StencilFunc object in
         the input typing context.
@@ -310,11 +481,39 @@ class StencilFunc(object):
                        dict(key=self, generic=self._type_me))
         typingctx.insert_user_function(self, _ty_cls)
 
+    def _get_cached_wrapper(self, argtys):
+        """
+        Return the compiled stencil function for the given argument types
+        from the in-memory or the on-disk cache, or None.
+        """
+        cres = self._compile_cache.get(argtys)
+        if cres is None:
+            cres = self._cache.load_overload(self._cache_key(argtys),
+                                             self._targetctx)
+            if cres is not None:
+                self._compile_cache[argtys] = cres
+        return cres
+
+    def _cache_wrapper(self, argtys, cres):
+        self._compile_cache[argtys] = cres
+        self._cache.save_overload(self._cache_key(argtys), cres)
+
+    def _cache_key(self, argtys):
+        # the generated function also depends on the mode and options
+        options = sorted((name, repr(value))
+                         for name, value in self.options.items()
+                         if name != "cache")
+        return (argtys, self.mode, tuple(options))
+
     def compile_for_argtys(self, argtys, kwtys, return_type, sigret):
+        new_func = self._get_cached_wrapper(argtys)
+        if new_func is not None:
+            return new_func
         # look in the type cache to find if result array is passed
         (_, result, typemap, calltypes) = self._type_cache[argtys]
         new_func = self._stencil_wrapper(result, sigret, return_type,
                                          typemap, calltypes, *argtys)
+        self._cache_wrapper(argtys, new_func)
         return new_func
 
     def _type_me(self, argtys, kwtys):
@@ -347,6 +546,9 @@ class StencilFunc(object):
             return _sig
 
         (real_ret, typemap, calltypes) = self.get_return_type(argtys)
+        # the stencil call returns the out argument if given
+        if result is not None:
+            real_ret = result
         sig = signature(real_ret, *argtys_extra)
         dummy_text = ("def __numba_dummy_stencil({}{}):\n    pass\n".format(
                         ",".join(self.kernel_ir.arg_names), sig_extra))
@@ -384,6 +586,66 @@ class StencilFunc(object):
             kernel_copy.blocks[block_label] = new_block
         return (kernel_copy, copy_calltypes)
 
+    def _replace_sentinel(self, stencil_ir, sentinel_name, kernel_blocks,
+                          ret_blocks):
+        """
+        Replace the sentinel assignment in stencil_ir with the given blocks of
+        the stencil kernel.
+        """
+        stencil_stub_last_label = max(stencil_ir.blocks.keys()) + 1
+
+        # Shift lables in the kernel copy so they are guaranteed unique
+        # and don't conflict with any labels in the stencil_ir.
+        kernel_blocks = ir_utils.add_offset_to_labels(
+                                kernel_blocks, stencil_stub_last_label)
+        new_label = max(kernel_blocks.keys()) + 1
+        # Adjust ret_blocks to account for addition of the offset.
+        ret_blocks = [x + stencil_stub_last_label for x in ret_blocks]
+
+        if config.DEBUG_ARRAY_OPT == 1:
+            print("ret_blocks w/ offsets", ret_blocks, stencil_stub_last_label)
+            print("before replace sentinel stencil_ir")
+            ir_utils.dump_blocks(stencil_ir.blocks)
+            print("before replace sentinel kernel_copy")
+            ir_utils.dump_blocks(kernel_blocks)
+
+        # Search all the block in the stencil outline for the sentinel.
+        for label, block in stencil_ir.blocks.items():
+            for i, inst in enumerate(block.body):
+                if (isinstance( inst, ir.Assign) and
+                    inst.target.name == sentinel_name):
+                    # We found the sentinel assignment.
+                    loc = inst.loc
+                    scope = block.scope
+                    # split block across __sentinel__
+                    # A new block is allocated for the statements prior to the
+                    # sentinel but the new block maintains the current block
+                    # label.
+                    prev_block = ir.Block(scope, loc)
+                    prev_block.body = block.body[:i]
+                    # The current block is used for statements after sentinel.
+                    block.body = block.body[i + 1:]
+                    # But the current block gets a new label.
+                    body_first_label = min(kernel_blocks.keys())
+
+                    # The previous block jumps to the minimum labelled block of
+                    # the parfor body.
+                    prev_block.append(ir.Jump(body_first_label, loc))
+                    # Add all the parfor loop body blocks to the gufunc
+                    # function's IR.
+                    for (l, b) in kernel_blocks.items():
+                        stencil_ir.blocks[l] = b
+
+                    stencil_ir.blocks[new_label] = block
+                    stencil_ir.blocks[label] = prev_block
+                    # Add a jump from all the blocks that previously contained
+                    # a return in the stencil kernel to the block
+                    # containing statements after the sentinel.
+                    for ret_block in ret_blocks:
+                        stencil_ir.blocks[ret_block].append(
+                            ir.Jump(new_label, loc))
+                    return
+
     def _stencil_wrapper(self, result, sigret, return_type, typemap, calltypes, *args):
         # Overall approach:
         # 1) Construct a string containing a function definition for the stencil function
@@ -428,8 +690,7 @@ class StencilFunc(object):
         the_array = args[0]
 
         if config.DEBUG_ARRAY_OPT == 1:
-            print("_stencil_wrapper", return_type, return_type.dtype,
-                                      type(return_type.dtype), args)
+            print("_stencil_wrapper", return_type, args)
             ir_utils.dump_blocks(kernel_copy.blocks)
 
         # We generate a Numba function to execute this stencil and here
@@ -449,6 +710,39 @@ class StencilFunc(object):
 
         # Create extra signature for out and neighborhood.
         out_name = ir_utils.get_unused_var_name("out", name_var_table)
+        # The type of the out argument, which follows the kernel arguments.
+        result_type = None
+        if result is not None:
+            result_type = args[len(kernel_copy.arg_names)]
+        # A kernel returning a tuple writes each of its elements into its
+        # own output array, out is then a tuple of arrays too.
+        if isinstance(return_type, types.BaseTuple):
+            out_types = list(return_type)
+            out_names = [ir_utils.get_unused_var_name(
+                            "{}_{}".format(out_name, i), name_var_table)
+                         for i in range(len(out_types))]
+            if (result is not None and
+                (not isinstance(result_type, types.BaseTuple) or
+                 len(result_type) != len(out_types))):
+                raise ValueError("Stencil kernel returning a tuple of {} "
+                                 "values requires a tuple of {} output "
+                                 "arrays.".format(len(out_types),
+                                                  len(out_types)))
+        else:
+            out_types = [return_type]
+            out_names = [out_name]
+            if isinstance(result_type, types.BaseTuple):
+                raise ValueError("Stencil kernel returning a single value "
+                                 "requires a single output array.")
+        # The arrays the kernel writes into.  If out overlaps an input
+        # array, the kernel writes into a temporary copied back afterwards
+        # so it never reads values it has already overwritten.
+        if result is None:
+            write_names = out_names
+        else:
+            write_names = [ir_utils.get_unused_var_name(
+                            "{}_write".format(name), name_var_table)
+                           for name in out_names]
         neighborhood_name = ir_utils.get_unused_var_name("neighborhood",
                                                          name_var_table)
         sig_extra = ""
@@ -468,6 +762,25 @@ class StencilFunc(object):
             raise ValueError("Standard indexing requested for an array name "
                              "not present in the stencil kernel definition.")
 
+        shape_name = ir_utils.get_unused_var_name("full_shape", name_var_table)
+
+        # For modes other than constant, the border of the output is computed
+        # by separate loop nests (two per dimension) each using its own copy
+        # of the kernel in which indices are mapped into the array bounds.
+        # The interior loop nest stays free of that index mapping.
+        border_kernels = []
+        if self.mode != 'constant':
+            for _ in range(2 * the_array.ndim):
+                border_kernel = kernel_copy.copy()
+                border_kernel.blocks = copy.deepcopy(kernel_copy.blocks)
+                # the kernel copies live in the same function so their
+                # variables need distinct names
+                ir_utils.replace_var_names(border_kernel.blocks,
+                    {name: ir_utils.mk_unique_var(name)
+                     for name in name_var_table
+                     if name not in kernel_copy.arg_names})
+                border_kernels.append(border_kernel)
+
         # Add index variables to getitems in the IR to transition the accesses
         # in the kernel from relative to regular Python indexing.  Returns the
         # computed size of the stencil kernel and a list of the relatively indexed
@@ -477,6 +790,10 @@ class StencilFunc(object):
                 self.neighborhood, standard_indexed)
         if self.neighborhood is None:
             self.neighborhood = kernel_size
+        for border_kernel in border_kernels:
+            self.add_indices_to_kernel(border_kernel, index_vars,
+                                       the_array.ndim, self.neighborhood,
+                                       standard_indexed, shape_name)
 
         if config.DEBUG_ARRAY_OPT == 1:
             print("After add_indices_to_kernel")
@@ -484,8 +801,15 @@ class StencilFunc(object):
 
         # The return in the stencil kernel becomes a setitem for that
         # particular point in the iteration space.
+        if isinstance(return_type, types.BaseTuple):
+            setitem_names = write_names
+        else:
+            setitem_names = write_names[0]
         ret_blocks = self.replace_return_with_setitem(kernel_copy.blocks,
-                                                      index_vars, out_name)
+                                                      index_vars, setitem_names)
+        border_ret_blocks = [self.replace_return_with_setitem(
+                                b.blocks, index_vars, setitem_names)
+                             for b in border_kernels]
 
         if config.DEBUG_ARRAY_OPT == 1:
             print("After replace_return_with_setitem", ret_blocks)
@@ -519,58 +843,127 @@ class StencilFunc(object):
             func_text += ")\n"
 
         # Get the shape of the first input array.
-        shape_name = ir_utils.get_unused_var_name("full_shape", name_var_table)
         func_text += "    {} = {}.shape\n".format(shape_name, first_arg)
 
 
         # If we have to allocate the output array (the out argument was not used)
         # then us numpy.full if the user specified a cval stencil decorator option
-        # or np.zeros if they didn't to allocate the array.
+        # or np.zeros if they didn't to allocate the array.  The border loops
+        # of the other modes write every element so np.empty is enough there.
         if result is None:
-            if "cval" in self.options:
-                cval = self.options["cval"]
-                if return_type.dtype != typing.typeof.typeof(cval):
-                    raise ValueError(
-                        "cval type does not match stencil return type.")
-
-                out_init ="{} = np.full({}, {}, dtype=np.{})\n".format(
-                            out_name, shape_name, cval, return_type.dtype)
+            for one_out_name, out_type in zip(out_names, out_types):
+                if self.mode != 'constant':
+                    out_init ="{} = np.empty({}, dtype=np.{})\n".format(
+                                one_out_name, shape_name, out_type.dtype)
+                elif "cval" in self.options:
+                    cval = self.options["cval"]
+                    if out_type.dtype != typing.typeof.typeof(cval):
+                        raise ValueError(
+                            "cval type does not match stencil return type.")
+
+                    out_init ="{} = np.full({}, {}, dtype=np.{})\n".format(
+                                one_out_name, shape_name, cval, out_type.dtype)
 
-            else:
-                out_init ="{} = np.zeros({}, dtype=np.{})\n".format(
-                            out_name, shape_name, return_type.dtype)
-            func_text += "    " + out_init
+                else:
+                    out_init ="{} = np.zeros({}, dtype=np.{})\n".format(
+                                one_out_name, shape_name, out_type.dtype)
+                func_text += "    " + out_init
+        else:
+            input_arrays = [name for name, typ in
+                            zip(kernel_copy.arg_names, args)
+                            if isinstance(typ, types.npytypes.Array)]
+            if isinstance(return_type, types.BaseTuple):
+                func_text += "    {}, = {}\n".format(",".join(out_names),
+                                                     out_name)
+            inplace_names = []
+            for one_out_name, write_name in zip(out_names, write_names):
+                inplace_name = ir_utils.get_unused_var_name(
+                                    "{}_inplace".format(one_out_name),
+                                    name_var_table)
+                inplace_names.append(inplace_name)
+                func_text += "    {} = {}\n".format(inplace_name,
+                    " or ".join("_arrays_overlap({}, {})".format(
+                                    one_out_name, name)
+                                for name in input_arrays))
+                # The border of the output is left alone in constant mode so
+                # the temporary has to start out as a copy of out there.
+                if self.mode != 'constant':
+                    buffer_init = "np.empty_like({})".format(one_out_name)
+                else:
+                    buffer_init = "{}.copy()".format(one_out_name)
+                func_text += "    if {}:\n".format(inplace_name)
+                func_text += "        {} = {}\n".format(write_name,
+                                                        buffer_init)
+                func_text += "    else:\n"
+                func_text += "        {} = {}\n".format(write_name,
+                                                        one_out_name)
+
+        # Compute the bounds of the loop nest over the interior of the array.
+        # ranges[i][0] is the minimum index used in the i'th dimension
+        # but minimum's greater than 0 don't preclude any entry in the array.
+        # So, take the minimum of 0 and the minimum index found in the kernel
+        # and this will be a negative number (potentially -0).  Then, we do
+        # unary - on that to get the positive offset in this dimension whose
+        # use is precluded.
+        # ranges[i][1] is the maximum of 0 and the observed maximum index
+        # in this dimension because negative maximums would not cause us to
+        # preclude any entry in the array from being used.
+        interior = []
+        for i in range(the_array.ndim):
+            interior.append(("-min(0,{})".format(ranges[i][0]),
+                             "{}[{}]-max(0,{})".format(shape_name, i,
+                                                      ranges[i][1])))
+        loop_nests = [(interior, sentinel_name)]
+
+        # The border loop nests cover the elements outside of the interior
+        # exactly once.  The two nests for dimension i iterate the interior
+        # range in the dimensions before i, the part of dimension i below and
+        # above the interior, and the full range in the dimensions after i.
+        border_sentinels = []
+        for i in range(the_array.ndim if border_kernels else 0):
+            size = "{}[{}]".format(shape_name, i)
+            low_end = "min({},{})".format(interior[i][0], size)
+            for bounds in [("0", low_end),
+                           ("max({},{})".format(interior[i][1], low_end),
+                            size)]:
+                nest = (interior[:i] + [bounds] +
+                        [("0", "{}[{}]".format(shape_name, j))
+                         for j in range(i + 1, the_array.ndim)])
+                border_sentinel = ir_utils.get_unused_var_name(
+                    "{}_{}".format(sentinel_name, len(border_sentinels)),
+                    name_var_table)
+                border_sentinels.append(border_sentinel)
+                loop_nests.append((nest, border_sentinel))
 
-        offset = 1
         # Add the loop nests to the new function.
-        for i in range(the_array.ndim):
+        for nest, nest_sentinel in loop_nests:
+            offset = 1
+            for i in range(the_array.ndim):
+                for j in range(offset):
+                    func_text += "    "
+                func_text += "for {} in range({},{}):\n".format(
+                                index_vars[i], nest[i][0], nest[i][1])
+                offset += 1
+
             for j in range(offset):
                 func_text += "    "
-            # ranges[i][0] is the minimum index used in the i'th dimension
-            # but minimum's greater than 0 don't preclude any entry in the array.
-            # So, take the minimum of 0 and the minimum index found in the kernel
-            # and this will be a negative number (potentially -0).  Then, we do
-            # unary - on that to get the positive offset in this dimension whose
-            # use is precluded.
-            # ranges[i][1] is the maximum of 0 and the observed maximum index
-            # in this dimension because negative maximums would not cause us to
-            # preclude any entry in the array from being used.
-            func_text += ("for {} in range(-min(0,{}),"
-                          "{}[{}]-max(0,{})):\n").format(
-                            index_vars[i],
-                            ranges[i][0],
-                            shape_name,
-                            i,
-                            ranges[i][1])
-            offset += 1
-
-        for j in range(offset):
-            func_text += "    "
-        # Put a sentinel in the code so we can locate it in the IR.  We will
-        # remove this sentinel assignment and replace it with the IR for the
-        # stencil kernel body.
-        func_text += "{} = 0\n".format(sentinel_name)
-        func_text += "    return {}\n".format(out_name)
+            # Put a sentinel in the code so we can locate it in the IR.  We
+            # will remove this sentinel assignment and replace it with the IR
+            # for the stencil kernel body.
+            func_text += "{} = 0\n".format(nest_sentinel)
+        if result is None:
+            if isinstance(return_type, types.BaseTuple):
+                func_text += "    return ({},)\n".format(",".join(out_names))
+            else:
+                func_text += "    return {}\n".format(out_name)
+        else:
+            # Copy the results computed in a temporary back into out.
+            for one_out_name, write_name, inplace_name in zip(
+                                    out_names, write_names, inplace_names):
+                func_text += "    if {}:\n".format(inplace_name)
+                func_text += "        {}[:] = {}\n".format(one_out_name,
+                                                           write_name)
+            func_text += "    return {}\n".format(out_name)
 
         if config.DEBUG_ARRAY_OPT == 1:
             print("new stencil func text")
@@ -590,68 +983,19 @@ class StencilFunc(object):
         var_table = ir_utils.get_name_var_table(stencil_ir.blocks)
         new_var_dict = {}
         reserved_names = ([sentinel_name, out_name, neighborhood_name,
-                           shape_name] + kernel_copy.arg_names + index_vars)
+                           shape_name] + border_sentinels + write_names +
+                          kernel_copy.arg_names + index_vars)
         for name, var in var_table.items():
             if not name in reserved_names:
                 new_var_dict[name] = ir_utils.mk_unique_var(name)
         ir_utils.replace_var_names(stencil_ir.blocks, new_var_dict)
 
-        stencil_stub_last_label = max(stencil_ir.blocks.keys()) + 1
-
-        # Shift lables in the kernel copy so they are guaranteed unique
-        # and don't conflict with any labels in the stencil_ir.
-        kernel_copy.blocks = ir_utils.add_offset_to_labels(
-                                kernel_copy.blocks, stencil_stub_last_label)
-        new_label = max(kernel_copy.blocks.keys()) + 1
-        # Adjust ret_blocks to account for addition of the offset.
-        ret_blocks = [x + stencil_stub_last_label for x in ret_blocks]
-
-        if config.DEBUG_ARRAY_OPT == 1:
-            print("ret_blocks w/ offsets", ret_blocks, stencil_stub_last_label)
-            print("before replace sentinel stencil_ir")
-            ir_utils.dump_blocks(stencil_ir.blocks)
-            print("before replace sentinel kernel_copy")
-            ir_utils.dump_blocks(kernel_copy.blocks)
-
-        # Search all the block in the stencil outline for the sentinel.
-        for label, block in stencil_ir.blocks.items():
-            for i, inst in enumerate(block.body):
-                if (isinstance( inst, ir.Assign) and
-                    inst.target.name == sentinel_name):
-                    # We found the sentinel assignment.
-                    loc = inst.loc
-                    scope = block.scope
-                    # split block across __sentinel__
-                    # A new block is allocated for the statements prior to the
-                    # sentinel but the new block maintains the current block
-                    # label.
-                    prev_block = ir.Block(scope, loc)
-                    prev_block.body = block.body[:i]
-                    # The current block is used for statements after sentinel.
-                    block.body = block.body[i + 1:]
-                    # But the current block gets a new label.
-                    body_first_label = min(kernel_copy.blocks.keys())
-
-                    # The previous block jumps to the minimum labelled block of
-                    # the parfor body.
-                    prev_block.append(ir.Jump(body_first_label, loc))
-                    # Add all the parfor loop body blocks to the gufunc
-                    # function's IR.
-                    for (l, b) in kernel_copy.blocks.items():
-                        stencil_ir.blocks[l] = b
-
-                    stencil_ir.blocks[new_label] = block
-                    stencil_ir.blocks[label] = prev_block
-                    # Add a jump from all the blocks that previously contained
-                    # a return in the stencil kernel to the block
-                    # containing statements after the sentinel.
-                    for ret_block in ret_blocks:
-                        stencil_ir.blocks[ret_block].append(
-                            ir.Jump(new_label, loc))
-                    break
-            else:
-                continue
-            break
+        kernels = [(sentinel_name, kernel_copy.blocks, ret_blocks)]
+        kernels.extend(zip(border_sentinels, [b.blocks for b in border_kernels],
+                           border_ret_blocks))
+        for (sentinel, kernel_blocks, kernel_ret_blocks) in kernels:
+            self._replace_sentinel(stencil_ir, sentinel, kernel_blocks,
+                                   kernel_ret_blocks)
 
         stencil_ir.blocks = ir_utils.rename_labels(stencil_ir.blocks)
         ir_utils.remove_dels(stencil_ir.blocks)
@@ -684,12 +1028,19 @@ class StencilFunc(object):
                              "dimensional input array".format(
                                 len(self.neighborhood), args[0].ndim))
 
-        if 'out' in kwargs:
-            result = kwargs['out']
+        def get_result_type(result):
             rdtype = result.dtype
             rttype = numpy_support.from_dtype(rdtype)
-            result_type = types.npytypes.Array(rttype, result.ndim,
-                                               numpy_support.map_layout(result))
+            return types.npytypes.Array(rttype, result.ndim,
+                                        numpy_support.map_layout(result))
+
+        if 'out' in kwargs:
+            result = kwargs['out']
+            if isinstance(result, tuple):
+                result_type = types.Tuple([get_result_type(x)
+                                           for x in result])
+            else:
+                result_type = get_result_type(result)
             array_types = tuple([typing.typeof.typeof(x) for x in args])
             array_types_full = tuple([typing.typeof.typeof(x) for x in args] +
                                      [result_type])
@@ -701,15 +1052,124 @@ class StencilFunc(object):
         if config.DEBUG_ARRAY_OPT == 1:
             print("__call__", array_types, args, kwargs)
 
-        (real_ret, typemap, calltypes) = self.get_return_type(array_types)
-        new_func = self._stencil_wrapper(result, None, real_ret, typemap,
-                                         calltypes, *array_types_full)
+        new_func = self._get_cached_wrapper(array_types_full)
+        if new_func is None:
+            (real_ret, typemap, calltypes) = self.get_return_type(array_types)
+            new_func = self._stencil_wrapper(result, None, real_ret, typemap,
+                                             calltypes, *array_types_full)
+            self._cache_wrapper(array_types_full, new_func)
 
         if result is None:
             return new_func.entry_point(*args)
         else:
             return new_func.entry_point(*(args+(result,)))
 
+# Approximate size in bytes of the part of the input a tile of
+# stencil_iterate() covers, small enough for all the time steps of a tile to
+# run in cache.
+_iterate_tile_bytes = 1 << 20
+
+_iterate_driver_text = """
+def __numba_stencil_iterate(a, steps, tile_size, before, after, out):
+    n = a.shape[0]
+    for t in prange((n + tile_size - 1) // tile_size):
+        lo = t * tile_size
+        hi = min(lo + tile_size, n)
+        # extend the tile by the elements the steps depend on, the results
+        # close to the edges of the extended block are wrong but do not
+        # reach the tile itself.  At the ends of the array, the border
+        # modes also read up to `before` (resp. `after`) elements inwards
+        # at each step.
+        ext_lo = max(min(lo - steps * before,
+                         n - 1 - after - (steps - 1) * before), 0)
+        ext_hi = min(max(hi + steps * after,
+                         before + 1 + (steps - 1) * after), n)
+        buf = kernel(a[ext_lo:ext_hi])
+        for step in range(steps - 1):
+            buf = kernel(buf)
+        out[lo:hi] = buf[lo - ext_lo:hi - ext_lo]
+    return out
+"""
+
+# In 'wrap' mode the elements before the first tile are the last ones of the
+# array and vice versa, so the extended tile is gathered with wrapped indices
+# instead of being clipped to the array.
+_iterate_wrap_driver_text = """
+def __numba_stencil_iterate(a, steps, tile_size, before, after, out):
+    n = a.shape[0]
+    for t in prange((n + tile_size - 1) // tile_size):
+        lo = t * tile_size
+        hi = min(lo + tile_size, n)
+        ext = np.arange(lo - steps * before, hi + steps * after) % n
+        buf = kernel(a[ext])
+        for step in range(steps - 1):
+            buf = kernel(buf)
+        out[lo:hi] = buf[steps * before:steps * before + hi - lo]
+    return out
+"""
+
+def stencil_iterate(kernel, steps, a, out=None, tile_size=None):
+    """
+    Apply the stencil `kernel` `steps` times starting from array `a`, i.e.
+    compute the result of::
+
+        for _ in range(steps):
+            a = kernel(a)
+
+    without a full sweep over memory per step.  The first dimension of `a`
+    is split into tiles of `tile_size` elements processed in parallel.  Each
+    tile applies all the steps to its part of `a` extended by the elements
+    these steps depend on, so the intermediate results stay in cache.  In
+    'wrap' mode, the tiles at the ends of the array are extended with the
+    elements from the other end.
+    """
+    if not isinstance(kernel, StencilFunc):
+        raise TypeError("stencil_iterate() requires a stencil kernel")
+    if len(kernel.kernel_ir.arg_names) != 1:
+        raise ValueError("stencil_iterate() requires a stencil kernel with "
+                         "a single input array")
+    if steps < 0:
+        raise ValueError("stencil_iterate() requires a non-negative number "
+                         "of steps")
+    argtys = (typing.typeof.typeof(a),)
+    real_ret = kernel.get_return_type(argtys)[0]
+    if isinstance(real_ret, types.BaseTuple):
+        raise ValueError("stencil_iterate() requires a stencil kernel "
+                         "returning a single value")
+    if out is None:
+        out = np.empty(a.shape, numpy_support.as_dtype(real_ret.dtype))
+    elif out.shape != a.shape:
+        raise ValueError("stencil_iterate() output array has a different "
+                         "shape than the input array")
+    elif np.may_share_memory(a, out):
+        raise ValueError("stencil_iterate() output array must not overlap "
+                         "the input array")
+    if steps == 0 or a.size == 0:
+        out[...] = a
+        return out
+
+    neighborhood = kernel.get_neighborhood(argtys)
+    before = -min(0, neighborhood[0][0])
+    after = max(0, neighborhood[0][1])
+    if tile_size is None:
+        row_bytes = a.itemsize * (a.size // a.shape[0])
+        # keep the redundant work on the overlap below the work on the tile
+        tile_size = max(_iterate_tile_bytes // row_bytes,
+                        2 * steps * (before + after), 1)
+    elif tile_size < 1:
+        raise ValueError("stencil_iterate() requires a positive tile size")
+
+    if kernel._iterate_driver is None:
+        from numba import njit, prange
+        glbls = {'prange': prange, 'kernel': kernel, 'np': np}
+        if kernel.mode == 'wrap':
+            exec_(_iterate_wrap_driver_text, glbls)
+        else:
+            exec_(_iterate_driver_text, glbls)
+        kernel._iterate_driver = njit(parallel=True)(
+            glbls['__numba_stencil_iterate'])
+    return kernel._iterate_driver(a, steps, tile_size, before, after, out)
+
 def stencil(func_or_mode='constant', **options):
     # called on function without specifying mode style
     if not isinstance(func_or_mode, str):
@@ -720,7 +1180,8 @@ def stencil(func_or_mode='constant', **options):
         func = None
 
     for option in options:
-        if option not in ["cval", "standard_indexing", "neighborhood"]:
+        if option not in ["cval", "standard_indexing", "neighborhood",
+                          "cache"]:
             raise ValueError("Unknown stencil option " + option)
 
     wrapper = _stencil(mode, options)
@@ -729,7 +1190,7 @@ def stencil(func_or_mode='constant', **options):
     return wrapper
 
 def _stencil(mode, options):
-    if mode != 'constant':
+    if mode != 'constant' and mode not in border_index_funcs:
         raise ValueError("Unsupported mode style " + mode)
 
     def decorated(func):
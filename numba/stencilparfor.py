@@ -17,7 +17,7 @@ from numba.typing import signature
 from numba import ir_utils, ir, utils, config, typing
 from numba.ir_utils import (get_call_table, mk_unique_var,
                             compile_to_numba_ir, replace_arg_nodes, guard,
-                            find_callname)
+                            find_callname, get_definition)
 from numba.six import exec_
 
 
@@ -46,7 +46,7 @@ class StencilPass(object):
         stencil_calls = []
         stencil_dict = {}
         for call_varname, call_list in call_table.items():
-            if isinstance(call_list[0], StencilFunc):
+            if call_list and isinstance(call_list[0], StencilFunc):
                 # Remember all calls to StencilFuncs.
                 stencil_calls.append(call_varname)
                 stencil_dict[call_varname] = call_list[0]
@@ -73,8 +73,6 @@ class StencilPass(object):
                             raise ValueError("Tuple parameters not supported " \
                                 "for stencil kernels in parallel=True mode.")
 
-                    out_arr = kws.get('out')
-
                     # Get the StencilFunc object corresponding to this call.
                     sf = stencil_dict[stmt.value.func.name]
                     stencil_ir, rt, arg_to_arr_dict = get_stencil_ir(sf,
@@ -82,9 +80,49 @@ class StencilPass(object):
                             block.scope, block.loc, input_dict,
                             self.typemap, self.calltypes)
                     index_offsets = sf.options.get('index_offsets', None)
-                    gen_nodes = self._mk_stencil_parfor(label, in_args, out_arr,
-                            stencil_ir, index_offsets, stmt.target, rt, sf,
-                            arg_to_arr_dict)
+
+                    gen_nodes = []
+                    copy_nodes = []
+                    out_arrs = kws.get('out')
+                    buffers = None
+                    if out_arrs is not None:
+                        out_arrs, buffers = self._get_stencil_buffers(
+                            out_arrs, in_args, rt, sf, gen_nodes, copy_nodes)
+                    gen_nodes += self._mk_stencil_parfor(label, in_args,
+                            buffers, stencil_ir, index_offsets, stmt.target,
+                            rt, sf, arg_to_arr_dict)
+                    # The result is assigned after all the parfors writing
+                    # into the output arrays so none of them can be moved
+                    # past the uses of the result.
+                    result_assign = gen_nodes.pop()
+                    if isinstance(result_assign.value, ir.Var):
+                        buffers = [result_assign.value]
+                    else:
+                        buffers = list(result_assign.value.items)
+                    if sf.mode != 'constant':
+                        # the border of the output is computed by separate
+                        # parfors (two per dimension) from their own copy of
+                        # the kernel so the interior parfor has no index
+                        # mapping
+                        for dim in range(arg_typemap[0].ndim):
+                            for is_low in [True, False]:
+                                stencil_ir, rt, arg_to_arr_dict = get_stencil_ir(
+                                    sf, self.typingctx, arg_typemap,
+                                    block.scope, block.loc, input_dict,
+                                    self.typemap, self.calltypes)
+                                gen_nodes += self._mk_stencil_parfor(label,
+                                    in_args, buffers, stencil_ir,
+                                    index_offsets, stmt.target, rt, sf,
+                                    arg_to_arr_dict, (dim, is_low))
+                    if copy_nodes:
+                        # copy the temporaries back into out
+                        gen_nodes += copy_nodes
+                        if isinstance(rt, types.BaseTuple):
+                            result_assign.value = ir.Expr.build_tuple(
+                                                    out_arrs, stmt.loc)
+                        else:
+                            result_assign.value = out_arrs[0]
+                    gen_nodes.append(result_assign)
                     block.body = block.body[:i] + gen_nodes + block.body[i+1:]
                 # Found a call to a stencil via numba.stencil().
                 elif (isinstance(stmt, ir.Assign)
@@ -120,10 +158,166 @@ class StencilPass(object):
                     new_body.append(stmt)
             block.body = new_body
 
+    def _unpack_stencil_outputs(self, out_arr, gen_nodes):
+        """ Returns the list of output arrays given the out argument of a
+            stencil, which is a tuple of arrays for kernels returning a
+            tuple.
+        """
+        out_typ = self.typemap[out_arr.name]
+        if not isinstance(out_typ, types.BaseTuple):
+            return [out_arr]
+        out_arrs = []
+        for i in range(len(out_typ)):
+            elem_var = ir.Var(out_arr.scope, mk_unique_var("$stencil_out"),
+                              out_arr.loc)
+            self.typemap[elem_var.name] = out_typ[i]
+            gen_nodes.append(ir.Assign(ir.Expr.static_getitem(out_arr, i,
+                                        None, out_arr.loc), elem_var,
+                                       out_arr.loc))
+            out_arrs.append(elem_var)
+        return out_arrs
+
+    def _get_stencil_buffers(self, out_arr, in_args, return_type,
+                             stencil_func, gen_nodes, copy_nodes):
+        """ Returns the list of output arrays given the out argument of a
+            stencil and the list of arrays the stencil writes into.  An
+            output array that overlaps an input array of the stencil at run
+            time is replaced by a temporary copied back into it by
+            copy_nodes so the kernel never reads elements it already
+            overwrote.
+        """
+        from numba.stencil import (_arrays_overlap, _stencil_write_buffer,
+                                   _stencil_copy_back)
+
+        if (isinstance(return_type, types.BaseTuple) !=
+                isinstance(self.typemap[out_arr.name], types.BaseTuple)):
+            raise ValueError("Stencil kernels returning a tuple require a "
+                             "tuple of output arrays.")
+        # use the variables a tuple of output arrays was built from so that
+        # the writes into them are not taken for dead code
+        out_def = guard(get_definition, self.func_ir, out_arr)
+        if (isinstance(out_def, ir.Expr) and out_def.op == 'build_tuple'
+                and all(guard(get_definition, self.func_ir, v) is not None
+                        for v in out_def.items)):
+            out_arrs = list(out_def.items)
+        else:
+            out_arrs = self._unpack_stencil_outputs(out_arr, gen_nodes)
+        in_arrs = [x for x in in_args
+                   if isinstance(self.typemap[x.name], types.npytypes.Array)]
+
+        # out may be a view of an input array, so whether the kernel has to
+        # write into a temporary is only known at run time.  The border is
+        # left alone in constant mode, so the temporary starts out as a copy
+        # of the output there.
+        in_names = ["a{}".format(i) for i in range(len(in_arrs))]
+        f_text = "def find_overlap(arr, {}):\n".format(", ".join(in_names))
+        f_text += "    return {}\n".format(" | ".join(
+                        "_arrays_overlap(arr, {})".format(name)
+                        for name in in_names))
+        f_text += "def init_buffer(arr, overlap):\n"
+        f_text += "    return _stencil_write_buffer(arr, overlap, {})\n".format(
+                        stencil_func.mode == 'constant')
+        f_text += "def copy_buffer(arr, buf, overlap):\n"
+        f_text += "    _stencil_copy_back(arr, buf, overlap)\n"
+        funcs = {}
+        exec_(f_text, {}, funcs)
+
+        def inline_call(f, args, nodes):
+            # appends the body of f applied to args to nodes and returns
+            # the variable holding its result
+            f_ir = compile_to_numba_ir(f, {
+                    '_arrays_overlap': _arrays_overlap,
+                    '_stencil_write_buffer': _stencil_write_buffer,
+                    '_stencil_copy_back': _stencil_copy_back},
+                self.typingctx,
+                tuple(self.typemap[x.name] for x in args), self.typemap,
+                self.calltypes)
+            block = f_ir.blocks.popitem()[1]
+            replace_arg_nodes(block, args)
+            nodes += block.body[:-2]
+            return block.body[-2].value.value
+
+        buffers = []
+        for arr in out_arrs:
+            overlap = inline_call(funcs['find_overlap'], [arr] + in_arrs,
+                                  gen_nodes)
+            buf = inline_call(funcs['init_buffer'], [arr, overlap], gen_nodes)
+            buffers.append(buf)
+            inline_call(funcs['copy_buffer'], [arr, buf, overlap], copy_nodes)
+        return out_arrs, buffers
+
+    def _mk_stencil_output(self, in_arr, dtype, stencil_func, init_block,
+                           equiv_set, in_arr_dim_sizes):
+        """ Adds the allocation of an output array of the stencil with the
+            shape of in_arr to init_block and returns its variable.
+        """
+        scope = in_arr.scope
+        loc = in_arr.loc
+        in_arr_typ = self.typemap[in_arr.name]
+
+        shape_name = ir_utils.mk_unique_var("in_arr_shape")
+        shape_var = ir.Var(scope, shape_name, loc)
+        shape_getattr = ir.Expr.getattr(in_arr, "shape", loc)
+        self.typemap[shape_name] = types.containers.UniTuple(types.intp,
+                                                           in_arr_typ.ndim)
+        init_block.body.extend([ir.Assign(shape_getattr, shape_var, loc)])
+
+        zero_name = ir_utils.mk_unique_var("zero_val")
+        zero_var = ir.Var(scope, zero_name, loc)
+        if "cval" in stencil_func.options:
+            cval = stencil_func.options["cval"]
+            # TODO: Loosen this restriction to adhere to casting rules.
+            if dtype != typing.typeof.typeof(cval):
+                raise ValueError("cval type does not match stencil return type.")
+
+            temp2 = dtype(cval)
+        else:
+            temp2 = dtype(0)
+        full_const = ir.Const(temp2, loc)
+        self.typemap[zero_name] = dtype
+        init_block.body.extend([ir.Assign(full_const, zero_var, loc)])
+
+        so_name = ir_utils.mk_unique_var("stencil_output")
+        out_arr = ir.Var(scope, so_name, loc)
+        self.typemap[out_arr.name] = numba.types.npytypes.Array(
+                                                       dtype,
+                                                       in_arr_typ.ndim,
+                                                       in_arr_typ.layout)
+        dtype_g_np_var = ir.Var(scope, mk_unique_var("$np_g_var"), loc)
+        self.typemap[dtype_g_np_var.name] = types.misc.Module(np)
+        dtype_g_np = ir.Global('np', np, loc)
+        dtype_g_np_assign = ir.Assign(dtype_g_np, dtype_g_np_var, loc)
+        init_block.body.append(dtype_g_np_assign)
+
+        dtype_np_attr_call = ir.Expr.getattr(dtype_g_np_var, dtype.name, loc)
+        dtype_attr_var = ir.Var(scope, mk_unique_var("$np_attr_attr"), loc)
+        self.typemap[dtype_attr_var.name] = types.functions.NumberClass(dtype)
+        dtype_attr_assign = ir.Assign(dtype_np_attr_call, dtype_attr_var, loc)
+        init_block.body.append(dtype_attr_assign)
+
+        stmts = ir_utils.gen_np_call("full",
+                                   np.full,
+                                   out_arr,
+                                   [shape_var, zero_var, dtype_attr_var],
+                                   self.typingctx,
+                                   self.typemap,
+                                   self.calltypes)
+        equiv_set.insert_equiv(out_arr, in_arr_dim_sizes)
+        init_block.body.extend(stmts)
+        return out_arr
+
     def _mk_stencil_parfor(self, label, in_args, out_arr, stencil_ir,
                            index_offsets, target, return_type, stencil_func,
-                           arg_to_arr_dict):
+                           arg_to_arr_dict, border=None):
         """ Converts a set of stencil kernel blocks to a parfor.
+            If border is a (dimension, is_low) pair, the parfor covers the
+            part of the output below (or above) the interior in that
+            dimension instead of the interior, and array indices are mapped
+            into the bounds of the input according to the stencil mode.
+            Border parfors write into out_arr which must be given.
+            out_arr is either None, a variable holding the output array (or
+            the tuple of output arrays of a kernel returning a tuple) or a
+            list of the output array variables.
         """
         gen_nodes = []
         stencil_blocks = stencil_ir.blocks
@@ -135,7 +329,6 @@ class StencilPass(object):
 
         in_arr = in_args[0]
         # run copy propagate to replace in_args copies (e.g. a = A)
-        in_arr_typ = self.typemap[in_arr.name]
         in_cps, out_cps = ir_utils.copy_propagate(stencil_blocks, self.typemap)
         name_var_table = ir_utils.get_name_var_table(stencil_blocks)
 
@@ -165,9 +358,13 @@ class StencilPass(object):
             self.typemap[parfor_var.name] = types.intp
             parfor_vars.append(parfor_var)
 
+        equiv_set = self.array_analysis.get_equiv_set(label)
+        in_arr_dim_sizes = equiv_set.get_shape(in_arr)
+        assert ndims == len(in_arr_dim_sizes)
+
         start_lengths, end_lengths = self._replace_stencil_accesses(
              stencil_blocks, parfor_vars, in_args, index_offsets, stencil_func,
-             arg_to_arr_dict)
+             arg_to_arr_dict, in_arr_dim_sizes if border else None)
 
         if config.DEBUG_ARRAY_OPT == 1:
             print("stencil_blocks after replace stencil accesses")
@@ -175,15 +372,15 @@ class StencilPass(object):
 
         # create parfor loop nests
         loopnests = []
-        equiv_set = self.array_analysis.get_equiv_set(label)
-        in_arr_dim_sizes = equiv_set.get_shape(in_arr)
-
-        assert ndims == len(in_arr_dim_sizes)
         for i in range(ndims):
             last_ind = self._get_stencil_last_ind(in_arr_dim_sizes[i],
                                         end_lengths[i], gen_nodes, scope, loc)
             start_ind = self._get_stencil_start_ind(
                                         start_lengths[i], gen_nodes, scope, loc)
+            if border is not None:
+                start_ind, last_ind = self._get_stencil_border_range(i, border,
+                        start_ind, last_ind, in_arr_dim_sizes[i], gen_nodes,
+                        loc)
             # start from stencil size to avoid invalid array access
             loopnests.append(numba.parfor.LoopNest(parfor_vars[i],
                                 start_ind, last_ind, 1))
@@ -194,7 +391,11 @@ class StencilPass(object):
         parfor_body_exit_label = max(stencil_blocks.keys()) + 1
         stencil_blocks[parfor_body_exit_label] = ir.Block(scope, loc)
         exit_value_var = ir.Var(scope, mk_unique_var("$parfor_exit_value"), loc)
-        self.typemap[exit_value_var.name] = return_type.dtype
+        if isinstance(return_type, types.BaseTuple):
+            self.typemap[exit_value_var.name] = types.Tuple(
+                                        [t.dtype for t in return_type])
+        else:
+            self.typemap[exit_value_var.name] = return_type.dtype
 
         # create parfor index var
         for_replacing_ret = []
@@ -215,58 +416,19 @@ class StencilPass(object):
 
         # empty init block
         init_block = ir.Block(scope, loc)
-        if out_arr == None:
-            in_arr_typ = self.typemap[in_arr.name]
-
-            shape_name = ir_utils.mk_unique_var("in_arr_shape")
-            shape_var = ir.Var(scope, shape_name, loc)
-            shape_getattr = ir.Expr.getattr(in_arr, "shape", loc)
-            self.typemap[shape_name] = types.containers.UniTuple(types.intp,
-                                                               in_arr_typ.ndim)
-            init_block.body.extend([ir.Assign(shape_getattr, shape_var, loc)])
-
-            zero_name = ir_utils.mk_unique_var("zero_val")
-            zero_var = ir.Var(scope, zero_name, loc)
-            if "cval" in stencil_func.options:
-                cval = stencil_func.options["cval"]
-                # TODO: Loosen this restriction to adhere to casting rules.
-                if return_type.dtype != typing.typeof.typeof(cval):
-                    raise ValueError("cval type does not match stencil return type.")
-
-                temp2 = return_type.dtype(cval)
-            else:
-                temp2 = return_type.dtype(0)
-            full_const = ir.Const(temp2, loc)
-            self.typemap[zero_name] = return_type.dtype
-            init_block.body.extend([ir.Assign(full_const, zero_var, loc)])
-
-            so_name = ir_utils.mk_unique_var("stencil_output")
-            out_arr = ir.Var(scope, so_name, loc)
-            self.typemap[out_arr.name] = numba.types.npytypes.Array(
-                                                           return_type.dtype,
-                                                           in_arr_typ.ndim,
-                                                           in_arr_typ.layout)
-            dtype_g_np_var = ir.Var(scope, mk_unique_var("$np_g_var"), loc)
-            self.typemap[dtype_g_np_var.name] = types.misc.Module(np)
-            dtype_g_np = ir.Global('np', np, loc)
-            dtype_g_np_assign = ir.Assign(dtype_g_np, dtype_g_np_var, loc)
-            init_block.body.append(dtype_g_np_assign)
-
-            dtype_np_attr_call = ir.Expr.getattr(dtype_g_np_var, return_type.dtype.name, loc)
-            dtype_attr_var = ir.Var(scope, mk_unique_var("$np_attr_attr"), loc)
-            self.typemap[dtype_attr_var.name] = types.functions.NumberClass(return_type.dtype)
-            dtype_attr_assign = ir.Assign(dtype_np_attr_call, dtype_attr_var, loc)
-            init_block.body.append(dtype_attr_assign)
-
-            stmts = ir_utils.gen_np_call("full",
-                                       np.full,
-                                       out_arr,
-                                       [shape_var, zero_var, dtype_attr_var],
-                                       self.typingctx,
-                                       self.typemap,
-                                       self.calltypes)
-            equiv_set.insert_equiv(out_arr, in_arr_dim_sizes)
-            init_block.body.extend(stmts)
+        if isinstance(return_type, types.BaseTuple):
+            out_types = list(return_type)
+        else:
+            out_types = [return_type]
+        if out_arr is None:
+            out_arrs = [self._mk_stencil_output(in_arr, out_type.dtype,
+                                stencil_func, init_block, equiv_set,
+                                in_arr_dim_sizes)
+                        for out_type in out_types]
+        elif isinstance(out_arr, list):
+            out_arrs = out_arr
+        else:
+            out_arrs = self._unpack_stencil_outputs(out_arr, gen_nodes)
 
         self.replace_return_with_setitem(stencil_blocks, exit_value_var,
                                          parfor_body_exit_label)
@@ -275,14 +437,27 @@ class StencilPass(object):
             print("stencil_blocks after replacing return")
             ir_utils.dump_blocks(stencil_blocks)
 
-        setitem_call = ir.SetItem(out_arr, parfor_ind_var, exit_value_var, loc)
-        self.calltypes[setitem_call] = signature(
-                                        types.none, self.typemap[out_arr.name],
+        stencil_blocks[parfor_body_exit_label].body.extend(for_replacing_ret)
+        for i, one_out_arr in enumerate(out_arrs):
+            if isinstance(return_type, types.BaseTuple):
+                # write each element of the returned tuple into its array
+                value_var = ir.Var(scope, mk_unique_var("$parfor_exit_elem"),
+                                   loc)
+                self.typemap[value_var.name] = out_types[i].dtype
+                stencil_blocks[parfor_body_exit_label].body.append(ir.Assign(
+                    ir.Expr.static_getitem(exit_value_var, i, None, loc),
+                    value_var, loc))
+            else:
+                value_var = exit_value_var
+            setitem_call = ir.SetItem(one_out_arr, parfor_ind_var, value_var,
+                                      loc)
+            self.calltypes[setitem_call] = signature(
+                                        types.none,
+                                        self.typemap[one_out_arr.name],
                                         self.typemap[parfor_ind_var.name],
-                                        self.typemap[out_arr.name].dtype
+                                        self.typemap[one_out_arr.name].dtype
                                         )
-        stencil_blocks[parfor_body_exit_label].body.extend(for_replacing_ret)
-        stencil_blocks[parfor_body_exit_label].body.append(setitem_call)
+            stencil_blocks[parfor_body_exit_label].body.append(setitem_call)
 
         # simplify CFG of parfor body (exit block could be simplified often)
         # add dummy return to enable CFG
@@ -299,9 +474,56 @@ class StencilPass(object):
         parfor = numba.parfor.Parfor(loopnests, init_block, stencil_blocks,
                                      loc, parfor_ind_var, equiv_set, pattern, self.flags)
         gen_nodes.append(parfor)
-        gen_nodes.append(ir.Assign(out_arr, target, loc))
+        if border is None:
+            if isinstance(return_type, types.BaseTuple):
+                gen_nodes.append(ir.Assign(ir.Expr.build_tuple(out_arrs, loc),
+                                           target, loc))
+            else:
+                gen_nodes.append(ir.Assign(out_arrs[0], target, loc))
         return gen_nodes
 
+    def _get_stencil_border_range(self, dim, border, start_ind, last_ind,
+                                  dim_size, gen_nodes, loc):
+        """ Returns the loop range in dimension dim of the border parfor
+            given by border.  The two border parfors of a dimension iterate
+            over the interior range in the dimensions before it, the part of
+            the dimension below or above the interior and the full range of
+            the dimensions after it so every element outside of the interior
+            is computed exactly once.
+        """
+        border_dim, is_low = border
+        if dim < border_dim:
+            return start_ind, last_ind
+        if dim > border_dim:
+            return 0, dim_size
+        def get_low_end(start_ind, dim_size):
+            return min(start_ind, dim_size)
+        def get_high_start(start_ind, last_ind, dim_size):
+            return max(last_ind, min(start_ind, dim_size))
+        if is_low:
+            return 0, self._gen_intp_call(get_low_end,
+                                          [start_ind, dim_size], gen_nodes, loc)
+        return (self._gen_intp_call(get_high_start,
+                                    [start_ind, last_ind, dim_size],
+                                    gen_nodes, loc),
+                dim_size)
+
+    def _gen_intp_call(self, func, args, gen_nodes, loc, glbls=None):
+        """ Generates the nodes computing func(*args) for a single block
+            function of intp arguments and returns the result variable.
+        """
+        if glbls is None:
+            glbls = {}
+        f_ir = compile_to_numba_ir(func, glbls, self.typingctx,
+                                   (types.intp,) * len(args), self.typemap,
+                                   self.calltypes)
+        assert len(f_ir.blocks) == 1
+        block = f_ir.blocks.popitem()[1]
+        replace_arg_nodes(block, [ir.Const(arg, loc) if isinstance(arg, int)
+                                  else arg for arg in args])
+        gen_nodes += block.body[:-2]
+        return block.body[-2].value.value
+
     def _get_stencil_last_ind(self, dim_size, end_length, gen_nodes, scope,
                                                                         loc):
         last_ind = dim_size
@@ -351,10 +573,13 @@ class StencilPass(object):
         return ret_var
 
     def _replace_stencil_accesses(self, stencil_blocks, parfor_vars, in_args,
-                                  index_offsets, stencil_func, arg_to_arr_dict):
+                                  index_offsets, stencil_func, arg_to_arr_dict,
+                                  border_sizes=None):
         """ Convert relative indexing in the stencil kernel to standard indexing
             by adding the loop index variables to the corresponding dimensions
-            of the array index tuples.
+            of the array index tuples.  If border_sizes is given, the indices
+            are also mapped into the bounds given by these dimension sizes
+            according to the stencil mode.
         """
         in_arr = in_args[0]
         in_arg_names = [x.name for x in in_args]
@@ -446,6 +671,9 @@ class StencilPass(object):
                     # update access indices
                     index_vars = self._add_index_offsets(parfor_vars,
                                 list(index_list), new_body, scope, loc)
+                    if border_sizes is not None:
+                        index_vars = self._map_border_indices(index_vars,
+                                border_sizes, stencil_func, new_body, loc)
 
                     # new access index tuple
                     if ndims == 1:
@@ -484,6 +712,26 @@ class StencilPass(object):
 
         return start_lengths, end_lengths
 
+    def _map_border_indices(self, index_vars, dim_sizes, stencil_func,
+                            new_body, loc):
+        """ Map the access indices into the array bounds according to the
+            border mode of the stencil.
+        """
+        from numba.stencil import border_index_funcs
+
+        def map_index(index, dim_size):
+            return border_index(index, dim_size)
+        glbls = {'border_index': border_index_funcs[stencil_func.mode]}
+        mapped_vars = []
+        for index_var, dim_size in zip(index_vars, dim_sizes):
+            if self.typemap[index_var.name] != types.intp:
+                raise ValueError("Stencil mode '{}' requires integer "
+                                 "relative indices.".format(stencil_func.mode))
+            mapped_vars.append(self._gen_intp_call(map_index,
+                                    [index_var, dim_size], new_body, loc,
+                                    glbls))
+        return mapped_vars
+
     def _add_index_offsets(self, index_list, index_offsets, new_body,
                            scope, loc):
         """ Does the actual work of adding loop index variables to the
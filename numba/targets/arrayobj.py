@@ -7,6 +7,7 @@ from __future__ import print_function, absolute_import, division
 
 import functools
 import math
+import operator
 
 from llvmlite import ir
 import llvmlite.llvmpy.core as lc
@@ -26,7 +27,9 @@ from numba.targets.imputils import (lower_builtin, lower_getattr,
                                     impl_ret_new_ref, impl_ret_untracked)
 from numba.typing import signature
 from numba.extending import register_jitable, overload
-from . import quicksort, mergesort, slicing
+from . import quicksort, mergesort, timsort, slicing
+from .listobj import ListInstance, is_plain_data
+from .setobj import SetInstance
 
 
 def set_range_metadata(builder, load, lower_bound, upper_bound):
@@ -3194,6 +3197,43 @@ def _empty_nd_impl(context, builder, arrtype, shapes):
 
     return ary
 
+def _stack_nd_impl(context, builder, arrtype, shape):
+    """Like _empty_nd_impl(), but allocate the array data in a stack slot
+    of the current function.  *shape* is a tuple of Python ints.  The
+    returned array has no MemInfo, so the caller must ensure it doesn't
+    outlive the function (see numba.escape_analysis).
+    """
+    arycls = make_array(arrtype)
+    ary = arycls(context, builder)
+
+    datatype = context.get_data_type(arrtype.dtype)
+    itemsize = get_itemsize(context, arrtype)
+    nitems = functools.reduce(operator.mul, shape, 1)
+
+    if arrtype.layout == 'C':
+        dims = reversed(shape)
+    else:
+        dims = shape
+    strides = []
+    stride = itemsize
+    for dimension_size in dims:
+        strides.append(stride)
+        stride *= dimension_size
+    if arrtype.layout == 'C':
+        strides.reverse()
+
+    data = cgutils.alloca_once(builder, ir.ArrayType(datatype, nitems))
+    meminfo = context.get_constant_null(types.MemInfoPointer(arrtype.dtype))
+    populate_array(ary,
+                   data=builder.bitcast(data, datatype.as_pointer()),
+                   shape=[context.get_constant(types.intp, s) for s in shape],
+                   strides=[context.get_constant(types.intp, s)
+                            for s in strides],
+                   itemsize=context.get_constant(types.intp, itemsize),
+                   meminfo=meminfo)
+
+    return ary
+
 def _zero_fill_array(context, builder, ary):
     """
     Zero-fill an array.  The array must be contiguous.
@@ -4053,6 +4093,16 @@ def np_array(context, builder, sig, args):
     shapes = compute_sequence_shape(context, builder, ndim, seqty, seq)
     assert len(shapes) == ndim
 
+    if (isinstance(seqty, types.List) and ndim == 1
+        and is_plain_data(seqty.dtype, arrty.dtype)):
+        # Fast path: copy the list's storage in bulk
+        inst = ListInstance(context, builder, seqty, seq)
+        arr = _empty_nd_impl(context, builder, arrty, shapes)
+        cgutils.raw_memcpy(builder, arr.data, inst.data, shapes[0],
+                           arr.itemsize)
+        return impl_ret_new_ref(context, builder, sig.return_type,
+                                arr._getvalue())
+
     check_sequence_shape(context, builder, seqty, seq, shapes)
     arr = _empty_nd_impl(context, builder, arrty, shapes)
     assign_sequence_to_array(context, builder, arr.data, shapes, arr.strides,
@@ -4061,6 +4111,39 @@ def np_array(context, builder, sig, args):
     return impl_ret_new_ref(context, builder, sig.return_type, arr._getvalue())
 
 
+@lower_builtin(np.asarray, types.Any)
+@lower_builtin(np.asarray, types.Any, types.DTypeSpec)
+def np_asarray(context, builder, sig, args):
+    return np_array(context, builder, sig, args)
+
+
+@lower_builtin(np.asarray, types.Array)
+@lower_builtin(np.asarray, types.Array, types.DTypeSpec)
+def np_asarray_array(context, builder, sig, args):
+    # The typing ensures no conversion is needed
+    return impl_ret_borrowed(context, builder, sig.return_type, args[0])
+
+
+@lower_builtin(np.asarray, types.Set)
+@lower_builtin(np.asarray, types.Set, types.DTypeSpec)
+def np_asarray_set(context, builder, sig, args):
+    arrty = sig.return_type
+    setty = sig.args[0]
+    inst = SetInstance(context, builder, setty, args[0])
+    arr = _empty_nd_impl(context, builder, arrty, [inst.get_size()])
+
+    index = cgutils.alloca_once_value(builder,
+                                      context.get_constant(types.intp, 0))
+    with inst.payload._iterate() as loop:
+        i = builder.load(index)
+        ptr = cgutils.get_item_pointer(builder, arrty, arr, [i])
+        val = context.cast(builder, loop.entry.key, setty.dtype, arrty.dtype)
+        store_item(context, builder, arrty, val, ptr)
+        builder.store(builder.add(i, i.type(1)), index)
+
+    return impl_ret_new_ref(context, builder, sig.return_type, arr._getvalue())
+
+
 def _normalize_axis(context, builder, func_name, ndim, axis):
     zero = axis.type(0)
     ll_ndim = axis.type(ndim)
@@ -4601,12 +4684,28 @@ def array_dot(arr, other):
 _sorts = {}
 
 def lt_floats(a, b):
-    return math.isnan(b) or a < b
+    # NaNs are sorted last, and compare equal to each other
+    return a < b or (math.isnan(b) and not math.isnan(a))
+
+def make_temp_array(keys, n):
+    return np.empty(n, keys.dtype)
+
+def make_timsort_argsort(run_timsort_with_values):
+    @register_jitable
+    def run_timsort_argsort(arr):
+        keys = arr.copy()
+        res = np.arange(arr.size)
+        run_timsort_with_values(keys, res)
+        return res
+
+    return run_timsort_argsort
 
 def get_sort_func(kind, is_float, is_argsort=False):
     """
     Get a sort implementation of the given kind.
     """
+    if kind == 'stable':
+        kind = 'timsort'
     key = kind, is_float, is_argsort
     try:
         return _sorts[key]
@@ -4621,31 +4720,54 @@ def get_sort_func(kind, is_float, is_argsort=False):
                 lt=lt_floats if is_float else None,
                 is_argsort=is_argsort)
             func = sort.run_mergesort
+        elif kind == 'timsort':
+            sort = timsort.make_jitable_timsort(
+                make_temp_array,
+                lt=lt_floats if is_float else None)
+            if is_argsort:
+                func = make_timsort_argsort(sort.run_timsort_with_values)
+            else:
+                func = sort.run_timsort
+        else:
+            raise ValueError("unsupported sort kind %r" % (kind,))
         _sorts[key] = func
         return func
 
 
 @lower_builtin("array.sort", types.Array)
+@lower_builtin("array.sort", types.Array, types.Const)
 def array_sort(context, builder, sig, args):
     arytype = sig.args[0]
-    sort_func = get_sort_func(kind='quicksort',
+    kind = sig.args[1].value if len(sig.args) > 1 else 'quicksort'
+    sort_func = get_sort_func(kind=kind,
                               is_float=isinstance(arytype.dtype, types.Float))
 
     def array_sort_impl(arr):
         # Note we clobber the return value
         sort_func(arr)
 
-    return context.compile_internal(builder, array_sort_impl, sig, args)
+    innersig = sig.replace(args=sig.args[:1])
+    innerargs = args[:1]
+    return context.compile_internal(builder, array_sort_impl,
+                                    innersig, innerargs)
 
 @lower_builtin(np.sort, types.Array)
+@lower_builtin(np.sort, types.Array, types.Const)
 def np_sort(context, builder, sig, args):
+    arytype = sig.args[0]
+    kind = sig.args[1].value if len(sig.args) > 1 else 'quicksort'
+    sort_func = get_sort_func(kind=kind,
+                              is_float=isinstance(arytype.dtype, types.Float))
 
     def np_sort_impl(a):
         res = a.copy()
-        res.sort()
+        sort_func(res)
         return res
 
-    return context.compile_internal(builder, np_sort_impl, sig, args)
+    innersig = sig.replace(args=sig.args[:1])
+    innerargs = args[:1]
+    return context.compile_internal(builder, np_sort_impl,
+                                    innersig, innerargs)
 
 @lower_builtin("array.argsort", types.Array, types.Const)
 @lower_builtin(np.argsort, types.Array, types.Const)
@@ -200,6 +200,15 @@ class BaseContext(object):
     # NRT
     enable_nrt = False
 
+    # Whether NRT reference counts are updated with atomic operations
+    enable_nrt_atomic = True
+
+    # Whether to tell the NRT allocation tracer about allocation sites
+    enable_nrt_trace = False
+
+    # Whether to allocate the temporaries of a call from a NRT arena
+    enable_nrt_arena = False
+
     # Auto parallelization
     auto_parallel = False
 
@@ -257,9 +266,9 @@ class BaseContext(object):
         Useful for third-party extensions.
         """
         # Populate built-in registry
-        from . import (arraymath, enumimpl, iterators, linalg, numbers,
-                       optional, polynomial, rangeobj, slicing, smartarray,
-                       tupleobj)
+        from . import (arraymath, enumimpl, heapq, iterators, linalg,
+                       numbers, optional, polynomial, rangeobj, slicing,
+                       smartarray, tupleobj)
         try:
             from . import npdatetime
         except NotImplementedError:
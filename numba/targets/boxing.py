@@ -2,12 +2,14 @@
 Boxing and unboxing of native Numba values to / from CPython objects.
 """
 
+import collections
+
 from llvmlite import ir
 
 from .. import cgutils, numpy_support, types
 from ..pythonapi import box, unbox, reflect, NativeValue
 
-from . import listobj, setobj
+from . import listobj, setobj, dictobj, dequeobj, recordlistobj
 from ..utils import IS_PY3
 
 
@@ -247,6 +249,41 @@ def unbox_charseq(typ, obj, c):
     return NativeValue(ret, is_error=c.builder.not_(ok))
 
 
+@box(types.UnicodeType)
+def box_unicode(typ, val, c):
+    """
+    Convert a native unicode string to a str object.  Strings unboxed
+    from Python give back their original object.
+    """
+    string = c.context.make_helper(c.builder, typ, val)
+    res = cgutils.alloca_once_value(c.builder, string.parent)
+    has_parent = cgutils.is_not_null(c.builder, string.parent)
+    with c.builder.if_else(has_parent) as (then, otherwise):
+        with then:
+            c.pyapi.incref(string.parent)
+        with otherwise:
+            obj = c.pyapi.string_from_kind_and_data(string.kind, string.data,
+                                                    string.length)
+            c.builder.store(obj, res)
+    # Steals NRT ref
+    c.context.nrt.decref(c.builder, typ, val)
+    return c.builder.load(res)
+
+@unbox(types.UnicodeType)
+def unbox_unicode(typ, obj, c):
+    """
+    Convert a str object to a native unicode string, without copying
+    its data.
+    """
+    string = c.context.make_helper(c.builder, typ)
+    ok = c.pyapi.nrt_adapt_unicode_from_python(
+        obj, string._get_ptr_by_name('data'),
+        string._get_ptr_by_name('length'), string._get_ptr_by_name('kind'),
+        string._get_ptr_by_name('hash'), string._get_ptr_by_name('meminfo'))
+    string.parent = obj
+    return NativeValue(string._getvalue(), is_error=c.builder.not_(ok))
+
+
 @unbox(types.Optional)
 def unbox_optional(typ, obj, c):
     """
@@ -926,6 +963,129 @@ def reflect_set(typ, val, c):
         inst.set_dirty(False)
 
 
+@box(types.Deque)
+def box_deque(typ, val, c):
+    """
+    Convert native deque *val* to a new collections.deque object.
+    """
+    inst = dequeobj.DequeInstance(c.context, c.builder, typ, val)
+    res = cgutils.alloca_once_value(c.builder, c.pyapi.get_null_object())
+
+    # Build a new Python list and then create a deque from that
+    nitems = inst.size
+    listobj = c.pyapi.list_new(nitems)
+    with c.builder.if_then(cgutils.is_not_null(c.builder, listobj),
+                           likely=True):
+        with cgutils.for_range(c.builder, nitems) as loop:
+            item = inst.getitem(loop.index)
+            inst.incref_value(item)
+            itemobj = c.box(typ.dtype, item)
+            c.pyapi.list_setitem(listobj, loop.index, itemobj)
+
+        maxlen = inst.maxlen
+        maxlenobj = cgutils.alloca_once_value(c.builder,
+                                              c.pyapi.get_null_object())
+        with c.builder.if_else(cgutils.is_neg_int(c.builder, maxlen)) \
+                as (unbounded, bounded):
+            with unbounded:
+                c.builder.store(c.pyapi.make_none(), maxlenobj)
+            with bounded:
+                c.builder.store(c.pyapi.long_from_ssize_t(maxlen), maxlenobj)
+        maxlenobj = c.builder.load(maxlenobj)
+
+        clsobj = c.pyapi.unserialize(
+            c.pyapi.serialize_object(collections.deque))
+        obj = c.pyapi.call_function_objargs(clsobj, (listobj, maxlenobj))
+        c.pyapi.decref(clsobj)
+        c.pyapi.decref(maxlenobj)
+        c.pyapi.decref(listobj)
+        c.builder.store(obj, res)
+
+    # Steal NRT ref
+    c.context.nrt.decref(c.builder, typ, val)
+    return c.builder.load(res)
+
+
+#
+# Typed containers
+#
+
+def _box_typed_container(typ, meminfo, pycls, c):
+    """
+    Wrap the native container of MemInfo *meminfo* in a *pycls* object
+    (a numba.typed.base.TypedContainer subclass).
+    """
+    addr = c.builder.ptrtoint(meminfo, c.pyapi.py_ssize_t)
+    addrobj = c.pyapi.long_from_ssize_t(addr)
+    typobj = c.pyapi.unserialize(c.pyapi.serialize_object(typ))
+    clsobj = c.pyapi.unserialize(c.pyapi.serialize_object(pycls))
+    # The NRT reference is stolen by the wrapper
+    res = c.pyapi.call_function_objargs(clsobj, (addrobj, typobj))
+    c.pyapi.decref(addrobj)
+    c.pyapi.decref(typobj)
+    c.pyapi.decref(clsobj)
+    return res
+
+def _unbox_typed_container(typ, obj, instcls, c):
+    """
+    Get the native container wrapped by TypedContainer object *obj*, as
+    a *instcls* (e.g. ListInstance) value.  The payload is shared, no
+    conversion happens.
+    """
+    addrobj = c.pyapi.object_getattr_string(obj, '_meminfo_ptr')
+    is_error = cgutils.is_null(c.builder, addrobj)
+    llty = c.context.get_value_type(typ)
+    res = cgutils.alloca_once_value(c.builder, ir.Constant(llty, None))
+    with c.builder.if_then(c.builder.not_(is_error), likely=True):
+        ptr = c.pyapi.long_as_voidptr(addrobj)
+        c.pyapi.decref(addrobj)
+        inst = instcls(c.context, c.builder, typ, None)
+        meminfo = c.builder.bitcast(ptr, inst.meminfo.type)
+        inst = instcls.from_meminfo(c.context, c.builder, typ, meminfo)
+        c.builder.store(inst.value, res)
+    return NativeValue(c.builder.load(res), is_error=is_error)
+
+@box(types.DictType)
+def box_dict(typ, val, c):
+    """
+    Wrap native dict *val* in a numba.typed.Dict object.
+    """
+    from numba.typed import Dict
+    inst = dictobj.DictInstance(c.context, c.builder, typ, val)
+    return _box_typed_container(typ, inst.meminfo, Dict, c)
+
+@unbox(types.DictType)
+def unbox_dict(typ, obj, c):
+    return _unbox_typed_container(typ, obj, dictobj.DictInstance, c)
+
+@box(types.ListType)
+def box_typed_list(typ, val, c):
+    """
+    Wrap native list *val* in a numba.typed.List object.
+    """
+    from numba.typed import List
+    inst = listobj.ListInstance(c.context, c.builder, typ, val)
+    return _box_typed_container(typ, inst.meminfo, List, c)
+
+@unbox(types.ListType)
+def unbox_typed_list(typ, obj, c):
+    return _unbox_typed_container(typ, obj, listobj.ListInstance, c)
+
+@box(types.RecordListType)
+def box_record_list(typ, val, c):
+    """
+    Wrap native record list *val* in a numba.typed.RecordList object.
+    """
+    from numba.typed import RecordList
+    inst = recordlistobj.RecordListInstance(c.context, c.builder, typ, val)
+    return _box_typed_container(typ, inst.meminfo, RecordList, c)
+
+@unbox(types.RecordListType)
+def unbox_record_list(typ, obj, c):
+    return _unbox_typed_container(typ, obj, recordlistobj.RecordListInstance,
+                                  c)
+
+
 #
 # Other types
 #
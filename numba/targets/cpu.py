@@ -9,7 +9,9 @@ from numba.callwrapper import PyCallWrapper
 from .base import BaseContext, PYOBJECT
 from numba import utils, cgutils, types
 from numba.utils import cached_property
-from numba.targets import callconv, codegen, externals, intrinsics, listobj, setobj
+from numba.targets import (callconv, codegen, externals, intrinsics, listobj,
+                           setobj, dictobj, dequeobj, recordlistobj,
+                           unicodeobj)
 from .options import TargetOptions
 from numba.runtime import rtsys
 from . import fastmathpass
@@ -214,6 +216,8 @@ class CPUTargetOptions(TargetOptions):
         "boundcheck": bool,
         "debug": bool,
         "_nrt": bool,
+        "nrt_atomic": bool,
+        "arena": bool,
         "no_rewrites": bool,
         "no_cpython_wrapper": bool,
         "fastmath": bool,
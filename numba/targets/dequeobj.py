@@ -0,0 +1,587 @@
+"""
+Support for native double-ended queues (collections.deque).
+
+Items are stored in a ring buffer whose allocated size is a power of 2,
+so that logical index *i* lives in slot ``(head + i) & mask``.  Adding or
+removing an item at either end is O(1) (amortized for appends, as the
+buffer doubles when full); indexing is O(1) as well.
+"""
+
+from __future__ import print_function, absolute_import, division
+
+import collections
+
+from llvmlite import ir
+from numba import types, cgutils
+from numba.targets.imputils import (lower_builtin, iternext_impl, for_iter,
+                                    impl_ret_borrowed, impl_ret_new_ref,
+                                    impl_ret_untracked)
+
+
+# Initial allocated size, must be a power of 2
+MINSIZE = 8
+
+
+def get_deque_payload(context, builder, deque_type, value):
+    """
+    Given a deque value and type, get its payload structure (as a
+    reference, so that mutations are seen by all).
+    """
+    payload_type = types.DequePayload(deque_type)
+    payload = context.nrt.meminfo_data(builder, value.meminfo)
+    ptrty = context.get_data_type(payload_type).as_pointer()
+    payload = builder.bitcast(payload, ptrty)
+    return context.make_data_helper(builder, payload_type, ref=payload)
+
+
+def get_itemsize(context, deque_type):
+    """
+    Return the item size for the given deque type.
+    """
+    llty = context.get_data_type(deque_type.dtype)
+    return context.get_abi_sizeof(llty)
+
+
+def get_payload_header_size(context, deque_type):
+    """
+    Return the size of the payload struct without the inlined items.
+    """
+    payload_type = context.get_data_type(types.DequePayload(deque_type))
+    # Account for the fact that the payload struct contains one entry
+    return (context.get_abi_sizeof(payload_type)
+            - get_itemsize(context, deque_type))
+
+
+class _DequePayloadMixin(object):
+
+    @property
+    def size(self):
+        return self._payload.size
+
+    @size.setter
+    def size(self, value):
+        self._payload.size = value
+
+    @property
+    def mask(self):
+        return self._payload.mask
+
+    @mask.setter
+    def mask(self, value):
+        self._payload.mask = value
+
+    @property
+    def head(self):
+        return self._payload.head
+
+    @head.setter
+    def head(self, value):
+        self._payload.head = value
+
+    @property
+    def maxlen(self):
+        return self._payload.maxlen
+
+    @maxlen.setter
+    def maxlen(self, value):
+        self._payload.maxlen = value
+
+    @property
+    def data(self):
+        return self._payload._get_ptr_by_name('data')
+
+    def _gep(self, slot):
+        return cgutils.gep(self._builder, self.data, slot)
+
+    def slot_for(self, idx):
+        """
+        Return the ring buffer slot of the item at logical index *idx*.
+        """
+        builder = self._builder
+        return builder.and_(builder.add(self.head, idx), self.mask)
+
+    def getitem(self, idx):
+        ptr = self._gep(self.slot_for(idx))
+        data_item = self._builder.load(ptr)
+        return self._datamodel.from_data(self._builder, data_item)
+
+    def fix_index(self, idx):
+        """
+        Fix negative indices by adding the size to them.  Positive
+        indices are left untouched.
+        """
+        is_negative = self._builder.icmp_signed('<', idx,
+                                                ir.Constant(idx.type, 0))
+        wrapped_index = self._builder.add(idx, self.size)
+        return self._builder.select(is_negative, wrapped_index, idx)
+
+    def guard_index(self, idx, msg):
+        """
+        Raise an error if the index is out of bounds.
+        """
+        builder = self._builder
+        underflow = builder.icmp_signed('<', idx, ir.Constant(idx.type, 0))
+        overflow = builder.icmp_signed('>=', idx, self.size)
+        with builder.if_then(builder.or_(underflow, overflow), likely=False):
+            self._context.call_conv.return_user_exc(builder,
+                                                    IndexError, (msg,))
+
+    def incref_value(self, val):
+        "Incref an element value"
+        self._context.nrt.incref(self._builder, self.dtype, val)
+
+    def decref_value(self, val):
+        "Decref an element value"
+        self._context.nrt.decref(self._builder, self.dtype, val)
+
+
+class DequePayloadAccessor(_DequePayloadMixin):
+    """
+    A helper object to access the deque attributes given the pointer to the
+    payload type.
+    """
+    def __init__(self, context, builder, deque_type, payload_ptr):
+        self._context = context
+        self._builder = builder
+        self._ty = deque_type
+        self._datamodel = context.data_model_manager[deque_type.dtype]
+        payload_type = types.DequePayload(deque_type)
+        ptrty = context.get_data_type(payload_type).as_pointer()
+        payload_ptr = builder.bitcast(payload_ptr, ptrty)
+        self._payload = context.make_data_helper(builder, payload_type,
+                                                 ref=payload_ptr)
+
+    @property
+    def dtype(self):
+        return self._ty.dtype
+
+
+class DequeInstance(_DequePayloadMixin):
+
+    def __init__(self, context, builder, deque_type, deque_val):
+        self._context = context
+        self._builder = builder
+        self._ty = deque_type
+        self._deque = context.make_helper(builder, deque_type, deque_val)
+        self._itemsize = get_itemsize(context, deque_type)
+        self._datamodel = context.data_model_manager[deque_type.dtype]
+
+    @property
+    def dtype(self):
+        return self._ty.dtype
+
+    @property
+    def _payload(self):
+        # This cannot be cached as it can be reallocated
+        return get_deque_payload(self._context, self._builder, self._ty,
+                                 self._deque)
+
+    @property
+    def value(self):
+        return self._deque._getvalue()
+
+    @property
+    def meminfo(self):
+        return self._deque.meminfo
+
+    def _store(self, slot, val):
+        """
+        Store *val* in the given ring buffer slot, taking a new reference.
+        """
+        data_item = self._datamodel.as_data(self._builder, val)
+        self._builder.store(data_item, self._gep(slot))
+        self.incref_value(val)
+
+    def setitem(self, idx, val):
+        # Decref old data
+        self.decref_value(self.getitem(idx))
+        self._store(self.slot_for(idx), val)
+
+    def _grow_if_full(self):
+        """
+        Double the ring buffer if all its slots are used.
+        """
+        context = self._context
+        builder = self._builder
+        intp_t = self.size.type
+        one = ir.Constant(intp_t, 1)
+
+        allocated = builder.add(self.mask, one)
+        is_full = builder.icmp_signed('==', self.size, allocated)
+        with builder.if_then(is_full, likely=False):
+            new_allocated = builder.shl(allocated, one)
+            header_size = get_payload_header_size(context, self._ty)
+            allocsize, ovf = cgutils.muladd_with_overflow(
+                builder, new_allocated,
+                ir.Constant(intp_t, self._itemsize),
+                ir.Constant(intp_t, header_size))
+            with builder.if_then(ovf, likely=False):
+                context.call_conv.return_user_exc(builder, MemoryError,
+                                                  ("cannot resize deque",))
+            ptr = context.nrt.meminfo_varsize_realloc(builder, self.meminfo,
+                                                      size=allocsize)
+            cgutils.guard_memory_error(context, builder, ptr,
+                                       "cannot resize deque")
+            # The items in slots [head, allocated) keep their slots.  Those
+            # which wrapped around to [0, head) move to [allocated,
+            # allocated + head), right after the others.
+            head = self.head
+            with builder.if_then(cgutils.is_not_null(builder, head)):
+                cgutils.raw_memcpy(builder, self._gep(allocated),
+                                   self._gep(ir.Constant(intp_t, 0)),
+                                   head, self._itemsize)
+            self.mask = builder.sub(new_allocated, one)
+
+    def _is_bounded_full(self):
+        """
+        Whether the deque has reached its maxlen (never true if unbounded).
+        """
+        return self._builder.icmp_signed('==', self.size, self.maxlen)
+
+    def _has_room(self):
+        """
+        Whether the deque can store any item at all (i.e. maxlen != 0).
+        """
+        return cgutils.is_not_null(self._builder, self.maxlen)
+
+    def append(self, val):
+        builder = self._builder
+        with builder.if_then(self._is_bounded_full(), likely=False):
+            # Make room by discarding the leftmost item (if any)
+            with builder.if_then(self._has_room()):
+                self.decref_value(self.popleft())
+        with builder.if_then(self._has_room(), likely=True):
+            self._grow_if_full()
+            size = self.size
+            self._store(self.slot_for(size), val)
+            self.size = builder.add(size, ir.Constant(size.type, 1))
+
+    def appendleft(self, val):
+        builder = self._builder
+        with builder.if_then(self._is_bounded_full(), likely=False):
+            # Make room by discarding the rightmost item (if any)
+            with builder.if_then(self._has_room()):
+                self.decref_value(self.pop())
+        with builder.if_then(self._has_room(), likely=True):
+            self._grow_if_full()
+            one = ir.Constant(self.size.type, 1)
+            self.head = builder.and_(builder.sub(self.head, one), self.mask)
+            self._store(self.head, val)
+            self.size = builder.add(self.size, one)
+
+    def pop(self):
+        """
+        Remove the rightmost item and return it (the reference is
+        transferred to the caller).  The deque must be non-empty.
+        """
+        builder = self._builder
+        size = builder.sub(self.size, ir.Constant(self.size.type, 1))
+        item = self.getitem(size)
+        self.size = size
+        return item
+
+    def popleft(self):
+        """
+        Remove the leftmost item and return it (the reference is
+        transferred to the caller).  The deque must be non-empty.
+        """
+        builder = self._builder
+        one = ir.Constant(self.size.type, 1)
+        item = self.getitem(ir.Constant(self.size.type, 0))
+        self.head = builder.and_(builder.add(self.head, one), self.mask)
+        self.size = builder.sub(self.size, one)
+        return item
+
+    def guard_not_empty(self, msg):
+        """
+        Raise an IndexError if the deque is empty.
+        """
+        builder = self._builder
+        with builder.if_then(cgutils.is_null(builder, self.size),
+                             likely=False):
+            self._context.call_conv.return_user_exc(builder,
+                                                    IndexError, (msg,))
+
+    def clear(self):
+        builder = self._builder
+        with cgutils.for_range(builder, self.size) as loop:
+            self.decref_value(self.getitem(loop.index))
+        zero = ir.Constant(self.size.type, 0)
+        self.size = zero
+        self.head = zero
+
+    @classmethod
+    def allocate_ex(cls, context, builder, deque_type, maxlen):
+        """
+        Allocate a DequeInstance with its storage.  *maxlen* is the
+        maximum size, or -1 for an unbounded deque.
+        Return a (ok, instance) tuple where *ok* is a LLVM boolean and
+        *instance* is a DequeInstance object (the object's contents are
+        only valid when *ok* is true).
+        """
+        intp_t = context.get_value_type(types.intp)
+        itemsize = get_itemsize(context, deque_type)
+        header_size = get_payload_header_size(context, deque_type)
+
+        ok = cgutils.alloca_once_value(builder, cgutils.true_bit)
+        self = cls(context, builder, deque_type, None)
+
+        allocsize = ir.Constant(intp_t, header_size + MINSIZE * itemsize)
+        meminfo = context.nrt.meminfo_new_varsize_dtor(
+            builder, size=allocsize, dtor=self.get_dtor())
+        with builder.if_else(cgutils.is_null(builder, meminfo),
+                             likely=False) as (if_error, if_ok):
+            with if_error:
+                builder.store(cgutils.false_bit, ok)
+            with if_ok:
+                self._deque.meminfo = meminfo
+                zero = ir.Constant(intp_t, 0)
+                self.size = zero
+                self.head = zero
+                self.mask = ir.Constant(intp_t, MINSIZE - 1)
+                self.maxlen = maxlen
+
+        return builder.load(ok), self
+
+    @classmethod
+    def allocate(cls, context, builder, deque_type, maxlen):
+        """
+        Allocate a DequeInstance with its storage.  Same as allocate_ex(),
+        but return an initialized *instance*.  If allocation failed,
+        control is transferred to the caller using the target's current
+        call convention.
+        """
+        ok, self = cls.allocate_ex(context, builder, deque_type, maxlen)
+        with builder.if_then(builder.not_(ok), likely=False):
+            context.call_conv.return_user_exc(builder, MemoryError,
+                                              ("cannot allocate deque",))
+        return self
+
+    def define_dtor(self):
+        "Define the destructor if not already defined"
+        context = self._context
+        builder = self._builder
+        mod = builder.module
+        # Declare dtor
+        fnty = ir.FunctionType(ir.VoidType(), [cgutils.voidptr_t])
+        fn = mod.get_or_insert_function(
+            fnty, name='.dtor.deque.{}'.format(self.dtype))
+        if not fn.is_declaration:
+            # End early if the dtor is already defined
+            return fn
+        fn.linkage = 'internal'
+        # Populate the dtor
+        builder = ir.IRBuilder(fn.append_basic_block())
+        base_ptr = fn.args[0]  # void*
+
+        # get payload
+        payload = DequePayloadAccessor(context, builder, self._ty, base_ptr)
+
+        # Loop over all items, in ring order, to decref
+        with cgutils.for_range(builder, payload.size) as loop:
+            val = payload.getitem(loop.index)
+            context.nrt.decref(builder, self.dtype, val)
+        builder.ret_void()
+        return fn
+
+    def get_dtor(self):
+        """"Get the element dtor function pointer as void pointer.
+
+        It's safe to be called multiple times.
+        """
+        # Define and set the Dtor
+        dtor = self.define_dtor()
+        dtor_fnptr = self._builder.bitcast(dtor, cgutils.voidptr_t)
+        return dtor_fnptr
+
+
+class DequeIterInstance(_DequePayloadMixin):
+
+    def __init__(self, context, builder, iter_type, iter_val):
+        self._context = context
+        self._builder = builder
+        self._ty = iter_type
+        self._iter = context.make_helper(builder, iter_type, iter_val)
+        self._datamodel = context.data_model_manager[iter_type.yield_type]
+
+    @classmethod
+    def from_deque(cls, context, builder, iter_type, deque_val):
+        deque_inst = DequeInstance(context, builder, iter_type.container,
+                                   deque_val)
+        self = cls(context, builder, iter_type, None)
+        index = context.get_constant(types.intp, 0)
+        self._iter.index = cgutils.alloca_once_value(builder, index)
+        self._iter.meminfo = deque_inst.meminfo
+        return self
+
+    @property
+    def _payload(self):
+        # This cannot be cached as it can be reallocated
+        return get_deque_payload(self._context, self._builder,
+                                 self._ty.container, self._iter)
+
+    @property
+    def value(self):
+        return self._iter._getvalue()
+
+    @property
+    def index(self):
+        return self._builder.load(self._iter.index)
+
+    @index.setter
+    def index(self, value):
+        self._builder.store(value, self._iter.index)
+
+
+#-------------------------------------------------------------------------------
+# Constructor
+
+@lower_builtin(collections.deque, types.Any, types.Any)
+def deque_constructor(context, builder, sig, args):
+    deque_type = sig.return_type
+    items_type, maxlen_type = sig.args
+    items, maxlen = args
+
+    if isinstance(maxlen_type, types.NoneType):
+        maxlen = context.get_constant(types.intp, -1)
+    else:
+        maxlen = context.cast(builder, maxlen, maxlen_type, types.intp)
+        with builder.if_then(cgutils.is_neg_int(builder, maxlen),
+                             likely=False):
+            context.call_conv.return_user_exc(
+                builder, ValueError, ("maxlen must be non-negative",))
+
+    inst = DequeInstance.allocate(context, builder, deque_type, maxlen)
+    if not isinstance(items_type, types.NoneType):
+        with for_iter(context, builder, items_type, items) as loop:
+            value = context.cast(builder, loop.value,
+                                 items_type.iterator_type.yield_type,
+                                 deque_type.dtype)
+            inst.append(value)
+
+    return impl_ret_new_ref(context, builder, deque_type, inst.value)
+
+
+#-------------------------------------------------------------------------------
+# Various operations
+
+@lower_builtin(len, types.Deque)
+def deque_len(context, builder, sig, args):
+    inst = DequeInstance(context, builder, sig.args[0], args[0])
+    return impl_ret_untracked(context, builder, sig.return_type, inst.size)
+
+@lower_builtin(bool, types.Deque)
+def deque_bool(context, builder, sig, args):
+    inst = DequeInstance(context, builder, sig.args[0], args[0])
+    res = cgutils.is_not_null(builder, inst.size)
+    return impl_ret_untracked(context, builder, sig.return_type, res)
+
+@lower_builtin("in", types.Any, types.Deque)
+def in_deque(context, builder, sig, args):
+    def deque_contains_impl(value, d):
+        for elem in d:
+            if elem == value:
+                return True
+        return False
+
+    return context.compile_internal(builder, deque_contains_impl, sig, args)
+
+@lower_builtin('getiter', types.Deque)
+def getiter_deque(context, builder, sig, args):
+    inst = DequeIterInstance.from_deque(context, builder, sig.return_type,
+                                        args[0])
+    return impl_ret_borrowed(context, builder, sig.return_type, inst.value)
+
+@lower_builtin('iternext', types.DequeIter)
+@iternext_impl
+def iternext_dequeiter(context, builder, sig, args, result):
+    inst = DequeIterInstance(context, builder, sig.args[0], args[0])
+
+    index = inst.index
+    is_valid = builder.icmp_signed('<', index, inst.size)
+    result.set_valid(is_valid)
+
+    with builder.if_then(is_valid):
+        result.yield_(inst.getitem(index))
+        inst.index = builder.add(index, context.get_constant(types.intp, 1))
+
+@lower_builtin('getitem', types.Deque, types.Integer)
+def getitem_deque(context, builder, sig, args):
+    inst = DequeInstance(context, builder, sig.args[0], args[0])
+    index = context.cast(builder, args[1], sig.args[1], types.intp)
+
+    index = inst.fix_index(index)
+    inst.guard_index(index, msg="deque index out of range")
+    result = inst.getitem(index)
+
+    return impl_ret_borrowed(context, builder, sig.return_type, result)
+
+@lower_builtin('setitem', types.Deque, types.Integer, types.Any)
+def setitem_deque(context, builder, sig, args):
+    inst = DequeInstance(context, builder, sig.args[0], args[0])
+    index = context.cast(builder, args[1], sig.args[1], types.intp)
+    value = context.cast(builder, args[2], sig.args[2], inst.dtype)
+
+    index = inst.fix_index(index)
+    inst.guard_index(index, msg="deque index out of range")
+    inst.setitem(index, value)
+
+    return context.get_dummy_value()
+
+
+#-------------------------------------------------------------------------------
+# Methods
+
+@lower_builtin("deque.append", types.Deque, types.Any)
+def deque_append(context, builder, sig, args):
+    inst = DequeInstance(context, builder, sig.args[0], args[0])
+    item = context.cast(builder, args[1], sig.args[1], inst.dtype)
+    inst.append(item)
+    return context.get_dummy_value()
+
+@lower_builtin("deque.appendleft", types.Deque, types.Any)
+def deque_appendleft(context, builder, sig, args):
+    inst = DequeInstance(context, builder, sig.args[0], args[0])
+    item = context.cast(builder, args[1], sig.args[1], inst.dtype)
+    inst.appendleft(item)
+    return context.get_dummy_value()
+
+@lower_builtin("deque.extend", types.Deque, types.IterableType)
+def deque_extend(context, builder, sig, args):
+    inst = DequeInstance(context, builder, sig.args[0], args[0])
+    items_type = sig.args[1]
+    with for_iter(context, builder, items_type, args[1]) as loop:
+        value = context.cast(builder, loop.value,
+                             items_type.iterator_type.yield_type, inst.dtype)
+        inst.append(value)
+    return context.get_dummy_value()
+
+@lower_builtin("deque.extendleft", types.Deque, types.IterableType)
+def deque_extendleft(context, builder, sig, args):
+    inst = DequeInstance(context, builder, sig.args[0], args[0])
+    items_type = sig.args[1]
+    with for_iter(context, builder, items_type, args[1]) as loop:
+        value = context.cast(builder, loop.value,
+                             items_type.iterator_type.yield_type, inst.dtype)
+        inst.appendleft(value)
+    return context.get_dummy_value()
+
+@lower_builtin("deque.clear", types.Deque)
+def deque_clear(context, builder, sig, args):
+    inst = DequeInstance(context, builder, sig.args[0], args[0])
+    inst.clear()
+    return context.get_dummy_value()
+
+@lower_builtin("deque.pop", types.Deque)
+def deque_pop(context, builder, sig, args):
+    inst = DequeInstance(context, builder, sig.args[0], args[0])
+    inst.guard_not_empty("pop from an empty deque")
+    item = inst.pop()
+    return impl_ret_new_ref(context, builder, sig.return_type, item)
+
+@lower_builtin("deque.popleft", types.Deque)
+def deque_popleft(context, builder, sig, args):
+    inst = DequeInstance(context, builder, sig.args[0], args[0])
+    inst.guard_not_empty("pop from an empty deque")
+    item = inst.popleft()
+    return impl_ret_new_ref(context, builder, sig.return_type, item)
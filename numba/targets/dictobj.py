@@ -0,0 +1,386 @@
+"""
+Support for native typed dictionaries.
+
+The hash table is the same open-addressing table as used by sets (see
+setobj.py), with a value stored next to each key.
+"""
+
+from __future__ import print_function, absolute_import, division
+
+from llvmlite import ir
+from numba import types, cgutils
+from numba.targets.imputils import (lower_builtin, iternext_impl,
+                                    impl_ret_borrowed, impl_ret_new_ref)
+from .setobj import _SetPayload, SetInstance, get_hash_value
+
+
+class _DictPayload(_SetPayload):
+
+    payload_class = types.DictPayload
+    entry_class = types.DictEntry
+
+
+class DictInstance(SetInstance):
+
+    payload_class = _DictPayload
+
+    @property
+    def key_type(self):
+        return self._ty.key_type
+
+    @property
+    def value_type(self):
+        return self._ty.value_type
+
+    def set_dirty(self, val):
+        # Typed dicts are never reflected
+        pass
+
+    def incref_entry(self, key, value):
+        nrt = self._context.nrt
+        nrt.incref(self._builder, self.key_type, key)
+        nrt.incref(self._builder, self.value_type, value)
+
+    def decref_entry(self, key, value):
+        nrt = self._context.nrt
+        nrt.decref(self._builder, self.key_type, key)
+        nrt.decref(self._builder, self.value_type, value)
+
+    def _copy_entry(self, payload, entry):
+        found, i = payload._lookup(entry.key, entry.hash, for_insert=True)
+        new_entry = payload.get_entry(i)
+        new_entry.value = entry.value
+        self._add_entry(payload, new_entry, entry.key, entry.hash,
+                        do_resize=False)
+
+    def lookup(self, key):
+        """
+        Look up *key*.  Return a (found, entry) tuple; *entry* is only
+        valid when *found* is true.
+        """
+        context = self._context
+        builder = self._builder
+
+        payload = self.payload
+        h = get_hash_value(context, builder, self.key_type, key)
+        found, i = payload._lookup(key, h)
+        return found, payload.get_entry(i)
+
+    def setitem(self, key, value):
+        """
+        Insert or replace the value for *key*.  New references to *key*
+        and *value* are taken.
+        """
+        context = self._context
+        builder = self._builder
+
+        payload = self.payload
+        h = get_hash_value(context, builder, self.key_type, key)
+        found, i = payload._lookup(key, h, for_insert=True)
+        entry = payload.get_entry(i)
+
+        with builder.if_then(found):
+            # Release the replaced value (the existing key is kept)
+            context.nrt.decref(builder, self.value_type, entry.value)
+        with builder.if_then(builder.not_(found)):
+            context.nrt.incref(builder, self.key_type, key)
+        context.nrt.incref(builder, self.value_type, value)
+        # The value must be written before the table can be resized
+        entry.value = value
+        with builder.if_then(builder.not_(found)):
+            self._add_entry(payload, entry, key, h)
+
+    def delitem(self, key):
+        """
+        Remove *key* and release its entry.  Return whether it was found.
+        """
+        builder = self._builder
+
+        found, entry = self.lookup(key)
+        with builder.if_then(found):
+            self.decref_entry(entry.key, entry.value)
+            self._remove_entry(self.payload, entry)
+        return found
+
+    def pop(self, key):
+        """
+        Remove *key* and return a (found, value) tuple.  The reference
+        to *value* is transferred to the caller.
+        """
+        context = self._context
+        builder = self._builder
+
+        found, entry = self.lookup(key)
+        value = entry.value
+        with builder.if_then(found):
+            context.nrt.decref(builder, self.key_type, entry.key)
+            self._remove_entry(self.payload, entry)
+        return found, value
+
+    def clear(self):
+        with self.payload._iterate() as loop:
+            entry = loop.entry
+            self.decref_entry(entry.key, entry.value)
+        super(DictInstance, self).clear()
+
+    def copy(self):
+        """
+        Return a copy of this dict.
+        """
+        other = super(DictInstance, self).copy()
+        with other.payload._iterate() as loop:
+            entry = loop.entry
+            self.incref_entry(entry.key, entry.value)
+        return other
+
+    def _new_meminfo(self, allocsize):
+        context = self._context
+        builder = self._builder
+        dmm = context.data_model_manager
+        if not (dmm[self.key_type].contains_nrt_meminfo() or
+                dmm[self.value_type].contains_nrt_meminfo()):
+            return super(DictInstance, self)._new_meminfo(allocsize)
+        return context.nrt.meminfo_new_varsize_dtor(builder, size=allocsize,
+                                                    dtor=self.get_dtor())
+
+    def define_dtor(self):
+        "Define the destructor if not already defined"
+        context = self._context
+        mod = self._builder.module
+        # Declare dtor
+        fnty = ir.FunctionType(ir.VoidType(), [cgutils.voidptr_t])
+        fn = mod.get_or_insert_function(
+            fnty, name='.dtor.dict.{}.{}'.format(self.key_type,
+                                                 self.value_type))
+        if not fn.is_declaration:
+            # End early if the dtor is already defined
+            return fn
+        fn.linkage = 'internal'
+        # Populate the dtor
+        builder = ir.IRBuilder(fn.append_basic_block())
+        payload = _DictPayload(context, builder, self._ty, fn.args[0])
+
+        # Loop over all entries to decref
+        with payload._iterate() as loop:
+            entry = loop.entry
+            context.nrt.decref(builder, self.key_type, entry.key)
+            context.nrt.decref(builder, self.value_type, entry.value)
+        builder.ret_void()
+        return fn
+
+    def get_dtor(self):
+        """"Get the entries dtor function pointer as void pointer.
+
+        It's safe to be called multiple times.
+        """
+        dtor = self.define_dtor()
+        return self._builder.bitcast(dtor, cgutils.voidptr_t)
+
+
+class DictIterInstance(object):
+
+    def __init__(self, context, builder, iter_type, iter_val):
+        self._context = context
+        self._builder = builder
+        self._ty = iter_type
+        self._iter = context.make_helper(builder, iter_type, iter_val)
+        ptr = self._context.nrt.meminfo_data(builder, self.meminfo)
+        self._payload = _DictPayload(context, builder, self._ty.container,
+                                     ptr)
+
+    @classmethod
+    def from_dict(cls, context, builder, iter_type, dict_val):
+        dict_inst = DictInstance(context, builder, iter_type.container,
+                                 dict_val)
+        self = cls(context, builder, iter_type, None)
+        index = context.get_constant(types.intp, 0)
+        self._iter.index = cgutils.alloca_once_value(builder, index)
+        self._iter.meminfo = dict_inst.meminfo
+        return self
+
+    @property
+    def value(self):
+        return self._iter._getvalue()
+
+    @property
+    def meminfo(self):
+        return self._iter.meminfo
+
+    @property
+    def index(self):
+        return self._builder.load(self._iter.index)
+
+    @index.setter
+    def index(self, value):
+        self._builder.store(value, self._iter.index)
+
+    def iternext(self, result):
+        index = self.index
+        payload = self._payload
+        one = ir.Constant(index.type, 1)
+
+        result.set_exhausted()
+
+        with payload._iterate(start=index) as loop:
+            # An entry was found
+            entry = loop.entry
+            kind = self._ty.kind
+            if kind == 'keys':
+                value = entry.key
+            elif kind == 'values':
+                value = entry.value
+            else:
+                value = self._context.make_tuple(self._builder,
+                                                 self._ty.yield_type,
+                                                 (entry.key, entry.value))
+            result.set_valid()
+            result.yield_(value)
+            self.index = self._builder.add(loop.index, one)
+            loop.do_break()
+
+
+#-------------------------------------------------------------------------------
+# Constructors
+
+@lower_builtin(dict)
+def dict_empty_constructor(context, builder, sig, args):
+    dict_type = sig.return_type
+    inst = DictInstance.allocate(context, builder, dict_type)
+    return impl_ret_new_ref(context, builder, dict_type, inst.value)
+
+
+#-------------------------------------------------------------------------------
+# Various operations
+
+@lower_builtin(len, types.DictType)
+def dict_len(context, builder, sig, args):
+    inst = DictInstance(context, builder, sig.args[0], args[0])
+    return inst.get_size()
+
+@lower_builtin("in", types.Any, types.DictType)
+def in_dict(context, builder, sig, args):
+    inst = DictInstance(context, builder, sig.args[1], args[1])
+    return inst.contains(args[0])
+
+@lower_builtin('getiter', types.DictType)
+def getiter_dict(context, builder, sig, args):
+    inst = DictIterInstance.from_dict(context, builder, sig.return_type,
+                                      args[0])
+    return impl_ret_borrowed(context, builder, sig.return_type, inst.value)
+
+@lower_builtin('iternext', types.DictIter)
+@iternext_impl
+def iternext_dictiter(context, builder, sig, args, result):
+    inst = DictIterInstance(context, builder, sig.args[0], args[0])
+    inst.iternext(result)
+
+@lower_builtin('getitem', types.DictType, types.Any)
+def getitem_dict(context, builder, sig, args):
+    inst = DictInstance(context, builder, sig.args[0], args[0])
+    found, entry = inst.lookup(args[1])
+    with builder.if_then(builder.not_(found), likely=False):
+        context.call_conv.return_user_exc(builder, KeyError,
+                                          ("key not in dict",))
+    return impl_ret_borrowed(context, builder, sig.return_type, entry.value)
+
+@lower_builtin('setitem', types.DictType, types.Any, types.Any)
+def setitem_dict(context, builder, sig, args):
+    inst = DictInstance(context, builder, sig.args[0], args[0])
+    inst.setitem(args[1], args[2])
+    return context.get_dummy_value()
+
+@lower_builtin('delitem', types.DictType, types.Any)
+def delitem_dict(context, builder, sig, args):
+    inst = DictInstance(context, builder, sig.args[0], args[0])
+    found = inst.delitem(args[1])
+    with builder.if_then(builder.not_(found), likely=False):
+        context.call_conv.return_user_exc(builder, KeyError,
+                                          ("key not in dict",))
+    return context.get_dummy_value()
+
+
+#-------------------------------------------------------------------------------
+# Methods
+
+@lower_builtin("dict.get", types.DictType, types.Any)
+def dict_get(context, builder, sig, args):
+    inst = DictInstance(context, builder, sig.args[0], args[0])
+    found, entry = inst.lookup(args[1])
+    optty = sig.return_type
+    res = cgutils.alloca_once_value(builder,
+                                    context.make_optional_none(builder,
+                                                               optty.type))
+    with builder.if_then(found):
+        value = entry.value
+        context.nrt.incref(builder, optty.type, value)
+        builder.store(context.make_optional_value(builder, optty.type, value),
+                      res)
+    return impl_ret_new_ref(context, builder, optty, builder.load(res))
+
+@lower_builtin("dict.get", types.DictType, types.Any, types.Any)
+def dict_get_default(context, builder, sig, args):
+    inst = DictInstance(context, builder, sig.args[0], args[0])
+    found, entry = inst.lookup(args[1])
+    res = builder.select(found, entry.value, args[2])
+    return impl_ret_borrowed(context, builder, sig.return_type, res)
+
+@lower_builtin("dict.pop", types.DictType, types.Any)
+def dict_pop(context, builder, sig, args):
+    inst = DictInstance(context, builder, sig.args[0], args[0])
+    found, value = inst.pop(args[1])
+    with builder.if_then(builder.not_(found), likely=False):
+        context.call_conv.return_user_exc(builder, KeyError,
+                                          ("key not in dict",))
+    return impl_ret_new_ref(context, builder, sig.return_type, value)
+
+@lower_builtin("dict.pop", types.DictType, types.Any, types.Any)
+def dict_pop_default(context, builder, sig, args):
+    inst = DictInstance(context, builder, sig.args[0], args[0])
+    found, value = inst.pop(args[1])
+    default = args[2]
+    with builder.if_then(builder.not_(found)):
+        context.nrt.incref(builder, sig.return_type, default)
+    res = builder.select(found, value, default)
+    return impl_ret_new_ref(context, builder, sig.return_type, res)
+
+@lower_builtin("dict.setdefault", types.DictType, types.Any, types.Any)
+def dict_setdefault(context, builder, sig, args):
+    inst = DictInstance(context, builder, sig.args[0], args[0])
+    key, default = args[1:]
+    found, entry = inst.lookup(key)
+    res = cgutils.alloca_once_value(builder, default)
+    with builder.if_else(found) as (if_found, if_not_found):
+        with if_found:
+            builder.store(entry.value, res)
+        with if_not_found:
+            inst.setitem(key, default)
+    return impl_ret_borrowed(context, builder, sig.return_type,
+                             builder.load(res))
+
+@lower_builtin("dict.clear", types.DictType)
+def dict_clear(context, builder, sig, args):
+    inst = DictInstance(context, builder, sig.args[0], args[0])
+    inst.clear()
+    return context.get_dummy_value()
+
+@lower_builtin("dict.copy", types.DictType)
+def dict_copy(context, builder, sig, args):
+    inst = DictInstance(context, builder, sig.args[0], args[0])
+    other = inst.copy()
+    return impl_ret_new_ref(context, builder, sig.return_type, other.value)
+
+@lower_builtin("dict.keys", types.DictType)
+@lower_builtin("dict.values", types.DictType)
+@lower_builtin("dict.items", types.DictType)
+def dict_iter_method(context, builder, sig, args):
+    inst = DictIterInstance.from_dict(context, builder, sig.return_type,
+                                      args[0])
+    return impl_ret_borrowed(context, builder, sig.return_type, inst.value)
+
+@lower_builtin('is', types.DictType, types.DictType)
+def dict_is(context, builder, sig, args):
+    a = DictInstance(context, builder, sig.args[0], args[0])
+    b = DictInstance(context, builder, sig.args[1], args[1])
+    ma = builder.ptrtoint(a.meminfo, cgutils.intp_t)
+    mb = builder.ptrtoint(b.meminfo, cgutils.intp_t)
+    return builder.icmp_signed('==', ma, mb)
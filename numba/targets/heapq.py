@@ -0,0 +1,194 @@
+"""
+Implementation of the heapq module functions, on reflected and typed lists.
+"""
+
+from __future__ import print_function, absolute_import, division
+
+import heapq as hq
+
+from numba import types
+from numba.errors import TypingError
+from numba.extending import overload, register_jitable
+
+
+# The sift functions are the same as CPython's heapq.py.  Items are only
+# compared with "<", so that tuples are ordered lexicographically.
+
+@register_jitable
+def _siftdown(heap, startpos, pos):
+    newitem = heap[pos]
+    while pos > startpos:
+        parentpos = (pos - 1) >> 1
+        parent = heap[parentpos]
+        if newitem < parent:
+            heap[pos] = parent
+            pos = parentpos
+            continue
+        break
+    heap[pos] = newitem
+
+@register_jitable
+def _siftup(heap, pos):
+    endpos = len(heap)
+    startpos = pos
+    newitem = heap[pos]
+    # Bubble up the smaller child until hitting a leaf
+    childpos = 2 * pos + 1
+    while childpos < endpos:
+        rightpos = childpos + 1
+        if rightpos < endpos and not heap[childpos] < heap[rightpos]:
+            childpos = rightpos
+        heap[pos] = heap[childpos]
+        pos = childpos
+        childpos = 2 * pos + 1
+    heap[pos] = newitem
+    _siftdown(heap, startpos, pos)
+
+@register_jitable
+def _heapify(heap):
+    for i in range(len(heap) // 2 - 1, -1, -1):
+        _siftup(heap, i)
+
+@register_jitable
+def _siftdown_max(heap, startpos, pos):
+    newitem = heap[pos]
+    while pos > startpos:
+        parentpos = (pos - 1) >> 1
+        parent = heap[parentpos]
+        if parent < newitem:
+            heap[pos] = parent
+            pos = parentpos
+            continue
+        break
+    heap[pos] = newitem
+
+@register_jitable
+def _siftup_max(heap, pos):
+    endpos = len(heap)
+    startpos = pos
+    newitem = heap[pos]
+    childpos = 2 * pos + 1
+    while childpos < endpos:
+        rightpos = childpos + 1
+        if rightpos < endpos and not heap[rightpos] < heap[childpos]:
+            childpos = rightpos
+        heap[pos] = heap[childpos]
+        pos = childpos
+        childpos = 2 * pos + 1
+    heap[pos] = newitem
+    _siftdown_max(heap, startpos, pos)
+
+@register_jitable
+def _heapify_max(heap):
+    for i in range(len(heap) // 2 - 1, -1, -1):
+        _siftup_max(heap, i)
+
+
+def _check_heap(heap):
+    if not isinstance(heap, types.List):
+        raise TypingError("heap argument must be a list")
+
+def _check_n(n):
+    if not isinstance(n, types.Integer):
+        raise TypingError("n argument must be an integer")
+
+
+@overload(hq.heapify)
+def heapify(heap):
+    _check_heap(heap)
+
+    def heapify_impl(heap):
+        _heapify(heap)
+
+    return heapify_impl
+
+@overload(hq.heappush)
+def heappush(heap, item):
+    _check_heap(heap)
+
+    def heappush_impl(heap, item):
+        heap.append(item)
+        _siftdown(heap, 0, len(heap) - 1)
+
+    return heappush_impl
+
+@overload(hq.heappop)
+def heappop(heap):
+    _check_heap(heap)
+
+    def heappop_impl(heap):
+        lastelt = heap.pop()
+        if heap:
+            returnitem = heap[0]
+            heap[0] = lastelt
+            _siftup(heap, 0)
+            return returnitem
+        return lastelt
+
+    return heappop_impl
+
+@overload(hq.heapreplace)
+def heapreplace(heap, item):
+    _check_heap(heap)
+
+    def heapreplace_impl(heap, item):
+        if not heap:
+            raise IndexError("index out of range")
+        returnitem = heap[0]
+        heap[0] = item
+        _siftup(heap, 0)
+        return returnitem
+
+    return heapreplace_impl
+
+
+# nsmallest() and nlargest() keep the best n items seen so far in a heap
+# whose root is the worst of them, so that each remaining item is
+# compared once with the root and the heap is only updated for better
+# items.  This is O(len(iterable) * log(n)) instead of sorting everything.
+
+@overload(hq.nsmallest)
+def nsmallest(n, iterable):
+    _check_n(n)
+    if not isinstance(iterable, types.IterableType):
+        raise TypingError("iterable argument must be iterable")
+
+    def nsmallest_impl(n, iterable):
+        heap = []
+        if n <= 0:
+            return heap
+        for x in iterable:
+            if len(heap) < n:
+                heap.append(x)
+                if len(heap) == n:
+                    _heapify_max(heap)
+            elif x < heap[0]:
+                heap[0] = x
+                _siftup_max(heap, 0)
+        heap.sort()
+        return heap
+
+    return nsmallest_impl
+
+@overload(hq.nlargest)
+def nlargest(n, iterable):
+    _check_n(n)
+    if not isinstance(iterable, types.IterableType):
+        raise TypingError("iterable argument must be iterable")
+
+    def nlargest_impl(n, iterable):
+        heap = []
+        if n <= 0:
+            return heap
+        for x in iterable:
+            if len(heap) < n:
+                heap.append(x)
+                if len(heap) == n:
+                    _heapify(heap)
+            elif heap[0] < x:
+                heap[0] = x
+                _siftup(heap, 0)
+        heap.sort(reverse=True)
+        return heap
+
+    return nlargest_impl
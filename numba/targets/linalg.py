@@ -517,6 +517,198 @@ def dot_2_vv(context, builder, sig, args, conjugate=False):
     return builder.load(out)
 
 
+# Block size (in elements along each dimension) of the native
+# matrix * matrix kernel used for dtypes BLAS doesn't support
+_native_mm_block = 64
+
+# Stacked matrix products where each product needs at most this many
+# multiply-adds are computed with plain loops instead of calling BLAS
+_small_matmul_size = 512
+
+
+@register_jitable
+def _dot_vv_native(a, b, zero):
+    s = zero
+    for i in range(a.shape[0]):
+        s += a[i] * b[i]
+    return s
+
+
+@register_jitable
+def _dot_mv_native(a, b, out, zero):
+    m, n = a.shape
+    for i in range(m):
+        s = zero
+        for j in range(n):
+            s += a[i, j] * b[j]
+        out[i] = s
+
+
+@register_jitable
+def _dot_vm_native(a, b, out):
+    m, n = b.shape
+    out[:] = 0
+    for i in range(m):
+        ai = a[i]
+        for j in range(n):
+            out[j] += ai * b[i, j]
+
+
+@register_jitable
+def _dot_mm_native(a, b, out):
+    m, k = a.shape
+    n = b.shape[1]
+    out[:, :] = 0
+    # i-l-j loop order on cache sized blocks, the inner loop walks rows
+    # of b and out contiguously
+    bs = _native_mm_block
+    for i0 in range(0, m, bs):
+        i1 = min(i0 + bs, m)
+        for l0 in range(0, k, bs):
+            l1 = min(l0 + bs, k)
+            for j0 in range(0, n, bs):
+                j1 = min(j0 + bs, n)
+                for i in range(i0, i1):
+                    for l in range(l0, l1):
+                        ail = a[i, l]
+                        for j in range(j0, j1):
+                            out[i, j] += ail * b[l, j]
+
+
+@register_jitable
+def _dot_mm_small(a, b, out, zero):
+    m, k = a.shape
+    n = b.shape[1]
+    for i in range(m):
+        for j in range(n):
+            s = zero
+            for l in range(k):
+                s += a[i, l] * b[l, j]
+            out[i, j] = s
+
+
+@register_jitable
+def _dot_mm_blas(a, b, out):
+    np.dot(a, b, out)
+
+
+@register_jitable
+def _stack_item(a, p):
+    return a[p]
+
+
+@register_jitable
+def _stack_self(a, p):
+    return a
+
+
+def dot_2_native(context, builder, sig, args):
+    """
+    np.dot(a, b) and a @ b for dtypes not supported by BLAS (integers),
+    using native loops.
+    """
+    aty, bty = sig.args
+    dtype = aty.dtype
+    zero = np_support.as_dtype(dtype).type(0)
+    ndims = [aty.ndim, bty.ndim]
+
+    if ndims == [2, 2]:
+        def dot_impl(a, b):
+            m, k = a.shape
+            _k, n = b.shape
+            if k != _k:
+                raise ValueError("incompatible array sizes for np.dot(a, b) "
+                                 "(matrix * matrix)")
+            out = np.empty((m, n), a.dtype)
+            _dot_mm_native(a, b, out)
+            return out
+    elif ndims == [2, 1]:
+        def dot_impl(a, b):
+            m, n = a.shape
+            _n, = b.shape
+            if n != _n:
+                raise ValueError("incompatible array sizes for np.dot(a, b) "
+                                 "(matrix * vector)")
+            out = np.empty((m, ), a.dtype)
+            _dot_mv_native(a, b, out, zero)
+            return out
+    elif ndims == [1, 2]:
+        def dot_impl(a, b):
+            m, = a.shape
+            _m, n = b.shape
+            if m != _m:
+                raise ValueError("incompatible array sizes for np.dot(a, b) "
+                                 "(vector * matrix)")
+            out = np.empty((n, ), a.dtype)
+            _dot_vm_native(a, b, out)
+            return out
+    elif ndims == [1, 1]:
+        def dot_impl(a, b):
+            m, = a.shape
+            n, = b.shape
+            if m != n:
+                raise ValueError("incompatible array sizes for np.dot(a, b) "
+                                 "(vector * vector)")
+            return _dot_vv_native(a, b, zero)
+    else:
+        assert 0
+
+    res = context.compile_internal(builder, dot_impl, sig, args)
+    if sig.return_type == dtype:
+        return impl_ret_untracked(context, builder, sig.return_type, res)
+    return impl_ret_new_ref(context, builder, sig.return_type, res)
+
+
+def matmul_stacked(context, builder, sig, args):
+    """
+    a @ b and np.matmul(a, b) where a or b is a 3-D stack of matrices.
+    A 2-D operand is broadcast against the stack, as are stacks of size 1.
+    Small matrices are multiplied with plain loops as the BLAS call overhead
+    would dominate.
+    """
+    aty, bty = sig.args
+    dtype = sig.return_type.dtype
+    zero = np_support.as_dtype(dtype).type(0)
+    a_stacked = aty.ndim == 3
+    b_stacked = bty.ndim == 3
+    get_a = _stack_item if a_stacked else _stack_self
+    get_b = _stack_item if b_stacked else _stack_self
+    # items of C-contiguous stacks are C-contiguous
+    use_blas = dtype in _blas_kinds and all(
+        ty.layout == 'C' or (ty.ndim == 2 and ty.layout == 'F')
+        for ty in (aty, bty))
+    if use_blas:
+        ensure_blas()
+
+    large_mm = _dot_mm_blas if use_blas else _dot_mm_native
+
+    def matmul_impl(a, b):
+        m, k = a.shape[-2], a.shape[-1]
+        _k, n = b.shape[-2], b.shape[-1]
+        if k != _k:
+            raise ValueError("incompatible array sizes for '@' "
+                             "(matrix * matrix)")
+        na = a.shape[0] if a_stacked else 1
+        nb = b.shape[0] if b_stacked else 1
+        if na != nb and na != 1 and nb != 1:
+            raise ValueError("incompatible array sizes for '@' "
+                             "(stacks of matrices)")
+        out = np.empty((max(na, nb), m, n), a.dtype)
+        small = m * n * k <= _small_matmul_size
+        for p in range(out.shape[0]):
+            # stacks of size 1 are broadcast
+            ap = get_a(a, p % na)
+            bp = get_b(b, p % nb)
+            if small:
+                _dot_mm_small(ap, bp, out[p], zero)
+            else:
+                large_mm(ap, bp, out[p])
+        return out
+
+    res = context.compile_internal(builder, matmul_impl, sig, args)
+    return impl_ret_new_ref(context, builder, sig.return_type, res)
+
+
 @lower_builtin(np.dot, types.Array, types.Array)
 @lower_builtin('@', types.Array, types.Array)
 def dot_2(context, builder, sig, args):
@@ -524,6 +716,11 @@ def dot_2(context, builder, sig, args):
     np.dot(a, b)
     a @ b
     """
+    if 3 in [x.ndim for x in sig.args]:
+        return matmul_stacked(context, builder, sig, args)
+    if sig.args[0].dtype not in _blas_kinds:
+        return dot_2_native(context, builder, sig, args)
+
     ensure_blas()
 
     with make_contiguous(context, builder, sig, args) as (sig, args):
@@ -539,6 +736,9 @@ def dot_2(context, builder, sig, args):
         else:
             assert 0
 
+if numpy_version >= (1, 10):
+    lower_builtin(np.matmul, types.Array, types.Array)(dot_2)
+
 
 @lower_builtin(np.vdot, types.Array, types.Array)
 def vdot(context, builder, sig, args):
@@ -696,12 +896,67 @@ def dot_3_mm(context, builder, sig, args):
                              out._getvalue())
 
 
+def dot_3_native(context, builder, sig, args):
+    """
+    np.dot(a, b, out) for dtypes not supported by BLAS (integers),
+    using native loops.
+    """
+    xty, yty, outty = sig.args
+    zero = np_support.as_dtype(xty.dtype).type(0)
+    ndims = [xty.ndim, yty.ndim]
+
+    if ndims == [2, 2]:
+        def dot_impl(a, b, out):
+            m, k = a.shape
+            _k, n = b.shape
+            if k != _k:
+                raise ValueError("incompatible array sizes for np.dot(a, b) "
+                                 "(matrix * matrix)")
+            if out.shape != (m, n):
+                raise ValueError("incompatible output array size for "
+                                 "np.dot(a, b, out) (matrix * matrix)")
+            _dot_mm_native(a, b, out)
+            return out
+    elif ndims == [2, 1]:
+        def dot_impl(a, b, out):
+            m, _n = a.shape
+            n, = b.shape
+            if n != _n:
+                raise ValueError("incompatible array sizes for np.dot(a, b) "
+                                 "(matrix * vector)")
+            if out.shape != (m,):
+                raise ValueError("incompatible output array size for "
+                                 "np.dot(a, b, out) (matrix * vector)")
+            _dot_mv_native(a, b, out, zero)
+            return out
+    elif ndims == [1, 2]:
+        def dot_impl(a, b, out):
+            m, = a.shape
+            _m, n = b.shape
+            if m != _m:
+                raise ValueError("incompatible array sizes for "
+                                 "np.dot(a, b) (vector * matrix)")
+            if out.shape != (n,):
+                raise ValueError("incompatible output array size for "
+                                 "np.dot(a, b, out) (vector * matrix)")
+            _dot_vm_native(a, b, out)
+            return out
+    else:
+        assert 0
+
+    res = context.compile_internal(builder, dot_impl, sig, args)
+    return impl_ret_new_ref(context, builder, sig.return_type, res)
+
+
 @lower_builtin(np.dot, types.Array, types.Array,
                types.Array)
 def dot_3(context, builder, sig, args):
     """
     np.dot(a, b, out)
     """
+    if sig.args[0].dtype not in _blas_kinds:
+        return dot_3_native(context, builder, sig, args)
+
     ensure_blas()
 
     with make_contiguous(context, builder, sig, args) as (sig, args):
@@ -863,6 +863,13 @@ def list_count(context, builder, sig, args):
 
     return context.compile_internal(builder, list_count_impl, sig, args)
 
+def is_plain_data(fromty, toty):
+    """
+    Whether items of type *fromty* can be copied bitwise to storage for
+    *toty* items (no conversion and no reference counting).
+    """
+    return fromty == toty and isinstance(toty, (types.Number, types.Boolean))
+
 def _list_extend_list(context, builder, sig, args):
     src = ListInstance(context, builder, sig.args[1], args[1])
     dest = ListInstance(context, builder, sig.args[0], args[0])
@@ -873,6 +880,11 @@ def _list_extend_list(context, builder, sig, args):
     dest.resize(nitems)
     dest.size = nitems
 
+    if is_plain_data(src.dtype, dest.dtype):
+        cgutils.raw_memcpy(builder, dest._gep(dest_size), src.data,
+                           src_size, dest._itemsize)
+        return dest
+
     with cgutils.for_range(builder, src_size) as loop:
         value = src.getitem(loop.index)
         value = context.cast(builder, value, src.dtype, dest.dtype)
@@ -880,12 +892,43 @@ def _list_extend_list(context, builder, sig, args):
 
     return dest
 
+def _list_extend_array(context, builder, sig, args):
+    from numba.targets.arrayobj import make_array, load_item
+
+    aryty = sig.args[1]
+    ary = make_array(aryty)(context, builder, args[1])
+    dest = ListInstance(context, builder, sig.args[0], args[0])
+
+    src_size, = cgutils.unpack_tuple(builder, ary.shape, 1)
+    dest_size = dest.size
+    nitems = builder.add(src_size, dest_size)
+    dest.resize(nitems)
+    dest.size = nitems
+
+    if aryty.layout == 'C' and is_plain_data(aryty.dtype, dest.dtype):
+        cgutils.raw_memcpy(builder, dest._gep(dest_size), ary.data,
+                           src_size, dest._itemsize)
+        return dest
+
+    with cgutils.for_range(builder, src_size) as loop:
+        ptr = cgutils.get_item_pointer(builder, aryty, ary, [loop.index])
+        value = load_item(context, builder, aryty, ptr)
+        value = context.cast(builder, value, aryty.dtype, dest.dtype)
+        dest.setitem(builder.add(loop.index, dest_size), value, incref=True)
+
+    return dest
+
 @lower_builtin("list.extend", types.List, types.IterableType)
 def list_extend(context, builder, sig, args):
-    if isinstance(sig.args[1], types.List):
-        # Specialize for list operands, for speed.
+    # Specialize for list and 1d array operands, for speed: the list
+    # is resized only once and the items are copied in bulk.
+    srcty = sig.args[1]
+    if isinstance(srcty, types.List):
         _list_extend_list(context, builder, sig, args)
         return context.get_dummy_value()
+    if isinstance(srcty, types.Array) and srcty.ndim == 1:
+        _list_extend_array(context, builder, sig, args)
+        return context.get_dummy_value()
 
     def list_extend(lst, iterable):
         # Speed hack to avoid NRT refcount operations inside the loop
@@ -1036,40 +1079,73 @@ def load_sorts():
     def gt(a, b):
         return a > b
 
+    # Compare (key, index, item) tuples by key then index, never by item
+    def key_lt(a, b):
+        return a[0] < b[0] or (not b[0] < a[0] and a[1] < b[1])
+
+    def reversed_key_lt(a, b):
+        return b[0] < a[0] or (not a[0] < b[0] and a[1] < b[1])
+
     default_sort = quicksort.make_jit_quicksort()
     reversed_sort = quicksort.make_jit_quicksort(lt=gt)
+    key_sort = quicksort.make_jit_quicksort(lt=key_lt)
+    reversed_key_sort = quicksort.make_jit_quicksort(lt=reversed_key_lt)
     g['run_default_sort'] = default_sort.run_quicksort
     g['run_reversed_sort'] = reversed_sort.run_quicksort
+    g['run_key_sort'] = key_sort.run_quicksort
+    g['run_reversed_key_sort'] = reversed_key_sort.run_quicksort
     g['_sorting_init'] = True
 
 
-@lower_builtin("list.sort", types.List)
-@lower_builtin("list.sort", types.List, types.Boolean)
-def list_sort(context, builder, sig, args):
-    load_sorts()
+def _normalize_sort_args(sig, args):
+    """
+    Replace an omitted *reverse* argument with False.
+    """
+    reverse_ty = sig.args[-1]
+    if isinstance(reverse_ty, types.NoneType):
+        sig = typing.signature(sig.return_type,
+                               *sig.args[:-1] + (types.boolean,))
+        args = tuple(args[:-1]) + (cgutils.false_bit,)
+    return sig, args
 
-    if len(args) == 1:
-        sig = typing.signature(sig.return_type, *sig.args + (types.boolean,))
-        args = tuple(args) + (cgutils.false_bit,)
 
-    def list_sort_impl(lst, reverse):
-        if reverse:
-            run_reversed_sort(lst)
-        else:
-            run_default_sort(lst)
+@lower_builtin("list.sort", types.List, types.Any, types.Any)
+def list_sort(context, builder, sig, args):
+    load_sorts()
+    sig, args = _normalize_sort_args(sig, args)
+
+    if isinstance(sig.args[1], types.NoneType):
+        def list_sort_impl(lst, key, reverse):
+            if reverse:
+                run_reversed_sort(lst)
+            else:
+                run_default_sort(lst)
+    else:
+        def list_sort_impl(lst, key, reverse):
+            # Decorate-sort-undecorate: the key is computed once per item,
+            # and (key, index, item) tuples are sorted with quicksort.  The
+            # index keeps equal items in their original order, like
+            # CPython, even when reversing.
+            n = len(lst)
+            if n < 2:
+                return
+            decorated = [(key(item), i, item) for i, item in enumerate(lst)]
+            if reverse:
+                run_reversed_key_sort(decorated)
+            else:
+                run_key_sort(decorated)
+            for i in range(n):
+                lst[i] = decorated[i][2]
 
     return context.compile_internal(builder, list_sort_impl, sig, args)
 
-@lower_builtin(sorted, types.IterableType)
-@lower_builtin(sorted, types.IterableType, types.Boolean)
+@lower_builtin(sorted, types.IterableType, types.Any, types.Any)
 def sorted_impl(context, builder, sig, args):
-    if len(args) == 1:
-        sig = typing.signature(sig.return_type, *sig.args + (types.boolean,))
-        args = tuple(args) + (cgutils.false_bit,)
+    sig, args = _normalize_sort_args(sig, args)
 
-    def sorted_impl(it, reverse):
+    def sorted_impl(it, key, reverse):
         lst = list(it)
-        lst.sort(reverse=reverse)
+        lst.sort(key=key, reverse=reverse)
         return lst
 
     return context.compile_internal(builder, sorted_impl, sig, args)
@@ -1080,6 +1156,6 @@ def sorted_impl(context, builder, sig, args):
 
 @lower_cast(types.List, types.List)
 def list_to_list(context, builder, fromty, toty, val):
-    # Casting from non-reflected to reflected
+    # Casting from non-reflected to reflected, or to a typed list
     assert fromty.dtype == toty.dtype
     return val
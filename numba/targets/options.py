@@ -50,6 +50,20 @@ class TargetOptions(object):
         if kws.pop('_nrt', True):
             flags.set("nrt")
 
+        nrt_atomic = kws.pop('nrt_atomic', True)
+        parallel = kws.get('parallel')
+        if parallel is not None and parallel.enabled:
+            # Parallel code shares refcounted objects between threads
+            nrt_atomic = True
+        if not nrt_atomic:
+            flags.set("nrt_nonatomic")
+
+        if config.NRT_TRACE:
+            flags.set("nrt_trace")
+
+        if kws.pop('arena', False):
+            flags.set("nrt_arena")
+
         if kws.pop('debug', config.DEBUGINFO_DEFAULT):
             flags.set("debuginfo")
             flags.set("boundcheck")
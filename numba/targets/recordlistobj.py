@@ -0,0 +1,475 @@
+"""
+Support for record lists: lists of tuples or named tuples stored as one
+contiguous array per field ("struct of arrays"), so that scanning or
+sorting by one field only touches that field's memory.
+"""
+
+from __future__ import print_function, absolute_import, division
+
+import numpy as np
+from llvmlite import ir
+
+from numba import types, cgutils
+from numba.targets.imputils import (lower_builtin, iternext_impl, for_iter,
+                                    impl_ret_borrowed, impl_ret_new_ref,
+                                    impl_ret_untracked)
+from numba.targets.arrayobj import (make_array, load_item, store_item,
+                                    populate_array, _empty_nd_impl)
+
+
+# Initial number of allocated records
+MINSIZE = 8
+
+
+def get_record_list_payload(context, builder, rl_type, value):
+    """
+    Given a record list value and type, get its payload structure (as a
+    reference, so that mutations are seen by all).
+    """
+    payload_type = types.RecordListPayload(rl_type)
+    payload = context.nrt.meminfo_data(builder, value.meminfo)
+    ptrty = context.get_data_type(payload_type).as_pointer()
+    payload = builder.bitcast(payload, ptrty)
+    return context.make_data_helper(builder, payload_type, ref=payload)
+
+
+def cast_record(context, builder, fromty, toty, val):
+    """
+    Cast tuple *val* to the record type *toty*, field by field.
+    """
+    values = [context.cast(builder, builder.extract_value(val, i), a, b)
+              for i, (a, b) in enumerate(zip(fromty, toty))]
+    return context.make_tuple(builder, toty, values)
+
+
+class _RecordListPayloadMixin(object):
+
+    @property
+    def dtype(self):
+        return self._ty.dtype
+
+    @property
+    def size(self):
+        return self._payload.size
+
+    @size.setter
+    def size(self, value):
+        self._payload.size = value
+
+    @property
+    def allocated(self):
+        return self._payload.allocated
+
+    @allocated.setter
+    def allocated(self, value):
+        self._payload.allocated = value
+
+    @property
+    def column_types(self):
+        return tuple(self._ty.columns_type)
+
+    def get_column(self, i):
+        """
+        Get the array structure of the *i*-th field's column.
+        """
+        arrty = self.column_types[i]
+        value = self._builder.extract_value(self._payload.columns, i)
+        return make_array(arrty)(self._context, self._builder, value)
+
+    def _item_ptr(self, column, idx):
+        return cgutils.gep(self._builder, column.data, idx)
+
+    def getitem(self, idx):
+        values = []
+        for i, arrty in enumerate(self.column_types):
+            ptr = self._item_ptr(self.get_column(i), idx)
+            values.append(load_item(self._context, self._builder, arrty, ptr))
+        return self._context.make_tuple(self._builder, self.dtype, values)
+
+    def fix_index(self, idx):
+        """
+        Fix negative indices by adding the size to them.  Positive
+        indices are left untouched.
+        """
+        is_negative = self._builder.icmp_signed('<', idx,
+                                                ir.Constant(idx.type, 0))
+        wrapped_index = self._builder.add(idx, self.size)
+        return self._builder.select(is_negative, wrapped_index, idx)
+
+    def guard_index(self, idx, msg):
+        """
+        Raise an error if the index is out of bounds.
+        """
+        builder = self._builder
+        underflow = builder.icmp_signed('<', idx, ir.Constant(idx.type, 0))
+        overflow = builder.icmp_signed('>=', idx, self.size)
+        with builder.if_then(builder.or_(underflow, overflow), likely=False):
+            self._context.call_conv.return_user_exc(builder,
+                                                    IndexError, (msg,))
+
+
+class RecordListPayloadAccessor(_RecordListPayloadMixin):
+    """
+    A helper object to access the record list attributes given the
+    pointer to the payload type.
+    """
+    def __init__(self, context, builder, rl_type, payload_ptr):
+        self._context = context
+        self._builder = builder
+        self._ty = rl_type
+        payload_type = types.RecordListPayload(rl_type)
+        ptrty = context.get_data_type(payload_type).as_pointer()
+        payload_ptr = builder.bitcast(payload_ptr, ptrty)
+        self._payload = context.make_data_helper(builder, payload_type,
+                                                 ref=payload_ptr)
+
+
+class RecordListInstance(_RecordListPayloadMixin):
+
+    def __init__(self, context, builder, rl_type, rl_val):
+        self._context = context
+        self._builder = builder
+        self._ty = rl_type
+        self._rl = context.make_helper(builder, rl_type, rl_val)
+
+    @property
+    def _payload(self):
+        return get_record_list_payload(self._context, self._builder,
+                                       self._ty, self._rl)
+
+    @property
+    def value(self):
+        return self._rl._getvalue()
+
+    @property
+    def meminfo(self):
+        return self._rl.meminfo
+
+    def setitem(self, idx, record):
+        # Record fields are plain data (see numba.typed.RecordList),
+        # there is no reference to take or release
+        for i, arrty in enumerate(self.column_types):
+            ptr = self._item_ptr(self.get_column(i), idx)
+            value = self._builder.extract_value(record, i)
+            store_item(self._context, self._builder, arrty, value, ptr)
+
+    def _set_columns(self, columns):
+        """
+        Replace the column arrays with *columns* (a list of array
+        structures, whose references are stolen).
+        """
+        context = self._context
+        builder = self._builder
+        columns_type = self._ty.columns_type
+        context.nrt.decref(builder, columns_type, self._payload.columns)
+        self._payload.columns = context.make_tuple(
+            builder, columns_type, [col._getvalue() for col in columns])
+
+    def _new_columns(self, allocated):
+        return [_empty_nd_impl(self._context, self._builder, arrty,
+                               [allocated])
+                for arrty in self.column_types]
+
+    def append(self, record):
+        builder = self._builder
+        size = self.size
+        is_full = builder.icmp_signed('==', size, self.allocated)
+        with builder.if_then(is_full, likely=False):
+            # Double the columns, copying the existing records
+            new_allocated = builder.shl(self.allocated,
+                                        ir.Constant(size.type, 1))
+            columns = self._new_columns(new_allocated)
+            for i, new_col in enumerate(columns):
+                old_col = self.get_column(i)
+                cgutils.raw_memcpy(builder, new_col.data, old_col.data,
+                                   size, old_col.itemsize)
+            self._set_columns(columns)
+            self.allocated = new_allocated
+        self.setitem(size, record)
+        self.size = builder.add(size, ir.Constant(size.type, 1))
+
+    def column_views(self):
+        """
+        Return a tuple of arrays viewing the first *size* items of each
+        column (a new reference).
+        """
+        context = self._context
+        builder = self._builder
+        views = []
+        for i, arrty in enumerate(self.column_types):
+            col = self.get_column(i)
+            view = make_array(arrty)(context, builder)
+            populate_array(view,
+                           data=col.data,
+                           shape=[self.size],
+                           strides=[col.itemsize],
+                           itemsize=col.itemsize,
+                           meminfo=col.meminfo)
+            context.nrt.incref(builder, arrty, view._getvalue())
+            views.append(view._getvalue())
+        return context.make_tuple(builder, self._ty.columns_type, views)
+
+    @classmethod
+    def allocate(cls, context, builder, rl_type):
+        """
+        Allocate an empty RecordListInstance.  If allocation failed,
+        control is transferred to the caller using the target's current
+        call convention.
+        """
+        self = cls(context, builder, rl_type, None)
+        payload_type = context.get_data_type(types.RecordListPayload(rl_type))
+        payload_size = context.get_constant(
+            types.intp, context.get_abi_sizeof(payload_type))
+        meminfo = context.nrt.meminfo_alloc_dtor(builder, payload_size,
+                                                 self.get_dtor())
+        with builder.if_then(cgutils.is_null(builder, meminfo),
+                             likely=False):
+            context.call_conv.return_user_exc(
+                builder, MemoryError, ("cannot allocate record list",))
+        self._rl.meminfo = meminfo
+        allocated = context.get_constant(types.intp, MINSIZE)
+        self.size = context.get_constant(types.intp, 0)
+        self.allocated = allocated
+        self._payload.columns = context.make_tuple(
+            builder, rl_type.columns_type,
+            [col._getvalue() for col in self._new_columns(allocated)])
+        return self
+
+    @classmethod
+    def from_meminfo(cls, context, builder, rl_type, meminfo):
+        """
+        Make a new record list instance pointing to an existing payload
+        (a meminfo pointer).
+        """
+        self = cls(context, builder, rl_type, None)
+        self._rl.meminfo = meminfo
+        context.nrt.incref(builder, rl_type, self.value)
+        return self
+
+    def define_dtor(self):
+        "Define the destructor if not already defined"
+        context = self._context
+        builder = self._builder
+        mod = builder.module
+        # Declare dtor
+        fnty = ir.FunctionType(ir.VoidType(),
+                               [cgutils.voidptr_t, cgutils.intp_t,
+                                cgutils.voidptr_t])
+        fn = mod.get_or_insert_function(
+            fnty, name='.dtor.recordlist.{}'.format(self.dtype))
+        if not fn.is_declaration:
+            # End early if the dtor is already defined
+            return fn
+        fn.linkage = 'internal'
+        # Populate the dtor
+        builder = ir.IRBuilder(fn.append_basic_block())
+        payload = RecordListPayloadAccessor(context, builder, self._ty,
+                                            fn.args[0])
+        # Release the column arrays
+        context.nrt.decref(builder, self._ty.columns_type,
+                           payload._payload.columns)
+        builder.ret_void()
+        return fn
+
+    def get_dtor(self):
+        """"Get the dtor function pointer as void pointer.
+
+        It's safe to be called multiple times.
+        """
+        dtor = self.define_dtor()
+        return self._builder.bitcast(dtor, cgutils.voidptr_t)
+
+
+class RecordListIterInstance(_RecordListPayloadMixin):
+
+    def __init__(self, context, builder, iter_type, iter_val):
+        self._context = context
+        self._builder = builder
+        self._ty = iter_type.container
+        self._iter = context.make_helper(builder, iter_type, iter_val)
+
+    @classmethod
+    def from_record_list(cls, context, builder, iter_type, rl_val):
+        rl_inst = RecordListInstance(context, builder, iter_type.container,
+                                     rl_val)
+        self = cls(context, builder, iter_type, None)
+        index = context.get_constant(types.intp, 0)
+        self._iter.index = cgutils.alloca_once_value(builder, index)
+        self._iter.meminfo = rl_inst.meminfo
+        return self
+
+    @property
+    def _payload(self):
+        return get_record_list_payload(self._context, self._builder,
+                                       self._ty, self._iter)
+
+    @property
+    def value(self):
+        return self._iter._getvalue()
+
+    @property
+    def index(self):
+        return self._builder.load(self._iter.index)
+
+    @index.setter
+    def index(self, value):
+        self._builder.store(value, self._iter.index)
+
+
+#-------------------------------------------------------------------------------
+# Various operations
+
+@lower_builtin(len, types.RecordListType)
+def record_list_len(context, builder, sig, args):
+    inst = RecordListInstance(context, builder, sig.args[0], args[0])
+    return impl_ret_untracked(context, builder, sig.return_type, inst.size)
+
+@lower_builtin(bool, types.RecordListType)
+def record_list_bool(context, builder, sig, args):
+    inst = RecordListInstance(context, builder, sig.args[0], args[0])
+    res = cgutils.is_not_null(builder, inst.size)
+    return impl_ret_untracked(context, builder, sig.return_type, res)
+
+@lower_builtin("in", types.Any, types.RecordListType)
+def in_record_list(context, builder, sig, args):
+    def record_list_contains_impl(value, rl):
+        for rec in rl:
+            if rec == value:
+                return True
+        return False
+
+    return context.compile_internal(builder, record_list_contains_impl,
+                                    sig, args)
+
+@lower_builtin('getiter', types.RecordListType)
+def getiter_record_list(context, builder, sig, args):
+    inst = RecordListIterInstance.from_record_list(context, builder,
+                                                   sig.return_type, args[0])
+    return impl_ret_borrowed(context, builder, sig.return_type, inst.value)
+
+@lower_builtin('iternext', types.RecordListIter)
+@iternext_impl
+def iternext_record_list_iter(context, builder, sig, args, result):
+    inst = RecordListIterInstance(context, builder, sig.args[0], args[0])
+
+    index = inst.index
+    is_valid = builder.icmp_signed('<', index, inst.size)
+    result.set_valid(is_valid)
+
+    with builder.if_then(is_valid):
+        result.yield_(inst.getitem(index))
+        inst.index = builder.add(index, context.get_constant(types.intp, 1))
+
+@lower_builtin('getitem', types.RecordListType, types.Integer)
+def getitem_record_list(context, builder, sig, args):
+    inst = RecordListInstance(context, builder, sig.args[0], args[0])
+    index = context.cast(builder, args[1], sig.args[1], types.intp)
+
+    index = inst.fix_index(index)
+    inst.guard_index(index, msg="record list index out of range")
+    result = inst.getitem(index)
+
+    return impl_ret_untracked(context, builder, sig.return_type, result)
+
+@lower_builtin('setitem', types.RecordListType, types.Integer, types.Any)
+def setitem_record_list(context, builder, sig, args):
+    inst = RecordListInstance(context, builder, sig.args[0], args[0])
+    index = context.cast(builder, args[1], sig.args[1], types.intp)
+    record = cast_record(context, builder, sig.args[2], inst.dtype, args[2])
+
+    index = inst.fix_index(index)
+    inst.guard_index(index, msg="record list index out of range")
+    inst.setitem(index, record)
+
+    return context.get_dummy_value()
+
+
+#-------------------------------------------------------------------------------
+# Methods
+
+@lower_builtin("recordlist.append", types.RecordListType, types.Any)
+def record_list_append(context, builder, sig, args):
+    inst = RecordListInstance(context, builder, sig.args[0], args[0])
+    record = cast_record(context, builder, sig.args[1], inst.dtype, args[1])
+    inst.append(record)
+    return context.get_dummy_value()
+
+@lower_builtin("recordlist.extend", types.RecordListType, types.IterableType)
+def record_list_extend(context, builder, sig, args):
+    inst = RecordListInstance(context, builder, sig.args[0], args[0])
+    items_type = sig.args[1]
+    with for_iter(context, builder, items_type, args[1]) as loop:
+        record = cast_record(context, builder,
+                             items_type.iterator_type.yield_type, inst.dtype,
+                             loop.value)
+        inst.append(record)
+    return context.get_dummy_value()
+
+@lower_builtin("recordlist.columns", types.RecordListType)
+def record_list_columns(context, builder, sig, args):
+    inst = RecordListInstance(context, builder, sig.args[0], args[0])
+    return impl_ret_new_ref(context, builder, sig.return_type,
+                            inst.column_views())
+
+
+def _argsort_column_impl(column, n):
+    # A stable sort keeps the current order of records with equal keys
+    return np.argsort(column[:n], kind='mergesort')
+
+def _permute_column_impl(column, perm):
+    n = len(perm)
+    column[:n] = column[:n][perm]
+
+
+@lower_builtin("recordlist.sort_by", types.RecordListType, types.Const)
+@lower_builtin("recordlist.sort_by", types.RecordListType, types.Integer)
+def record_list_sort_by(context, builder, sig, args):
+    """
+    Sort the records by the given field, and return the permutation
+    applied (the original index of each record in sorted order).
+    """
+    rl_type, field_type = sig.args
+    inst = RecordListInstance(context, builder, rl_type, args[0])
+    perm_type = sig.return_type
+    column_types = inst.column_types
+    size = inst.size
+
+    def argsort_column(i):
+        col = inst.get_column(i)._getvalue()
+        argsort_sig = perm_type(column_types[i], types.intp)
+        return context.compile_internal(builder, _argsort_column_impl,
+                                        argsort_sig, (col, size))
+
+    if isinstance(field_type, types.Const):
+        perm = argsort_column(rl_type.dtype.fields.index(field_type.value))
+    else:
+        nfields = len(column_types)
+        field = context.cast(builder, args[1], field_type, types.intp)
+        field = builder.select(cgutils.is_neg_int(builder, field),
+                               builder.add(field, field.type(nfields)),
+                               field)
+        # Only the key column is sorted, dispatch on the field index
+        permptr = cgutils.alloca_once(builder,
+                                      context.get_value_type(perm_type))
+        bb_default = builder.append_basic_block("sort_by.bad_field")
+        bb_end = builder.append_basic_block("sort_by.end")
+        switch = builder.switch(field, bb_default)
+        for i in range(nfields):
+            bb = builder.append_basic_block("sort_by.field%d" % i)
+            switch.add_case(field.type(i), bb)
+            with builder.goto_block(bb):
+                builder.store(argsort_column(i), permptr)
+                builder.branch(bb_end)
+        with builder.goto_block(bb_default):
+            context.call_conv.return_user_exc(
+                builder, IndexError, ("field index out of range",))
+        builder.position_at_end(bb_end)
+        perm = builder.load(permptr)
+
+    for i, arrty in enumerate(column_types):
+        col = inst.get_column(i)._getvalue()
+        permute_sig = types.none(arrty, perm_type)
+        context.compile_internal(builder, _permute_column_impl,
+                                 permute_sig, (col, perm))
+
+    return impl_ret_new_ref(context, builder, perm_type, perm)
@@ -17,7 +17,7 @@ class _MarkNrtCallVisitor(CallVisitor):
         self.marked = set()
 
     def visit_Call(self, instr):
-        if instr.callee.name in ('NRT_incref', 'NRT_decref'):
+        if instr.callee.name in _accepted_nrtfns:
             self.marked.add(instr)
 
 
@@ -33,7 +33,12 @@ def _rewrite_function(function):
                 bb.instructions.remove(inst)
 
 
-_accepted_nrtfns = 'NRT_incref', 'NRT_decref'
+_accepted_nrtfns = ('NRT_incref', 'NRT_decref',
+                    'NRT_incref_nonatomic', 'NRT_decref_nonatomic')
+
+# NRT functions that don't allocate and are kept by the rewrite
+_allowed_nrtfns = ('NRT_MemSys_trace_set_site', 'NRT_MemSys_trace_get_site',
+                   'NRT_Arena_enter', 'NRT_Arena_use', 'NRT_Arena_exit')
 
 
 def _legalize(module, dmm, fndesc):
@@ -77,7 +82,7 @@ def _legalize(module, dmm, fndesc):
     # Ensure no allocation
     for fn in module.functions:
         if fn.name.startswith("NRT_"):
-            if fn.name not in _accepted_nrtfns:
+            if fn.name not in _accepted_nrtfns + _allowed_nrtfns:
                 return False
 
     return True
@@ -9,7 +9,7 @@ import contextlib
 import math
 
 from llvmlite import ir
-from numba import types, cgutils, typing
+from numba import types, cgutils, typing, config
 from numba.targets.imputils import (lower_builtin, lower_cast,
                                     iternext_impl, impl_ret_borrowed,
                                     impl_ret_new_ref, impl_ret_untracked,
@@ -18,22 +18,23 @@ from numba.utils import cached_property
 from . import quicksort, slicing
 
 
-def get_payload_struct(context, builder, set_type, ptr):
+def get_payload_struct(context, builder, set_type, ptr,
+                       payload_class=types.SetPayload):
     """
     Given a set value and type, get its payload structure (as a
     reference, so that mutations are seen by all).
     """
-    payload_type = types.SetPayload(set_type)
+    payload_type = payload_class(set_type)
     ptrty = context.get_data_type(payload_type).as_pointer()
     payload = builder.bitcast(ptr, ptrty)
     return context.make_data_helper(builder, payload_type, ref=payload)
 
 
-def get_entry_size(context, set_type):
+def get_entry_size(context, set_type, entry_class=types.SetEntry):
     """
     Return the entry size for the given set type.
     """
-    llty = context.get_data_type(types.SetEntry(set_type))
+    llty = context.get_data_type(entry_class(set_type))
     return context.get_abi_sizeof(llty)
 
 
@@ -50,9 +51,34 @@ MINSIZE = 16
 # Number of cache-friendly linear probes before switching to non-linear probing
 LINEAR_PROBES = 3
 
+# Key types whose hash values are scrambled before indexing the table,
+# if enabled by NUMBA_SET_HASH_MIXING
+MIXED_HASH_TYPES = (types.Integer, types.Boolean, types.NPDatetime,
+                    types.NPTimedelta)
+
 DEBUG_ALLOCS = False
 
 
+def mix_hash(builder, h):
+    """
+    Scramble the bits of hash value *h*, so that all of them influence
+    the lower bits used to index the table.  This is the finalizer of
+    MurmurHash3.
+    """
+    if h.type.width == 64:
+        shifts = (33, 33, 33)
+        mults = (0xff51afd7ed558ccd, 0xc4ceb9fe1a85ec53)
+    else:
+        assert h.type.width == 32, h.type
+        shifts = (16, 13, 16)
+        mults = (0x85ebca6b, 0xc2b2ae35)
+    h = builder.xor(h, builder.lshr(h, h.type(shifts[0])))
+    h = builder.mul(h, h.type(mults[0]))
+    h = builder.xor(h, builder.lshr(h, h.type(shifts[1])))
+    h = builder.mul(h, h.type(mults[1]))
+    h = builder.xor(h, builder.lshr(h, h.type(shifts[2])))
+    return h
+
 def get_hash_value(context, builder, typ, value):
     """
     Compute the hash of the given value.
@@ -60,6 +86,10 @@ def get_hash_value(context, builder, typ, value):
     sig = typing.signature(types.intp, typ)
     fn = context.get_function(hash, sig)
     h = fn(builder, (value,))
+    if config.SET_HASH_MIXING and isinstance(typ, MIXED_HASH_TYPES):
+        # The hash of these types is (close to) the identity, which
+        # makes strided keys collide in the lower bits.
+        h = mix_hash(builder, h)
     # Fixup reserved values
     is_ok = is_hash_used(context, builder, h)
     fallback = ir.Constant(h.type, FALLBACK)
@@ -93,8 +123,12 @@ SetLoop = collections.namedtuple('SetLoop', ('index', 'entry', 'do_break'))
 
 class _SetPayload(object):
 
+    payload_class = types.SetPayload
+    entry_class = types.SetEntry
+
     def __init__(self, context, builder, set_type, ptr):
-        payload = get_payload_struct(context, builder, set_type, ptr)
+        payload = get_payload_struct(context, builder, set_type, ptr,
+                                     self.payload_class)
         self._context = context
         self._builder = builder
         self._ty = set_type
@@ -163,7 +197,7 @@ class _SetPayload(object):
         """
         entry_ptr = cgutils.gep(self._builder, self._entries, idx)
         entry = self._context.make_data_helper(self._builder,
-                                               types.SetEntry(self._ty),
+                                               self.entry_class(self._ty),
                                                ref=entry_ptr)
         return entry
 
@@ -346,11 +380,14 @@ class _SetPayload(object):
 
 class SetInstance(object):
 
+    payload_class = _SetPayload
+
     def __init__(self, context, builder, set_type, set_val):
         self._context = context
         self._builder = builder
         self._ty = set_type
-        self._entrysize = get_entry_size(context, set_type)
+        self._entrysize = get_entry_size(context, set_type,
+                                         self.payload_class.entry_class)
         self._set = context.make_helper(builder, set_type, set_val)
 
     @property
@@ -367,7 +404,7 @@ class SetInstance(object):
         builder = self._builder
 
         ptr = self._context.nrt.meminfo_data(builder, self.meminfo)
-        return _SetPayload(context, builder, self._ty, ptr)
+        return self.payload_class(context, builder, self._ty, ptr)
 
     @property
     def value(self):
@@ -441,6 +478,13 @@ class SetInstance(object):
                 self.upsize(used)
             self.set_dirty(True)
 
+    def _copy_entry(self, payload, entry):
+        """
+        Insert the contents of *entry*, taken from another payload, into
+        *payload*.  The payload is not resized.
+        """
+        self._add_key(payload, entry.key, entry.hash, do_resize=False)
+
     def _remove_entry(self, payload, entry, do_resize=True):
         # Mark entry deleted
         entry.hash = ir.Constant(entry.hash.type, DELETED)
@@ -547,9 +591,7 @@ class SetInstance(object):
 
                 other_payload = other.payload
                 with payload._iterate() as loop:
-                    entry = loop.entry
-                    other._add_key(other_payload, entry.key, entry.hash,
-                                   do_resize=False)
+                    other._copy_entry(other_payload, loop.entry)
 
         return other
 
@@ -898,9 +940,7 @@ class SetInstance(object):
         # Re-insert old entries
         payload = self.payload
         with old_payload._iterate() as loop:
-            entry = loop.entry
-            self._add_key(payload, entry.key, entry.hash,
-                          do_resize=False)
+            self._copy_entry(payload, loop.entry)
 
         self._free_payload(old_payload.ptr)
 
@@ -938,7 +978,8 @@ class SetInstance(object):
         zero = ir.Constant(intp_t, 0)
         one = ir.Constant(intp_t, 1)
 
-        payload_type = context.get_data_type(types.SetPayload(self._ty))
+        payload_type = context.get_data_type(
+            self.payload_class.payload_class(self._ty))
         payload_size = context.get_abi_sizeof(payload_type)
         entry_size = self._entrysize
         # Account for the fact that the payload struct already contains an entry
@@ -958,7 +999,7 @@ class SetInstance(object):
                                                         size=allocsize)
                 alloc_ok = cgutils.is_null(builder, ptr)
             else:
-                meminfo = context.nrt.meminfo_new_varsize(builder, size=allocsize)
+                meminfo = self._new_meminfo(allocsize)
                 alloc_ok = cgutils.is_null(builder, meminfo)
 
             with builder.if_else(cgutils.is_null(builder, meminfo),
@@ -985,6 +1026,13 @@ class SetInstance(object):
 
         return builder.load(ok)
 
+    def _new_meminfo(self, allocsize):
+        """
+        Allocate a new NRT varsize object of *allocsize* bytes.
+        """
+        return self._context.nrt.meminfo_new_varsize(self._builder,
+                                                     size=allocsize)
+
     def _free_payload(self, ptr):
         """
         Free an allocated old payload at *ptr*.
@@ -1004,7 +1052,8 @@ class SetInstance(object):
         zero = ir.Constant(intp_t, 0)
         one = ir.Constant(intp_t, 1)
 
-        payload_type = context.get_data_type(types.SetPayload(self._ty))
+        payload_type = context.get_data_type(
+            self.payload_class.payload_class(self._ty))
         payload_size = context.get_abi_sizeof(payload_type)
         entry_size = self._entrysize
         # Account for the fact that the payload struct already contains an entry
@@ -1021,7 +1070,7 @@ class SetInstance(object):
                                             nentries))
 
         with builder.if_then(builder.load(ok), likely=True):
-            meminfo = context.nrt.meminfo_new_varsize(builder, size=allocsize)
+            meminfo = self._new_meminfo(allocsize)
             alloc_ok = cgutils.is_null(builder, meminfo)
 
             with builder.if_else(cgutils.is_null(builder, meminfo),
@@ -1134,11 +1183,14 @@ def set_constructor(context, builder, sig, args):
     items, = args
 
     # If the argument has a len(), preallocate the set so as to
-    # avoid resizes.
+    # avoid resizes.  The fresh table then has room for all items
+    # (and no deleted entries), so the per-item resize check can be
+    # skipped as well: it would otherwise trigger a useless rehash
+    # when len(items) is exactly half the table size.
     n = call_len(context, builder, items_type, items)
     inst = SetInstance.allocate(context, builder, set_type, n)
     with for_iter(context, builder, items_type, items) as loop:
-        inst.add(loop.value)
+        inst.add(loop.value, do_resize=n is None)
 
     return impl_ret_new_ref(context, builder, set_type, inst.value)
 
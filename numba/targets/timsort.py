@@ -55,7 +55,7 @@ MergeState = collections.namedtuple(
 MergeRun = collections.namedtuple('MergeRun', ('start', 'size'))
 
 
-def make_timsort_impl(wrap, make_temp_area):
+def make_timsort_impl(wrap, make_temp_area, lt=None):
 
     make_temp_area = wrap(make_temp_area)
     intp = types.intp
@@ -105,9 +105,10 @@ def make_timsort_impl(wrap, make_temp_area):
         return MergeState(ms.min_gallop, ms.keys, ms.values, ms.pending, ms.n - 1)
 
     @wrap
-    def merge_getmem(ms, need):
+    def merge_getmem(ms, need, with_values):
         """
         Ensure enough temp memory for 'need' items is available.
+        The temp values are only reallocated if *with_values* is true.
         """
         alloced = len(ms.keys)
         if need <= alloced:
@@ -118,10 +119,12 @@ def make_timsort_impl(wrap, make_temp_area):
         # Don't realloc!  That can cost cycles to copy the old data, but
         # we don't care what's in the block.
         temp_keys = make_temp_area(ms.keys, alloced)
-        if has_values(ms.keys, ms.values):
+        if with_values:
             temp_values = make_temp_area(ms.values, alloced)
         else:
-            temp_values = temp_keys
+            # Not used by the caller.  We can't alias *temp_keys* here,
+            # as keys and values may have different types.
+            temp_values = ms.values
         return MergeState(ms.min_gallop, temp_keys, temp_values, ms.pending, ms.n)
 
     @wrap
@@ -132,14 +135,15 @@ def make_timsort_impl(wrap, make_temp_area):
         return MergeState(intp(new_gallop), ms.keys, ms.values, ms.pending, ms.n)
 
 
-    @wrap
-    def LT(a, b):
+    def default_lt(a, b):
         """
         Trivial comparison function between two keys.  This is factored out to
         make it clear where comparisons occur.
         """
         return a < b
 
+    LT = wrap(lt if lt is not None else default_lt)
+
     @wrap
     def binarysort(keys, values, lo, hi, start):
         """
@@ -421,7 +425,10 @@ def make_timsort_impl(wrap, make_temp_area):
         assert dest_start >= 0
         for i in range(nitems):
             dest_keys[dest_start + i] = src_keys[src_start + i]
-        if has_values(src_keys, src_values):
+        # One of the slices is always the caller's keys and values; the
+        # temp area may hold stale values for a non-keyed sort.
+        if (has_values(src_keys, src_values) and
+            has_values(dest_keys, dest_values)):
             for i in range(nitems):
                 dest_values[dest_start + i] = src_values[src_start + i]
 
@@ -436,7 +443,8 @@ def make_timsort_impl(wrap, make_temp_area):
         assert dest_start >= 0
         for i in range(nitems):
             dest_keys[dest_start - i] = src_keys[src_start - i]
-        if has_values(src_keys, src_values):
+        if (has_values(src_keys, src_values) and
+            has_values(dest_keys, dest_values)):
             for i in range(nitems):
                 dest_values[dest_start - i] = src_values[src_start - i]
 
@@ -462,7 +470,8 @@ def make_timsort_impl(wrap, make_temp_area):
         assert na > 0 and nb > 0 and na <= nb
         assert ssb == ssa + na
         # First copy [ssa, ssa + na) into the temp space
-        ms = merge_getmem(ms, na)
+        _has_values = has_values(keys, values)
+        ms = merge_getmem(ms, na, _has_values)
         sortslice_copy(ms.keys, ms.values, 0,
                        keys, values, ssa,
                        na)
@@ -473,7 +482,6 @@ def make_timsort_impl(wrap, make_temp_area):
         dest = ssa
         ssa = 0
 
-        _has_values = has_values(a_keys, a_values)
         min_gallop = ms.min_gallop
 
         # Now start merging into the space left from [ssa, ...)
@@ -617,7 +625,8 @@ def make_timsort_impl(wrap, make_temp_area):
         assert na > 0 and nb > 0 and na >= nb
         assert ssb == ssa + na
         # First copy [ssb, ssb + nb) into the temp space
-        ms = merge_getmem(ms, nb)
+        _has_values = has_values(keys, values)
+        ms = merge_getmem(ms, nb, _has_values)
         sortslice_copy(ms.keys, ms.values, 0,
                        keys, values, ssb,
                        nb)
@@ -632,7 +641,6 @@ def make_timsort_impl(wrap, make_temp_area):
         ssb = nb - 1
         ssa = ssa + na - 1
 
-        _has_values = has_values(b_keys, b_values)
         min_gallop = ms.min_gallop
 
         while nb > 0 and na > 0:
@@ -935,10 +943,15 @@ def make_timsort_impl(wrap, make_temp_area):
         run_timsort, run_timsort_with_values)
 
 
-def make_py_timsort(*args):
-    return make_timsort_impl((lambda f: f), *args)
+def make_py_timsort(*args, **kwargs):
+    return make_timsort_impl((lambda f: f), *args, **kwargs)
 
-def make_jit_timsort(*args):
+def make_jit_timsort(*args, **kwargs):
     from numba import jit
     return make_timsort_impl((lambda f: jit(nopython=True)(f)),
-                              *args)
+                             *args, **kwargs)
+
+def make_jitable_timsort(*args, **kwargs):
+    from numba.extending import register_jitable
+    return make_timsort_impl((lambda f: register_jitable(f)),
+                             *args, **kwargs)
@@ -0,0 +1,569 @@
+"""
+Support for native unicode strings.
+
+Strings use the compact representation of CPython (PEP 393): each code
+point is stored on 1, 2 or 4 bytes (the string's "kind"), and the kind is
+always the smallest able to represent the largest code point.  Strings
+unboxed from Python share the data of the str object; all strings created
+here maintain the same invariant, so that equal strings have the same kind
+and the same bytes.
+"""
+
+from __future__ import print_function, absolute_import, division
+
+from llvmlite import ir
+
+from numba import types, cgutils, typing
+from numba.extending import intrinsic, register_jitable
+from numba.targets.imputils import (lower_builtin, lower_cast, lower_constant,
+                                    impl_ret_borrowed, impl_ret_new_ref,
+                                    impl_ret_untracked)
+from . import slicing
+
+
+_code_point_t = ir.IntType(32)
+
+
+def make_string(context, builder, value=None):
+    """
+    Get a helper structure for the native string *value*.
+    """
+    return context.make_helper(builder, types.unicode_type, value)
+
+
+def _data_at(builder, string, idx):
+    """
+    Get a byte pointer to the code point at *idx*.
+    """
+    offset = builder.mul(idx, builder.sext(string.kind, idx.type))
+    return builder.gep(string.data, [offset])
+
+
+def _for_each_kind(builder, kind, gen):
+    """
+    Emit the code generated by *gen(nbytes)* for each of the three
+    possible values *nbytes* of *kind*.
+    """
+    bb_end = builder.append_basic_block("kind.end")
+    switch = builder.switch(kind, bb_end)
+    for nbytes in (1, 2, 4):
+        bb = builder.append_basic_block("kind.%d" % nbytes)
+        switch.add_case(ir.Constant(kind.type, nbytes), bb)
+        with builder.goto_block(bb):
+            gen(nbytes)
+            builder.branch(bb_end)
+    builder.position_at_end(bb_end)
+
+
+def load_code_point(builder, string, idx):
+    """
+    Load the code point at *idx* in *string*, as a 32-bit integer.
+    """
+    res = cgutils.alloca_once_value(builder, ir.Constant(_code_point_t, 0))
+    ptr = _data_at(builder, string, idx)
+
+    def gen(nbytes):
+        unit_t = ir.IntType(nbytes * 8)
+        unit = builder.load(builder.bitcast(ptr, unit_t.as_pointer()))
+        builder.store(builder.zext(unit, _code_point_t)
+                      if nbytes < 4 else unit, res)
+
+    _for_each_kind(builder, string.kind, gen)
+    return builder.load(res)
+
+
+def store_code_point(builder, string, idx, ch):
+    """
+    Store the code point *ch* at *idx* in *string*.
+    """
+    ptr = _data_at(builder, string, idx)
+
+    def gen(nbytes):
+        unit_t = ir.IntType(nbytes * 8)
+        unit = builder.trunc(ch, unit_t) if nbytes < 4 else ch
+        builder.store(unit, builder.bitcast(ptr, unit_t.as_pointer()))
+
+    _for_each_kind(builder, string.kind, gen)
+
+
+def allocate_string(context, builder, kind, length):
+    """
+    Allocate a new native string of *length* code points of the given
+    *kind*.  The data is NUL-terminated, like CPython's.
+    """
+    string = make_string(context, builder)
+    kind = context.cast(builder, kind, types.intp, types.int32)
+    nbytes = builder.mul(builder.add(length, ir.Constant(length.type, 1)),
+                         builder.sext(kind, length.type))
+    meminfo = context.nrt.meminfo_alloc(builder, nbytes)
+    with builder.if_then(cgutils.is_null(builder, meminfo), likely=False):
+        context.call_conv.return_user_exc(builder, MemoryError,
+                                          ("cannot allocate string",))
+    string.meminfo = meminfo
+    string.data = context.nrt.meminfo_data(builder, meminfo)
+    string.length = length
+    string.kind = kind
+    string.hash = context.get_constant(types.intp, -1)
+    string.parent = cgutils.get_null_value(string.parent.type)
+    store_code_point(builder, string, length, ir.Constant(_code_point_t, 0))
+    return string
+
+
+#-------------------------------------------------------------------------------
+# Intrinsics for the implementations written in Python
+
+@intrinsic
+def _empty_string(typingctx, kind, length):
+    def codegen(context, builder, sig, args):
+        string = allocate_string(context, builder, *args)
+        return impl_ret_new_ref(context, builder, sig.return_type,
+                                string._getvalue())
+
+    return types.unicode_type(types.intp, types.intp), codegen
+
+@intrinsic
+def _get_kind(typingctx, s):
+    def codegen(context, builder, sig, args):
+        string = make_string(context, builder, args[0])
+        return builder.sext(string.kind, context.get_value_type(types.intp))
+
+    return types.intp(types.unicode_type), codegen
+
+@intrinsic
+def _get_code_point(typingctx, s, idx):
+    def codegen(context, builder, sig, args):
+        string = make_string(context, builder, args[0])
+        return load_code_point(builder, string, args[1])
+
+    return types.uint32(types.unicode_type, types.intp), codegen
+
+@intrinsic
+def _set_code_point(typingctx, s, idx, ch):
+    def codegen(context, builder, sig, args):
+        string = make_string(context, builder, args[0])
+        store_code_point(builder, string, args[1], args[2])
+        return context.get_dummy_value()
+
+    return types.none(types.unicode_type, types.intp, types.uint32), codegen
+
+@intrinsic
+def _memcmp_region(typingctx, a, a_start, b, b_start, length):
+    """
+    Compare *length* code points of *a* and *b* (of the same kind) with
+    memcmp().
+    """
+    def codegen(context, builder, sig, args):
+        a, a_start, b, b_start, length = args
+        a = make_string(context, builder, a)
+        b = make_string(context, builder, b)
+        nbytes = builder.mul(length, builder.sext(a.kind, length.type))
+        fnty = ir.FunctionType(ir.IntType(32),
+                               [cgutils.voidptr_t, cgutils.voidptr_t,
+                                nbytes.type])
+        fn = builder.module.get_or_insert_function(fnty, name="memcmp")
+        return builder.call(fn, [_data_at(builder, a, a_start),
+                                 _data_at(builder, b, b_start), nbytes])
+
+    sig = types.int32(types.unicode_type, types.intp, types.unicode_type,
+                      types.intp, types.intp)
+    return sig, codegen
+
+@intrinsic
+def _memcpy_region(typingctx, dst, dst_start, src, src_start, length):
+    """
+    Copy *length* code points from *src* to *dst* (of the same kind).
+    """
+    def codegen(context, builder, sig, args):
+        dst, dst_start, src, src_start, length = args
+        dst = make_string(context, builder, dst)
+        src = make_string(context, builder, src)
+        nbytes = builder.mul(length, builder.sext(dst.kind, length.type))
+        cgutils.raw_memcpy(builder, _data_at(builder, dst, dst_start),
+                           _data_at(builder, src, src_start), nbytes, 1)
+        return context.get_dummy_value()
+
+    sig = types.none(types.unicode_type, types.intp, types.unicode_type,
+                     types.intp, types.intp)
+    return sig, codegen
+
+
+#-------------------------------------------------------------------------------
+# Helpers written in Python
+
+@register_jitable
+def _kind_for_code_point(ch):
+    if ch < 0x100:
+        return 1
+    elif ch < 0x10000:
+        return 2
+    else:
+        return 4
+
+@register_jitable
+def _is_whitespace(ch):
+    # The same set as CPython's Py_UNICODE_ISSPACE()
+    if ch < 0x80:
+        return 9 <= ch <= 13 or 28 <= ch <= 32
+    return (ch == 0x85 or ch == 0xa0 or ch == 0x1680
+            or 0x2000 <= ch <= 0x200a or ch == 0x2028 or ch == 0x2029
+            or ch == 0x202f or ch == 0x205f or ch == 0x3000)
+
+@register_jitable
+def _regions_equal(a, a_start, b, b_start, length):
+    if _get_kind(a) == _get_kind(b):
+        return _memcmp_region(a, a_start, b, b_start, length) == 0
+    for i in range(length):
+        if _get_code_point(a, a_start + i) != _get_code_point(b, b_start + i):
+            return False
+    return True
+
+@register_jitable
+def _find(s, sub, start):
+    n = len(s)
+    m = len(sub)
+    if m == 0:
+        return start if start <= n else -1
+    first = _get_code_point(sub, 0)
+    for i in range(start, n - m + 1):
+        if (_get_code_point(s, i) == first
+            and _regions_equal(s, i, sub, 0, m)):
+            return i
+    return -1
+
+@register_jitable
+def _copy_into(dst, dst_start, src):
+    n = len(src)
+    if _get_kind(dst) == _get_kind(src):
+        _memcpy_region(dst, dst_start, src, 0, n)
+    else:
+        for i in range(n):
+            _set_code_point(dst, dst_start + i, _get_code_point(src, i))
+
+@register_jitable
+def _substring(s, start, step, length):
+    kind = _get_kind(s)
+    if kind > 1:
+        # Narrow the kind if possible, to keep the representation canonical
+        maxch = 0
+        for i in range(length):
+            ch = _get_code_point(s, start + i * step)
+            if ch > maxch:
+                maxch = ch
+        kind = _kind_for_code_point(maxch)
+    res = _empty_string(kind, length)
+    if step == 1 and kind == _get_kind(s):
+        _memcpy_region(res, 0, s, start, length)
+    else:
+        for i in range(length):
+            _set_code_point(res, i, _get_code_point(s, start + i * step))
+    return res
+
+@register_jitable
+def _compare(a, b):
+    n = min(len(a), len(b))
+    for i in range(n):
+        x = _get_code_point(a, i)
+        y = _get_code_point(b, i)
+        if x != y:
+            return -1 if x < y else 1
+    if len(a) < len(b):
+        return -1
+    elif len(a) > len(b):
+        return 1
+    return 0
+
+
+#-------------------------------------------------------------------------------
+# Constants
+
+def _encode(pyval):
+    """
+    Return the (kind, bytes) of the compact representation of *pyval*.
+    """
+    maxch = max(map(ord, pyval)) if pyval else 0
+    if maxch < 0x100:
+        return 1, pyval.encode('latin-1')
+    elif maxch < 0x10000:
+        return 2, pyval.encode('utf-16-le', 'surrogatepass')
+    else:
+        return 4, pyval.encode('utf-32-le', 'surrogatepass')
+
+
+@lower_constant(types.UnicodeType)
+def constant_unicode(context, builder, ty, pyval):
+    kind, data = _encode(pyval)
+    # NUL-terminated, like allocated strings
+    text = cgutils.make_bytearray(data + b'\x00' * kind)
+    gv = cgutils.global_constant(builder, ".const.unicode", text)
+    # Build a true LLVM constant, so that the string can be nested in
+    # other constants (e.g. tuples)
+    llty = context.get_value_type(ty)
+    return ir.Constant.literal_struct([
+        gv.bitcast(cgutils.voidptr_t),
+        context.get_constant(types.intp, len(pyval)),
+        context.get_constant(types.int32, kind),
+        context.get_constant(types.intp, -1),
+        ir.Constant(llty.elements[4], None),
+        ir.Constant(llty.elements[5], None),
+        ])
+
+
+@lower_cast(types.Const, types.UnicodeType)
+def const_to_unicode(context, builder, fromty, toty, val):
+    return context.get_constant_generic(builder, toty, fromty.value)
+
+
+#-------------------------------------------------------------------------------
+# Basic operations
+
+@lower_builtin(len, types.UnicodeType)
+def unicode_len(context, builder, sig, args):
+    string = make_string(context, builder, args[0])
+    return impl_ret_untracked(context, builder, sig.return_type,
+                              string.length)
+
+@lower_builtin(bool, types.UnicodeType)
+def unicode_bool(context, builder, sig, args):
+    string = make_string(context, builder, args[0])
+    res = cgutils.is_not_null(builder, string.length)
+    return impl_ret_untracked(context, builder, sig.return_type, res)
+
+@lower_builtin(hash, types.UnicodeType)
+def unicode_hash(context, builder, sig, args):
+    string = make_string(context, builder, args[0])
+    res = cgutils.alloca_once_value(builder, string.hash)
+    not_computed = builder.icmp_signed('==', string.hash,
+                                       context.get_constant(types.intp, -1))
+    with builder.if_then(not_computed):
+        # Same as str.__hash__()
+        nbytes = builder.mul(string.length,
+                             builder.sext(string.kind, string.length.type))
+        fnty = ir.FunctionType(string.hash.type,
+                               [cgutils.voidptr_t, nbytes.type])
+        fn = builder.module.get_or_insert_function(fnty,
+                                                   name="numba_unicode_hash")
+        builder.store(builder.call(fn, [string.data, nbytes]), res)
+    return impl_ret_untracked(context, builder, sig.return_type,
+                              builder.load(res))
+
+
+@lower_builtin('getitem', types.UnicodeType, types.Integer)
+def getitem_unicode(context, builder, sig, args):
+    def getitem_impl(s, idx):
+        n = len(s)
+        if idx < 0:
+            idx += n
+        if idx < 0 or idx >= n:
+            raise IndexError("string index out of range")
+        return _substring(s, idx, 1, 1)
+
+    return context.compile_internal(builder, getitem_impl, sig, args)
+
+@lower_builtin('getitem', types.UnicodeType, types.SliceType)
+def getslice_unicode(context, builder, sig, args):
+    string = make_string(context, builder, args[0])
+    slice = context.make_helper(builder, sig.args[1], args[1])
+    slicing.guard_invalid_slice(context, builder, sig.args[1], slice)
+    slicing.fix_slice(builder, slice, string.length)
+    length = slicing.get_slice_length(builder, slice)
+
+    substring_sig = typing.signature(types.unicode_type, types.unicode_type,
+                                     types.intp, types.intp, types.intp)
+    return context.compile_internal(builder, _substring, substring_sig,
+                                    (args[0], slice.start, slice.step, length))
+
+
+@lower_builtin('getiter', types.UnicodeType)
+def getiter_unicode(context, builder, sig, args):
+    it = context.make_helper(builder, sig.return_type)
+    it.index = cgutils.alloca_once_value(builder,
+                                         context.get_constant(types.intp, 0))
+    it.data = args[0]
+    return impl_ret_borrowed(context, builder, sig.return_type,
+                             it._getvalue())
+
+@lower_builtin('iternext', types.UnicodeIteratorType)
+def iternext_unicode(context, builder, sig, args):
+    it = context.make_helper(builder, sig.args[0], args[0])
+    string = make_string(context, builder, it.data)
+    pair = context.make_helper(builder, sig.return_type)
+
+    index = builder.load(it.index)
+    is_valid = builder.icmp_signed('<', index, string.length)
+    pair.first = context.get_constant_null(types.unicode_type)
+    pair.second = is_valid
+
+    with builder.if_then(is_valid):
+        one = context.get_constant(types.intp, 1)
+        substring_sig = typing.signature(types.unicode_type,
+                                         types.unicode_type, types.intp,
+                                         types.intp, types.intp)
+        pair.first = context.compile_internal(builder, _substring,
+                                              substring_sig,
+                                              (it.data, index, one, one))
+        builder.store(builder.add(index, one), it.index)
+
+    # The pair owns the new one-character string
+    return impl_ret_new_ref(context, builder, sig.return_type,
+                            pair._getvalue())
+
+
+#-------------------------------------------------------------------------------
+# Operators
+
+@lower_builtin('==', types.UnicodeType, types.UnicodeType)
+def unicode_eq(context, builder, sig, args):
+    def eq_impl(a, b):
+        n = len(a)
+        if n != len(b):
+            return False
+        # Equal strings have the same kind
+        if _get_kind(a) != _get_kind(b):
+            return False
+        return _memcmp_region(a, 0, b, 0, n) == 0
+
+    return context.compile_internal(builder, eq_impl, sig, args)
+
+@lower_builtin('!=', types.UnicodeType, types.UnicodeType)
+def unicode_ne(context, builder, sig, args):
+    def ne_impl(a, b):
+        return not (a == b)
+
+    return context.compile_internal(builder, ne_impl, sig, args)
+
+@lower_builtin('<', types.UnicodeType, types.UnicodeType)
+def unicode_lt(context, builder, sig, args):
+    def lt_impl(a, b):
+        return _compare(a, b) < 0
+
+    return context.compile_internal(builder, lt_impl, sig, args)
+
+@lower_builtin('<=', types.UnicodeType, types.UnicodeType)
+def unicode_le(context, builder, sig, args):
+    def le_impl(a, b):
+        return _compare(a, b) <= 0
+
+    return context.compile_internal(builder, le_impl, sig, args)
+
+@lower_builtin('>', types.UnicodeType, types.UnicodeType)
+def unicode_gt(context, builder, sig, args):
+    def gt_impl(a, b):
+        return _compare(a, b) > 0
+
+    return context.compile_internal(builder, gt_impl, sig, args)
+
+@lower_builtin('>=', types.UnicodeType, types.UnicodeType)
+def unicode_ge(context, builder, sig, args):
+    def ge_impl(a, b):
+        return _compare(a, b) >= 0
+
+    return context.compile_internal(builder, ge_impl, sig, args)
+
+@lower_builtin("in", types.UnicodeType, types.UnicodeType)
+def unicode_contains(context, builder, sig, args):
+    def contains_impl(sub, s):
+        return _find(s, sub, 0) >= 0
+
+    return context.compile_internal(builder, contains_impl, sig, args)
+
+@lower_builtin('+', types.UnicodeType, types.UnicodeType)
+def unicode_concat(context, builder, sig, args):
+    def concat_impl(a, b):
+        res = _empty_string(max(_get_kind(a), _get_kind(b)), len(a) + len(b))
+        _copy_into(res, 0, a)
+        _copy_into(res, len(a), b)
+        return res
+
+    return context.compile_internal(builder, concat_impl, sig, args)
+
+
+#-------------------------------------------------------------------------------
+# Methods
+
+@lower_builtin("unicode.find", types.UnicodeType, types.UnicodeType)
+def unicode_find(context, builder, sig, args):
+    def find_impl(s, sub):
+        return _find(s, sub, 0)
+
+    return context.compile_internal(builder, find_impl, sig, args)
+
+@lower_builtin("unicode.startswith", types.UnicodeType, types.UnicodeType)
+def unicode_startswith(context, builder, sig, args):
+    def startswith_impl(s, prefix):
+        m = len(prefix)
+        return m <= len(s) and _regions_equal(s, 0, prefix, 0, m)
+
+    return context.compile_internal(builder, startswith_impl, sig, args)
+
+@lower_builtin("unicode.endswith", types.UnicodeType, types.UnicodeType)
+def unicode_endswith(context, builder, sig, args):
+    def endswith_impl(s, suffix):
+        m = len(suffix)
+        n = len(s)
+        return m <= n and _regions_equal(s, n - m, suffix, 0, m)
+
+    return context.compile_internal(builder, endswith_impl, sig, args)
+
+@lower_builtin("unicode.split", types.UnicodeType, types.UnicodeType)
+def unicode_split(context, builder, sig, args):
+    def split_impl(s, sep):
+        m = len(sep)
+        if m == 0:
+            raise ValueError("empty separator")
+        parts = []
+        start = 0
+        pos = _find(s, sep, start)
+        while pos >= 0:
+            parts.append(_substring(s, start, 1, pos - start))
+            start = pos + m
+            pos = _find(s, sep, start)
+        parts.append(_substring(s, start, 1, len(s) - start))
+        return parts
+
+    return context.compile_internal(builder, split_impl, sig, args)
+
+@lower_builtin("unicode.split", types.UnicodeType)
+def unicode_split_whitespace(context, builder, sig, args):
+    def split_impl(s):
+        parts = []
+        n = len(s)
+        i = 0
+        while i < n:
+            while i < n and _is_whitespace(_get_code_point(s, i)):
+                i += 1
+            if i == n:
+                break
+            j = i + 1
+            while j < n and not _is_whitespace(_get_code_point(s, j)):
+                j += 1
+            parts.append(_substring(s, i, 1, j - i))
+            i = j
+        return parts
+
+    return context.compile_internal(builder, split_impl, sig, args)
+
+@lower_builtin("unicode.join", types.UnicodeType, types.Sequence)
+def unicode_join(context, builder, sig, args):
+    def join_impl(sep, parts):
+        n = len(parts)
+        # Compute the size and kind of the result in a first pass
+        kind = 1
+        length = 0
+        for i in range(n):
+            kind = max(kind, _get_kind(parts[i]))
+            length += len(parts[i])
+        if n > 1:
+            kind = max(kind, _get_kind(sep))
+            length += len(sep) * (n - 1)
+        res = _empty_string(kind, length)
+        pos = 0
+        for i in range(n):
+            if i > 0:
+                _copy_into(res, pos, sep)
+                pos += len(sep)
+            part = parts[i]
+            _copy_into(res, pos, part)
+            pos += len(part)
+        return res
+
+    return context.compile_internal(builder, join_impl, sig, args)
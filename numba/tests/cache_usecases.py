@@ -10,7 +10,7 @@ import sys
 
 import numpy as np
 
-from numba import jit, generated_jit, types
+from numba import jit, generated_jit, types, stencil
 
 from numba.tests.ctypes_usecases import c_sin
 from numba.tests.support import TestCase, captured_stderr
@@ -129,6 +129,15 @@ def record_return(ary, i):
     return ary[i]
 
 
+@stencil(cache=True)
+def stencil_usecase(a):
+    return a[-1] + a[1]
+
+@jit(cache=True, nopython=True)
+def stencil_caller_usecase(a):
+    return stencil_usecase(a) + 1
+
+
 class _TestModule(TestCase):
     """
     Tests for functionality of this module's functions.
@@ -454,6 +454,24 @@ def override_env_config(name, value):
         config.reload_config()
 
 
+def run_in_subprocess(code, **envvars):
+    """
+    Run *code* in a new Python interpreter with the environment variables
+    *envvars* set, and return its standard output.  Raise AssertionError
+    with its standard error if it fails.
+    """
+    env = dict(os.environ)
+    env.update(envvars)
+    popen = subprocess.Popen([sys.executable, "-c", code],
+                             stdout=subprocess.PIPE,
+                             stderr=subprocess.PIPE, env=env)
+    out, err = popen.communicate()
+    if popen.returncode != 0:
+        raise AssertionError("process failed with code %s: stderr follows"
+                             "\n%s\n" % (popen.returncode, err.decode()))
+    return out.decode()
+
+
 def compile_function(name, code, globs):
     """
     Given a *code* string, compile it with globals *globs* and return
@@ -521,6 +521,32 @@ class TestArrayAnalysis(TestCase):
                                asserts=[self.without_assert('B', 'C')],
                                idempotent=False)
 
+        def test_9(m):
+            A = np.zeros(m)
+            B1 = A[1:]
+            B2 = A[:-1]
+            B = B1 - B2
+            C1 = A[2:]
+            C2 = A[:-2]
+            C = C1 - C2
+            D1 = B[1:]
+            D = D1 + C
+            return D
+        self._compile_and_test(test_9, (types.intp,),
+                               asserts=[self.without_assert('B1', 'B2'),
+                                        self.without_assert('C1', 'C2'),
+                                        self.without_assert('D1', 'C')],
+                               idempotent=False)
+
+        def test_10(m):
+            A = np.zeros(m)
+            B = A[1:m-1]
+            C = np.ones(m-2)
+            return B + C
+        self._compile_and_test(test_10, (types.intp,),
+                               asserts=[self.without_assert('B', 'C')],
+                               idempotent=False)
+
     def test_numpy_calls(self):
         def test_zeros(n):
             a = np.zeros(n)
@@ -0,0 +1,205 @@
+from __future__ import print_function
+
+from collections import deque
+
+import numpy as np
+
+from numba import njit
+from numba.errors import TypingError
+import numba.unittest_support as unittest
+from .support import TestCase, MemoryLeakMixin
+
+
+def constructor_usecase(n):
+    d = deque()
+    for i in range(n):
+        d.append(i)
+    return d
+
+def iterable_constructor_usecase(arr, maxlen):
+    return deque(arr, maxlen)
+
+def append_usecase(n, maxlen):
+    d = deque(maxlen=maxlen)
+    for i in range(n):
+        if i % 3:
+            d.append(i)
+        else:
+            d.appendleft(i)
+    return d
+
+def pop_usecase(n):
+    d = deque()
+    for i in range(n):
+        d.append(i)
+        d.appendleft(-i)
+    res = []
+    while d:
+        res.append(d.pop())
+        if d:
+            res.append(d.popleft())
+    return res
+
+def sliding_window_usecase(arr, k):
+    # Running sum of the last k items
+    window = deque(maxlen=k)
+    res = []
+    total = 0.0
+    for x in arr:
+        if len(window) == k:
+            total -= window[0]
+        window.append(x)
+        total += x
+        res.append(total)
+    return res
+
+def getitem_usecase(n, maxlen):
+    d = deque(maxlen=maxlen)
+    for i in range(n):
+        d.append(i)
+        d.appendleft(-i)
+    res = []
+    for i in range(-len(d), len(d)):
+        res.append(d[i])
+    return res
+
+def setitem_usecase(n):
+    d = deque([0] * n)
+    d.appendleft(-1)
+    for i in range(len(d)):
+        d[i] += i
+    d[-1] = 42
+    return d
+
+def contains_usecase(n, x):
+    d = deque()
+    for i in range(n):
+        d.appendleft(i * 2)
+    s = 0
+    for y in d:
+        s += y
+    return s, x in d
+
+def extend_clear_usecase(a, b):
+    d = deque(a)
+    d.extend(b)
+    d.extendleft(b)
+    r1 = list(d)
+    d.clear()
+    d.append(a[0])
+    return r1, list(d)
+
+def string_items_usecase(words, maxlen):
+    d = deque(maxlen=maxlen)
+    for w in words:
+        d.append(w)
+    return d
+
+def pop_empty_usecase():
+    d = deque([1])
+    d.pop()
+    return d.pop()
+
+def popleft_empty_usecase():
+    d = deque([1])
+    d.popleft()
+    return d.popleft()
+
+def index_error_usecase(i):
+    d = deque([1, 2, 3])
+    return d[i]
+
+def maxlen_usecase(n):
+    d = deque(maxlen=n)
+    d.append(1)
+    return len(d)
+
+
+class TestDeque(MemoryLeakMixin, TestCase):
+
+    def test_constructor(self):
+        cfunc = njit(constructor_usecase)
+        for n in (0, 1, 7, 8, 9, 100):
+            self.assertEqual(cfunc(n), constructor_usecase(n))
+        cfunc = njit(iterable_constructor_usecase)
+        arr = np.arange(20)
+        for maxlen in (None, 0, 5, 20, 30):
+            got = cfunc(arr, maxlen)
+            self.assertEqual(got, deque(arr, maxlen))
+            self.assertEqual(got.maxlen, maxlen)
+
+    def test_append(self):
+        pyfunc = append_usecase
+        cfunc = njit(pyfunc)
+        for n in (0, 5, 8, 9, 50):
+            for maxlen in (None, 0, 1, 4, 8, 9, 100):
+                self.assertEqual(cfunc(n, maxlen), pyfunc(n, maxlen))
+
+    def test_pop(self):
+        cfunc = njit(pop_usecase)
+        for n in (0, 1, 5, 30):
+            self.assertEqual(cfunc(n), pop_usecase(n))
+
+    def test_sliding_window(self):
+        pyfunc = sliding_window_usecase
+        cfunc = njit(pyfunc)
+        arr = np.random.RandomState(42).random_sample(100)
+        for k in (1, 3, 10):
+            self.assertPreciseEqual(cfunc(arr, k), pyfunc(arr, k))
+
+    def test_getitem(self):
+        cfunc = njit(getitem_usecase)
+        for n, maxlen in [(1, None), (20, None), (20, 12)]:
+            self.assertEqual(cfunc(n, maxlen), getitem_usecase(n, maxlen))
+
+    def test_setitem(self):
+        cfunc = njit(setitem_usecase)
+        for n in (1, 8, 20):
+            self.assertEqual(cfunc(n), setitem_usecase(n))
+
+    def test_contains(self):
+        cfunc = njit(contains_usecase)
+        for n, x in [(0, 2), (5, 4), (5, 5), (20, 38)]:
+            self.assertEqual(cfunc(n, x), contains_usecase(n, x))
+
+    def test_extend_clear(self):
+        cfunc = njit(extend_clear_usecase)
+        a = [1.5, 2.5, 3.5]
+        b = [1, 2, 3, 4, 5, 6, 7]
+        self.assertEqual(cfunc(a, b), extend_clear_usecase(a, b))
+
+    def test_string_items(self):
+        cfunc = njit(string_items_usecase)
+        words = "the quick brown fox jumps over the lazy dog".split()
+        for maxlen in (None, 3):
+            self.assertEqual(cfunc(words, maxlen),
+                             string_items_usecase(words, maxlen))
+
+    def test_errors(self):
+        # Exceptions leak references
+        self.disable_leak_check()
+
+        for pyfunc in (pop_empty_usecase, popleft_empty_usecase):
+            cfunc = njit(pyfunc)
+            with self.assertRaises(IndexError) as raises:
+                cfunc()
+            self.assertIn("pop from an empty deque", str(raises.exception))
+
+        cfunc = njit(index_error_usecase)
+        for i in (3, -4):
+            with self.assertRaises(IndexError) as raises:
+                cfunc(i)
+            self.assertIn("deque index out of range", str(raises.exception))
+
+        cfunc = njit(maxlen_usecase)
+        with self.assertRaises(ValueError) as raises:
+            cfunc(-1)
+        self.assertIn("maxlen must be non-negative", str(raises.exception))
+
+    def test_invalid_maxlen(self):
+        with self.assertRaises(TypingError):
+            njit(maxlen_usecase)(1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
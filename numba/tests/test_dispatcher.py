@@ -1131,6 +1131,46 @@ class TestCache(BaseCacheUsecasesTest):
         self.assertIn("cache hits = 1", err.strip())
 
 
+    def test_stencil_caching(self):
+        self.check_pycache(0)
+        mod = self.import_module()
+        self.check_pycache(0)
+
+        a = np.arange(10.)
+        expected = np.zeros_like(a)
+        expected[1:-1] = a[:-2] + a[2:]
+        self.assertPreciseEqual(mod.stencil_usecase(a), expected)
+        self.check_pycache(2)  # 1 index, 1 data
+        # the caller reuses the stencil function compiled above
+        self.assertPreciseEqual(mod.stencil_caller_usecase(a), expected + 1)
+        self.check_pycache(4)  # 2 index, 2 data
+
+        # Both are loaded from the cache by another process, which would
+        # overwrite the index files if it compiled anything.  The caller
+        # comes first as it has to carry the stencil function with it.
+        mtimes = self.get_cache_mtimes()
+        code = """if 1:
+            import sys
+
+            import numpy as np
+
+            sys.path.insert(0, %(tempdir)r)
+            mod = __import__(%(modname)r)
+            a = np.arange(10.)
+            expected = np.zeros_like(a)
+            expected[1:-1] = a[:-2] + a[2:]
+            assert np.all(mod.stencil_caller_usecase(a) == expected + 1)
+            assert np.all(mod.stencil_usecase(a) == expected)
+            """ % dict(tempdir=self.tempdir, modname=self.modname)
+        popen = subprocess.Popen([sys.executable, "-c", code],
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        out, err = popen.communicate()
+        if popen.returncode != 0:
+            raise AssertionError("process failed with code %s: stderr follows\n%s\n"
+                                 % (popen.returncode, err.decode()))
+        self.assertEqual(self.get_cache_mtimes(), mtimes)
+
+
 class TestCacheWithCpuSetting(BaseCacheUsecasesTest):
     # Disable parallel testing due to envvars modification
     _numba_parallel_test_ = False
@@ -1207,6 +1247,33 @@ class TestCacheWithCpuSetting(BaseCacheUsecasesTest):
         self.assertEqual(key_generic[1][2], my_cpu_features)
 
 
+class TestCacheWithConfigSetting(BaseCacheUsecasesTest):
+    # Disable parallel testing due to envvars modification
+    _numba_parallel_test_ = False
+
+    def check_config_key(self, envvar):
+        self.check_pycache(0)
+        mod = self.import_module()
+        mod.self_test()
+        cache_size = len(self.cache_contents())
+
+        # Code compiled under another setting isn't loaded
+        with override_env_config(envvar, '1'):
+            self.run_in_separate_process()
+        self.assertGreater(len(self.cache_contents()), cache_size)
+        cache_index = mod.add_usecase._cache._cache_file._load_index()
+        self.assertEqual(len(cache_index), 2)
+        [key_a, key_b] = cache_index.keys()
+        self.assertEqual(key_a[:2], key_b[:2])
+        self.assertNotEqual(key_a[2], key_b[2])
+
+    def test_nrt_trace(self):
+        self.check_config_key('NUMBA_NRT_TRACE')
+
+    def test_set_hash_mixing(self):
+        self.check_config_key('NUMBA_SET_HASH_MIXING')
+
+
 class TestMultiprocessCache(BaseCacheTest):
 
     # Nested multiprocessing.Pool raises AssertionError:
@@ -1068,6 +1068,11 @@ class TestNpArray(MemoryLeakMixin, BaseTest):
         # An empty tuple
         got = cfunc(())
         self.assertPreciseEqual(got, np.float64(()))
+        # Lists of booleans and floats
+        got = cfunc([True, False, True])
+        self.assertPreciseEqual(got, np.array([True, False, True]))
+        got = cfunc([1.5] * 100)
+        self.assertPreciseEqual(got, np.full(100, 1.5))
 
     def test_1d_with_dtype(self):
         def pyfunc(arg):
@@ -1138,6 +1143,59 @@ class TestNpArray(MemoryLeakMixin, BaseTest):
             cfunc(((1, 2), (np.int64(1), val)))
 
 
+class TestNpAsarray(MemoryLeakMixin, BaseTest):
+
+    def test_array(self):
+        def pyfunc(arg):
+            return np.asarray(arg)
+
+        cfunc = nrtjit(pyfunc)
+        arr = np.arange(6).reshape((2, 3))
+        got = cfunc(arr)
+        self.assertIs(got, arr)
+        self.assertPreciseEqual(cfunc(arr.T), arr.T)
+
+    def test_sequence(self):
+        def pyfunc(arg):
+            return np.asarray(arg)
+
+        cfunc = nrtjit(pyfunc)
+        self.assertPreciseEqual(cfunc([2, 3, 42]), np.intp([2, 3, 42]))
+        self.assertPreciseEqual(cfunc(((1, 2.5), (3, 4))),
+                                np.float64([[1, 2.5], [3, 4]]))
+
+    def test_sequence_with_dtype(self):
+        def pyfunc(arg):
+            return np.asarray(arg, dtype=np.float32)
+
+        self.check_outputs(pyfunc, [([2, 42],), ((1, 3.5, 42),)])
+
+    def test_set(self):
+        # Unlike Numpy, which would build a 0d object array, sets are
+        # converted to a 1d array of their items.
+        def pyfunc(n):
+            return np.asarray(set(np.arange(n) % 7))
+
+        cfunc = nrtjit(pyfunc)
+        for n in (0, 5, 100):
+            got = cfunc(n)
+            self.assertEqual(got.dtype, np.intp)
+            self.assertPreciseEqual(np.sort(got), np.arange(min(n, 7)))
+
+    def test_set_unsupported_dtype(self):
+        def pyfunc(n):
+            s = set()
+            s.add((n, n))
+            return np.asarray(s)
+
+        cfunc = nrtjit(pyfunc)
+        with self.assertRaises(TypingError) as raises:
+            cfunc(1)
+        self.assertIn("np.asarray() cannot convert a set of "
+                      "tuple(int64 x 2) to an array",
+                      str(raises.exception))
+
+
 class TestNpConcatenate(MemoryLeakMixin, TestCase):
     """
     Tests for np.concatenate().
@@ -0,0 +1,196 @@
+from __future__ import print_function, absolute_import, division
+
+import re
+
+import numpy as np
+
+from numba import njit
+from numba import unittest_support as unittest
+from .support import MemoryLeakMixin, TestCase, override_config
+
+
+def loop_temporary(a):
+    s = 0.0
+    for i in range(a.shape[0]):
+        t = np.empty(3)
+        t[0] = a[i]
+        t[1] = a[i] * 2
+        t[2] = len(t)
+        t += 1
+        s += t.sum()
+    return s
+
+def zeros_temporary(n):
+    s = 0
+    for i in range(n):
+        t = np.zeros(4, dtype=np.int64)
+        t[i % 4] += i
+        s += t.sum() * (i + 1)
+    return s
+
+def temporary_2d(n):
+    s = 0
+    for k in range(n):
+        t = np.empty((2, 3), dtype=np.int32)
+        for i in range(2):
+            for j in range(3):
+                t[i, j] = i * 10 + j + k
+        s += t[1, 2] - t[0, 1] + t.sum()
+    return s
+
+def returned(n):
+    t = np.zeros(3)
+    t[0] = n
+    return t
+
+def returned_view(n):
+    t = np.zeros(3)
+    t[0] = n
+    return t[1:]
+
+def stored_in_list(n):
+    l = []
+    for i in range(n):
+        t = np.empty(2)
+        t[:] = i
+        l.append(t)
+    s = 0.0
+    for t in l:
+        s += t.sum()
+    return s
+
+def live_across_iterations(n):
+    prev = np.zeros(3)
+    for i in range(n):
+        cur = np.empty(3)
+        cur[:] = prev + 1
+        prev = cur
+    return prev.sum()
+
+def large_temporary(n):
+    t = np.empty(100000)
+    t[:] = n
+    return t.sum()
+
+def variable_shape(n):
+    t = np.empty(n)
+    t[:] = n
+    return t.sum()
+
+def arena_kernel(a, n):
+    s = 0.0
+    for i in range(n):
+        m = 1 + (i * 7) % a.shape[0]
+        t = a[:m] * 2.0 + 1.0
+        s += np.sqrt(t).sum()
+    return s
+
+def arena_returned(a):
+    t = a + 1
+    return t * 2
+
+def arena_stored(a, n):
+    l = []
+    for i in range(n):
+        l.append(a * i)
+    return l
+
+def arena_raises(a, n):
+    t = a + 1
+    if n < 0:
+        raise ValueError
+    return t.sum()
+
+
+class TestStackAllocation(MemoryLeakMixin, TestCase):
+
+    def allocates(self, cfunc):
+        llvm_ir = cfunc.inspect_llvm(cfunc.signatures[0])
+        return 'NRT_MemInfo_alloc' in llvm_ir
+
+    def check(self, pyfunc, arg, stack):
+        cfunc = njit(pyfunc)
+        self.assertPreciseEqual(cfunc(arg), pyfunc(arg))
+        self.assertEqual(self.allocates(cfunc), not stack)
+
+    def test_non_escaping(self):
+        self.check(loop_temporary, np.arange(10.), stack=True)
+        self.check(zeros_temporary, 10, stack=True)
+        self.check(temporary_2d, 5, stack=True)
+
+    def test_escaping(self):
+        self.check(returned, 5, stack=False)
+        self.check(returned_view, 5, stack=False)
+        self.check(stored_in_list, 5, stack=False)
+        self.check(live_across_iterations, 5, stack=False)
+
+    def test_not_constant_size(self):
+        self.check(large_temporary, 5, stack=False)
+        self.check(variable_shape, 5, stack=False)
+
+    def test_disabled(self):
+        with override_config('STACK_ALLOC_MAX_BYTES', 0):
+            self.check(loop_temporary, np.arange(10.), stack=False)
+
+
+class TestArenaAllocation(MemoryLeakMixin, TestCase):
+
+    def arena_uses(self, cfunc):
+        llvm_ir = cfunc.inspect_llvm(cfunc.signatures[0])
+        return re.findall(r'call void @NRT_Arena_use\(i32 (\d)\)', llvm_ir)
+
+    def test_temporaries(self):
+        cfunc = njit(arena=True)(arena_kernel)
+        a = np.arange(2000.)
+        self.assertPreciseEqual(cfunc(a, 100), njit(arena_kernel)(a, 100))
+        self.assertIn('1', self.arena_uses(cfunc))
+
+    def test_returned(self):
+        cfunc = njit(arena=True)(arena_returned)
+        kernel = njit(arena=True)(arena_kernel)
+        a = np.arange(10.)
+        got = cfunc(a)
+        # The result doesn't live in the arena and survives later calls
+        kernel(a, 100)
+        self.assertPreciseEqual(got, arena_returned(a))
+        # Only the temporary comes from the arena
+        self.assertEqual(self.arena_uses(cfunc), ['1', '0'])
+
+    def test_stored(self):
+        cfunc = njit(arena=True)(arena_stored)
+        a = np.arange(10.)
+        got = cfunc(a, 5)
+        # The arrays stored in the list survive later calls
+        njit(arena=True)(arena_kernel)(a, 100)
+        self.assertPreciseEqual(got, arena_stored(a, 5))
+
+    def test_nested(self):
+        inner = njit(arena=True)(arena_returned)
+        plain = njit(arena_returned)
+
+        @njit(arena=True)
+        def outer(a):
+            x = inner(a)
+            y = plain(a)
+            return (x + y).sum(), inner(a)
+
+        a = np.arange(10.)
+        s, r = outer(a)
+        self.assertPreciseEqual(s, 2 * arena_returned(a).sum())
+        self.assertPreciseEqual(r, arena_returned(a))
+
+    def test_exception(self):
+        cfunc = njit(arena=True)(arena_raises)
+        a = np.arange(10.)
+        with self.assertRaises(ValueError):
+            cfunc(a, -1)
+        self.assertPreciseEqual(cfunc(a, 1), arena_raises(a, 1))
+
+    def test_disabled(self):
+        cfunc = njit(arena_kernel)
+        cfunc(np.arange(10.), 5)
+        self.assertEqual(self.arena_uses(cfunc), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
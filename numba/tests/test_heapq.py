@@ -0,0 +1,153 @@
+from __future__ import print_function
+
+import heapq as hq
+import itertools
+
+import numpy as np
+
+from numba import njit, types
+from numba.errors import TypingError
+from numba.typed import List
+import numba.unittest_support as unittest
+from .support import TestCase, MemoryLeakMixin
+
+
+def heapify_usecase(heap):
+    hq.heapify(heap)
+
+def heappush_usecase(heap, item):
+    hq.heappush(heap, item)
+
+def heappop_usecase(heap):
+    return hq.heappop(heap)
+
+def heapreplace_usecase(heap, item):
+    return hq.heapreplace(heap, item)
+
+def nsmallest_usecase(n, iterable):
+    return hq.nsmallest(n, iterable)
+
+def nlargest_usecase(n, iterable):
+    return hq.nlargest(n, iterable)
+
+def pop_twice_usecase(heap):
+    hq.heappop(heap)
+    hq.heappop(heap)
+
+def pop_replace_usecase(heap):
+    hq.heappop(heap)
+    hq.heapreplace(heap, 1.0)
+
+def heapsort_usecase(items):
+    heap = [items[0]]
+    hq.heappop(heap)
+    for x in items:
+        hq.heappush(heap, x)
+    res = []
+    while heap:
+        res.append(hq.heappop(heap))
+    return res
+
+def empty_heap_usecase(x):
+    heap = []
+    hq.heappush(heap, x)
+    return heap
+
+
+class TestHeapq(MemoryLeakMixin, TestCase):
+
+    def setUp(self):
+        super(TestHeapq, self).setUp()
+        self.rnd = np.random.RandomState(42)
+
+    def float_lists(self):
+        yield [1.0]
+        yield [2.0, 1.0]
+        for n in (5, 16, 33):
+            yield list(self.rnd.random_sample(n))
+        yield [3.0] * 7
+
+    def tuple_lists(self):
+        for n in (1, 6, 20):
+            yield [(float(a), int(b)) for a, b in
+                   zip(self.rnd.randint(0, 4, n), self.rnd.randint(0, 10, n))]
+
+    def test_heapify(self):
+        cfunc = njit(heapify_usecase)
+        for items in itertools.chain(self.float_lists(), self.tuple_lists()):
+            expected = list(items)
+            hq.heapify(expected)
+            got = list(items)
+            cfunc(got)
+            self.assertPreciseEqual(got, expected)
+
+    def test_heappush_heappop(self):
+        push = njit(heappush_usecase)
+        pop = njit(heappop_usecase)
+        for items in itertools.chain(self.float_lists(), self.tuple_lists()):
+            # Empty lists can't be passed to jitted functions
+            expected = items[:1]
+            got = items[:1]
+            for x in items[1:]:
+                hq.heappush(expected, x)
+                push(got, x)
+                self.assertPreciseEqual(got, expected)
+            while expected:
+                self.assertPreciseEqual(pop(got), hq.heappop(expected))
+                self.assertPreciseEqual(got, expected)
+        # Exceptions leak references
+        self.disable_leak_check()
+        with self.assertRaises(IndexError):
+            njit(pop_twice_usecase)([1.0])
+
+    def test_heapreplace(self):
+        cfunc = njit(heapreplace_usecase)
+        for items in self.float_lists():
+            expected = list(items)
+            hq.heapify(expected)
+            got = list(expected)
+            for x in (0.5, 2.0, -1.0):
+                self.assertPreciseEqual(cfunc(got, x),
+                                        hq.heapreplace(expected, x))
+                self.assertPreciseEqual(got, expected)
+        # Exceptions leak references
+        self.disable_leak_check()
+        with self.assertRaises(IndexError):
+            njit(pop_replace_usecase)([1.0])
+
+    def test_heapsort(self):
+        cfunc = njit(heapsort_usecase)
+        for items in itertools.chain(self.float_lists(), self.tuple_lists()):
+            self.assertPreciseEqual(cfunc(items), sorted(items))
+
+    def test_nsmallest_nlargest(self):
+        for pyfunc in (nsmallest_usecase, nlargest_usecase):
+            cfunc = njit(pyfunc)
+            for items in itertools.chain(self.float_lists(),
+                                         self.tuple_lists()):
+                for n in (0, 1, 3, len(items), len(items) + 2):
+                    self.assertPreciseEqual(cfunc(n, items), pyfunc(n, items))
+            # Over arrays
+            arr = self.rnd.randint(0, 100, 50)
+            self.assertPreciseEqual(cfunc(5, arr), pyfunc(5, list(arr)))
+
+    def test_typed_list(self):
+        heap = List.empty(types.float64)
+        heap.extend([5.0, 1.0, 4.0, 2.0])
+        njit(heapify_usecase)(heap)
+        njit(heappush_usecase)(heap, 3.0)
+        pop = njit(heappop_usecase)
+        self.assertEqual([pop(heap) for i in range(len(heap))],
+                         [1.0, 2.0, 3.0, 4.0, 5.0])
+
+    def test_errors(self):
+        with self.assertRaises(TypingError) as raises:
+            njit(heapify_usecase)((1, 2))
+        self.assertIn("heap argument must be a list", str(raises.exception))
+        # The item type of an empty heap can't be inferred
+        with self.assertRaises(TypingError):
+            njit(empty_heap_usecase)(1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -37,6 +37,13 @@ def vdot(a, b):
     return np.vdot(a, b)
 
 
+def np_matmul(a, b):
+    return np.matmul(a, b)
+
+def np_matmul_out(a, b, out):
+    return np.matmul(a, b, out)
+
+
 class TestProduct(TestCase):
     """
     Tests for dot products.
@@ -281,6 +288,78 @@ class TestProduct(TestCase):
         """
         self.check_dot_mm(matmul_usecase, None, "'@'")
 
+    def test_dot_int(self):
+        """
+        Test np.dot() on integer arrays, computed without BLAS
+        """
+        def sample_int(shape, dtype):
+            return (np.arange(np.prod(shape)) % 7 - 2).astype(dtype).reshape(
+                shape)
+
+        cfunc2 = jit(nopython=True)(dot2)
+        cfunc3 = jit(nopython=True)(dot3)
+        for dtype in (np.int64, np.int32, np.uint8):
+            # larger sizes exercise the blocked matrix * matrix kernel
+            for m, n, k in [(2, 3, 4), (1, 3, 4), (70, 130, 90)]:
+                a = sample_int((m, k), dtype)
+                b = sample_int((k, n), dtype)
+                v = sample_int((k,), dtype)
+                w = sample_int((m,), dtype)
+                for args in [(a, b), (a, v), (w, a), (v, v), (b.T, a.T),
+                             (a[::-1], b[:, ::2])]:
+                    self.check_func(dot2, cfunc2, args)
+                for args in [(a, b), (a, v), (w, a)]:
+                    out = np.empty(np.dot(*args).shape, dtype)
+                    self.check_func_out(dot3, cfunc3, args, out)
+
+        a = sample_int((2, 3), np.int64)
+        b = sample_int((4, 2), np.int64)
+        self.assert_mismatching_sizes(cfunc2, (a, b))
+        self.assert_mismatching_sizes(cfunc3, (b, a, np.empty((4, 2),
+                                                              np.int64)),
+                                      is_out=True)
+
+    @needs_matmul
+    def check_matmul_stacked(self, pyfunc):
+        cfunc = jit(nopython=True)(pyfunc)
+        for dtype in (np.float64, np.complex128, np.int64):
+            # small matrices use native loops, larger ones BLAS if the
+            # dtype is supported
+            for m, n, k in [(3, 3, 3), (2, 4, 3), (20, 30, 25)]:
+                a = self.sample_matrix(5 * m, k, dtype).reshape((5, m, k))
+                b = self.sample_matrix(5 * k, n, dtype).reshape((5, k, n))
+                for args in [(a, b), (a, b[0]), (a[0], b), (a[:1], b),
+                             (a, b[:1]), (a[:, ::-1], b), (a[::2], b[::2])]:
+                    self.check_func(pyfunc, cfunc, args)
+
+        a = self.sample_matrix(6, 3, np.float64).reshape((2, 3, 3))
+        b = self.sample_matrix(9, 3, np.float64).reshape((3, 3, 3))
+        self.assert_mismatching_sizes(cfunc, (a, b))
+        self.assert_mismatching_sizes(cfunc, (a, b[:, :2]))
+
+    @needs_blas
+    def test_matmul_stacked(self):
+        """
+        Test stack of matrices @ stack of matrices
+        """
+        self.check_matmul_stacked(matmul_usecase)
+
+    @needs_blas
+    @unittest.skipUnless(numpy_version >= (1, 10), "requires Numpy 1.10+")
+    def test_np_matmul(self):
+        """
+        Test np.matmul() on stacks of matrices and matrices
+        """
+        self.check_matmul_stacked(np_matmul)
+        self.check_dot_mm(np_matmul, None, "np.matmul()")
+
+        a = self.sample_matrix(3, 3, np.float64)
+        cfunc = jit(nopython=True)(np_matmul_out)
+        with self.assertRaises(errors.TypingError) as raises:
+            cfunc(a, a, np.empty_like(a))
+        self.assertIn("np.matmul() doesn't support the out argument",
+                      str(raises.exception))
+
     @needs_blas
     def test_contiguity_warnings(self):
         m, k, n = 2, 3, 4
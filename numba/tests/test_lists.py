@@ -124,6 +124,19 @@ def list_extend_heterogeneous(n):
     l.extend([123.0])
     return l
 
+def list_extend_array(n):
+    a = np.arange(n)
+    l = list(a)
+    # Contiguous and non-contiguous arrays, the list itself
+    l.extend(a[::-1])
+    l.extend(l)
+    m = [0.5]
+    m.extend(a)
+    s = 0.0
+    for x in m:
+        s += x
+    return l, s
+
 def list_pop0(n):
     l = list(range(n))
     res = 0
@@ -417,6 +430,9 @@ class TestLists(MemoryLeakMixin, TestCase):
     def test_extend(self):
         self.check_unary_with_size(list_extend)
 
+    def test_extend_array(self):
+        self.check_unary_with_size(list_extend_array)
+
     @tag('important')
     def test_extend_heterogeneous(self):
         self.check_unary_with_size(list_extend_heterogeneous, precise=False)
@@ -8,11 +8,11 @@ import re
 import numpy as np
 
 from numba import unittest_support as unittest
-from numba import njit, targets, typing
+from numba import config, njit, targets, typing
 from numba.compiler import compile_isolated, Flags, types
 from numba.runtime import rtsys
 from numba.runtime import nrtopt
-from .support import MemoryLeakMixin, TestCase
+from .support import MemoryLeakMixin, TestCase, run_in_subprocess
 
 enable_nrt_flags = Flags()
 enable_nrt_flags.set("nrt")
@@ -266,6 +266,240 @@ class TestTracemalloc(unittest.TestCase):
         self.assertLess(stat.size, N * 0.01)
 
 
+class TestNrtPoolAllocator(TestCase):
+    """
+    Test the size-class pool allocator (NUMBA_NRT_POOL_ALLOCATOR).
+    """
+
+    def run_with_pool(self, code):
+        # The allocator is chosen when numba is imported
+        return run_in_subprocess(code, NUMBA_NRT_POOL_ALLOCATOR='1')
+
+    def test_pool_allocator(self):
+        code = """if 1:
+            import numpy as np
+            from numba import njit
+            from numba.runtime import rtsys
+
+            @njit
+            def churn(n, size):
+                total = 0.0
+                for i in range(n):
+                    total += np.ones(size).sum()
+                return total
+
+            @njit
+            def make(n):
+                return np.arange(n)
+
+            @njit
+            def grow(n):
+                l = []
+                for i in range(n):
+                    l.append(i)
+                return l
+
+            # small, medium and large (unpooled) blocks
+            for size in (1, 100, 5000, 100000):
+                assert churn(50, size) == 50.0 * size
+            # reallocation across size classes
+            for n in (10, 1000, 100000):
+                assert grow(n) == list(range(n))
+            # blocks released from Python
+            arrs = [make(i) for i in range(200)]
+            assert all(len(a) == i for i, a in enumerate(arrs))
+            del arrs
+
+            stats = rtsys.get_allocation_stats()
+            assert stats.alloc == stats.free, stats
+            assert stats.mi_alloc == stats.mi_free, stats
+            print(stats.pool_hit, stats.pool_miss)
+            """
+        hit, miss = map(int, self.run_with_pool(code).split())
+        self.assertGreater(miss, 0)
+        # churn() reuses the block freed by the previous iteration
+        self.assertGreaterEqual(hit, 3 * 49)
+
+    def test_pool_allocator_threads(self):
+        code = """if 1:
+            import threading
+            import numpy as np
+            from numba import njit
+            from numba.runtime import rtsys
+
+            @njit(nogil=True)
+            def churn(n, size):
+                total = 0.0
+                for i in range(n):
+                    total += np.ones(size).sum()
+                return total
+
+            churn(1, 1)
+            before = rtsys.get_allocation_stats()
+            threads = [threading.Thread(target=churn, args=(50, 100))
+                       for i in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            after = rtsys.get_allocation_stats()
+            # The stats of the exited threads are kept
+            print(after.pool_hit - before.pool_hit,
+                  after.pool_miss - before.pool_miss)
+            assert after.alloc == after.free, after
+            """
+        hit, miss = map(int, self.run_with_pool(code).split())
+        # Each thread misses its first block, then reuses it
+        self.assertEqual(miss, 4)
+        self.assertEqual(hit, 4 * 49)
+
+    @unittest.skipUnless(sys.version_info >= (3, 4),
+                         "need Python 3.4+ for the tracemalloc module")
+    def test_arena_threads(self):
+        # The pool's backend allocations are seen by tracemalloc
+        code = """if 1:
+            import threading
+            import tracemalloc
+            import numpy as np
+            from numba import njit
+
+            @njit(arena=True, nogil=True)
+            def kernel(a, n):
+                s = 0.0
+                for i in range(n):
+                    s += (a * i).sum()
+                return s
+
+            a = np.arange(100.)
+            kernel(a, 1)
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            for i in range(4):
+                threads = [threading.Thread(target=kernel, args=(a, 10))
+                           for j in range(4)]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+            after = tracemalloc.get_traced_memory()[0]
+            print(after - before)
+            """
+        growth = int(self.run_with_pool(code))
+        # Each thread's spare arena chunk (256 KiB) is released when it exits
+        self.assertLess(growth, 256 * 1024)
+
+    @unittest.skipIf(config.NRT_POOL_ALLOCATOR, "pool allocator enabled")
+    def test_default_allocator(self):
+        stats = rtsys.get_allocation_stats()
+        self.assertEqual(stats.pool_hit, 0)
+        self.assertEqual(stats.pool_miss, 0)
+
+
+class TestNrtTrace(TestCase):
+    """
+    Test the allocation tracer (NUMBA_NRT_TRACE).
+    """
+
+    def run_with_trace(self, code):
+        # The allocator is chosen when numba is imported
+        return run_in_subprocess(code, NUMBA_NRT_TRACE='1')
+
+    def test_trace(self):
+        code = """if 1:
+            import numpy as np
+            from numba import njit
+            from numba.runtime import rtsys
+
+            @njit
+            def make(n):
+                return np.ones(n)
+
+            @njit
+            def churn(n, size):
+                l = []
+                for i in range(n):
+                    a = np.zeros(size)
+                    b = make(size) + a
+                    l.append(b)
+                return len(l)
+
+            assert churn(10, 100) == 10
+            kept = make(1000)
+            trace = rtsys.get_allocation_trace()
+            for st in trace.sites + trace.functions:
+                print(st.function, getattr(st, 'line', 0), st.alloc,
+                      st.free, st.bytes, st.live_bytes, st.peak_live_bytes)
+            print('peak', trace.peak_live_bytes)
+            rtsys.dump_allocation_trace()
+            """
+        out = self.run_with_trace(code).splitlines()
+        stats = {}
+        for ln in out:
+            fields = ln.split()
+            if fields[0] == 'peak':
+                peak = int(fields[1])
+                break
+            stats[fields[0], int(fields[1])] = tuple(map(int, fields[2:]))
+
+        # Sites are the source lines of the jitted functions.  The data
+        # of a 100-element float64 array and its MemInfo take at least
+        # 800 bytes.
+        alloc, free, nbytes, live, peak_live = stats['churn', 14]
+        self.assertEqual((alloc, free, live), (10, 10, 0))
+        self.assertGreaterEqual(nbytes, 10 * 800)
+        self.assertLess(peak_live, 2 * 900)
+        # The results of the additions are kept in the list
+        alloc, free, nbytes, live, peak_live = stats['churn', 15]
+        self.assertEqual((alloc, free, live), (10, 10, 0))
+        self.assertGreaterEqual(peak_live, 10 * 800)
+        alloc, free, nbytes, live, peak_live = stats['make', 8]
+        self.assertEqual((alloc, free), (11, 10))
+        self.assertGreaterEqual(live, 8000)
+        # Per-function statistics add up the function's sites
+        alloc, free, nbytes, live, peak_live = stats['churn', 0]
+        self.assertEqual(alloc, sum(v[0] for k, v in stats.items()
+                                    if k[0] == 'churn' and k[1] > 0))
+        self.assertGreaterEqual(peak, peak_live)
+        # The report lists the functions and sites
+        self.assertTrue(any(ln.startswith('NRT allocation trace')
+                            for ln in out))
+        self.assertTrue(any(ln.endswith('churn (<string>:15)')
+                            for ln in out))
+
+    def test_trace_restore_site(self):
+        code = """if 1:
+            import numpy as np
+            from numba import njit
+            from numba.runtime import rtsys
+
+            @njit
+            def make(n):
+                return np.ones(n)
+
+            @njit
+            def total(a):
+                return a.sum()
+
+            a = make(10)
+            # Unboxing the argument allocates a MemInfo before total()
+            # sets its first site
+            assert total(np.arange(10.)) == 45.0
+            trace = rtsys.get_allocation_trace()
+            for st in trace.sites:
+                print(st.function, st.alloc)
+            """
+        out = self.run_with_trace(code).splitlines()
+        stats = dict(ln.split() for ln in out)
+        # make() restored the caller's (unknown) site when it returned
+        self.assertEqual(stats['make'], '1')
+        self.assertEqual(stats['<unknown>'], '1')
+
+    @unittest.skipIf(config.NRT_TRACE, "allocation tracer enabled")
+    def test_trace_disabled(self):
+        with self.assertRaises(RuntimeError):
+            rtsys.get_allocation_trace()
+
+
 class TestNRTIssue(MemoryLeakMixin, TestCase):
     def test_issue_with_refct_op_pruning(self):
         """
@@ -467,6 +701,149 @@ br i1 %.294, label %B42, label %B160
         # no other lines
         self.assertEqual(len(list(pruned_lines.splitlines())), len(combined))
 
+    loop_llvm_ir = """
+define i32 @"MyLoop"(i8** noalias nocapture %retptr, {excinfo}i8* %arg.a.0) {{
+entry:
+br label %B10
+
+B10:                                              ; preds = %entry, %B20
+%i = phi i64 [ 0, %entry ], [ %i.next, %B20 ]
+tail call void @NRT_incref(i8* %arg.a.0)
+%st = tail call i32 @callee(i8* %arg.a.0)
+%err = icmp ne i32 %st, 0
+br i1 %err, label %B30, label %B20
+
+B20:                                              ; preds = %B10
+tail call void @NRT_decref(i8* %arg.a.0)
+%i.next = add i64 %i, 1
+%done = icmp eq i64 %i.next, 10
+br i1 %done, label %B40, label %B10
+
+B30:                                              ; preds = %B10
+{error_decref}ret i32 %st
+
+B40:                                              ; preds = %B20
+ret i32 0
+}}
+"""
+
+    def count_refct_ops(self, llvmir):
+        return (llvmir.count('NRT_incref'), llvmir.count('NRT_decref'))
+
+    def test_refct_pruning_across_blocks(self):
+        # The incref and decref are in different blocks of a loop body
+        excinfo = "{ i8*, i32 }** noalias nocapture %excinfo, "
+        input_ir = self.loop_llvm_ir.format(excinfo=excinfo, error_decref="")
+        self.assertEqual(self.count_refct_ops(input_ir), (1, 1))
+        output_ir = nrtopt._remove_redundant_nrt_refct(input_ir)
+        self.assertEqual(self.count_refct_ops(output_ir), (0, 0))
+
+        # The whole sample function is left without refcount operations
+        output_ir = nrtopt._remove_redundant_nrt_refct(self.sample_llvm_ir)
+        self.assertEqual(self.count_refct_ops(output_ir), (0, 0))
+
+    def test_refct_pruning_nested_pairs(self):
+        # Each pair is only pruned once the pairs nested in it are
+        n = 50
+        lines = ['define i32 @"MyNested"(i8** noalias nocapture %retptr, '
+                 '{ i8*, i32 }** noalias nocapture %excinfo, i8* %arg.a.0) {']
+        for i in range(n):
+            lines += ['B%d:' % i,
+                      'tail call void @NRT_incref(i8* %%arg.a.%d)' % i,
+                      'br label %%B%d' % (i + 1)]
+        for i in reversed(range(n)):
+            lines += ['B%d:' % (2 * n - 1 - i),
+                      'tail call void @NRT_decref(i8* %%arg.a.%d)' % i,
+                      'br label %%B%d' % (2 * n - i)]
+        lines += ['B%d:' % (2 * n), 'ret i32 0', '}']
+        input_ir = '\n'.join(lines) + '\n'
+        self.assertEqual(self.count_refct_ops(input_ir), (n, n))
+        output_ir = nrtopt._remove_redundant_nrt_refct(input_ir)
+        self.assertEqual(self.count_refct_ops(output_ir), (0, 0))
+
+    def test_refct_pruning_across_blocks_unsafe(self):
+        excinfo = "{ i8*, i32 }** noalias nocapture %excinfo, "
+        # B30 is a normal exit of a function not using Numba's calling
+        # convention, so B20 doesn't post-dominate B10
+        input_ir = self.loop_llvm_ir.format(excinfo="", error_decref="")
+        output_ir = nrtopt._remove_redundant_nrt_refct(input_ir)
+        self.assertEqual(self.count_refct_ops(output_ir), (1, 1))
+        # A decref may run between the incref and the decref
+        decref = "tail call void @NRT_decref(i8* %arg.b.0)\n"
+        input_ir = self.loop_llvm_ir.format(excinfo=excinfo,
+                                            error_decref=decref)
+        output_ir = nrtopt._remove_redundant_nrt_refct(input_ir)
+        self.assertEqual(self.count_refct_ops(output_ir), (1, 2))
+
+    def test_refct_pruning_across_loop(self):
+        # The incref before the loop is balanced by the decref in the loop
+        # header only on the first iteration: pruning them would leak a
+        # reference per iteration, as the body's incref is left alone.
+        input_ir = """
+define i32 @"MyLoop"(i8** noalias nocapture %retptr, { i8*, i32 }** noalias nocapture %excinfo, i8* %arg.a.0) {
+entry:
+tail call void @NRT_incref(i8* %arg.a.0)
+br label %B10
+
+B10:                                              ; preds = %entry, %B20
+%i = phi i64 [ 0, %entry ], [ %i.next, %B20 ]
+tail call void @NRT_decref(i8* %arg.a.0)
+%done = icmp eq i64 %i, 10
+br i1 %done, label %B30, label %B20
+
+B20:                                              ; preds = %B10
+tail call void @NRT_incref(i8* %arg.a.0)
+%i.next = add i64 %i, 1
+br label %B10
+
+B30:                                              ; preds = %B10
+ret i32 0
+}
+"""
+        output_ir = nrtopt._remove_redundant_nrt_refct(input_ir)
+        self.assertEqual(self.count_refct_ops(output_ir), (2, 1))
+
+    def test_refct_pruning_unnamed_blocks(self):
+        # Unnamed blocks are separate blocks: the decref must not be moved
+        # after the incref of the next block
+        input_ir = """
+define i32 @"MyFunction"(i8** noalias nocapture %retptr, { i8*, i32 }** noalias nocapture %excinfo, i1 %arg.c, i8* %arg.a.0) {
+entry:
+br i1 %arg.c, label %B10, label %0
+
+B10:                                              ; preds = %entry
+tail call void @NRT_decref(i8* %arg.a.0)
+ret i32 0
+
+; <label>:0:                                      ; preds = %entry
+tail call void @NRT_incref(i8* %arg.a.0)
+ret i32 0
+}
+"""
+        output_ir = nrtopt._remove_redundant_nrt_refct(input_ir)
+        self.assertEqual(self.count_refct_ops(output_ir), (1, 1))
+        b10 = output_ir[output_ir.index('B10:'):output_ir.index('; <label>')]
+        self.assertIn('NRT_decref', b10)
+
+    def test_refct_pruning_in_loop(self):
+        @njit
+        def f(a, lst):
+            s = 0.0
+            for i in range(len(lst)):
+                x = lst[i]
+                s += x.sum() + a[i]
+            return s
+
+        a = np.arange(10.)
+        lst = [np.arange(3.)] * 10
+        self.assertEqual(f(a, lst), f.py_func(a, lst))
+        # No refcount operations are left in the loop
+        llvmir = f.inspect_llvm(f.signatures[0])
+        fndesc = f.overloads[f.signatures[0]].fndesc
+        start = llvmir.index('define i32 @"{}"'.format(fndesc.mangled_name))
+        body = llvmir[start:llvmir.index('\n}', start)]
+        self.assertEqual(self.count_refct_ops(body), (0, 0))
+
     def test_refct_pruning_with_branches(self):
         '''testcase from #2350'''
         @njit
@@ -504,5 +881,65 @@ br i1 %.294, label %B42, label %B160
         self.assertEqual(len(refops), 0)
 
 
+class TestNrtNonAtomic(MemoryLeakMixin, TestCase):
+    """
+    Tests for the nrt_atomic=False compile option.
+    """
+
+    @staticmethod
+    def pyfunc(a):
+        s = 0.0
+        lst = [a, a + 1]
+        for x in lst:
+            y = x
+            s += y.sum()
+        return s, lst
+
+    def nrt_atomic(self, cfunc):
+        cres = cfunc.overloads[cfunc.signatures[0]]
+        return cres.target_context.enable_nrt_atomic
+
+    def check(self, cfunc):
+        a = np.arange(5.)
+        got = cfunc(a)
+        expected = self.pyfunc(a)
+        self.assertPreciseEqual(got[0], expected[0])
+        self.assertPreciseEqual(got[1], expected[1])
+        del got
+        return cfunc.inspect_llvm(cfunc.signatures[0])
+
+    def test_default(self):
+        cfunc = njit(self.pyfunc)
+        llvmir = self.check(cfunc)
+        self.assertTrue(self.nrt_atomic(cfunc))
+        self.assertIn('atomicrmw', llvmir)
+
+    def test_nonatomic(self):
+        cfunc = njit(nrt_atomic=False)(self.pyfunc)
+        llvmir = self.check(cfunc)
+        self.assertFalse(self.nrt_atomic(cfunc))
+        # The refcount updates are plain and inlined
+        self.assertNotIn('atomicrmw', llvmir)
+        self.assertNotIn('call void @NRT_incref', llvmir)
+        self.assertNotIn('call void @NRT_decref', llvmir)
+
+    def test_parallel_is_atomic(self):
+        cfunc = njit(nrt_atomic=False, parallel=True)(self.pyfunc)
+        self.check(cfunc)
+        self.assertTrue(self.nrt_atomic(cfunc))
+
+    def test_pruning(self):
+        # The non-atomic operations are pruned like the atomic ones
+        def nonatomic(llvmir):
+            llvmir = llvmir.replace('@NRT_incref(', '@NRT_incref_nonatomic(')
+            return llvmir.replace('@NRT_decref(', '@NRT_decref_nonatomic(')
+
+        llvmir = TestRefCtPruning.sample_llvm_ir
+        expected = nonatomic(nrtopt._remove_redundant_nrt_refct(llvmir))
+        got = nrtopt._remove_redundant_nrt_refct(nonatomic(llvmir))
+        self.assertNotIn('GONE', got)
+        self.assertEqual(got, expected)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -11,7 +11,7 @@ import numpy as np
 import numba.unittest_support as unittest
 from numba import njit
 from numba.runtime import rtsys
-from .support import TestCase
+from .support import TestCase, override_config
 
 
 class TestNrtRefCt(TestCase):
@@ -32,6 +32,9 @@ class TestNrtRefCt(TestCase):
             return 0
 
         n = 10
+        # `temp` would otherwise be allocated on the stack
+        with override_config('STACK_ALLOC_MAX_BYTES', 0):
+            foo.compile("(intp,)")
         init_stats = rtsys.get_allocation_stats()
         foo(n)
         cur_stats = rtsys.get_allocation_stats()
@@ -34,7 +34,8 @@ from numba.unsafe.ndarray import empty_inferred as unsafe_empty
 from numba.compiler import compile_isolated, Flags
 from numba.bytecode import ByteCodeIter
 from .support import tag, override_env_config
-from .matmul_usecase import needs_blas
+from numba.utils import StringIO
+from .matmul_usecase import matmul_usecase, needs_matmul, needs_blas
 from .test_linalg import needs_lapack
 
 # for decorating tests, marking that Windows with Python 2.7 is not supported
@@ -485,6 +486,28 @@ class TestParfors(TestParforsBase):
 
         self.check(test_impl, A, v)
 
+    @skip_unsupported
+    def test_mmdot_int(self):
+        def test_impl(a, b):
+            return np.dot(a, b)
+
+        # no BLAS for integers, a parallel loop nest is used
+        A = np.arange(60).reshape(6, 10) % 7
+        B = np.arange(40).reshape(10, 4) - 20
+        self.check(test_impl, A, B)
+        self.check(test_impl, A.astype(np.int32), B.astype(np.int32))
+
+    @skip_unsupported
+    @needs_matmul
+    def test_matmul_stacked(self):
+        # stacks of small matrices are parallelized across the stack
+        A = np.arange(90.).reshape(10, 3, 3)
+        B = np.arange(120.).reshape(10, 3, 4) - 60
+        self.check(matmul_usecase, A, B)
+        self.check(matmul_usecase, A, B[0])
+        self.check(matmul_usecase, A[:1], B)
+        self.check(matmul_usecase, A.astype(np.int64), B.astype(np.int64))
+
     @skip_unsupported
     @tag('important')
     def test_0d_broadcast(self):
@@ -530,6 +553,22 @@ class TestParfors(TestParforsBase):
         self.assertTrue(countParfors(test_impl, (types.int64, )) == 1)
         self.assertTrue(countArrays(test_impl, (types.intp,)) == 0)
 
+    @skip_unsupported
+    def test_fuse_sibling_reductions(self):
+        def test_impl1(A):
+            return (A.sum(), A.min(), A.argmin(), A.argmax(), A.mean(),
+                    (A * A).sum(), np.prod(A))
+
+        def test_impl2(A):
+            return A.sum(), A.min(), A.max(), A.mean(), (A * A).sum()
+
+        self.check(test_impl1, np.random.ranf(64))
+        self.check(test_impl2, np.random.ranf((8, 8)))
+        self.assertTrue(countParfors(test_impl1,
+                        (types.Array(types.float64, 1, 'C'), )) == 1)
+        self.assertTrue(countParfors(test_impl2,
+                        (types.Array(types.float64, 2, 'C'), )) == 1)
+
     @skip_unsupported
     @tag('important')
     def test_blackscholes(self):
@@ -2180,6 +2219,30 @@ class TestParforsSlice(TestParforsBase):
 
         self.check(test_impl, 10, np.ones(10))
 
+    @skip_unsupported
+    def test_parfor_slice18(self):
+        def test_impl(a):
+            d = a[1:] - a[:-1]
+            e = a[2:] - a[:-2]
+            return d[1:] + e
+
+        for n in (10, 2, 1):
+            self.check(test_impl, np.arange(float(n)) ** 2)
+        self.assertEqual(countParfors(test_impl, (numba.float64[:],)), 2)
+
+    @skip_unsupported
+    def test_parfor_slice19(self):
+        def test_impl(a):
+            n = a.shape[0]
+            b = a[2:] + 1.0
+            for i in prange(n - 2):
+                b[i] += i
+            return b
+
+        for n in (10, 2, 1):
+            self.check(test_impl, np.arange(float(n)))
+        self.assertEqual(countParfors(test_impl, (numba.float64[:],)), 1)
+
 
 class TestParforsOptions(TestParforsBase):
 
@@ -2293,6 +2356,52 @@ class TestParforsBitMask(TestParforsBase):
             self.check(test_impl, a, b, c)
         self.assertIn("\'@do_scheduling\' not found", str(raises.exception))
 
+    @skip_unsupported
+    def test_parfor_bitmask7(self):
+        def test_impl(a, b):
+            return a[b]
+
+        a = np.arange(100.)
+        self.check(test_impl, a, a % 3 == 0)
+        self.check(test_impl, a, a < 0)
+        self.check(test_impl, a[:1], a[:1] > 0)
+        args = (numba.float64[:], numba.boolean[:])
+        self.assertEqual(countParfors(test_impl, args), 2)
+
+    @skip_unsupported
+    def test_parfor_bitmask8(self):
+        def test_impl(a):
+            b = a[a > 5] * 2
+            c = np.nonzero(a > 5)[0]
+            d = np.where(a > 5)[0]
+            return np.concatenate((b, c, d))
+
+        self.check(test_impl, np.arange(100) % 10)
+        self.check(test_impl, np.arange(3))
+        self.check(test_impl, np.arange(0))
+
+    @skip_unsupported
+    def test_parfor_gather(self):
+        def test_impl(a, b):
+            return a[b]
+
+        a = np.arange(100.)
+        self.check(test_impl, a, np.arange(-100, 100, 3))
+        args = (numba.float64[:], numba.int64[:])
+        self.assertEqual(countParfors(test_impl, args), 1)
+
+    @skip_unsupported
+    def test_parfor_scatter(self):
+        def test_impl(a, b):
+            a[b] = 7
+            return a
+
+        a = np.arange(100.)
+        self.check(test_impl, a, np.arange(-100, 100, 3))
+        args = (numba.float64[:], numba.int64[:])
+        self.assertEqual(countParfors(test_impl, args), 1)
+
+
 class TestParforsMisc(TestCase):
     """
     Tests miscellaneous parts of ParallelAccelerator use.
@@ -2323,5 +2432,94 @@ class TestParforsMisc(TestCase):
         # make sure the cache is set to false, cf. NullCache
         self.assertTrue(isinstance(cfunc._cache, numba.caching.NullCache))
 
+    @skip_unsupported
+    def test_parallel_diagnostics(self):
+
+        def pyfunc(a, n):
+            b = a + 1
+            c = b * 2
+            s = 0.
+            for i in prange(n):
+                t = n * 3
+                s += c[i] + t
+            for j in range(3):
+                s += j
+            return s
+
+        cfunc = njit(parallel=True)(pyfunc)
+        a = np.arange(10.)
+        np.testing.assert_almost_equal(cfunc(a, 10), pyfunc(a, 10))
+        diag = cfunc.parallel_diagnostics(cfunc.signatures[0])
+        self.assertTrue(diag.func_name.endswith('pyfunc'))
+
+        # the two array expressions and the prange loop become parfors,
+        # the range loop does not
+        converted = [rec for rec in diag.loops if rec['parfor'] is not None]
+        self.assertEqual(len(converted), 3)
+        seq_loops = [rec for rec in diag.loops if rec['parfor'] is None]
+        self.assertEqual(len(seq_loops), 1)
+        self.assertEqual(seq_loops[0]['reason'], "not a prange loop")
+
+        # array expressions fuse, the prange loop does not since its range
+        # is not known to match the array size
+        b_id, c_id, loop_id = [rec['parfor'] for rec in converted]
+        decisions = {(rec['parfor1'], rec['parfor2']): rec
+                     for rec in diag.fusion}
+        self.assertTrue(decisions[b_id, c_id]['fused'])
+        self.assertFalse(decisions[b_id, loop_id]['fused'])
+        self.assertIn("dimension correlation mismatch",
+                      decisions[b_id, loop_id]['reason'])
+        self.assertEqual(sorted(diag.parfor_ids), sorted([b_id, loop_id]))
+
+        # t = n * 3 is loop invariant
+        self.assertTrue(any('n * ' in inst for inst in diag.hoisted[loop_id]))
+        self.assertTrue(all(reason == 'dependency'
+                            for _, reason in diag.not_hoisted[loop_id]))
+
+        # b is removed after fusion, only the output array of c is left
+        self.assertEqual([rec['func'] for rec in diag.allocations],
+                         ['np.empty'])
+        self.assertIsNone(diag.allocations[0]['parfor'])
+
+        buf = StringIO()
+        diag.dump(buf)
+        self.assertIn("not parallelized (not a prange loop)", buf.getvalue())
+        self.assertEqual(cfunc.parallel_diagnostics(),
+                         {cfunc.signatures[0]: diag})
+
+    @skip_unsupported
+    def test_parallel_diagnostics_rejections(self):
+
+        def transpose_add(a):
+            return a.T + 1
+
+        def early_exit(a, n):
+            s = 0.
+            for i in prange(n):
+                if a[i] < 0:
+                    break
+                s += a[i]
+            return s
+
+        cfunc = njit(parallel=True)(transpose_add)
+        cfunc(np.ones((3, 4)))
+        diag = cfunc.parallel_diagnostics(cfunc.signatures[0])
+        [rec] = diag.loops
+        self.assertIsNone(rec['parfor'])
+        self.assertEqual(rec['reason'], "output array layout is 'F', not 'C'")
+
+        cfunc = njit(parallel=True)(early_exit)
+        cfunc(np.ones(5), 5)
+        diag = cfunc.parallel_diagnostics(cfunc.signatures[0])
+        [rec] = diag.loops
+        self.assertEqual(rec['kind'], 'prange loop')
+        self.assertEqual(rec['reason'], "loop has multiple entries or exits")
+
+    @skip_unsupported
+    def test_parallel_diagnostics_not_parallel(self):
+        cfunc = njit(lambda a: a + 1)
+        cfunc(np.ones(3))
+        self.assertIsNone(cfunc.parallel_diagnostics(cfunc.signatures[0]))
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,165 @@
+from __future__ import print_function
+
+from collections import namedtuple
+
+import numpy as np
+
+from numba import njit, types
+from numba.errors import TypingError
+from numba.typed import RecordList
+import numba.unittest_support as unittest
+from .support import TestCase, MemoryLeakMixin
+
+
+Trade = namedtuple('Trade', ['price', 'volume', 'ident'])
+trade_type = types.NamedTuple([types.float64, types.int32, types.int64],
+                              Trade)
+pair_type = types.Tuple([types.float64, types.intp])
+
+
+def fill_usecase(rl, n):
+    for i in range(n):
+        rl.append(((i * 7) % 5 * 0.5, i))
+    return rl
+
+def total_usecase(rl):
+    s = 0.0
+    for rec in rl:
+        s += rec[0]
+    return s
+
+def columns_usecase(rl):
+    prices, idents = rl.columns()
+    return prices.sum(), idents.max()
+
+def trade_columns_usecase(rl):
+    return rl.columns().volume.sum()
+
+def sort_by_usecase(rl, field):
+    return rl.sort_by(field)
+
+def sort_by_price_usecase(rl):
+    return rl.sort_by('price')
+
+def sort_by_bad_name_usecase(rl):
+    return rl.sort_by('foo')
+
+def getitem_usecase(rl, i):
+    return rl[i]
+
+def setitem_contains_usecase(rl, i, rec):
+    rl[i] = rec
+    return rec in rl
+
+
+class TestRecordList(MemoryLeakMixin, TestCase):
+
+    def make_trades(self, n):
+        rl = RecordList.empty(trade_type)
+        ref = []
+        for i in range(n):
+            t = Trade(float((i * 3) % 7), i % 4, i)
+            rl.append(t)
+            ref.append(t)
+        return rl, ref
+
+    def test_empty(self):
+        rl = RecordList.empty(pair_type)
+        self.assertEqual(len(rl), 0)
+        self.assertEqual(list(rl), [])
+        self.assertEqual(rl._numba_type_, types.RecordListType(pair_type))
+        with self.assertRaises(TypeError):
+            RecordList.empty(types.float64)
+        with self.assertRaises(TypeError):
+            RecordList.empty(types.Tuple([types.float64, types.unicode_type]))
+
+    def test_sequence_methods(self):
+        rl, ref = self.make_trades(20)
+        self.assertEqual(len(rl), 20)
+        self.assertEqual(list(rl), ref)
+        self.assertEqual(rl[-1], ref[-1])
+        self.assertIsInstance(rl[0], Trade)
+        rl[3] = Trade(1.5, 2, 3)
+        self.assertEqual(rl[3], (1.5, 2, 3))
+        rl.extend(ref[:2])
+        self.assertEqual(len(rl), 22)
+        self.assertEqual(rl[21], ref[1])
+        with self.assertRaises(IndexError):
+            rl[22]
+
+    def test_shared_with_jit(self):
+        # Mutations done in jitted code are seen by the interpreter
+        rl = RecordList.empty(pair_type)
+        r = njit(fill_usecase)(rl, 30)
+        self.assertIsInstance(r, RecordList)
+        self.assertEqual(len(rl), 30)
+        self.assertEqual(rl[7], (2.0, 7))
+        self.assertEqual(njit(total_usecase)(rl), total_usecase(list(rl)))
+        self.assertEqual(njit(getitem_usecase)(rl, -1), rl[29])
+        cfunc = njit(setitem_contains_usecase)
+        self.assertTrue(cfunc(rl, 0, (-1.0, 42)))
+        self.assertEqual(rl[0], (-1.0, 42))
+
+    def test_columns(self):
+        rl, ref = self.make_trades(20)
+        cols = rl.columns()
+        self.assertIsInstance(cols, Trade)
+        self.assertPreciseEqual(cols.price,
+                                np.array([t.price for t in ref]))
+        self.assertPreciseEqual(cols.volume,
+                                np.array([t.volume for t in ref], np.int32))
+        # Columns are views, not copies
+        cols.price[0] = 42.0
+        self.assertEqual(rl[0].price, 42.0)
+        self.assertEqual(njit(trade_columns_usecase)(rl), cols.volume.sum())
+
+        rl = RecordList.empty(pair_type)
+        njit(fill_usecase)(rl, 100)
+        prices, idents = rl.columns()
+        self.assertEqual(njit(columns_usecase)(rl),
+                         (prices.sum(), idents.max()))
+
+    def test_sort_by(self):
+        rl, ref = self.make_trades(50)
+        cfunc = njit(sort_by_usecase)
+        for field in (0, 1, -1):
+            perm = cfunc(rl, field)
+            expected = sorted(ref, key=lambda t: t[field])
+            self.assertEqual(list(rl), expected)
+            self.assertEqual([ref[i] for i in perm], list(rl))
+            ref = expected
+        njit(sort_by_price_usecase)(rl)
+        expected = sorted(ref, key=lambda t: t.price)
+        self.assertEqual(list(rl), expected)
+        rl.sort_by('volume')
+        self.assertEqual(list(rl), sorted(expected, key=lambda t: t.volume))
+
+    def test_sort_by_errors(self):
+        rl, ref = self.make_trades(5)
+        with self.assertRaises(KeyError):
+            rl.sort_by('foo')
+        with self.assertRaises(TypingError):
+            njit(sort_by_bad_name_usecase)(rl)
+
+        # Exceptions leak references
+        self.disable_leak_check()
+        with self.assertRaises(IndexError) as raises:
+            njit(sort_by_usecase)(rl, 3)
+        self.assertIn("field index out of range", str(raises.exception))
+
+    def test_to_structured(self):
+        rl, ref = self.make_trades(10)
+        arr = rl.to_structured()
+        self.assertEqual(arr.dtype.names, Trade._fields)
+        self.assertEqual(arr.dtype['volume'], np.dtype(np.int32))
+        self.assertEqual([tuple(r) for r in arr], ref)
+
+        rl = RecordList.empty(pair_type)
+        njit(fill_usecase)(rl, 3)
+        arr = rl.to_structured()
+        self.assertEqual(arr.dtype.names, ('f0', 'f1'))
+        self.assertEqual([tuple(r) for r in arr], list(rl))
+
+
+if __name__ == '__main__':
+    unittest.main()
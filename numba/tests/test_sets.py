@@ -14,8 +14,10 @@ import numpy as np
 from numba.compiler import compile_isolated, Flags
 from numba import jit, types
 import numba.unittest_support as unittest
+from numba.extending import intrinsic
+from numba.targets import setobj
 from .support import (TestCase, enable_pyobj_flags, MemoryLeakMixin, tag,
-                      compile_function)
+                      compile_function, override_config, run_in_subprocess)
 
 
 Point = namedtuple('Point', ('a', 'b'))
@@ -381,6 +383,9 @@ class TestSets(BaseTest):
             self.assertPreciseEqual(pyfunc(arg), cfunc(arg))
 
         check((1, 2, 3, 2, 7))
+        # Sizes filling exactly half of the preallocated table
+        check(np.arange(8))
+        check(np.arange(32))
         check(self.duplicates_array(200))
         check(self.sparse_array(200))
 
@@ -798,6 +803,58 @@ class TestSetReflection(BaseTest):
         self.assertEqual([id(x) for x in s], ids)
 
 
+class TestHashMixing(TestCase):
+    """
+    Test sets with scrambled integer hashes (NUMBA_SET_HASH_MIXING).
+    """
+
+    def test_strided_keys(self):
+        # Hashes must be computed consistently in all compiled code,
+        # hence a separate process.
+        code = """if 1:
+            import numpy as np
+            from numba import njit
+            from numba.tests.test_sets import (
+                difference_usecase, intersection_usecase,
+                symmetric_difference_usecase, union_usecase)
+
+            # Strided keys, which collide without hash mixing
+            a = np.arange(300) * 1024
+            b = np.arange(0, 600, 3) * 1024
+            for pyfunc in (difference_usecase, intersection_usecase,
+                           symmetric_difference_usecase, union_usecase):
+                got = njit(pyfunc)(a, b)
+                assert sorted(got) == sorted(pyfunc(a, b)), pyfunc
+            print(len(njit(union_usecase)(a, b)))
+            """
+        out = run_in_subprocess(code, NUMBA_SET_HASH_MIXING='1')
+        self.assertEqual(int(out), 400)
+
+    def test_mix_hash(self):
+        @intrinsic
+        def set_hash(typingctx, x):
+            def codegen(context, builder, sig, args):
+                return setobj.get_hash_value(context, builder, sig.args[0],
+                                             args[0])
+            return types.intp(x), codegen
+
+        def hashes(keys):
+            out = np.empty_like(keys)
+            for i in range(keys.size):
+                out[i] = set_hash(keys[i])
+            return out
+
+        # The index of strided keys in a table of 1024 entries
+        keys = np.arange(256) * 1024
+        with override_config('SET_HASH_MIXING', 0):
+            low_bits = jit(nopython=True)(hashes)(keys) & 1023
+        self.assertEqual(len(set(low_bits)), 1)
+        with override_config('SET_HASH_MIXING', 1):
+            low_bits = jit(nopython=True)(hashes)(keys) & 1023
+        # Close to the ~226 distinct values of random hashes
+        self.assertGreater(len(set(low_bits)), 200)
+
+
 class TestExamples(BaseTest):
     """
     Examples of using sets.
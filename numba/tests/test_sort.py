@@ -12,11 +12,12 @@ from numba.compiler import compile_isolated, Flags
 from numba import jit, types, utils, njit
 import numba.unittest_support as unittest
 from numba import testing
+from numba.errors import TypingError
 from .support import TestCase, MemoryLeakMixin, tag
 
 from numba.targets.quicksort import make_py_quicksort, make_jit_quicksort
 from numba.targets.mergesort import make_jit_mergesort
-from .timsort import make_py_timsort, make_jit_timsort, MergeRun
+from numba.targets.timsort import make_py_timsort, make_jit_timsort, MergeRun
 
 
 def make_temp_list(keys, n):
@@ -51,12 +52,51 @@ def argsort_kind_usecase(val, is_stable=False):
     else:
         return val.argsort(kind='quicksort')
 
+def sort_timsort_usecase(val):
+    val.sort(kind='timsort')
+
+def np_sort_stable_usecase(val):
+    return np.sort(val, kind='stable')
+
+def argsort_timsort_usecase(val):
+    return val.argsort(kind='timsort')
+
+def np_argsort_stable_usecase(val):
+    return np.argsort(val, kind='stable')
+
+def sort_invalid_kind_usecase(val):
+    val.sort(kind='heapsort')
+
 def sorted_usecase(val):
     return sorted(val)
 
 def sorted_reverse_usecase(val, b):
     return sorted(val, reverse=b)
 
+def sorted_key_usecase(val, b):
+    return sorted(val, key=modulo_key, reverse=b)
+
+def list_sort_key_usecase(val, b):
+    val.sort(reverse=b, key=modulo_key)
+
+def list_sort_tuple_key_usecase(n):
+    l = []
+    for i in range(n):
+        l.append((i, (i * 7) % 5 * 0.5))
+    l.sort(key=second_item_key)
+    return l
+
+def list_sort_array_key_usecase(n, b):
+    # Arrays can't be compared, only their keys are
+    l = []
+    for i in range(n):
+        l.append(np.arange((i * 7) % 5))
+    l.sort(key=len, reverse=b)
+    return [a.sum() for a in l]
+
+def sorted_invalid_key_usecase(val):
+    return sorted(val, key=1)
+
 def np_sort_usecase(val):
     return np.sort(val)
 
@@ -88,6 +128,15 @@ def list_sort_reverse_usecase(n, b):
     return l, ll
 
 
+@jit(nopython=True)
+def modulo_key(x):
+    return x % 7
+
+@jit(nopython=True)
+def second_item_key(x):
+    return x[1]
+
+
 class BaseSortingTest(object):
 
     def random_list(self, n, offset=10):
@@ -738,6 +787,15 @@ class TestNumpySort(TestCase):
             orig[np.random.random(size=size) < 0.1] = float('nan')
             yield orig
 
+    def partially_sorted_arrays(self):
+        for size in (5, 20, 50, 500):
+            arr = np.arange(size) * 3 % 97
+            yield np.sort(arr)
+            yield np.sort(arr)[::-1].copy()
+            arr = np.sort(arr)
+            arr[size // 2:] = np.random.randint(99, size=size - size // 2)
+            yield arr
+
     def has_duplicates(self, arr):
         """
         Whether the array has duplicates.  Takes NaNs into account.
@@ -852,6 +910,38 @@ class TestNumpySort(TestCase):
         check(np_argsort_kind_usecase, is_stable=False)
 
 
+    def test_sort_timsort(self):
+        arrays = list(itertools.chain(self.int_arrays(), self.float_arrays(),
+                                      self.partially_sorted_arrays()))
+        cfunc = jit(nopython=True)(sort_timsort_usecase)
+        for orig in arrays:
+            got = orig.copy()
+            cfunc(got)
+            self.assertPreciseEqual(got, np.sort(orig))
+
+        pyfunc = np_sort_stable_usecase
+        cfunc = jit(nopython=True)(pyfunc)
+        for orig in arrays:
+            self.check_sort_copy(pyfunc, cfunc, orig)
+
+    def test_argsort_timsort(self):
+        arrays = list(itertools.chain(self.int_arrays(), self.float_arrays(),
+                                      self.partially_sorted_arrays()))
+        for pyfunc in (argsort_timsort_usecase, np_argsort_stable_usecase):
+            cfunc = jit(nopython=True)(pyfunc)
+            for orig in arrays:
+                # The sort is stable, so the result is always the same as
+                # Numpy's even with duplicates
+                got = cfunc(orig)
+                self.assertPreciseEqual(got, np.argsort(orig, kind='mergesort'))
+
+    def test_invalid_kind(self):
+        cfunc = jit(nopython=True)(sort_invalid_kind_usecase)
+        with self.assertRaises(TypingError) as raises:
+            cfunc(np.arange(5))
+        self.assertIn("sort kind must be", str(raises.exception))
+
+
 class TestPythonSort(TestCase):
 
     @tag('important')
@@ -897,6 +987,42 @@ class TestPythonSort(TestCase):
             self.assertPreciseEqual(got, expected)
             self.assertNotEqual(list(orig), got)   # sanity check
 
+    def test_sorted_key(self):
+        pyfunc = sorted_key_usecase
+        cfunc = jit(nopython=True)(pyfunc)
+
+        for size in (0, 1, 2, 20, 500):
+            orig = np.random.randint(0, 100, size)
+            for b in (False, True):
+                # Items with equal keys keep their original order
+                self.assertEqual(cfunc(orig, b), pyfunc(orig, b))
+
+    def test_list_sort_key(self):
+        pyfunc = list_sort_key_usecase
+        cfunc = jit(nopython=True)(pyfunc)
+
+        for size in (2, 20, 500):
+            for b in (False, True):
+                expected = list(np.random.randint(0, 100, size))
+                got = expected[:]
+                pyfunc(expected, b)
+                cfunc(got, b)
+                self.assertEqual(got, expected)
+
+        pyfunc = list_sort_tuple_key_usecase
+        cfunc = jit(nopython=True)(pyfunc)
+        self.assertEqual(cfunc(50), pyfunc(50))
+
+        pyfunc = list_sort_array_key_usecase
+        cfunc = jit(nopython=True)(pyfunc)
+        for b in (False, True):
+            self.assertEqual(cfunc(50, b), pyfunc(50, b))
+
+    def test_invalid_key(self):
+        cfunc = jit(nopython=True)(sorted_invalid_key_usecase)
+        with self.assertRaises(TypingError):
+            cfunc([1, 2])
+
 
 class TestMergeSort(unittest.TestCase):
     def setUp(self):
@@ -427,6 +427,183 @@ class TestStencil(TestStencilBase):
         n = 100
         self.check(test_impl_seq, test_impl, n)
 
+    @skip_unsupported
+    def test_stencil_border_modes(self):
+        """Tests the border modes other than constant against the input padded
+        with the equivalent numpy.pad mode.
+        """
+        pad_modes = {'reflect': 'symmetric', 'mirror': 'reflect',
+                     'nearest': 'edge', 'wrap': 'wrap'}
+        for mode, pad_mode in pad_modes.items():
+            kernel = stencil(mode)(lambda a: a[-1, 1] + 2 * a[0, 0] - a[1, -2])
+
+            def test_impl(n):
+                A = np.arange(n * (n + 1)).reshape((n, n + 1)) ** 2
+                return kernel(A)
+
+            def test_impl_seq(n):
+                A = np.arange(n * (n + 1)).reshape((n, n + 1)) ** 2
+                P = np.pad(A, 2, pad_mode)
+                B = np.empty_like(A)
+                for i in range(n):
+                    for j in range(n + 1):
+                        B[i, j] = (P[i + 1, j + 3] + 2 * P[i + 2, j + 2]
+                                   - P[i + 3, j])
+                return B
+
+            # the array is smaller than the neighborhood for n = 2
+            for n in (2, 20):
+                self.check(test_impl_seq, test_impl, n)
+
+        with self.assertRaises(ValueError) as raises:
+            stencil('spam')
+        self.assertIn("Unsupported mode style spam", str(raises.exception))
+
+    @skip_unsupported
+    def test_stencil_multiple_outputs(self):
+        """Tests stencil kernels returning a tuple, with and without a tuple
+        of output arrays.
+        """
+        kernel = stencil(lambda a: (a[0, 1] - a[0, -1], a[1, 0] + a[-1, 0]))
+        wrap_kernel = stencil('wrap')(lambda a: (a[0, 1], a[-1, 0] * 2))
+
+        def test_impl(n):
+            A = np.arange(n * n).reshape((n, n)) ** 2
+            return kernel(A)
+
+        def test_impl_out(n):
+            A = np.arange(n * n).reshape((n, n)) ** 2
+            B = np.ones((n, n))
+            C = np.ones((n, n), dtype=np.int64)
+            kernel(A, out=(B, C))
+            return B, C
+
+        def test_impl_wrap(n):
+            A = np.arange(n * n).reshape((n, n)) ** 2
+            B, C = wrap_kernel(A)
+            return B + C
+
+        def test_impl_seq(n):
+            A = np.arange(n * n).reshape((n, n)) ** 2
+            B = np.zeros((n, n), dtype=A.dtype)
+            C = np.zeros((n, n), dtype=A.dtype)
+            B[1:-1, 1:-1] = A[1:-1, 2:] - A[1:-1, :-2]
+            C[1:-1, 1:-1] = A[2:, 1:-1] + A[:-2, 1:-1]
+            return B, C
+
+        def test_impl_out_seq(n):
+            B, C = test_impl_seq(n)
+            B[0, :] = B[-1, :] = B[:, 0] = B[:, -1] = 1
+            C[0, :] = C[-1, :] = C[:, 0] = C[:, -1] = 1
+            return B, C
+
+        def test_impl_wrap_seq(n):
+            A = np.arange(n * n).reshape((n, n)) ** 2
+            return np.roll(A, -1, axis=1) + 2 * np.roll(A, 1, axis=0)
+
+        n = 20
+        self.check(test_impl_seq, test_impl, n)
+        self.check(test_impl_out_seq, test_impl_out, n)
+        self.check(test_impl_wrap_seq, test_impl_wrap, n)
+
+        A = np.arange(16.).reshape((4, 4))
+        with self.assertRaises(ValueError) as raises:
+            kernel(A, out=np.empty_like(A))
+        self.assertIn("requires a tuple of 2 output arrays",
+                      str(raises.exception))
+
+    @skip_unsupported
+    def test_stencil_inplace(self):
+        """Tests that stencils writing into one of their input arrays give
+        the same result as writing into a separate array.
+        """
+        def test_impl(n):
+            A = np.arange(n * n).reshape((n, n)) ** 2.
+            stencil1_kernel(A, out=A)
+            return A
+
+        def test_impl_wrap(n):
+            A = np.arange(n * n).reshape((n, n)) ** 2.
+            B = np.ones((n, n))
+            B, A = wrap_kernel(A, B, out=(B, A))
+            return A - B
+
+        def test_impl_view(n):
+            A = np.arange(n * n).reshape((n, n)) ** 2.
+            B = A[:]
+            stencil1_kernel(A, out=B)
+            return A
+
+        def test_impl_seq(n):
+            A = np.arange(n * n).reshape((n, n)) ** 2.
+            A[1:-1, 1:-1] = 0.25 * (A[1:-1, 2:] + A[2:, 1:-1]
+                                    + A[1:-1, :-2] + A[:-2, 1:-1])
+            return A
+
+        def test_impl_wrap_seq(n):
+            A = np.arange(n * n).reshape((n, n)) ** 2.
+            return np.roll(A, 1, axis=0) - (np.roll(A, -1, axis=1) + 1)
+
+        wrap_kernel = stencil('wrap')(lambda a, b: (a[0, 1] + b[0, 0],
+                                                    a[-1, 0]))
+        n = 20
+        self.check(test_impl_seq, test_impl, n)
+        self.check(test_impl_seq, test_impl_view, n)
+        self.check(test_impl_wrap_seq, test_impl_wrap, n)
+
+        # a view overlapping the input is detected at run time
+        A = np.arange(21.)
+        kernel = stencil(lambda a: a[-1] + a[1])
+        expected = A.copy()
+        expected[1:-2] = kernel(A[1:])[1:-1]
+        kernel(A[1:], out=A[:-1])
+        np.testing.assert_almost_equal(A, expected)
+
+    @skip_unsupported
+    def test_stencil_iterate(self):
+        """Tests that numba.stencil_iterate() matches applying the stencil
+        repeatedly, for tiles smaller and larger than the overlap they need.
+        """
+        def iterate(kernel, steps, a):
+            for _ in range(steps):
+                a = kernel(a)
+            return a
+
+        A = np.arange(40 * 30.).reshape((40, 30)) % 7
+        B = np.arange(50.) ** 2
+        kernels_1d = [stencil(mode)(lambda a: 0.5 * a[-2] + a[1])
+                      for mode in ('constant', 'reflect', 'mirror',
+                                   'nearest', 'wrap')]
+        wrap_kernel_2d = stencil('wrap')(
+            lambda a: 0.25 * (a[-1, 0] + a[0, -1] + a[1, 0] + a[0, 2]))
+        for steps in (0, 1, 4):
+            for tile_size in (None, 1, 3, 100):
+                for kernel, arr in ([(stencil1_kernel, A),
+                                     (wrap_kernel_2d, A)] +
+                                    [(k, B) for k in kernels_1d]):
+                    np.testing.assert_almost_equal(
+                        numba.stencil_iterate(kernel, steps, arr,
+                                              tile_size=tile_size),
+                        iterate(kernel, steps, arr),
+                        err_msg="mode %r, %d steps, tile size %s"
+                                % (kernel.mode, steps, tile_size))
+        # the extended tiles may be longer than the array
+        np.testing.assert_almost_equal(
+            numba.stencil_iterate(kernels_1d[-1], 20, B[:5], tile_size=2),
+            iterate(kernels_1d[-1], 20, B[:5]))
+
+        out = np.empty_like(A)
+        res = numba.stencil_iterate(stencil1_kernel, 2, A, out=out)
+        self.assertIs(res, out)
+        np.testing.assert_almost_equal(out, iterate(stencil1_kernel, 2, A))
+
+        with self.assertRaises(ValueError) as raises:
+            numba.stencil_iterate(stencil1_kernel, 2, A, out=A)
+        self.assertIn("must not overlap", str(raises.exception))
+        with self.assertRaises(ValueError) as raises:
+            numba.stencil_iterate(stencil_multiple_input_kernel, 2, A)
+        self.assertIn("single input array", str(raises.exception))
+
     @skip_unsupported
     @tag('important')
     def test_stencil_parallel_off(self):
@@ -0,0 +1,187 @@
+from __future__ import print_function
+
+import numpy as np
+
+from numba import njit, types
+from numba.typed import Dict
+import numba.unittest_support as unittest
+from .support import TestCase, MemoryLeakMixin
+
+
+def setitem_getitem_usecase(n):
+    d = dict()
+    for i in range(n):
+        d[i] = i * 2.0
+    for i in range(0, n, 3):
+        d[i] = -1.0
+    s = 0.0
+    for i in range(n):
+        s += d[i]
+    return len(d), s
+
+def delitem_usecase(n):
+    d = dict()
+    for i in range(n):
+        d[i * 7] = i
+    for i in range(0, n, 2):
+        del d[i * 7]
+    # Re-insert into the deleted slots
+    for i in range(0, n, 4):
+        d[i * 7] = -i
+    s = 0
+    for k in d:
+        s += k * d[k]
+    return len(d), s, 7 in d, 14 in d
+
+def iteration_usecase(n):
+    d = dict()
+    for i in range(n):
+        d[(i, i % 3)] = i + 0.5
+    keys = 0
+    for k in d.keys():
+        keys += k[0] * k[1]
+    values = 0.0
+    for v in d.values():
+        values += v
+    items = 0.0
+    for k, v in d.items():
+        items += k[1] * v
+    return keys, values, items
+
+def constant_key_usecase(n):
+    d = dict()
+    # The first insertion is a static setitem
+    d[1] = 2.5
+    for i in range(n):
+        d[i + 2] = d[i + 1] * 2.0
+    return len(d), d[1], d[n + 1]
+
+def methods_usecase(n):
+    d = dict()
+    for i in range(n):
+        d[i] = i + 1
+    a = d.get(2, -1)
+    b = d.get(n, -1)
+    c = d.get(3)
+    e = d.get(n)
+    f = d.pop(4)
+    g = d.pop(4, -2)
+    h = d.setdefault(5, 0)
+    k = d.setdefault(n + 1, 42)
+    return (a, b, c is None, e is None, f, g, h, k, len(d), 4 in d,
+            n + 1 in d)
+
+def copy_clear_usecase(n):
+    d = dict()
+    for i in range(n):
+        d[i] = np.arange(i)
+    e = d.copy()
+    del e[1]
+    d.clear()
+    d[0] = np.ones(3, dtype=np.int64)
+    s = 0
+    for v in e.values():
+        s += v.sum()
+    return len(d), len(e), s, d[0].sum()
+
+def getitem_usecase(d, key):
+    return d[key]
+
+def fill_usecase(d, n):
+    for i in range(n):
+        d[i] = i * 0.5
+
+def make_dict_usecase(n):
+    d = dict()
+    for i in range(n):
+        d[i] = np.arange(i)
+    return d
+
+
+class TestTypedDictNoPython(MemoryLeakMixin, TestCase):
+
+    def check(self, pyfunc, *args):
+        cfunc = njit(pyfunc)
+        self.assertPreciseEqual(cfunc(*args), pyfunc(*args))
+
+    def test_setitem_getitem(self):
+        for n in (1, 10, 1000):
+            self.check(setitem_getitem_usecase, n)
+
+    def test_delitem(self):
+        for n in (1, 10, 1000):
+            self.check(delitem_usecase, n)
+
+    def test_iteration(self):
+        self.check(iteration_usecase, 100)
+
+    def test_constant_key(self):
+        self.check(constant_key_usecase, 10)
+
+    def test_methods(self):
+        self.check(methods_usecase, 10)
+
+    def test_copy_clear(self):
+        self.check(copy_clear_usecase, 50)
+
+    def test_missing_key(self):
+        d = Dict.empty(types.int64, types.float64)
+        with self.assertRaises(KeyError):
+            njit(getitem_usecase)(d, 1)
+
+
+class TestTypedDictInterpreter(MemoryLeakMixin, TestCase):
+
+    def test_empty(self):
+        d = Dict.empty(types.int64, types.float64)
+        self.assertEqual(len(d), 0)
+        self.assertEqual(d._numba_type_,
+                         types.DictType(types.int64, types.float64))
+        self.assertEqual(list(d), [])
+
+    def test_mapping_methods(self):
+        d = Dict.empty(types.int64, types.float64)
+        ref = {}
+        for i in range(20):
+            d[i * 3] = i
+            ref[i * 3] = float(i)
+        del d[9]
+        del ref[9]
+        self.assertEqual(len(d), len(ref))
+        self.assertEqual(sorted(d), sorted(ref))
+        self.assertEqual(sorted(d.items()), sorted(ref.items()))
+        self.assertEqual(d[6], 2.0)
+        self.assertIn(6, d)
+        self.assertNotIn(9, d)
+        self.assertEqual(d.get(9), None)
+        self.assertEqual(d.pop(6), 2.0)
+        with self.assertRaises(KeyError):
+            d[9]
+        with self.assertRaises(KeyError):
+            del d[9]
+        e = d.copy()
+        d.clear()
+        self.assertEqual(len(d), 0)
+        self.assertEqual(len(e), len(ref) - 1)
+
+    def test_shared_with_jit(self):
+        # Mutations done in jitted code are seen by the interpreter
+        d = Dict.empty(types.intp, types.float64)
+        njit(fill_usecase)(d, 100)
+        self.assertEqual(len(d), 100)
+        self.assertEqual(d[99], 49.5)
+        d[1000] = 1.5
+        self.assertEqual(njit(getitem_usecase)(d, 1000), 1.5)
+
+    def test_returned(self):
+        d = njit(make_dict_usecase)(5)
+        self.assertIsInstance(d, Dict)
+        self.assertEqual(d.value_type, types.int64[::1])
+        self.assertEqual(len(d), 5)
+        self.assertPreciseEqual(d[3], np.arange(3))
+        # The dict can be passed back to jitted code
+        self.assertPreciseEqual(njit(getitem_usecase)(d, 4), np.arange(4))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+from __future__ import print_function
+
+import numpy as np
+
+from numba import njit, types
+from numba.typed import List
+import numba.unittest_support as unittest
+from .support import TestCase, MemoryLeakMixin
+
+
+def fill_usecase(l, n):
+    for i in range(n):
+        l.append(i * 0.5)
+    return l
+
+def total_usecase(l):
+    s = 0.0
+    for x in l:
+        s += x
+    return s
+
+def getitem_usecase(l, i):
+    return l[i]
+
+def slice_copy_usecase(l):
+    m = l[1:]
+    m.append(l[0])
+    return m, l.copy()
+
+def make_arrays_usecase(l, n):
+    for i in range(n):
+        l.append(np.arange(i))
+
+
+class TestTypedList(MemoryLeakMixin, TestCase):
+
+    def test_empty(self):
+        l = List.empty(types.int64)
+        self.assertEqual(len(l), 0)
+        self.assertEqual(list(l), [])
+        self.assertEqual(l._numba_type_, types.ListType(types.int64))
+
+    def test_sequence_methods(self):
+        l = List.empty(types.float64)
+        ref = []
+        for x in (1, 2.5, 3):
+            l.append(x)
+            ref.append(float(x))
+        l.extend([4, 5])
+        ref.extend([4.0, 5.0])
+        l.insert(1, -1)
+        ref.insert(1, -1.0)
+        self.assertEqual(list(l), ref)
+        self.assertEqual(len(l), len(ref))
+        self.assertEqual(l[-1], 5.0)
+        self.assertIn(2.5, l)
+        self.assertNotIn(6.0, l)
+        self.assertEqual(l.index(3.0), ref.index(3.0))
+        self.assertEqual(l.pop(), ref.pop())
+        self.assertEqual(l.pop(0), ref.pop(0))
+        del l[0]
+        del ref[0]
+        l[0] = 42
+        ref[0] = 42.0
+        self.assertEqual(list(l), ref)
+        self.assertEqual(list(l.copy()), ref)
+        with self.assertRaises(IndexError):
+            l[10]
+
+    def test_shared_with_jit(self):
+        # Mutations done in jitted code are seen by the interpreter
+        l = List.empty(types.float64)
+        r = njit(fill_usecase)(l, 10)
+        self.assertIsInstance(r, List)
+        self.assertEqual(len(l), 10)
+        self.assertEqual(l[3], 1.5)
+        l.append(100)
+        self.assertEqual(njit(total_usecase)(r), total_usecase(list(l)))
+        self.assertEqual(njit(getitem_usecase)(l, -1), 100.0)
+
+    def test_slice_copy(self):
+        l = List.empty(types.intp)
+        l.extend(range(5))
+        m, c = njit(slice_copy_usecase)(l)
+        self.assertIsInstance(m, List)
+        self.assertIsInstance(c, List)
+        self.assertEqual(list(m), [1, 2, 3, 4, 0])
+        self.assertEqual(list(c), list(range(5)))
+
+    def test_refcounted_items(self):
+        l = List.empty(types.int64[::1])
+        njit(make_arrays_usecase)(l, 4)
+        self.assertEqual(len(l), 4)
+        self.assertPreciseEqual(l[3], np.arange(3))
+        self.assertPreciseEqual(njit(getitem_usecase)(l, 2), np.arange(2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,7 +13,7 @@ import sys
 import numpy as np
 
 import numba.unittest_support as unittest
-from numba import cffi_support, numpy_support, types
+from numba import cffi_support, numpy_support, types, utils
 from numba.special import typeof
 from numba.dispatcher import OmittedArg
 from numba._dispatcher import compute_fingerprint
@@ -173,7 +173,10 @@ class TestTypeof(ValueTypingTestBase, TestCase):
 
     def test_str(self):
         ty = typeof("abc")
-        self.assertEqual(ty, types.string)
+        if utils.IS_PY3:
+            self.assertEqual(ty, types.unicode_type)
+        else:
+            self.assertEqual(ty, types.string)
 
     @tag('important')
     def test_slices(self):
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+
+from numba import njit, typeof, types, utils
+import numba.unittest_support as unittest
+from .support import TestCase, MemoryLeakMixin
+
+
+def len_usecase(s):
+    return len(s)
+
+def getitem_usecase(s, i):
+    return s[i]
+
+def getslice_usecase(s, start, stop, step):
+    return s[start:stop:step]
+
+def hash_slice_usecase(s, start, stop, step):
+    return hash(s[start:stop:step])
+
+def eq_usecase(a, b):
+    return a == b
+
+def lt_usecase(a, b):
+    return a < b
+
+def concat_usecase(a, b):
+    return a + b
+
+def hash_usecase(s):
+    return hash(s)
+
+def contains_usecase(sub, s):
+    return sub in s
+
+def find_usecase(s, sub):
+    return s.find(sub)
+
+def startswith_usecase(s, prefix):
+    return s.startswith(prefix)
+
+def endswith_usecase(s, suffix):
+    return s.endswith(suffix)
+
+def split_usecase(s, sep):
+    return s.split(sep)
+
+def split_whitespace_usecase(s):
+    return s.split()
+
+def join_usecase(sep, parts):
+    return sep.join(parts)
+
+def iter_usecase(s):
+    l = []
+    for c in s:
+        l.append(c)
+    return l
+
+def literals_usecase(x):
+    if x:
+        s = 'abc'
+    else:
+        s = 'd€f'
+    return s + '!', '-'.join([s, 'x']), s.startswith('a')
+
+def tuple_literals_usecase():
+    return [(1, 'a'), (2, 'b€')]
+
+def dedup_usecase(words):
+    seen = set()
+    for w in words:
+        seen.add(w)
+    return len(seen)
+
+def count_words_usecase(lines):
+    counts = dict()
+    for line in lines:
+        for w in line.split():
+            if w in counts:
+                counts[w] += 1
+            else:
+                counts[w] = 1
+    return counts['the']
+
+
+# Strings of the three kinds of the compact representation
+SAMPLES = ['', 'a', 'hello, world', 'caf\xe9 cr\xe8me',
+           '€10 and €20', 'emoji \U0001f600 and €']
+
+
+@unittest.skipUnless(utils.IS_PY3, "native unicode strings need Python 3")
+class TestUnicode(MemoryLeakMixin, TestCase):
+
+    def test_typeof(self):
+        self.assertEqual(typeof('abc'), types.unicode_type)
+
+    def test_len(self):
+        cfunc = njit(len_usecase)
+        for s in SAMPLES:
+            self.assertEqual(cfunc(s), len(s))
+
+    def test_getitem(self):
+        cfunc = njit(getitem_usecase)
+        for s in SAMPLES[1:]:
+            for i in range(-len(s), len(s)):
+                self.assertEqual(cfunc(s, i), s[i])
+        with self.assertRaises(IndexError):
+            cfunc('abc', 3)
+
+    def test_getslice(self):
+        cfunc = njit(getslice_usecase)
+        hash_slice = njit(hash_slice_usecase)
+        for s in SAMPLES:
+            for args in [(1, 100, 1), (0, -1, 1), (100, -100, -1),
+                         (1, 5, 2), (-3, 100, 1), (10, 1, -2)]:
+                self.assertEqual(cfunc(s, *args), s[slice(*args)])
+                # The result has the smallest possible kind, like CPython's,
+                # hence the same hash
+                self.assertEqual(hash_slice(s, *args), hash(s[slice(*args)]))
+
+    def test_compare(self):
+        eq = njit(eq_usecase)
+        lt = njit(lt_usecase)
+        for a in SAMPLES:
+            for b in SAMPLES:
+                self.assertEqual(eq(a, b), a == b, (a, b))
+                self.assertEqual(lt(a, b), a < b, (a, b))
+        # Same code points, different kinds in the source
+        self.assertTrue(eq('\xe9', ('\xe9€')[:1]))
+
+    def test_concat(self):
+        cfunc = njit(concat_usecase)
+        for a in SAMPLES:
+            for b in SAMPLES:
+                self.assertEqual(cfunc(a, b), a + b)
+
+    def test_hash(self):
+        # Hashes of unboxed and created strings match str.__hash__
+        cfunc = njit(hash_usecase)
+        concat = njit(concat_usecase)
+        for s in SAMPLES:
+            self.assertEqual(cfunc(s), hash(s))
+            self.assertEqual(cfunc(concat(s, '+')), hash(s + '+'))
+
+    def test_find(self):
+        find = njit(find_usecase)
+        contains = njit(contains_usecase)
+        for s in SAMPLES:
+            for sub in ['', 'a', 'l, w', '€', '\U0001f600 a', 'zz']:
+                self.assertEqual(find(s, sub), s.find(sub), (s, sub))
+                self.assertEqual(contains(sub, s), sub in s, (s, sub))
+
+    def test_startswith_endswith(self):
+        startswith = njit(startswith_usecase)
+        endswith = njit(endswith_usecase)
+        for s in SAMPLES:
+            for fix in ['', 'h', 'hello', 'd', '€', 'and €', s]:
+                self.assertEqual(startswith(s, fix), s.startswith(fix))
+                self.assertEqual(endswith(s, fix), s.endswith(fix))
+
+    def test_split(self):
+        cfunc = njit(split_usecase)
+        for s in SAMPLES + ['a,,b,', ',']:
+            for sep in [',', ' ', ' and ', '€']:
+                self.assertEqual(cfunc(s, sep), s.split(sep))
+        with self.assertRaises(ValueError) as raises:
+            cfunc('abc', '')
+        self.assertIn("empty separator", str(raises.exception))
+
+    def test_split_whitespace(self):
+        cfunc = njit(split_whitespace_usecase)
+        for s in SAMPLES + ['  a \t b\n\x0bc ', '　x\xa0y\x1c', '   ']:
+            self.assertEqual(cfunc(s), s.split())
+
+    def test_join(self):
+        cfunc = njit(join_usecase)
+        for sep in ['', ', ', '€']:
+            for parts in [['a'], ['a', 'b\xe9', ''],
+                          ['\U0001f600', 'x', 'yz']]:
+                self.assertEqual(cfunc(sep, parts), sep.join(parts))
+
+    def test_iter(self):
+        cfunc = njit(iter_usecase)
+        for s in SAMPLES:
+            self.assertEqual(cfunc(s), list(s))
+
+    def test_literals(self):
+        cfunc = njit(literals_usecase)
+        self.assertEqual(cfunc(True), literals_usecase(True))
+        self.assertEqual(cfunc(False), literals_usecase(False))
+
+    def test_tuple_literals(self):
+        # String constants nested in tuple constants
+        cfunc = njit(tuple_literals_usecase)
+        self.assertEqual(cfunc(), tuple_literals_usecase())
+
+    def test_set_dedup(self):
+        cfunc = njit(dedup_usecase)
+        words = 'the quick brown fox jumps over the lazy dog the end'.split()
+        self.assertEqual(cfunc(words), len(set(words)))
+        words = ['€', 'caf\xe9', '€', 'caf\xe9'[:3] + '\xe9']
+        self.assertEqual(cfunc(words), len(set(words)))
+
+    def test_dict_keys(self):
+        cfunc = njit(count_words_usecase)
+        lines = ['the cat', 'and the dog', '  the end ']
+        self.assertEqual(cfunc(lines), 3)
+
+    def test_boxing_identity(self):
+        # Unboxed strings are returned as the original object
+        s = 'some string'
+        self.assertIs(njit(lambda x: x)(s), s)
+
+
+if __name__ == '__main__':
+    unittest.main()
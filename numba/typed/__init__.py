@@ -0,0 +1,9 @@
+"""
+Typed containers usable both in nopython mode and from the interpreter.
+"""
+
+from __future__ import print_function, absolute_import, division
+
+from .typeddict import Dict
+from .typedlist import List
+from .recordlist import RecordList
@@ -0,0 +1,59 @@
+"""
+Common support for the Python wrappers of NRT-allocated containers.
+"""
+
+from __future__ import print_function, absolute_import, division
+
+from numba import njit
+from numba.extending import intrinsic
+from numba.runtime.nrt import MemInfo
+from numba.targets.imputils import impl_ret_new_ref
+
+
+_empty_makers = {}
+
+
+def get_empty_maker(container_type, allocate):
+    """
+    Get a jitted function returning a new empty container of
+    *container_type*.  ``allocate(context, builder, container_type)``
+    must return the instance (e.g. a ListInstance) of the new container.
+    """
+    try:
+        return _empty_makers[container_type]
+    except KeyError:
+        pass
+
+    @intrinsic
+    def new_container(typingctx):
+        def codegen(context, builder, sig, args):
+            inst = allocate(context, builder, container_type)
+            return impl_ret_new_ref(context, builder, container_type,
+                                    inst.value)
+
+        return container_type(), codegen
+
+    @njit
+    def make():
+        return new_container()
+
+    _empty_makers[container_type] = make
+    return make
+
+
+class TypedContainer(object):
+    """
+    Base class for the Python wrappers of native containers.  The wrapper
+    owns a reference to the container's MemInfo, so that the container
+    is passed to and from jitted functions by pointer.
+    """
+
+    def __init__(self, meminfo_ptr, numba_type):
+        # The MemInfo steals the reference given by the caller
+        self._meminfo = MemInfo(meminfo_ptr)
+        self._meminfo_ptr = meminfo_ptr
+        self._numba_type = numba_type
+
+    @property
+    def _numba_type_(self):
+        return self._numba_type
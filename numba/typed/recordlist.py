@@ -0,0 +1,159 @@
+"""
+Python wrapper for record lists, which store lists of tuples or named
+tuples as one array per field.
+"""
+
+from __future__ import print_function, absolute_import, division
+
+import numpy as np
+
+from numba import njit, numpy_support, types, utils
+from numba.targets.recordlistobj import RecordListInstance
+from .base import TypedContainer, get_empty_maker
+
+
+if utils.IS_PY3:
+    from collections.abc import Sequence
+else:
+    from collections import Sequence
+
+
+def _allocate(context, builder, rl_type):
+    return RecordListInstance.allocate(context, builder, rl_type)
+
+
+@njit
+def _length(rl):
+    return len(rl)
+
+@njit
+def _getitem(rl, index):
+    return rl[index]
+
+@njit
+def _setitem(rl, index, record):
+    rl[index] = record
+
+@njit
+def _append(rl, record):
+    rl.append(record)
+
+@njit
+def _extend(rl, iterable):
+    rl.extend(iterable)
+
+@njit
+def _columns(rl):
+    return rl.columns()
+
+@njit
+def _sort_by(rl, field):
+    return rl.sort_by(field)
+
+@njit
+def _items(rl):
+    return [record for record in rl]
+
+
+class RecordList(TypedContainer, Sequence):
+    """
+    A list of tuples or named tuples of scalars, usable in nopython mode
+    and passed to and from jitted functions by reference.
+
+    The records are stored as one contiguous array per field, so that
+    reading or sorting by one field doesn't touch the others.
+    :meth:`columns` returns views of those arrays without copying.
+    """
+
+    @classmethod
+    def empty(cls, record_type):
+        """
+        Create a new empty record list with the given Numba record type
+        (a tuple or named tuple type of NumPy-compatible scalars).
+        """
+        if not isinstance(record_type, types.BaseTuple) or not record_type:
+            raise TypeError("record type must be a non-empty tuple type, "
+                            "got %s" % (record_type,))
+        for ty in record_type:
+            try:
+                numpy_support.as_dtype(ty)
+            except NotImplementedError:
+                raise TypeError("unsupported record field type %s" % (ty,))
+        rl_type = types.RecordListType(record_type)
+        return get_empty_maker(rl_type, _allocate)()
+
+    @property
+    def record_type(self):
+        return self._numba_type.dtype
+
+    @property
+    def field_names(self):
+        """
+        The names of the record fields: the named tuple's fields, or
+        'f0', 'f1', etc. for plain tuples.
+        """
+        record_type = self.record_type
+        if isinstance(record_type, types.BaseNamedTuple):
+            return record_type.fields
+        return tuple('f%d' % i for i in range(len(record_type)))
+
+    def __len__(self):
+        return _length(self)
+
+    def __getitem__(self, index):
+        return _getitem(self, index)
+
+    def __setitem__(self, index, record):
+        _setitem(self, index, record)
+
+    def __iter__(self):
+        # Iterate over a snapshot: the records are boxed in one call
+        return iter(_items(self))
+
+    def append(self, record):
+        _append(self, record)
+
+    def extend(self, iterable):
+        if not isinstance(iterable, RecordList):
+            # Python sequences are converted once instead of one call
+            # per record
+            iterable = list(iterable)
+            if not iterable:
+                return
+        _extend(self, iterable)
+
+    def columns(self):
+        """
+        Return a tuple (a named tuple for named tuple records) of 1d
+        arrays viewing each field.  The views share memory with the
+        record list until it grows.
+        """
+        return _columns(self)
+
+    def sort_by(self, field):
+        """
+        Stable sort of the records by the given field (a field index, or
+        a field name for named tuple records).  Return the permutation
+        applied, i.e. the former index of each record in sorted order.
+        """
+        if isinstance(field, str):
+            try:
+                field = self.field_names.index(field)
+            except ValueError:
+                raise KeyError(field)
+        return _sort_by(self, field)
+
+    def to_structured(self):
+        """
+        Return a NumPy structured array with a copy of the records.
+        """
+        names = self.field_names
+        dtype = np.dtype([(name, numpy_support.as_dtype(ty))
+                          for name, ty in zip(names, self.record_type)])
+        out = np.empty(len(self), dtype=dtype)
+        for name, column in zip(names, self.columns()):
+            out[name] = column
+        return out
+
+    def __repr__(self):
+        return '[%s]' % ', '.join(repr(record) for record in self)
@@ -0,0 +1,116 @@
+"""
+Python wrapper for the native typed dictionaries of nopython mode.
+"""
+
+from __future__ import print_function, absolute_import, division
+
+from numba import njit, types, utils
+from numba.targets.dictobj import DictInstance
+from .base import TypedContainer, get_empty_maker
+
+
+if utils.IS_PY3:
+    from collections.abc import MutableMapping
+else:
+    from collections import MutableMapping
+
+
+def _allocate(context, builder, dict_type):
+    return DictInstance.allocate(context, builder, dict_type)
+
+
+@njit
+def _length(d):
+    return len(d)
+
+@njit
+def _getitem(d, key):
+    return d[key]
+
+@njit
+def _setitem(d, key, value):
+    d[key] = value
+
+@njit
+def _delitem(d, key):
+    del d[key]
+
+@njit
+def _contains(d, key):
+    return key in d
+
+@njit
+def _copy(d):
+    return d.copy()
+
+@njit
+def _clear(d):
+    d.clear()
+
+@njit
+def _keys(d):
+    return [k for k in d]
+
+@njit
+def _items(d):
+    return [item for item in d.items()]
+
+
+class Dict(TypedContainer, MutableMapping):
+    """
+    A typed dictionary usable in nopython mode.
+
+    Instances are created with :meth:`Dict.empty` and are passed to and
+    returned from jitted functions by reference, without any conversion.
+    In jitted functions, ``dict()`` creates a typed dictionary whose key
+    and value types are inferred from its first insertion.
+    """
+
+    @classmethod
+    def empty(cls, key_type, value_type):
+        """
+        Create a new empty dictionary with the given Numba key and value
+        types.
+        """
+        dict_type = types.DictType(key_type, value_type)
+        return get_empty_maker(dict_type, _allocate)()
+
+    @property
+    def key_type(self):
+        return self._numba_type.key_type
+
+    @property
+    def value_type(self):
+        return self._numba_type.value_type
+
+    def __len__(self):
+        return _length(self)
+
+    def __getitem__(self, key):
+        return _getitem(self, key)
+
+    def __setitem__(self, key, value):
+        _setitem(self, key, value)
+
+    def __delitem__(self, key):
+        _delitem(self, key)
+
+    def __contains__(self, key):
+        return _contains(self, key)
+
+    def __iter__(self):
+        # Iterate over a snapshot: the keys are boxed in one call
+        return iter(_keys(self))
+
+    def items(self):
+        return _items(self)
+
+    def clear(self):
+        _clear(self)
+
+    def copy(self):
+        return _copy(self)
+
+    def __repr__(self):
+        body = ', '.join('%r: %r' % item for item in self.items())
+        return '{%s}' % body
@@ -0,0 +1,131 @@
+"""
+Python wrapper for typed lists, which cross the interpreter boundary by
+reference instead of being reflected.
+"""
+
+from __future__ import print_function, absolute_import, division
+
+from numba import njit, types, utils
+from numba.targets.listobj import ListInstance
+from .base import TypedContainer, get_empty_maker
+
+
+if utils.IS_PY3:
+    from collections.abc import MutableSequence
+else:
+    from collections import MutableSequence
+
+
+def _allocate(context, builder, list_type):
+    return ListInstance.allocate(context, builder, list_type,
+                                 context.get_constant(types.intp, 0))
+
+
+@njit
+def _length(l):
+    return len(l)
+
+@njit
+def _getitem(l, index):
+    return l[index]
+
+@njit
+def _setitem(l, index, value):
+    l[index] = value
+
+@njit
+def _delitem(l, index):
+    del l[index]
+
+@njit
+def _insert(l, index, value):
+    l.insert(index, value)
+
+@njit
+def _append(l, value):
+    l.append(value)
+
+@njit
+def _extend(l, iterable):
+    l.extend(iterable)
+
+@njit
+def _pop(l, index):
+    return l.pop(index)
+
+@njit
+def _copy(l):
+    return l.copy()
+
+@njit
+def _contains(l, item):
+    return item in l
+
+@njit
+def _items(l):
+    return [item for item in l]
+
+
+class List(TypedContainer, MutableSequence):
+    """
+    A typed list usable in nopython mode.
+
+    Instances are created with :meth:`List.empty` and are passed to and
+    returned from jitted functions by reference: contrary to Python lists,
+    their items are neither unboxed on entry nor reflected on exit.
+    """
+
+    @classmethod
+    def empty(cls, item_type):
+        """
+        Create a new empty list with the given Numba item type.
+        """
+        list_type = types.ListType(item_type)
+        return get_empty_maker(list_type, _allocate)()
+
+    @property
+    def item_type(self):
+        return self._numba_type.dtype
+
+    def __len__(self):
+        return _length(self)
+
+    def __getitem__(self, index):
+        return _getitem(self, index)
+
+    def __setitem__(self, index, value):
+        _setitem(self, index, value)
+
+    def __delitem__(self, index):
+        _delitem(self, index)
+
+    def __contains__(self, item):
+        return _contains(self, item)
+
+    def __iter__(self):
+        # Iterate over a snapshot: the items are boxed in one call
+        return iter(_items(self))
+
+    def insert(self, index, value):
+        _insert(self, index, value)
+
+    def append(self, value):
+        _append(self, value)
+
+    def extend(self, iterable):
+        if not isinstance(iterable, List):
+            # Python sequences are converted once instead of one call
+            # per item
+            iterable = list(iterable)
+            if not iterable:
+                return
+        _extend(self, iterable)
+
+    def pop(self, index=-1):
+        return _pop(self, index)
+
+    def copy(self):
+        return _copy(self)
+
+    def __repr__(self):
+        return '[%s]' % ', '.join(repr(item) for item in self)
@@ -575,6 +575,12 @@ class SetItemConstraint(object):
             if _is_array_not_precise(targetty):
                 assert sig.args[0].is_precise()
                 typeinfer.add_type(self.target.name, sig.args[0], loc=self.loc)
+            # For setitem on an empty dict(), refine its key and value types
+            elif (isinstance(targetty, types.DictType)
+                    and not targetty.is_precise()):
+                if sig.args[0].is_precise():
+                    typeinfer.add_type(self.target.name, sig.args[0],
+                                       loc=self.loc)
 
             self.signature = sig
 
@@ -607,6 +613,14 @@ class StaticSetItemConstraint(object):
             if sig is None:
                 raise TypingError("Cannot resolve setitem: %s[%r] = %s" %
                                   (targetty, self.index, valty), loc=self.loc)
+
+            # For setitem on an empty dict(), refine its key and value types
+            if (isinstance(targetty, types.DictType)
+                    and not targetty.is_precise()):
+                if sig.args[0].is_precise():
+                    typeinfer.add_type(self.target.name, sig.args[0],
+                                       loc=self.loc)
+
             self.signature = sig
 
     def get_call_signature(self):
@@ -960,6 +974,9 @@ class TypeInferer(object):
     def _unify_return_types(self, rettypes):
         if rettypes:
             unified = self.context.unify_types(*rettypes)
+            if unified is not None:
+                # String constants are returned as native strings
+                unified = types.unliteral(unified)
             if unified is None or not unified.is_precise():
                 def check_type(atype):
                     lst = []
@@ -1108,7 +1125,7 @@ class TypeInferer(object):
     def typeof_const(self, inst, target, const):
         ty = self.resolve_value_type(inst, const)
         # Special case string constant as Const type
-        if ty == types.string:
+        if ty in (types.string, types.unicode_type):
             ty = types.Const(value=const)
         self.lock_type(target.name, ty, loc=inst.loc,
                        literal_value=const)
@@ -2,7 +2,7 @@ from __future__ import print_function, division, absolute_import
 
 from .abstract import *
 from .common import *
-from .misc import Undefined
+from .misc import Undefined, unliteral
 from ..typeconv import Conversion
 
 
@@ -316,7 +316,7 @@ class List(MutableSequence):
     mutable = True
 
     def __init__(self, dtype, reflected=False):
-        self.dtype = dtype
+        self.dtype = unliteral(dtype)
         self.reflected = reflected
         cls_name = "reflected list" if reflected else "list"
         name = "%s(%s)" % (cls_name, self.dtype)
@@ -348,6 +348,40 @@ class List(MutableSequence):
         return self.dtype.is_precise()
 
 
+class ListType(List):
+    """
+    Type class for typed lists (see numba.typed.List), which are passed
+    to and from the interpreter by reference instead of being reflected.
+    """
+
+    def __init__(self, dtype):
+        self.dtype = unliteral(dtype)
+        self.reflected = False
+        name = "typed list(%s)" % (self.dtype,)
+        super(List, self).__init__(name=name)
+
+    def copy(self, dtype=None, reflected=None):
+        if dtype is None:
+            dtype = self.dtype
+        return ListType(dtype)
+
+    def unify(self, typingctx, other):
+        if isinstance(other, ListType):
+            dtype = typingctx.unify_pairs(self.dtype, other.dtype)
+            if dtype is not None:
+                return ListType(dtype)
+
+    def can_convert_from(self, typingctx, other):
+        # A list built in nopython mode can become a typed list
+        if (isinstance(other, List) and not other.reflected
+                and other.dtype == self.dtype):
+            return Conversion.safe
+
+    @property
+    def key(self):
+        return self.dtype
+
+
 class ListIter(BaseContainerIterator):
     """
     Type class for list iterators.
@@ -369,6 +403,7 @@ class Set(Container):
     mutable = True
 
     def __init__(self, dtype, reflected=False):
+        dtype = unliteral(dtype)
         assert isinstance(dtype, (Hashable, Undefined))
         self.dtype = dtype
         self.reflected = reflected
@@ -428,3 +463,203 @@ class SetEntry(Type):
     @property
     def key(self):
         return self.set_type
+
+
+class Deque(Container):
+    """
+    Type class for homogeneous double-ended queues (collections.deque),
+    stored in a ring buffer.
+    """
+    mutable = True
+
+    def __init__(self, dtype):
+        self.dtype = unliteral(dtype)
+        name = "deque(%s)" % (self.dtype,)
+        super(Deque, self).__init__(name=name)
+
+    @property
+    def key(self):
+        return self.dtype
+
+    @property
+    def iterator_type(self):
+        return DequeIter(self)
+
+    def is_precise(self):
+        return self.dtype.is_precise()
+
+    def copy(self, dtype=None):
+        if dtype is None:
+            dtype = self.dtype
+        return Deque(dtype)
+
+    def unify(self, typingctx, other):
+        if isinstance(other, Deque):
+            dtype = typingctx.unify_pairs(self.dtype, other.dtype)
+            if dtype is not None:
+                return Deque(dtype)
+
+
+class DequeIter(BaseContainerIterator):
+    """
+    Type class for deque iterators.
+    """
+    container_class = Deque
+
+
+class DequePayload(BaseContainerPayload):
+    """
+    Internal type class for the dynamically-allocated payload of a deque.
+    """
+    container_class = Deque
+
+
+class RecordListType(Container):
+    """
+    Type class for record lists (see numba.typed.RecordList): lists of
+    tuples or named tuples stored as one contiguous array per field
+    (a "struct of arrays" layout).
+    """
+    mutable = True
+
+    def __init__(self, record_type):
+        assert isinstance(record_type, BaseTuple) and len(record_type) > 0
+        self.dtype = record_type
+        name = "record list(%s)" % (record_type,)
+        super(RecordListType, self).__init__(name=name)
+
+    @property
+    def key(self):
+        return self.dtype
+
+    @property
+    def iterator_type(self):
+        return RecordListIter(self)
+
+    @property
+    def field_types(self):
+        return tuple(self.dtype)
+
+    @property
+    def columns_type(self):
+        """
+        The type of the tuple of field arrays, as returned by columns().
+        Named tuple records give a named tuple of arrays.
+        """
+        from .npytypes import Array
+        arrays = [Array(ty, 1, 'C') for ty in self.field_types]
+        if isinstance(self.dtype, BaseNamedTuple):
+            return NamedTuple(arrays, self.dtype.instance_class)
+        return Tuple(arrays)
+
+
+class RecordListIter(BaseContainerIterator):
+    """
+    Type class for record list iterators.
+    """
+    container_class = RecordListType
+
+
+class RecordListPayload(BaseContainerPayload):
+    """
+    Internal type class for the dynamically-allocated payload of a
+    record list.
+    """
+    container_class = RecordListType
+
+
+class DictType(Container):
+    """
+    Type class for typed dictionaries (hash maps with homogeneous keys
+    and homogeneous values).  Iterating over a dictionary and the ``in``
+    operator work on its keys.
+    """
+    mutable = True
+
+    def __init__(self, key_type, value_type):
+        key_type = unliteral(key_type)
+        assert isinstance(key_type, (Hashable, Undefined))
+        self.key_type = key_type
+        self.value_type = unliteral(value_type)
+        self.dtype = key_type
+        name = "dict(%s, %s)" % (key_type, value_type)
+        super(DictType, self).__init__(name=name)
+
+    @property
+    def key(self):
+        return self.key_type, self.value_type
+
+    @property
+    def iterator_type(self):
+        return DictIter(self, 'keys')
+
+    def is_precise(self):
+        return self.key_type.is_precise() and self.value_type.is_precise()
+
+    def copy(self, key_type=None, value_type=None):
+        if key_type is None:
+            key_type = self.key_type
+        if value_type is None:
+            value_type = self.value_type
+        return DictType(key_type, value_type)
+
+    def unify(self, typingctx, other):
+        if isinstance(other, DictType):
+            key_type = typingctx.unify_pairs(self.key_type, other.key_type)
+            value_type = typingctx.unify_pairs(self.value_type,
+                                               other.value_type)
+            if key_type is not None and value_type is not None:
+                return DictType(key_type, value_type)
+
+
+class DictIter(SimpleIteratorType):
+    """
+    Type class for iterators over a dictionary's keys, values or
+    (key, value) items, depending on *kind*.
+    """
+
+    def __init__(self, container, kind):
+        assert isinstance(container, DictType), container
+        assert kind in ('keys', 'values', 'items'), kind
+        self.container = container
+        self.kind = kind
+        if kind == 'keys':
+            yield_type = container.key_type
+        elif kind == 'values':
+            yield_type = container.value_type
+        else:
+            yield_type = Tuple((container.key_type, container.value_type))
+        name = 'iter_%s(%s)' % (kind, container)
+        super(DictIter, self).__init__(name, yield_type)
+
+    def unify(self, typingctx, other):
+        if isinstance(other, DictIter) and other.kind == self.kind:
+            container = typingctx.unify_pairs(self.container, other.container)
+            if container is not None:
+                return DictIter(container, self.kind)
+
+    @property
+    def key(self):
+        return self.container, self.kind
+
+
+class DictPayload(BaseContainerPayload):
+    """
+    Internal type class for the dynamically-allocated payload of a
+    dictionary.
+    """
+    container_class = DictType
+
+
+class DictEntry(Type):
+    """
+    Internal type class for the entries of a dictionary's hash table.
+    """
+    def __init__(self, dict_type):
+        self.dict_type = dict_type
+        name = 'entry(%s)' % dict_type
+        super(DictEntry, self).__init__(name)
+
+    @property
+    def key(self):
+        return self.dict_type
@@ -3,6 +3,7 @@ from __future__ import print_function, division, absolute_import
 from .abstract import *
 from .common import *
 from ..typeconv import Conversion
+from .. import utils
 
 
 class PyObject(Dummy):
@@ -59,6 +60,29 @@ class Const(Dummy):
     def key(self):
         return type(self.value), self._key
 
+    def unify(self, typingctx, other):
+        # Distinct string constants unify to a native string
+        if is_str_constant(self) and is_str_constant(other):
+            return UnicodeType('unicode_type')
+
+
+def is_str_constant(ty):
+    """
+    Whether *ty* is the type of a (unicode) string constant.
+    """
+    return (utils.IS_PY3 and isinstance(ty, Const)
+            and isinstance(ty.value, str))
+
+
+def unliteral(ty):
+    """
+    Get the type of the runtime values of type *ty*: string constants
+    are materialized as native strings, other types are unchanged.
+    """
+    if is_str_constant(ty):
+        return UnicodeType('unicode_type')
+    return ty
+
 
 class Omitted(Opaque):
     """
@@ -290,6 +314,34 @@ class ExceptionInstance(Phantom):
         return self.exc_class
 
 
+class UnicodeType(Hashable, IterableType):
+    """
+    A native unicode string, stored in the compact representation of
+    CPython (PEP 393): one, two or four bytes per code point depending
+    on the largest code point.
+    """
+
+    @property
+    def iterator_type(self):
+        return UnicodeIteratorType(self)
+
+    def can_convert_from(self, typingctx, other):
+        if is_str_constant(other):
+            return Conversion.safe
+
+
+class UnicodeIteratorType(SimpleIteratorType):
+    """
+    The type of iterators over native unicode strings, yielding
+    one-character strings.
+    """
+
+    def __init__(self, string_type):
+        self.string_type = string_type
+        name = "iter(%s)" % (string_type,)
+        super(UnicodeIteratorType, self).__init__(name, string_type)
+
+
 class SliceType(Type):
 
     def __init__(self, name, members):
@@ -15,6 +15,21 @@ from numba.errors import TypingError
 
 Indexing = namedtuple("Indexing", ("index", "result", "advanced"))
 
+# The algorithms accepted by the sorting functions' *kind* argument
+# ('stable' is an alias for 'timsort')
+supported_sort_kinds = ('quicksort', 'mergesort', 'stable', 'timsort')
+
+
+def check_sort_kind(kind):
+    """
+    Check the *kind* argument of a sorting function is a constant naming
+    a supported algorithm.
+    """
+    if (not isinstance(kind, types.Const) or
+        kind.value not in supported_sort_kinds):
+        raise TypingError("sort kind must be a constant string in %s, got %s"
+                          % (supported_sort_kinds, kind))
+
 
 def get_array_index_type(ary, idx):
     """
@@ -405,10 +420,16 @@ class ArrayAttribute(AttributeTemplate):
 
     @bound_function("array.sort")
     def resolve_sort(self, ary, args, kws):
-        assert not args
-        assert not kws
+        def sort_stub(kind='quicksort'):
+            pass
+        pysig = utils.pysignature(sort_stub)
+        bound = pysig.bind(*args, **kws)
         if ary.ndim == 1:
-            return signature(types.none)
+            if 'kind' not in bound.arguments:
+                return signature(types.none)
+            kind = bound.arguments['kind']
+            check_sort_kind(kind)
+            return signature(types.none, kind).replace(pysig=pysig)
 
     @bound_function("array.argsort")
     def resolve_argsort(self, ary, args, kws):
@@ -418,6 +439,7 @@ class ArrayAttribute(AttributeTemplate):
         if kwargs:
             msg = "Unsupported keywords: {!r}"
             raise TypingError(msg.format([k for k in kwargs.keys()]))
+        check_sort_kind(kind)
         if ary.ndim == 1:
             def argsort_stub(kind='quicksort'):
                 pass
@@ -1,5 +1,7 @@
 from __future__ import print_function, division, absolute_import
 
+import collections
+
 from .. import types, utils, errors
 from .templates import (AttributeTemplate, ConcreteTemplate, AbstractTemplate,
                         infer_global, infer, infer_getattr,
@@ -79,6 +81,332 @@ class DelItemSequence(AbstractTemplate):
             return signature(types.none, seq, idx)
 
 
+# --------------------------------------------------------------------------
+# typed dicts
+
+@infer_global(dict)
+class DictBuiltin(AbstractTemplate):
+
+    def generic(self, args, kws):
+        assert not kws
+        if not args:
+            # dict(): the key and value types are refined by the first
+            # insertion
+            return signature(types.DictType(types.undefined, types.undefined))
+
+
+@infer
+class GetItemDict(AbstractTemplate):
+    key = "getitem"
+
+    def generic(self, args, kws):
+        d, key = args
+        if isinstance(d, types.DictType):
+            return signature(d.value_type, d, d.key_type)
+
+
+@infer
+class SetItemDict(AbstractTemplate):
+    key = "setitem"
+
+    def generic(self, args, kws):
+        d, key, value = args
+        if not isinstance(d, types.DictType):
+            return
+        if not d.is_precise():
+            # Refine the key and value types of an empty dict()
+            key = self.context.unify_pairs(d.key_type, types.unliteral(key))
+            value = self.context.unify_pairs(d.value_type,
+                                             types.unliteral(value))
+            if isinstance(key, types.Hashable) and value is not None:
+                d = d.copy(key_type=key, value_type=value)
+                return signature(types.none, d, key, value)
+            return
+        for ty, expected in [(key, d.key_type), (value, d.value_type)]:
+            if not self.context.can_convert(ty, expected):
+                msg = "invalid setitem with {} to {} of {}"
+                raise errors.TypingError(msg.format(ty, expected, d))
+        return signature(types.none, d, d.key_type, d.value_type)
+
+
+@infer
+class DelItemDict(AbstractTemplate):
+    key = "delitem"
+
+    def generic(self, args, kws):
+        d, key = args
+        if isinstance(d, types.DictType):
+            return signature(types.none, d, d.key_type)
+
+
+@infer_getattr
+class DictAttribute(AttributeTemplate):
+    key = types.DictType
+
+    @bound_function("dict.clear")
+    def resolve_clear(self, d, args, kws):
+        assert not kws
+        if not args:
+            return signature(types.none)
+
+    @bound_function("dict.copy")
+    def resolve_copy(self, d, args, kws):
+        assert not kws
+        if not args:
+            return signature(d)
+
+    @bound_function("dict.get")
+    def resolve_get(self, d, args, kws):
+        assert not kws
+        if len(args) == 1:
+            return signature(types.Optional(d.value_type), d.key_type)
+        elif len(args) == 2:
+            return signature(d.value_type, d.key_type, d.value_type)
+
+    @bound_function("dict.pop")
+    def resolve_pop(self, d, args, kws):
+        assert not kws
+        if len(args) == 1:
+            return signature(d.value_type, d.key_type)
+        elif len(args) == 2:
+            return signature(d.value_type, d.key_type, d.value_type)
+
+    @bound_function("dict.setdefault")
+    def resolve_setdefault(self, d, args, kws):
+        assert not kws
+        if len(args) == 2:
+            return signature(d.value_type, d.key_type, d.value_type)
+
+    def _resolve_iter(self, d, args, kws, kind):
+        assert not kws
+        if not args:
+            return signature(types.DictIter(d, kind))
+
+    @bound_function("dict.keys")
+    def resolve_keys(self, d, args, kws):
+        return self._resolve_iter(d, args, kws, 'keys')
+
+    @bound_function("dict.values")
+    def resolve_values(self, d, args, kws):
+        return self._resolve_iter(d, args, kws, 'values')
+
+    @bound_function("dict.items")
+    def resolve_items(self, d, args, kws):
+        return self._resolve_iter(d, args, kws, 'items')
+
+
+# --------------------------------------------------------------------------
+# deques
+
+def _deque_stub(iterable=None, maxlen=None):
+    pass
+
+
+@infer_global(collections.deque)
+class DequeBuiltin(AbstractTemplate):
+
+    def generic(self, args, kws):
+        pysig = utils.pysignature(_deque_stub)
+        bound = pysig.bind(*args, **kws)
+        iterable = bound.arguments.get('iterable', types.none)
+        maxlen = bound.arguments.get('maxlen', types.none)
+        if not isinstance(maxlen, (types.Integer, types.NoneType)):
+            return
+        if isinstance(iterable, types.NoneType):
+            # deque(): the item type is refined by the first insertion
+            dtype = types.undefined
+        elif isinstance(iterable, types.IterableType):
+            dtype = iterable.iterator_type.yield_type
+        else:
+            return
+        sig = signature(types.Deque(dtype), iterable, types.unliteral(maxlen))
+        # Let lowering fold keyword and omitted arguments
+        sig.pysig = pysig
+        return sig
+
+
+@infer
+class DequeBool(AbstractTemplate):
+    key = "is_true"
+
+    def generic(self, args, kws):
+        assert not kws
+        (val,) = args
+        if isinstance(val, types.Deque):
+            return signature(types.boolean, val)
+
+
+@infer
+class GetItemDeque(AbstractTemplate):
+    key = "getitem"
+
+    def generic(self, args, kws):
+        d, idx = args
+        if isinstance(d, types.Deque) and isinstance(idx, types.Integer):
+            return signature(d.dtype, d, normalize_1d_index(idx))
+
+
+@infer
+class SetItemDeque(AbstractTemplate):
+    key = "setitem"
+
+    def generic(self, args, kws):
+        d, idx, value = args
+        if isinstance(d, types.Deque) and isinstance(idx, types.Integer):
+            if not self.context.can_convert(value, d.dtype):
+                msg = "invalid setitem with value of {} to element of {}"
+                raise errors.TypingError(msg.format(value, d.dtype))
+            return signature(types.none, d, normalize_1d_index(idx), d.dtype)
+
+
+@infer_getattr
+class DequeAttribute(AttributeTemplate):
+    key = types.Deque
+
+    def _resolve_append(self, d, args, kws):
+        item, = args
+        assert not kws
+        unified = self.context.unify_pairs(d.dtype, types.unliteral(item))
+        if unified is not None:
+            sig = signature(types.none, unified)
+            sig.recvr = d.copy(dtype=unified)
+            return sig
+
+    @bound_function("deque.append")
+    def resolve_append(self, d, args, kws):
+        return self._resolve_append(d, args, kws)
+
+    @bound_function("deque.appendleft")
+    def resolve_appendleft(self, d, args, kws):
+        return self._resolve_append(d, args, kws)
+
+    def _resolve_extend(self, d, args, kws):
+        iterable, = args
+        assert not kws
+        if not isinstance(iterable, types.IterableType):
+            return
+        dtype = iterable.iterator_type.yield_type
+        unified = self.context.unify_pairs(d.dtype, dtype)
+        if unified is not None:
+            sig = signature(types.none, iterable)
+            sig.recvr = d.copy(dtype=unified)
+            return sig
+
+    @bound_function("deque.extend")
+    def resolve_extend(self, d, args, kws):
+        return self._resolve_extend(d, args, kws)
+
+    @bound_function("deque.extendleft")
+    def resolve_extendleft(self, d, args, kws):
+        return self._resolve_extend(d, args, kws)
+
+    @bound_function("deque.clear")
+    def resolve_clear(self, d, args, kws):
+        assert not kws
+        if not args:
+            return signature(types.none)
+
+    @bound_function("deque.pop")
+    def resolve_pop(self, d, args, kws):
+        assert not kws
+        if not args:
+            return signature(d.dtype)
+
+    @bound_function("deque.popleft")
+    def resolve_popleft(self, d, args, kws):
+        assert not kws
+        if not args:
+            return signature(d.dtype)
+
+
+# --------------------------------------------------------------------------
+# record lists
+
+def _can_convert_record(context, fromty, rl):
+    """
+    Whether tuple type *fromty* can be stored in record list *rl*
+    (field by field, as named tuples don't convert as a whole).
+    """
+    return (isinstance(fromty, types.BaseTuple) and
+            len(fromty) == len(rl.dtype) and
+            all(context.can_convert(a, b) is not None
+                for a, b in zip(fromty, rl.dtype)))
+
+@infer
+class RecordListBool(AbstractTemplate):
+    key = "is_true"
+
+    def generic(self, args, kws):
+        assert not kws
+        (val,) = args
+        if isinstance(val, types.RecordListType):
+            return signature(types.boolean, val)
+
+
+@infer
+class GetItemRecordList(AbstractTemplate):
+    key = "getitem"
+
+    def generic(self, args, kws):
+        rl, idx = args
+        if isinstance(rl, types.RecordListType) and isinstance(idx, types.Integer):
+            return signature(rl.dtype, rl, normalize_1d_index(idx))
+
+
+@infer
+class SetItemRecordList(AbstractTemplate):
+    key = "setitem"
+
+    def generic(self, args, kws):
+        rl, idx, value = args
+        if isinstance(rl, types.RecordListType) and isinstance(idx, types.Integer):
+            if not _can_convert_record(self.context, value, rl):
+                msg = "invalid setitem with value of {} to element of {}"
+                raise errors.TypingError(msg.format(value, rl.dtype))
+            return signature(types.none, rl, normalize_1d_index(idx), value)
+
+
+@infer_getattr
+class RecordListAttribute(AttributeTemplate):
+    key = types.RecordListType
+
+    @bound_function("recordlist.append")
+    def resolve_append(self, rl, args, kws):
+        item, = args
+        assert not kws
+        if _can_convert_record(self.context, item, rl):
+            return signature(types.none, item)
+
+    @bound_function("recordlist.extend")
+    def resolve_extend(self, rl, args, kws):
+        iterable, = args
+        assert not kws
+        if (isinstance(iterable, types.IterableType) and
+            _can_convert_record(self.context,
+                                iterable.iterator_type.yield_type, rl)):
+            return signature(types.none, iterable)
+
+    @bound_function("recordlist.columns")
+    def resolve_columns(self, rl, args, kws):
+        assert not kws
+        if not args:
+            return signature(rl.columns_type)
+
+    @bound_function("recordlist.sort_by")
+    def resolve_sort_by(self, rl, args, kws):
+        field, = args
+        assert not kws
+        if isinstance(field, types.Const):
+            # A field name of a named tuple record
+            if (not isinstance(rl.dtype, types.BaseNamedTuple) or
+                field.value not in rl.dtype.fields):
+                raise errors.TypingError("%s has no field %r"
+                                         % (rl.dtype, field.value))
+        elif not isinstance(field, types.Integer):
+            return
+        return signature(types.Array(types.intp, 1, 'C'), field)
+
+
 # --------------------------------------------------------------------------
 # named tuples
 
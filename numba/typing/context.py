@@ -603,7 +603,8 @@ class Context(BaseContext):
 
     def load_additional_registries(self):
         from . import (cffi_utils, cmathdecl, enumdecl, listdecl, mathdecl,
-                       npydecl, operatordecl, randomdecl, setdecl)
+                       npydecl, operatordecl, randomdecl, setdecl,
+                       unicodedecl)
         self.install_registry(cffi_utils.registry)
         self.install_registry(cmathdecl.registry)
         self.install_registry(enumdecl.registry)
@@ -613,3 +614,4 @@ class Context(BaseContext):
         self.install_registry(operatordecl.registry)
         self.install_registry(randomdecl.registry)
         self.install_registry(setdecl.registry)
+        self.install_registry(unicodedecl.registry)
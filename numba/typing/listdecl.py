@@ -1,9 +1,8 @@
 from __future__ import absolute_import, print_function
 
-from .. import types
+from .. import types, utils
 from .templates import (ConcreteTemplate, AbstractTemplate, AttributeTemplate,
-                        CallableTemplate,  Registry, signature, bound_function,
-                        make_callable_template)
+                        Registry, signature, bound_function)
 # Ensure list is typed as a collection as well
 from . import collections
 
@@ -26,19 +25,44 @@ class ListBuiltin(AbstractTemplate):
                 return signature(types.List(dtype), iterable)
 
 
-@infer_global(sorted)
-class SortedBuiltin(CallableTemplate):
+def _sorted_stub(iterable, key=None, reverse=None):
+    pass
+
+def _sort_stub(key=None, reverse=None):
+    pass
 
-    def generic(self):
-        def typer(iterable, reverse=None):
-            if not isinstance(iterable, types.IterableType):
-                return
-            if (reverse is not None and
-                not isinstance(reverse, types.Boolean)):
-                return
-            return types.List(iterable.iterator_type.yield_type)
+def _check_sort_args(context, dtype, key, reverse):
+    """
+    Check the *key* and *reverse* arguments of a sort of items
+    of type *dtype*.
+    """
+    if not isinstance(reverse, (types.Boolean, types.NoneType)):
+        return False
+    if isinstance(key, types.NoneType):
+        return True
+    if not isinstance(key, types.Callable):
+        return False
+    return context.resolve_function_type(key, (dtype,), {}) is not None
 
-        return typer
+
+@infer_global(sorted)
+class SortedBuiltin(AbstractTemplate):
+
+    def generic(self, args, kws):
+        pysig = utils.pysignature(_sorted_stub)
+        bound = pysig.bind(*args, **kws)
+        iterable = bound.arguments['iterable']
+        key = bound.arguments.get('key', types.none)
+        reverse = bound.arguments.get('reverse', types.none)
+        if not isinstance(iterable, types.IterableType):
+            return
+        dtype = iterable.iterator_type.yield_type
+        if not _check_sort_args(self.context, dtype, key, reverse):
+            return
+        sig = signature(types.List(dtype), iterable, key, reverse)
+        # Let lowering fold keyword and omitted arguments
+        sig.pysig = pysig
+        return sig
 
 
 @infer_getattr
@@ -51,7 +75,7 @@ class ListAttribute(AttributeTemplate):
     def resolve_append(self, list, args, kws):
         item, = args
         assert not kws
-        unified = self.context.unify_pairs(list.dtype, item)
+        unified = self.context.unify_pairs(list.dtype, types.unliteral(item))
         if unified is not None:
             sig = signature(types.none, unified)
             sig.recvr = list.copy(dtype=unified)
@@ -107,7 +131,8 @@ class ListAttribute(AttributeTemplate):
         idx, item = args
         assert not kws
         if isinstance(idx, types.Integer):
-            unified = self.context.unify_pairs(list.dtype, item)
+            unified = self.context.unify_pairs(list.dtype,
+                                               types.unliteral(item))
             if unified is not None:
                 sig = signature(types.none, types.intp, unified)
                 sig.recvr = list.copy(dtype=unified)
@@ -135,17 +160,17 @@ class ListAttribute(AttributeTemplate):
         assert not kws
         return signature(types.none)
 
-    def resolve_sort(self, list):
-        def typer(reverse=None):
-            if (reverse is not None and
-                not isinstance(reverse, types.Boolean)):
-                return
-            return types.none
-
-        return types.BoundFunction(make_callable_template(key="list.sort",
-                                                          typer=typer,
-                                                          recvr=list),
-                                   list)
+    @bound_function("list.sort")
+    def resolve_sort(self, list, args, kws):
+        pysig = utils.pysignature(_sort_stub)
+        bound = pysig.bind(*args, **kws)
+        key = bound.arguments.get('key', types.none)
+        reverse = bound.arguments.get('reverse', types.none)
+        if not _check_sort_args(self.context, list.dtype, key, reverse):
+            return
+        sig = signature(types.none, key, reverse)
+        sig.pysig = pysig
+        return sig
 
 
 @infer
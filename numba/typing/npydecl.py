@@ -481,6 +481,38 @@ class NpArray(CallableTemplate):
         return typer
 
 
+@infer_global(np.asarray)
+class NpAsarray(CallableTemplate):
+    """
+    Typing template for np.asarray().  Arrays are returned unchanged,
+    sequences are converted as by np.array(), and sets are converted
+    to a 1d array of their items.
+    """
+
+    def generic(self):
+        def typer(a, dtype=None):
+            if dtype is not None:
+                dtype = _parse_dtype(dtype)
+                if dtype is None:
+                    return
+            if isinstance(a, types.Array):
+                # No copy is made, so no conversion is supported either
+                if dtype is None or dtype == a.dtype:
+                    return a
+            elif isinstance(a, types.Set):
+                try:
+                    as_dtype(a.dtype)
+                except NotImplementedError:
+                    raise TypingError("np.asarray() cannot convert a set of "
+                                      "%s to an array" % (a.dtype,))
+                return types.Array(dtype or a.dtype, 1, 'C')
+            else:
+                ndim, seq_dtype = _parse_nested_sequence(self.context, a)
+                return types.Array(dtype or seq_dtype, ndim, 'C')
+
+        return typer
+
+
 @infer_global(np.empty)
 @infer_global(np.zeros)
 @infer_global(np.ones)
@@ -685,7 +717,11 @@ class NdFromBuffer(CallableTemplate):
 class NdSort(CallableTemplate):
 
     def generic(self):
-        def typer(a):
+        from .arraydecl import check_sort_kind
+
+        def typer(a, kind=None):
+            if kind is not None:
+                check_sort_kind(kind)
             if isinstance(a, types.Array) and a.ndim == 1:
                 return a
 
@@ -920,6 +956,8 @@ class NdColumnStack(CallableTemplate):
 
 
 class MatMulTyperMixin(object):
+    # whether 3-D arrays are supported as stacks of matrices
+    allow_stacked = False
 
     def matmul_typer(self, a, b, out=None):
         """
@@ -927,12 +965,20 @@ class MatMulTyperMixin(object):
         """
         if not isinstance(a, types.Array) or not isinstance(b, types.Array):
             return
-        if not all(x.ndim in (1, 2) for x in (a, b)):
+        if self.allow_stacked and 3 in (a.ndim, b.ndim):
+            if not all(x.ndim in (2, 3) for x in (a, b)):
+                raise TypingError("%s only supported on stacks of matrices "
+                                  "with 2-D and 3-D arrays"
+                                  % (self.func_name, ))
+        elif not all(x.ndim in (1, 2) for x in (a, b)):
             raise TypingError("%s only supported on 1-D and 2-D arrays"
                               % (self.func_name, ))
         # Output dimensionality
         ndims = set([a.ndim, b.ndim])
-        if ndims == set([2]):
+        if 3 in ndims:
+            # stack of M * M
+            out_ndim = 3
+        elif ndims == set([2]):
             # M * M
             out_ndim = 2
         elif ndims == set([1, 2]):
@@ -959,9 +1005,10 @@ class MatMulTyperMixin(object):
         if not all(x.dtype == a.dtype for x in all_args):
             raise TypingError("%s arguments must all have "
                               "the same dtype" % (self.func_name,))
-        if not isinstance(a.dtype, (types.Float, types.Complex)):
+        if not isinstance(a.dtype, (types.Integer, types.Float,
+                                    types.Complex)):
             raise TypingError("%s only supported on "
-                              "float and complex arrays"
+                              "integer, float and complex arrays"
                               % (self.func_name,))
         if out:
             return out
@@ -1011,6 +1058,7 @@ class VDot(CallableTemplate):
 class MatMul(MatMulTyperMixin, AbstractTemplate):
     key = "@"
     func_name = "'@'"
+    allow_stacked = True
 
     def generic(self, args, kws):
         assert not kws
@@ -1019,6 +1067,22 @@ class MatMul(MatMulTyperMixin, AbstractTemplate):
             return signature(restype, *args)
 
 
+if numpy_version >= (1, 10):
+    @infer_global(np.matmul)
+    class NpMatMul(MatMulTyperMixin, AbstractTemplate):
+        func_name = "np.matmul()"
+        allow_stacked = True
+
+        def generic(self, args, kws):
+            assert not kws
+            if len(args) > 2:
+                raise TypingError("np.matmul() doesn't support the out "
+                                  "argument")
+            restype = self.matmul_typer(*args)
+            if restype is not None:
+                return signature(restype, *args)
+
+
 def _check_linalg_matrix(a, func_name):
     if not isinstance(a, types.Array):
         return
@@ -39,7 +39,7 @@ class SetAttribute(AttributeTemplate):
     def resolve_add(self, set, args, kws):
         item, = args
         assert not kws
-        unified = self.context.unify_pairs(set.dtype, item)
+        unified = self.context.unify_pairs(set.dtype, types.unliteral(item))
         if unified is not None:
             sig = signature(types.none, unified)
             sig.recvr = set.copy(dtype=unified)
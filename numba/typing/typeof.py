@@ -127,6 +127,8 @@ def _typeof_numpy_scalar(val, c):
 
 @typeof_impl.register(str)
 def _typeof_str(val, c):
+    if utils.IS_PY3:
+        return types.unicode_type
     return types.string
 
 @typeof_impl.register(type((lambda a: a).__code__))
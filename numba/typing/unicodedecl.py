@@ -0,0 +1,177 @@
+"""
+Typing declarations for native unicode strings.
+"""
+
+from __future__ import absolute_import, print_function
+
+from .. import types
+from .templates import (ConcreteTemplate, AbstractTemplate, AttributeTemplate,
+                        Registry, signature, bound_function)
+from .builtins import normalize_1d_index
+
+
+registry = Registry()
+infer = registry.register
+infer_global = registry.register_global
+infer_getattr = registry.register_attr
+
+
+def is_unicode(ty):
+    """
+    Whether *ty* is a native string type or a string constant.
+    """
+    return isinstance(ty, types.UnicodeType) or types.is_str_constant(ty)
+
+
+@infer_global(len)
+class UnicodeLen(AbstractTemplate):
+
+    def generic(self, args, kws):
+        assert not kws
+        (val,) = args
+        if isinstance(val, types.UnicodeType):
+            return signature(types.intp, val)
+
+
+@infer_global(hash)
+class UnicodeHash(ConcreteTemplate):
+    # Allows hashing string constants
+    cases = [signature(types.intp, types.unicode_type)]
+
+
+@infer
+class UnicodeBool(AbstractTemplate):
+    key = "is_true"
+
+    def generic(self, args, kws):
+        assert not kws
+        (val,) = args
+        if isinstance(val, types.UnicodeType):
+            return signature(types.boolean, val)
+
+
+@infer
+class GetItemUnicode(AbstractTemplate):
+    key = "getitem"
+
+    def generic(self, args, kws):
+        s, idx = args
+        if isinstance(s, types.UnicodeType):
+            idx = normalize_1d_index(idx)
+            if isinstance(idx, (types.SliceType, types.Integer)):
+                return signature(s, s, idx)
+
+
+class UnicodeCompare(AbstractTemplate):
+
+    def generic(self, args, kws):
+        assert not kws
+        a, b = args
+        if not (isinstance(a, types.UnicodeType)
+                or isinstance(b, types.UnicodeType)):
+            # Comparisons of two constants are handled elsewhere
+            return
+        if is_unicode(a) and is_unicode(b):
+            return signature(types.boolean, types.unicode_type,
+                             types.unicode_type)
+
+
+@infer
+class UnicodeEq(UnicodeCompare):
+    key = '=='
+
+@infer
+class UnicodeNe(UnicodeCompare):
+    key = '!='
+
+@infer
+class UnicodeLt(UnicodeCompare):
+    key = '<'
+
+@infer
+class UnicodeLe(UnicodeCompare):
+    key = '<='
+
+@infer
+class UnicodeGt(UnicodeCompare):
+    key = '>'
+
+@infer
+class UnicodeGe(UnicodeCompare):
+    key = '>='
+
+
+@infer
+class UnicodeIn(AbstractTemplate):
+    key = "in"
+
+    def generic(self, args, kws):
+        assert not kws
+        sub, s = args
+        if isinstance(s, types.UnicodeType) and is_unicode(sub):
+            return signature(types.boolean, types.unicode_type, s)
+
+
+@infer
+class UnicodeAdd(AbstractTemplate):
+    key = "+"
+
+    def generic(self, args, kws):
+        assert not kws
+        a, b = args
+        if is_unicode(a) and is_unicode(b):
+            return signature(types.unicode_type, types.unicode_type,
+                             types.unicode_type)
+
+
+@infer_getattr
+class UnicodeAttribute(AttributeTemplate):
+    key = types.UnicodeType
+
+    def _resolve_substring_method(self, args, kws, restype):
+        assert not kws
+        sub, = args
+        if is_unicode(sub):
+            return signature(restype, types.unicode_type)
+
+    @bound_function("unicode.find")
+    def resolve_find(self, s, args, kws):
+        return self._resolve_substring_method(args, kws, types.intp)
+
+    @bound_function("unicode.startswith")
+    def resolve_startswith(self, s, args, kws):
+        return self._resolve_substring_method(args, kws, types.boolean)
+
+    @bound_function("unicode.endswith")
+    def resolve_endswith(self, s, args, kws):
+        return self._resolve_substring_method(args, kws, types.boolean)
+
+    @bound_function("unicode.split")
+    def resolve_split(self, s, args, kws):
+        assert not kws
+        restype = types.List(types.unicode_type)
+        if not args:
+            # Split on runs of whitespace
+            return signature(restype)
+        sep, = args
+        if is_unicode(sep):
+            return signature(restype, types.unicode_type)
+
+    @bound_function("unicode.join")
+    def resolve_join(self, s, args, kws):
+        assert not kws
+        parts, = args
+        if (isinstance(parts, types.Sequence)
+            and isinstance(parts.dtype, types.UnicodeType)):
+            return signature(types.unicode_type, parts)
+
+
+@infer_getattr
+class StringConstantAttribute(AttributeTemplate):
+    key = types.Const
+
+    def generic_resolve(self, const, attr):
+        # Methods of string constants are those of native strings,
+        # e.g. ", ".join(...)
+        if types.is_str_constant(const):
+            return self.context.resolve_getattr(types.unicode_type, attr)